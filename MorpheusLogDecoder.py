@@ -7,7 +7,7 @@ def parse_log(filename):
     DEVICE = "SCTE104_TLNProtocol"
     KEYWORD = "SendData"
 
-    log_filtered_kerneldiag_logs(filter_kernel_diags_on_device_and_keyword(file = FILE, device = DEVICE, keyword = KEYWORD), ignore_keep_alive=True)
+    log_filtered_kerneldiag_logs(filter_kernel_diags_on_device_and_keyword(file = FILE, device = DEVICE, keyword = KEYWORD, ignore_keep_alive=True), ignore_keep_alive=True)
 
 if __name__ == "__main__":
     cli_parser = argparse.ArgumentParser(description="Read Morpheus KernelDiags log and parse SCTE104 Messages")
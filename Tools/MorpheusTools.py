@@ -4,7 +4,8 @@ from shutil import ReadError
 import pytz
 import datetime
 from datetime import timezone
-from timecode import Timecode
+from pyvanc.utils.frame_timecode import frames_to_timecode
+from pyvanc.extractors.morpheus import iter_kerneldiag_messages
 from Tools.SCTE_104_Tools import decode_SCTE104, decode_SCTE104_to_SCTE104Packet
 from bitstring import ReadError
 from Tools.PhabrixTools import fake_anc_decode
@@ -63,96 +64,62 @@ def filter_sent_driver_data_to_injector(sent_driver_data_to_injector):
 
 morpheus_preprocessor = compose(filter_sent_driver_data_to_injector, list_to_string)
 
-def log_filtered_kerneldiag_logs(line, ignore_keep_alive=False):
+def decode_kerneldiag_message(message):
+    '''
+    Decode the SCTE104 data of a logged message, None if it cannot be decoded.
+    This runs in the worker processes of the parser, so it has to live at module level.
+    '''
+    try:
+        return decode_SCTE104_to_SCTE104Packet(message.data.hex())
+    except ReadError:
+        return None
+
+def log_filtered_kerneldiag_logs(messages, ignore_keep_alive=False):
     logging.basicConfig(filename='scte_diags.log', encoding='utf-8', filemode='w', format='%(message)s', level=logging.INFO)
     log = logging.getLogger(__name__)
-    all_log_lines = []
     '''
     if only one item is needed from the generator object:
-    #result = next(itertools.islice(line, 0, None))
+    #result = next(itertools.islice(messages, 0, None))
     '''
     # get utc hour offset
     naive = datetime.datetime.now()
     timezone = pytz.timezone("Europe/Brussels")
     utc_offset = timezone.localize(naive)
     utc_adjusted_hour = (utc_offset.utcoffset().seconds//3600)
+    utc_adjusted_frames = utc_adjusted_hour * 3600 * 25
     '''
-    The Morpheus Kernel Diags log lines are not formatted in a way that is easily parsed. We need to string slice and mangle the line data in a format that can be handled.
+    The messages are streamed from the parser in pyvanc.extractors.morpheus, which already read the timestamp,
+    device and data bytes of every log line. Nothing is collected, every message is logged as soon as it is parsed.
+    example line:
+    10_240_33_166|167 26-AUG-2022 12:30:40:06: SCTE104_AdsProtocol,SendData, data sent: 0x0 [0] 0x3 [1] 0x0 [2] 0xd [3] 0xff [4] 0xff [5] 0xff [6] 0xff [7] 0x0 [8] 0x0 [9] 0x3 [10] 0x0 [11] 0x2 [12]  [166-Active]
     '''
-    for result in line:
-        single_log_line = {}
-        '''
-        example line:
-        10_240_33_166|167 26-AUG-2022 12:30:40:06: SCTE104_AdsProtocol,SendData, data sent: 0x0 [0] 0x3 [1] 0x0 [2] 0xd [3] 0xff [4] 0xff [5] 0xff [6] 0xff [7] 0x0 [8] 0x0 [9] 0x3 [10] 0x0 [11] 0x2 [12]  [166-Active]
-        1. First we split on the semicolon to separate the [card pair][timestamp], [topic], [data string], [active controller]
-        2. Then we reconstruct the timecode from the first field, using some string slicing to reconstruct a timecode string. Then we convert this to a Timecode object at 25fps.
-        3. The rest of the dict items is selected from the other fields
-        4. Finally, constructing a single dict with the timecode, device, the original data for debugging purposes and the hex data send. This data is converted into a hex stream string.
-        '''
-        result = result.split(":")
-        # skip the card pair and jump to the hours, in this example: "12"
-        hours = result[0][len(result[0])-2:]
-        # the rest can be grabbed from the list
-        minutes = result[1]
-        seconds = result[2]
-        frames = result[3]
-        # we reformat the fields so it's easily convertible to a Timecode object
-        timecode_string = f"{hours}:{minutes}:{seconds}:{frames}"
-        automation_ts = Timecode('25', timecode_string)
-
-        utc_adjusted_timecode_string = f"{int(hours)+utc_adjusted_hour}:{minutes}:{seconds}:{frames}"
-        utc_adjusted_automation_ts = Timecode('25', utc_adjusted_timecode_string)
-        # build the dict
-        single_log_line["timecode"] = str(automation_ts)
-        single_log_line["timecode_utc_adjusted"] = str(utc_adjusted_automation_ts)
-        automation_ts.set_fractional(True)
-        utc_adjusted_automation_ts.set_fractional(True)
-        single_log_line["timecode_frac"] = str(automation_ts)
-        single_log_line["timecode_utc_adjusted_frac"] = str(utc_adjusted_automation_ts)
-        # only device needed from the "topic" datafield
-        single_log_line["device"] = result[4].split(",")[0]
-        # grab the sent SCTE104 data from the automation driver to the injector card
-        sent_driver_data_to_injector = result[5][1:-14]
-        #print(sent_driver_data_to_injector)
-        single_log_line["orig"] = sent_driver_data_to_injector
-        '''
-        The Morpheus preprocessor function combines two functions:
-        We convert the data from the log file into a list of only the hex data
-        Then we convert that list into one single data string.
-        This data string is in the format that the SCTE104 decoder functions expect.
-        So a log line 0xff [0] 0xff [1] 0x0 [2] etc. will become 0xff 0xff 0x0
-        And then will become "ffff00" etc.
+    for message in messages:
+        # 0003000dffffffff0000 = keep_alive message
+        if ignore_keep_alive == True and message.is_keep_alive:
+            # skip keep alive messages
+            continue
+        # the frames of the log timestamp were stored as microseconds, we turn the time of day back into a frame count at 25fps
+        timestamp = message.timestamp
+        automation_ts = (timestamp.hour * 3600 + timestamp.minute * 60 + timestamp.second) * 25 + round(timestamp.microsecond * 25 / 1000000)
+        # the utc offset is added in frames, wrapping around at midnight
+        utc_adjusted_automation_ts = automation_ts + utc_adjusted_frames
+        # the data string is in the format that the SCTE104 decoder functions expect, e.g. "ffff00"
+        data = message.data.hex()
+        log.info("@UTC %s (frac: %s) ~ UTC Corrected %s (frac: %s): %s", frames_to_timecode(automation_ts, 25), frames_to_timecode(automation_ts, 25, fractional=True), frames_to_timecode(utc_adjusted_automation_ts, 25), frames_to_timecode(utc_adjusted_automation_ts, 25, fractional=True), data)
+        if message.decoded is None:
+            print("error decoding: ", message)
+        else:
+            log.info(message.decoded)
 
-        The dict item "data" is what in the end will be parsed by the SCTE104 decoder.
-        '''
-        single_log_line["data"] = morpheus_preprocessor(sent_driver_data_to_injector)
-    
-        
-        all_log_lines.append(single_log_line)
-
-    for scte_event_in_log in all_log_lines:
-        #print(scte_event_in_log)
-        try:
-            # 0003000dffffffff0000 = keep_alive message
-            if ignore_keep_alive == True and "0003000dffffffff0000" in scte_event_in_log["data"]:
-                    # skip keep alive messages
-                    pass
-            else:
-                log.info("@UTC %s (frac: %s) ~ UTC Corrected %s (frac: %s): %s", scte_event_in_log["timecode"], scte_event_in_log["timecode_frac"], scte_event_in_log["timecode_utc_adjusted"], scte_event_in_log["timecode_utc_adjusted_frac"], scte_event_in_log["data"])
-                #print("SCTE104 Message found in logs:", single_log_line["data"])
-                log.info(decode_SCTE104_to_SCTE104Packet(scte_event_in_log["data"]))
-                
-        except ReadError:
-            print("error decoding: ", scte_event_in_log)
-
-def filter_kernel_diags_on_device_and_keyword(file, device, keyword):
+def filter_kernel_diags_on_device_and_keyword(file, device, keyword, ignore_keep_alive=False):
     '''
-    This function will reads a KernelDiags log file and only returns log lines with the following conditions:
+    This function reads a KernelDiags log file and only returns the messages on log lines with the following conditions:
     - device: only return log lines if it matches a certain device
     - keyword: only return log lines if a certain command is seen on this log line
-    '''    
-    filtered_on_device = (line for line in open(file) if device in line )
-    return (filtered_on_keyword for filtered_on_keyword in filtered_on_device if keyword in filtered_on_keyword )
+    The log is memory-mapped and parsed in chunks on all cores, the messages come back decoded and in log order.
+    Keep alive messages are dropped before they are parsed when ignore_keep_alive is set.
+    '''
+    return iter_kerneldiag_messages(file, device=device, keyword=keyword, skip_keep_alives=ignore_keep_alive, decode=decode_kerneldiag_message)
 
 def morpheus_log_parser(sent_driver_data_to_injector):
     #manual_anc = "ffff002c000073000200020a1f190c02010400021f40010b0012000002290000000000310000000000000000000a0104000b0000000c00000001"
@@ -0,0 +1,28 @@
+from TimecodeTools import frame_timecode, frames_to_timecode, timecode_to_frames
+
+def test_timecode_round_trip():
+    frames = timecode_to_frames('07:01:26:11')
+    assert frames == ((7 * 60 + 1) * 60 + 26) * 25 + 11
+    assert frames_to_timecode(frames) == '07:01:26:11'
+    assert frames_to_timecode(timecode_to_frames('12:30:40:06'), fractional=True) == '12:30:40.240'
+
+    # frame counts wrap around at midnight
+    assert frames_to_timecode(timecode_to_frames('23:59:59:24') + 1) == '00:00:00:00'
+    assert frame_timecode.frame_difference(timecode_to_frames('00:00:00:05'), timecode_to_frames('23:59:59:20')) == 10
+    assert frame_timecode.frame_difference(timecode_to_frames('10:00:00:00'), timecode_to_frames('10:00:01:00')) == -25
+
+def test_drop_frame():
+    assert timecode_to_frames('00:01:00;02', '29.97') == 1800
+    assert timecode_to_frames('00:10:00;00', '29.97') == 17982
+    assert frame_timecode.frames_to_timecode(1800, '29.97', drop_frame=True) == '00:01:00;02'
+
+    for frames in range(0, 2 * 17982, 7):
+        timecode = frame_timecode.frames_to_timecode(frames, '29.97', drop_frame=True)
+        assert timecode_to_frames(timecode, '29.97') == frames
+
+def test_seconds_to_frames():
+    assert frame_timecode.seconds_to_frames('8.920000') == 223
+    assert frame_timecode.seconds_to_frames('0.019999') == 0
+    assert frame_timecode.seconds_to_frames('0.020000') == 1
+    assert frame_timecode.seconds_to_frames('1.001', '30000/1001') == 30
+    assert frame_timecode.milliseconds_to_frames(8000) == 200
@@ -0,0 +1,7 @@
+"""SCTE-104 event analyzers."""
+
+from .engine import AnalysisEngine, AnalysisSummary, analyze_events, classify_event
+from .interval_index import IntervalIndex
+from .timeline import TimelineSource, TimelineStats, merge_timeline
+from .diff import DiffStats, EventDiff, diff_events
+from .correlate import Correlation, CorrelationStats, correlate_events
@@ -0,0 +1,321 @@
+"""Correlate the SCTE-104 messages sent by automation with those found in files.
+
+Automation logs tell when a message was sent to the injector, MXF files tell
+in which frame it ended up. Both sides are placed on the same axis of UTC
+frames and joined with a sort-merge join: each side is sorted by join key
+and frame, spilling to temporary files past a memory limit, and the two
+sorted streams are merged in one pass. Within a key, every sent message is
+paired with the first unpaired message in the files within the maximum
+latency, so a message that is sent repeatedly is paired in order. Copies of
+a paired message in the frames after it are counted as repeats.
+
+Latencies are kept as a histogram of whole frames, so the percentiles are
+exact and memory does not grow with the number of messages.
+"""
+
+import collections
+import hashlib
+import logging
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    Callable,
+    Counter,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from ..storage.spill import DEFAULT_MEMORY_LIMIT, ExternalSorter
+
+logger = logging.getLogger(__name__)
+
+JOIN_EVENT_ID = "event-id"
+JOIN_PAYLOAD = "payload"
+
+DEFAULT_PERCENTILES = (50.0, 90.0, 95.0, 99.0)
+
+# Hex digits of the payload hash used as join key
+PAYLOAD_HASH_DIGITS = 16
+
+# Key of an event for the join, None to leave the event out
+JoinKey = Callable[[Dict[str, Any]], Optional[Tuple[Any, ...]]]
+# Frame of an event on the common axis, None if it cannot be placed
+Position = Callable[[Dict[str, Any]], Optional[int]]
+
+
+class Correlation(NamedTuple):
+    """A sent message with the message found in a file, or without one."""
+
+    key: Tuple[Any, ...]
+    sent: Optional[Dict[str, Any]]
+    received: Optional[Dict[str, Any]]
+    sent_frame: Optional[int]
+    received_frame: Optional[int]
+
+    @property
+    def latency(self) -> Optional[int]:
+        """Frames from sending to the frame in the file, None if unpaired."""
+        if self.sent_frame is None or self.received_frame is None:
+            return None
+        return self.received_frame - self.sent_frame
+
+
+@dataclass
+class CorrelationStats:
+    """Counts and latency histogram of a correlation."""
+
+    paired: int = 0
+    not_received: int = 0  # Sent, but not found in the files
+    not_sent: int = 0  # Found in the files, but not in the logs
+    repeats: int = 0  # Further copies of a paired message in the files
+    unplaced: int = 0
+    latencies: Counter[int] = field(default_factory=collections.Counter)
+
+    def percentiles(
+        self, percentiles: Sequence[float] = DEFAULT_PERCENTILES
+    ) -> Dict[float, int]:
+        """Get latency percentiles with the nearest-rank method.
+
+        Args:
+            percentiles: Percentiles between 0 and 100
+
+        Returns:
+            Latency in frames of every percentile, empty without pairs
+        """
+        total = sum(self.latencies.values())
+        if not total:
+            return {}
+
+        ranks = sorted((max(1, -(-p * total // 100)), p) for p in percentiles)
+        results = {}
+        seen = 0
+        pending = iter(ranks)
+        rank, percentile = next(pending)
+        for latency in sorted(self.latencies):
+            seen += self.latencies[latency]
+            while seen >= rank:
+                results[percentile] = latency
+                try:
+                    rank, percentile = next(pending)
+                except StopIteration:
+                    return results
+        return results
+
+
+def message_digest(payload: bytes) -> str:
+    """Hash a SCTE-104 message, without the VANC header around it.
+
+    Args:
+        payload: VANC user data words, or the bare message
+
+    Returns:
+        Hex digest, the same for the message as sent and as found in a file
+    """
+    message = payload
+    if message[:2] == b"\x41\x07":
+        # DID, SDID, payload descriptor and size
+        message = message[4:]
+    if message[:2] == b"\xff\xff" and len(message) >= 4:
+        # Multiple operation message, drop padding after its messageSize
+        message = message[: int.from_bytes(message[2:4], byteorder="big")]
+    return hashlib.sha1(message).hexdigest()[:PAYLOAD_HASH_DIGITS]
+
+
+def join_key(join: str = JOIN_EVENT_ID) -> JoinKey:
+    """Get the join key of events.
+
+    Args:
+        join: JOIN_EVENT_ID to join by segmentation event ID and type, falling
+              back to the payload hash for events without one, or JOIN_PAYLOAD
+              to always join by payload hash
+
+    Returns:
+        Function giving the key of an event, None for events without payload
+        that cannot be joined by event ID
+    """
+    if join not in (JOIN_EVENT_ID, JOIN_PAYLOAD):
+        raise ValueError(f"Unknown join: {join}")
+
+    def key(event: Dict[str, Any]) -> Optional[Tuple[Any, ...]]:
+        if join == JOIN_EVENT_ID and event.get("event_id") is not None:
+            return (
+                JOIN_EVENT_ID,
+                event["event_id"],
+                event.get("segmentation_type_id") or 0,
+            )
+        payload = event.get("payload")
+        if not payload:
+            return None
+        return (JOIN_PAYLOAD, message_digest(payload), event.get("operation_id") or "")
+
+    return key
+
+
+def _sorted_side(
+    events: Iterable[Dict[str, Any]],
+    key: JoinKey,
+    position: Position,
+    memory_limit: int,
+    stats: CorrelationStats,
+) -> Generator[Tuple[Tuple[Any, ...], int, Dict[str, Any]], None, None]:
+    """Sort the events of one side by join key and frame.
+
+    Yields:
+        (key, frame, event) in key and frame order
+    """
+    with ExternalSorter(
+        key=lambda item: (item[0], item[1]), memory_limit=memory_limit
+    ) as sorter:
+        for event in events:
+            event_key = key(event)
+            frame = position(event)
+            if event_key is None or frame is None:
+                stats.unplaced += 1
+                continue
+            sorter.add((event_key, frame, event))
+        logger.debug(f"Sorted {sorter.count} events in {sorter.spilled_runs} runs")
+        yield from sorter.sorted_items()
+
+
+def _pair_group(
+    key: Tuple[Any, ...],
+    sent: List[Tuple[Any, int, Dict[str, Any]]],
+    received: List[Tuple[Any, int, Dict[str, Any]]],
+    max_latency_frames: int,
+    stats: CorrelationStats,
+) -> Iterator[Correlation]:
+    """Pair the sent and received messages of one key, both in frame order."""
+    index = 0
+    for position, (_, sent_frame, sent_event) in enumerate(sent):
+        # Received messages too early for this send cannot pair with later ones
+        while index < len(received) and (
+            received[index][1] < sent_frame - max_latency_frames
+        ):
+            _, frame, event = received[index]
+            yield Correlation(key, None, event, None, frame)
+            index += 1
+        if index >= len(received) or (
+            received[index][1] > sent_frame + max_latency_frames
+        ):
+            yield Correlation(key, sent_event, None, sent_frame, None)
+            continue
+
+        _, frame, event = received[index]
+        yield Correlation(key, sent_event, event, sent_frame, frame)
+        index += 1
+
+        # Copies in the next frames that the next send cannot pair with are
+        # repeats of this message, e.g. by an injector that inserts it twice
+        next_window = (
+            sent[position + 1][1] - max_latency_frames
+            if position + 1 < len(sent)
+            else None
+        )
+        while (
+            index < len(received)
+            and received[index][1] <= frame + max_latency_frames
+            and (next_window is None or received[index][1] < next_window)
+        ):
+            stats.repeats += 1
+            index += 1
+
+    for _, frame, event in received[index:]:
+        yield Correlation(key, None, event, None, frame)
+
+
+def correlate_events(
+    sent: Iterable[Dict[str, Any]],
+    received: Iterable[Dict[str, Any]],
+    key: JoinKey,
+    position: Position,
+    max_latency_frames: int,
+    memory_limit: int = DEFAULT_MEMORY_LIMIT,
+    stats: Optional[CorrelationStats] = None,
+) -> Generator[Correlation, None, None]:
+    """Join the messages sent by automation with the messages found in files.
+
+    A sent message is paired with a received message with the same key at
+    most max_latency_frames before or after it. Received messages before
+    the send are allowed, so an offset between the clocks of the automation
+    and the recorder shows as negative latencies instead of lost pairs.
+
+    Args:
+        sent: Events of the sent messages, in any order
+        received: Events of the messages found in files, in any order
+        key: Join key of an event
+        position: Frame of an event on the axis both sides share
+        max_latency_frames: Maximum frames between sending and the frame in a file
+        memory_limit: Bytes of events each side sorts in memory before spilling
+        stats: Receives the counts and latencies of the correlation
+
+    Yields:
+        Correlations in join key order
+    """
+    if stats is None:
+        stats = CorrelationStats()
+
+    # Each side is sorted in full before the merge starts
+    sent_items = _sorted_side(sent, key, position, memory_limit, stats)
+    received_items = _sorted_side(received, key, position, memory_limit, stats)
+
+    def groups(
+        items: Iterator[Tuple[Tuple[Any, ...], int, Dict[str, Any]]],
+    ) -> Iterator[Tuple[Tuple[Any, ...], List[Tuple[Any, int, Dict[str, Any]]]]]:
+        group: List[Tuple[Any, int, Dict[str, Any]]] = []
+        for item in items:
+            if group and item[0] != group[0][0]:
+                yield group[0][0], group
+                group = []
+            group.append(item)
+        if group:
+            yield group[0][0], group
+
+    def count(correlation: Correlation) -> Correlation:
+        if correlation.sent is None:
+            stats.not_sent += 1
+        elif correlation.received is None:
+            stats.not_received += 1
+        else:
+            stats.paired += 1
+            stats.latencies[correlation.latency] += 1
+        return correlation
+
+    sent_groups = groups(sent_items)
+    received_groups = groups(received_items)
+    try:
+        sent_group = next(sent_groups, None)
+        received_group = next(received_groups, None)
+        while sent_group is not None or received_group is not None:
+            if received_group is None or (
+                sent_group is not None and sent_group[0] < received_group[0]
+            ):
+                for _, frame, event in sent_group[1]:
+                    yield count(Correlation(sent_group[0], event, None, frame, None))
+                sent_group = next(sent_groups, None)
+            elif sent_group is None or received_group[0] < sent_group[0]:
+                for _, frame, event in received_group[1]:
+                    yield count(
+                        Correlation(received_group[0], None, event, None, frame)
+                    )
+                received_group = next(received_groups, None)
+            else:
+                for correlation in _pair_group(
+                    sent_group[0],
+                    sent_group[1],
+                    received_group[1],
+                    max_latency_frames,
+                    stats,
+                ):
+                    yield count(correlation)
+                sent_group = next(sent_groups, None)
+                received_group = next(received_groups, None)
+    finally:
+        sent_items.close()
+        received_items.close()
@@ -0,0 +1,276 @@
+"""Align the SCTE-104 cue events of two recordings of the same content.
+
+Main and backup chain recordings, or an ingest and its playout copy, should
+carry the same cues at the same times. Both event sequences are put on a
+common frame axis and merged into a single stream in frame order. A sweep
+over that stream pairs every event with the first event of the other
+recording that has the same identity, segmentation event ID and type,
+within a tolerance of frames. Unpaired events are kept per identity until
+the sweep moves past the tolerance, so the alignment takes linear time and
+memory depends on the events within the tolerance, not on the length of
+the recordings.
+"""
+
+import collections
+import datetime
+import heapq
+import logging
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+from ..utils.scte104_utils import CUE_OPIDS
+from ..utils.vanc_utils import parse_creation_time
+
+logger = logging.getLogger(__name__)
+
+# Frames a cue may be shifted in the other recording and still be paired
+DEFAULT_TOLERANCE_FRAMES = 25
+
+# Statuses of an aligned event
+STATUS_MATCHED = "matched"
+STATUS_SHIFTED = "shifted"
+STATUS_MISSING = "missing"  # Only in the first recording
+STATUS_EXTRA = "extra"  # Only in the second recording
+
+EPOCH = datetime.datetime(1970, 1, 1)
+
+# Frame of an event on the common axis, None if it cannot be placed
+Position = Callable[[Dict[str, Any]], Optional[int]]
+
+
+class EventDiff(NamedTuple):
+    """An event of either recording, with its counterpart in the other one."""
+
+    status: str
+    key: Tuple[Optional[int], Any]
+    first: Optional[Dict[str, Any]]
+    second: Optional[Dict[str, Any]]
+    first_frame: Optional[int]
+    second_frame: Optional[int]
+
+    @property
+    def delta(self) -> Optional[int]:
+        """Frames the second recording is late, None for unpaired events."""
+        if self.first_frame is None or self.second_frame is None:
+            return None
+        return self.second_frame - self.first_frame
+
+    @property
+    def frame(self) -> int:
+        """Frame of the event on the common axis, in the first recording if paired."""
+        return self.first_frame if self.first_frame is not None else self.second_frame
+
+
+@dataclass
+class DiffStats:
+    """Counts of an alignment."""
+
+    statuses: Dict[str, int] = field(
+        default_factory=lambda: {
+            STATUS_MATCHED: 0,
+            STATUS_SHIFTED: 0,
+            STATUS_MISSING: 0,
+            STATUS_EXTRA: 0,
+        }
+    )
+    unplaced: int = 0
+
+    @property
+    def differences(self) -> int:
+        """Number of events that were not found at the same frame."""
+        return sum(
+            count for status, count in self.statuses.items() if status != STATUS_MATCHED
+        )
+
+
+def is_cue_event(event: Dict[str, Any]) -> bool:
+    """Check whether an event carries a cue, rather than being a keep-alive.
+
+    Args:
+        event: Event from the extraction or the catalog
+
+    Returns:
+        True for splices, time signals and segmentation descriptors
+    """
+    if event.get("segmentation_type_id") is not None:
+        return True
+    try:
+        return int(event.get("operation_id") or "", 16) in CUE_OPIDS
+    except ValueError:
+        return False
+
+
+def diff_key(event: Dict[str, Any]) -> Tuple[Optional[int], Any]:
+    """Identity of an event, the same for its copy in the other recording.
+
+    Args:
+        event: Event from the extraction or the catalog
+
+    Returns:
+        Segmentation event ID and segmentation type ID, or the operation ID
+        for events without segmentation
+    """
+    event_type = event.get("segmentation_type_id")
+    if event_type is None:
+        event_type = event.get("operation_id")
+    return event.get("event_id"), event_type
+
+
+def timecode_position(framerate: float) -> Position:
+    """Place events by their timecode, the time of day of the recording chain.
+
+    Args:
+        framerate: Frame rate of the recordings
+
+    Returns:
+        Function giving the frame of an event since timecode 00:00:00:00
+    """
+
+    def position(event: Dict[str, Any]) -> Optional[int]:
+        pts_time = event.get("pts_time")
+        return None if pts_time is None else round(pts_time * framerate)
+
+    return position
+
+
+def utc_position(framerate: float) -> Position:
+    """Place events by their UTC time.
+
+    Args:
+        framerate: Frame rate of the recordings
+
+    Returns:
+        Function giving the frame of an event since the Unix epoch
+    """
+
+    def position(event: Dict[str, Any]) -> Optional[int]:
+        utc_time = parse_creation_time(event.get("utc_time") or "")
+        if utc_time is None:
+            return None
+        return round((utc_time - EPOCH).total_seconds() * framerate)
+
+    return position
+
+
+class _Unpaired:
+    """An event waiting for its counterpart, until the sweep passes the tolerance."""
+
+    __slots__ = ("frame", "side", "key", "event", "open")
+
+    def __init__(
+        self, frame: int, side: int, key: Tuple[Any, ...], event: Dict[str, Any]
+    ):
+        self.frame = frame
+        self.side = side
+        self.key = key
+        self.event = event
+        self.open = True
+
+
+def diff_events(
+    first: Iterable[Dict[str, Any]],
+    second: Iterable[Dict[str, Any]],
+    position: Position,
+    tolerance_frames: int = DEFAULT_TOLERANCE_FRAMES,
+    stats: Optional[DiffStats] = None,
+) -> Generator[EventDiff, None, None]:
+    """Align the cue events of two recordings.
+
+    Both event sequences must be in frame order, keep-alives should be left
+    out. Events are paired greedily: an event is paired with the earliest
+    unpaired event of the other recording with the same identity at most
+    tolerance_frames away.
+
+    Args:
+        first: Events of the first recording, e.g. the main chain
+        second: Events of the second recording, e.g. the backup chain
+        position: Frame of an event on the axis both recordings share
+        tolerance_frames: Maximum frames between the two copies of an event
+        stats: Receives the counts of the alignment
+
+    Yields:
+        Aligned events, in the order the sweep resolves them: pairs at the
+        later copy, unpaired events once the sweep is past their tolerance
+    """
+    if stats is None:
+        stats = DiffStats()
+
+    def placed(
+        events: Iterable[Dict[str, Any]], side: int
+    ) -> Iterator[Tuple[int, int, Dict[str, Any]]]:
+        for event in events:
+            frame = position(event)
+            if frame is None:
+                stats.unplaced += 1
+                continue
+            yield frame, side, event
+
+    # Unpaired events by identity, all of one recording, and in frame order
+    unpaired: Dict[Tuple[Any, ...], Deque[_Unpaired]] = {}
+    expiry: Deque[_Unpaired] = collections.deque()
+
+    def resolve(diff: EventDiff) -> EventDiff:
+        stats.statuses[diff.status] += 1
+        return diff
+
+    def expire(before: Optional[int]) -> Iterator[EventDiff]:
+        while expiry and (before is None or expiry[0].frame < before):
+            entry = expiry.popleft()
+            if not entry.open:
+                continue
+            entry.open = False
+            waiting = unpaired[entry.key]
+            waiting.popleft()
+            if not waiting:
+                del unpaired[entry.key]
+            if entry.side == 0:
+                yield resolve(
+                    EventDiff(
+                        STATUS_MISSING, entry.key, entry.event, None, entry.frame, None
+                    )
+                )
+            else:
+                yield resolve(
+                    EventDiff(
+                        STATUS_EXTRA, entry.key, None, entry.event, None, entry.frame
+                    )
+                )
+
+    merged = heapq.merge(
+        placed(first, 0), placed(second, 1), key=lambda item: (item[0], item[1])
+    )
+    for frame, side, event in merged:
+        yield from expire(frame - tolerance_frames)
+
+        key = diff_key(event)
+        waiting = unpaired.get(key)
+        if waiting and waiting[0].side != side:
+            # Expired entries are gone, so the earliest waiting one is in tolerance
+            other = waiting.popleft()
+            other.open = False
+            if not waiting:
+                del unpaired[key]
+            if side == 1:
+                pair = (other.event, event, other.frame, frame)
+            else:
+                pair = (event, other.event, frame, other.frame)
+            status = STATUS_MATCHED if pair[2] == pair[3] else STATUS_SHIFTED
+            yield resolve(EventDiff(status, key, *pair))
+            continue
+
+        entry = _Unpaired(frame, side, key, event)
+        unpaired.setdefault(key, collections.deque()).append(entry)
+        expiry.append(entry)
+
+    yield from expire(None)
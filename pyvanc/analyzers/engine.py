@@ -0,0 +1,435 @@
+"""Single-pass analysis of SCTE-104 event streams.
+
+The engine consumes events one at a time in frame order. Events are
+classified through a lookup table keyed by segmentation type ID, start and
+end events are paired by segmentation event ID, and segment, break and gap
+durations are accumulated as running summaries. Memory use depends on the
+number of segments open at the same time, not on the number of events.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+from ..utils.scte104_utils import SEGMENTATION_TYPE_NAMES, get_event_color
+
+logger = logging.getLogger(__name__)
+
+# Categories shown in the analysis table
+CATEGORY_PROGRAM_BOUNDARY = "Program Boundary"
+CATEGORY_CONTENT_MARKER = "Content Marker"
+CATEGORY_OTHER = "Other"
+
+CATEGORY_COLORS = {
+    CATEGORY_PROGRAM_BOUNDARY: "bright_green",
+    CATEGORY_CONTENT_MARKER: "bright_yellow",
+    CATEGORY_OTHER: "bright_blue",
+}
+
+# Roles of the intervals built from start and end events
+ROLE_SEGMENT = "segment"
+ROLE_BREAK = "break"
+
+# Actions of an event on the interval state machine
+ACTION_START = "start"
+ACTION_END = "end"
+ACTION_BOUNDARY = "boundary"  # Ends the open interval of its kind and starts a new one
+
+# Type IDs whose start/end is not spelled out in their name
+SPECIAL_ACTIONS = {
+    0x12: ("Program", ACTION_END),  # Program Early Termination
+    0x17: ("Program", ACTION_START),  # Program Overlap Start
+    0x19: ("Program", ACTION_START),  # Program Start - In Progress
+    0x98: (CATEGORY_PROGRAM_BOUNDARY, ACTION_BOUNDARY),  # Morpheus Program Boundary
+}
+
+# Interval kinds that interrupt the program rather than being part of it
+BREAK_KEYWORDS = ("Break", "Advertisement", "Placement Opportunity")
+
+# Number of finished intervals kept for display by default
+DEFAULT_MAX_RETAINED = 1000
+
+
+class EventClass(NamedTuple):
+    """Precomputed classification of a segmentation type ID."""
+
+    type_name: str
+    event_color: str
+    category: str
+    category_color: str
+    kind: Optional[str]  # Interval kind, e.g. "Program" or "Break"
+    role: Optional[str]
+    action: Optional[str]
+
+
+def _classify_type_name(type_name: str) -> str:
+    """Get the analysis category of a segmentation type name."""
+    if CATEGORY_PROGRAM_BOUNDARY in type_name:
+        return CATEGORY_PROGRAM_BOUNDARY
+    if CATEGORY_CONTENT_MARKER in type_name:
+        return CATEGORY_CONTENT_MARKER
+    return CATEGORY_OTHER
+
+
+def _interval_action(
+    type_id: int, type_name: str
+) -> Tuple[Optional[str], Optional[str]]:
+    """Get the interval kind and action of a segmentation type."""
+    if type_id in SPECIAL_ACTIONS:
+        return SPECIAL_ACTIONS[type_id]
+    if type_name.endswith(" Start"):
+        return type_name[: -len(" Start")], ACTION_START
+    if type_name.endswith(" End"):
+        return type_name[: -len(" End")], ACTION_END
+    return None, None
+
+
+def _build_event_class(type_id: int, type_name: str) -> EventClass:
+    """Build the classification of a segmentation type."""
+    category = _classify_type_name(type_name)
+    kind, action = _interval_action(type_id, type_name)
+
+    role = None
+    if kind is not None:
+        is_break = any(keyword in kind for keyword in BREAK_KEYWORDS)
+        role = ROLE_BREAK if is_break else ROLE_SEGMENT
+
+    return EventClass(
+        type_name,
+        get_event_color(type_name),
+        category,
+        CATEGORY_COLORS[category],
+        kind,
+        role,
+        action,
+    )
+
+
+# Classification of every known segmentation type, built once at import
+EVENT_CLASSES: Dict[int, EventClass] = {
+    type_id: _build_event_class(type_id, type_name)
+    for type_id, type_name in SEGMENTATION_TYPE_NAMES.items()
+}
+
+# Classification of events without segmentation data
+UNSEGMENTED_CLASS = EventClass(
+    "",
+    "bright_white",
+    CATEGORY_OTHER,
+    CATEGORY_COLORS[CATEGORY_OTHER],
+    None,
+    None,
+    None,
+)
+
+
+def classify_event(event: Dict[str, Any]) -> EventClass:
+    """Get the classification of an event.
+
+    Args:
+        event: Event dictionary as produced by extract_scte104_events
+
+    Returns:
+        Classification of the event's segmentation type
+    """
+    type_id = event.get("segmentation_type_id")
+    if type_id is None:
+        return UNSEGMENTED_CLASS
+
+    event_class = EVENT_CLASSES.get(type_id)
+    if event_class is None:
+        # Unknown type IDs are classified by name and remembered
+        type_name = event.get(
+            "segmentation_type_name", f"Unknown Type (0x{type_id:02x})"
+        )
+        event_class = _build_event_class(type_id, type_name)
+        EVENT_CLASSES[type_id] = event_class
+
+    return event_class
+
+
+class Interval(NamedTuple):
+    """A segment or break between a start and an end event."""
+
+    kind: str
+    role: str
+    event_id: Optional[int]
+    start_frame: int
+    end_frame: int
+    start_timecode: str
+    end_timecode: str
+    closed_by_id: bool = True  # False if ended by the next boundary with another ID
+    start_utc: Optional[str] = None
+    end_utc: Optional[str] = None
+
+    @property
+    def frames(self) -> int:
+        """Duration in frames."""
+        return self.end_frame - self.start_frame
+
+
+class Gap(NamedTuple):
+    """Time between two program segments that is not covered by any segment."""
+
+    start_frame: int
+    end_frame: int
+    start_timecode: str
+    end_timecode: str
+
+    @property
+    def frames(self) -> int:
+        """Duration in frames."""
+        return self.end_frame - self.start_frame
+
+
+@dataclass
+class DurationSummary:
+    """Running count, total, minimum and maximum of durations in frames."""
+
+    count: int = 0
+    total_frames: int = 0
+    min_frames: Optional[int] = None
+    max_frames: Optional[int] = None
+
+    def add(self, frames: int) -> None:
+        """Add a duration to the summary."""
+        self.count += 1
+        self.total_frames += frames
+        if self.min_frames is None or frames < self.min_frames:
+            self.min_frames = frames
+        if self.max_frames is None or frames > self.max_frames:
+            self.max_frames = frames
+
+    @property
+    def mean_frames(self) -> float:
+        """Mean duration in frames."""
+        return self.total_frames / self.count if self.count else 0.0
+
+
+@dataclass
+class AnalysisSummary:
+    """Result of an analysis run."""
+
+    event_count: int = 0
+    category_counts: Dict[str, int] = field(default_factory=dict)
+    segments: DurationSummary = field(default_factory=DurationSummary)
+    breaks: DurationSummary = field(default_factory=DurationSummary)
+    gaps: DurationSummary = field(default_factory=DurationSummary)
+    unmatched_ends: int = 0
+    out_of_order: int = 0
+    open_at_end: List[Tuple[str, Optional[int], int]] = field(default_factory=list)
+    intervals: List[Interval] = field(default_factory=list)  # First finished intervals
+    gap_list: List[Gap] = field(default_factory=list)  # First gaps
+
+
+class _OpenInterval(NamedTuple):
+    """State of an interval that has started but not ended yet."""
+
+    kind: str
+    role: str
+    event_id: Optional[int]
+    start_frame: int
+    start_timecode: str
+    start_utc: Optional[str]
+
+
+class AnalysisEngine:
+    """Single-pass analyzer of SCTE-104 events.
+
+    Feed events in frame order with feed() and call finish() at the end.
+    Each event is annotated in place with its category and colours, so the
+    caller can render it without copying.
+    """
+
+    def __init__(
+        self, framerate: float = 25.0, max_retained: int = DEFAULT_MAX_RETAINED
+    ):
+        """Initialize the analysis engine.
+
+        Args:
+            framerate: Frame rate used for durations in seconds
+            max_retained: Number of finished intervals and gaps kept in the summary
+        """
+        self.framerate = framerate
+        self.max_retained = max_retained
+        self.summary = AnalysisSummary(
+            category_counts={category: 0 for category in CATEGORY_COLORS}
+        )
+
+        self._open: Dict[Tuple[str, Optional[int]], _OpenInterval] = {}
+        self._open_boundaries: Dict[str, _OpenInterval] = {}
+        self._open_segments = 0
+        self._idle_since: Optional[Tuple[int, str]] = None
+        self._last_frame: Optional[int] = None
+
+    def feed(self, event: Dict[str, Any]) -> List[Union[Interval, Gap]]:
+        """Process one event.
+
+        Args:
+            event: Event dictionary with at least "frame" and "timecode"
+
+        Returns:
+            Intervals and gaps completed by this event
+        """
+        summary = self.summary
+        summary.event_count += 1
+
+        frame = event["frame"]
+        if self._last_frame is not None and frame < self._last_frame:
+            summary.out_of_order += 1
+        self._last_frame = frame
+
+        event_class = classify_event(event)
+        summary.category_counts[event_class.category] += 1
+        event["category"] = event_class.category
+        event["category_color"] = event_class.category_color
+        event["event_color"] = event_class.event_color
+
+        if event_class.action is None:
+            return []
+
+        completed: List[Union[Interval, Gap]] = []
+        event_id = event.get("event_id")
+        timecode = event["timecode"]
+        utc_time = event.get("utc_time")
+        kind = event_class.kind
+
+        if event_class.action == ACTION_BOUNDARY:
+            open_interval = self._open_boundaries.pop(kind, None)
+            if open_interval is not None:
+                same_id = open_interval.event_id == event_id
+                completed.append(
+                    self._close(open_interval, frame, timecode, same_id, utc_time)
+                )
+                if same_id:
+                    # Start and end of the same program
+                    return completed
+            self._open_boundaries[kind] = self._start(
+                event_class, event_id, frame, timecode, completed, utc_time
+            )
+
+        elif event_class.action == ACTION_START:
+            key = (kind, event_id)
+            open_interval = self._open.pop(key, None)
+            if open_interval is not None:
+                # Repeated start without an end, restart the interval
+                logger.debug(
+                    f"Restarting {kind} 0x{event_id or 0:08x} at frame {frame}"
+                )
+                self._release(open_interval, frame, timecode)
+            self._open[key] = self._start(
+                event_class, event_id, frame, timecode, completed, utc_time
+            )
+
+        else:
+            open_interval = self._open.pop((kind, event_id), None)
+            if open_interval is None:
+                summary.unmatched_ends += 1
+            else:
+                completed.append(
+                    self._close(open_interval, frame, timecode, True, utc_time)
+                )
+
+        return completed
+
+    def finish(self) -> AnalysisSummary:
+        """Finish the analysis and report intervals that never ended.
+
+        Returns:
+            Summary of the analysis
+        """
+        still_open = list(self._open.values()) + list(self._open_boundaries.values())
+        self.summary.open_at_end = [
+            (interval.kind, interval.event_id, interval.start_frame)
+            for interval in sorted(
+                still_open, key=lambda interval: interval.start_frame
+            )
+        ]
+        return self.summary
+
+    def _start(
+        self,
+        event_class: EventClass,
+        event_id: Optional[int],
+        frame: int,
+        timecode: str,
+        completed: List[Union[Interval, Gap]],
+        utc_time: Optional[str] = None,
+    ) -> _OpenInterval:
+        """Open an interval, recording the gap before it if no segment was open."""
+        if event_class.role == ROLE_SEGMENT:
+            if self._open_segments == 0 and self._idle_since is not None:
+                idle_frame, idle_timecode = self._idle_since
+                if frame > idle_frame:
+                    gap = Gap(idle_frame, frame, idle_timecode, timecode)
+                    self.summary.gaps.add(gap.frames)
+                    if len(self.summary.gap_list) < self.max_retained:
+                        self.summary.gap_list.append(gap)
+                    completed.append(gap)
+            self._open_segments += 1
+
+        return _OpenInterval(
+            event_class.kind, event_class.role, event_id, frame, timecode, utc_time
+        )
+
+    def _release(self, open_interval: _OpenInterval, frame: int, timecode: str) -> None:
+        """Drop an open interval, tracking when no segment is open anymore."""
+        if open_interval.role == ROLE_SEGMENT:
+            self._open_segments -= 1
+            if self._open_segments == 0:
+                self._idle_since = (frame, timecode)
+
+    def _close(
+        self,
+        open_interval: _OpenInterval,
+        frame: int,
+        timecode: str,
+        closed_by_id: bool,
+        utc_time: Optional[str] = None,
+    ) -> Interval:
+        """Close an open interval and add it to the summaries."""
+        self._release(open_interval, frame, timecode)
+
+        interval = Interval(
+            open_interval.kind,
+            open_interval.role,
+            open_interval.event_id,
+            open_interval.start_frame,
+            frame,
+            open_interval.start_timecode,
+            timecode,
+            closed_by_id,
+            open_interval.start_utc,
+            utc_time,
+        )
+
+        if interval.role == ROLE_BREAK:
+            self.summary.breaks.add(interval.frames)
+        else:
+            self.summary.segments.add(interval.frames)
+
+        if len(self.summary.intervals) < self.max_retained:
+            self.summary.intervals.append(interval)
+
+        return interval
+
+
+def analyze_events(
+    events: Iterable[Dict[str, Any]],
+    framerate: float = 25.0,
+    max_retained: int = DEFAULT_MAX_RETAINED,
+) -> AnalysisSummary:
+    """Analyze an event stream in a single pass.
+
+    Args:
+        events: Events in frame order, may be a generator
+        framerate: Frame rate used for durations in seconds
+        max_retained: Number of finished intervals and gaps kept in the summary
+
+    Returns:
+        Summary of the analysis
+    """
+    engine = AnalysisEngine(framerate, max_retained)
+    for event in events:
+        engine.feed(event)
+    return engine.finish()
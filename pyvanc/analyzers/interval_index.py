@@ -0,0 +1,516 @@
+"""Interval index answering which segments were active at a time.
+
+Segments and breaks found by the analysis engine are stored in an implicit
+augmented interval tree: the intervals are sorted by start and laid out as a
+complete binary tree over the array, where every node stores the maximum
+end time of its subtree. Point and range queries take O(log n + k) for k
+results. The index is kept on two time axes, timecode (time of day) and UTC,
+and can be saved to disk as JSON and merged across files.
+"""
+
+import datetime
+import json
+import logging
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from ..utils.vanc_utils import (
+    TIMECODE_PATTERN,
+    parse_creation_time,
+    parse_timecode_seconds,
+)
+from .engine import Interval
+
+logger = logging.getLogger(__name__)
+
+INDEX_FORMAT_VERSION = 1
+
+AXIS_TIMECODE = "timecode"
+AXIS_UTC = "utc"
+
+DAY_MS = 24 * 3600 * 1000
+EPOCH = datetime.datetime(1970, 1, 1)
+
+# "HH:MM:SS.mmm", queried like the "HH:MM:SS:FF" timecodes of TIMECODE_PATTERN
+CLOCK_TIME_PATTERN = re.compile(r"^\d{1,2}:\d{2}:\d{2}\.\d+$")
+
+# Subtrees of at most 2^(SMALL_SUBTREE_LEVEL + 1) intervals are scanned linearly
+SMALL_SUBTREE_LEVEL = 3
+
+
+class IndexEntry(NamedTuple):
+    """A segment or break of one file, with its times on both axes in milliseconds."""
+
+    file: str
+    kind: str
+    role: str
+    event_id: Optional[int]
+    start_timecode: str
+    end_timecode: str
+    start_utc: Optional[str]
+    end_utc: Optional[str]
+    timecode_start_ms: int
+    timecode_end_ms: int
+    utc_start_ms: Optional[int]
+    utc_end_ms: Optional[int]
+
+    @classmethod
+    def from_interval(
+        cls, interval: Interval, file: str, framerate: float
+    ) -> Optional["IndexEntry"]:
+        """Build an index entry from an interval found by the analysis engine.
+
+        Args:
+            interval: Finished interval
+            file: File the interval was found in
+            framerate: Frame rate used to convert timecodes
+
+        Returns:
+            Index entry, or None if the timecodes cannot be parsed
+        """
+        timecode_start_ms = timecode_to_ms(interval.start_timecode, framerate)
+        timecode_end_ms = timecode_to_ms(interval.end_timecode, framerate)
+        if timecode_start_ms is None or timecode_end_ms is None:
+            return None
+        if timecode_end_ms < timecode_start_ms:
+            # The interval runs past midnight
+            timecode_end_ms += DAY_MS
+
+        utc_start_ms = utc_to_ms(interval.start_utc) if interval.start_utc else None
+        utc_end_ms = utc_to_ms(interval.end_utc) if interval.end_utc else None
+        if utc_start_ms is None or utc_end_ms is None:
+            utc_start_ms = utc_end_ms = None
+
+        return cls(
+            file,
+            interval.kind,
+            interval.role,
+            interval.event_id,
+            interval.start_timecode,
+            interval.end_timecode,
+            interval.start_utc,
+            interval.end_utc,
+            timecode_start_ms,
+            timecode_end_ms,
+            utc_start_ms,
+            utc_end_ms,
+        )
+
+
+def timecode_to_ms(timecode: str, framerate: float) -> Optional[int]:
+    """Convert a timecode to milliseconds since midnight.
+
+    Args:
+        timecode: "HH:MM:SS:FF" timecode, or "HH:MM:SS.mmm"
+        framerate: Frames per second
+
+    Returns:
+        Milliseconds since midnight, or None if the timecode cannot be parsed
+    """
+    if "." in timecode:
+        hms, _, fraction = timecode.partition(".")
+        seconds = parse_timecode_seconds(f"{hms}:0", framerate)
+        if seconds is None or not fraction.isdigit():
+            return None
+        return round(seconds * 1000) + round(int(fraction) * 10 ** (3 - len(fraction)))
+
+    seconds = parse_timecode_seconds(timecode, framerate)
+    return None if seconds is None else round(seconds * 1000)
+
+
+def utc_to_ms(utc_time: str) -> Optional[int]:
+    """Convert a UTC time string to milliseconds since the Unix epoch.
+
+    Args:
+        utc_time: UTC time, e.g. "2024-05-14 13:05:04.000Z" or ISO 8601
+
+    Returns:
+        Milliseconds since 1970-01-01, or None if the time cannot be parsed
+    """
+    parsed = parse_creation_time(utc_time)
+    if parsed is None:
+        return None
+    return (parsed - EPOCH) // datetime.timedelta(milliseconds=1)
+
+
+def parse_query_time(value: str, framerate: float) -> Tuple[str, int]:
+    """Parse a query time given on the command line.
+
+    Args:
+        value: Timecode ("HH:MM:SS:FF", "HH:MM:SS.mmm") or UTC time (ISO 8601)
+        framerate: Frame rate used to convert timecodes
+
+    Returns:
+        Time axis and time in milliseconds on that axis
+
+    Raises:
+        ValueError: If the time cannot be parsed
+    """
+    if TIMECODE_PATTERN.match(value) or CLOCK_TIME_PATTERN.match(value):
+        ms = timecode_to_ms(value, framerate)
+        if ms is not None:
+            return AXIS_TIMECODE, ms
+    else:
+        ms = utc_to_ms(value)
+        if ms is not None:
+            return AXIS_UTC, ms
+
+    raise ValueError(f"Cannot parse time '{value}', use HH:MM:SS:FF or ISO 8601 UTC")
+
+
+class ImplicitIntervalTree:
+    """Static interval tree stored in flat arrays sorted by interval start.
+
+    Node i at level k covers the array range around i of size 2^(k+1) - 1,
+    and max_ends[i] is the largest end in that range. Intervals are half
+    open: [start, end).
+    """
+
+    def __init__(
+        self,
+        starts: List[int],
+        ends: List[int],
+        ids: List[int],
+        max_ends: Optional[List[int]] = None,
+        max_level: Optional[int] = None,
+    ):
+        """Initialize the tree from arrays sorted by start.
+
+        Use build() to create a tree from unsorted intervals. The max_ends
+        and max_level arguments restore a tree loaded from disk.
+
+        Args:
+            starts: Interval starts in ascending order
+            ends: Interval ends
+            ids: Identifier of every interval
+            max_ends: Maximum end of every subtree, computed if not given
+            max_level: Level of the root node, computed if not given
+        """
+        self.starts = starts
+        self.ends = ends
+        self.ids = ids
+
+        if max_ends is None or max_level is None:
+            self.max_ends, self.max_level = self._augment(starts, ends)
+        else:
+            self.max_ends, self.max_level = max_ends, max_level
+
+    @classmethod
+    def build(cls, intervals: Iterable[Tuple[int, int, int]]) -> "ImplicitIntervalTree":
+        """Build a tree from (start, end, id) tuples in any order.
+
+        Args:
+            intervals: Intervals with their identifiers
+
+        Returns:
+            Interval tree
+        """
+        ordered = sorted(intervals)
+        return cls(
+            [interval[0] for interval in ordered],
+            [interval[1] for interval in ordered],
+            [interval[2] for interval in ordered],
+        )
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    @staticmethod
+    def _augment(starts: Sequence[int], ends: Sequence[int]) -> Tuple[List[int], int]:
+        """Compute the maximum end of every subtree.
+
+        Args:
+            starts: Interval starts in ascending order
+            ends: Interval ends
+
+        Returns:
+            Maximum ends and the level of the root node (-1 for an empty tree)
+        """
+        n = len(starts)
+        max_ends = list(ends)
+        if n == 0:
+            return max_ends, -1
+
+        # Leaves are the even positions
+        last_i = 0
+        last = 0
+        for i in range(0, n, 2):
+            last_i, last = i, ends[i]
+
+        k = 1
+        while 1 << k <= n:
+            x = 1 << (k - 1)
+            for i in range((x << 1) - 1, n, x << 2):
+                left = max_ends[i - x]
+                right = max_ends[i + x] if i + x < n else last
+                max_ends[i] = max(ends[i], left, right)
+
+            # Track the maximum end of the incomplete rightmost subtree
+            last_i = last_i - x if (last_i >> k) & 1 else last_i + x
+            if last_i < n and max_ends[last_i] > last:
+                last = max_ends[last_i]
+            k += 1
+
+        return max_ends, k - 1
+
+    def overlapping(self, query_start: int, query_end: int) -> List[int]:
+        """Find the intervals that overlap a closed query range.
+
+        Args:
+            query_start: Start of the query range
+            query_end: End of the query range, equal to query_start for a point query
+
+        Returns:
+            Identifiers of the intervals with start <= query_end and end > query_start
+        """
+        starts, ends, max_ends, ids = self.starts, self.ends, self.max_ends, self.ids
+        n = len(starts)
+        found: List[int] = []
+        if n == 0:
+            return found
+
+        # Stack of (node, level, left subtree visited)
+        stack = [((1 << self.max_level) - 1, self.max_level, False)]
+        while stack:
+            x, k, visited = stack.pop()
+
+            if k <= SMALL_SUBTREE_LEVEL:
+                # Scan small subtrees linearly
+                i0 = x >> k << k
+                i1 = min(i0 + (1 << (k + 1)) - 1, n)
+                i = i0
+                while i < i1 and starts[i] <= query_end:
+                    if query_start < ends[i]:
+                        found.append(ids[i])
+                    i += 1
+            elif not visited:
+                # Visit the left child first, skipping it if nothing in it ends late enough
+                y = x - (1 << (k - 1))
+                stack.append((x, k, True))
+                if y >= n or max_ends[y] > query_start:
+                    stack.append((y, k - 1, False))
+            elif x < n and starts[x] <= query_end:
+                if query_start < ends[x]:
+                    found.append(ids[x])
+                stack.append((x + (1 << (k - 1)), k - 1, False))
+
+        return found
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the tree to a JSON-serializable dictionary."""
+        return {
+            "starts": self.starts,
+            "ends": self.ends,
+            "ids": self.ids,
+            "max_ends": self.max_ends,
+            "max_level": self.max_level,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ImplicitIntervalTree":
+        """Restore a tree saved with to_dict()."""
+        return cls(
+            data["starts"],
+            data["ends"],
+            data["ids"],
+            data["max_ends"],
+            data["max_level"],
+        )
+
+
+class IntervalIndex:
+    """Index of segments and breaks on the timecode and UTC axes."""
+
+    def __init__(
+        self,
+        entries: List[IndexEntry],
+        trees: Optional[Dict[str, ImplicitIntervalTree]] = None,
+    ):
+        """Initialize the index.
+
+        Args:
+            entries: Indexed segments and breaks
+            trees: Prebuilt trees per axis, built from the entries if not given
+        """
+        self.entries = entries
+
+        if trees is None:
+            trees = {
+                AXIS_TIMECODE: ImplicitIntervalTree.build(
+                    (entry.timecode_start_ms, entry.timecode_end_ms, i)
+                    for i, entry in enumerate(entries)
+                ),
+                AXIS_UTC: ImplicitIntervalTree.build(
+                    (entry.utc_start_ms, entry.utc_end_ms, i)
+                    for i, entry in enumerate(entries)
+                    if entry.utc_start_ms is not None
+                ),
+            }
+        self.trees = trees
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @classmethod
+    def from_intervals(
+        cls, intervals: Iterable[Interval], file: str, framerate: float
+    ) -> "IntervalIndex":
+        """Build an index from the intervals of one analyzed file.
+
+        Args:
+            intervals: Intervals found by the analysis engine
+            file: File the intervals were found in
+            framerate: Frame rate used to convert timecodes
+
+        Returns:
+            Interval index
+        """
+        entries = []
+        for interval in intervals:
+            entry = IndexEntry.from_interval(interval, file, framerate)
+            if entry is None:
+                logger.warning(
+                    f"Skipping interval with unparsable timecode: {interval}"
+                )
+            else:
+                entries.append(entry)
+        return cls(entries)
+
+    @classmethod
+    def merge(cls, indexes: Iterable["IntervalIndex"]) -> "IntervalIndex":
+        """Combine indexes of several files into one.
+
+        Args:
+            indexes: Indexes to combine
+
+        Returns:
+            Combined index
+        """
+        indexes = list(indexes)
+        if len(indexes) == 1:
+            return indexes[0]
+        return cls([entry for index in indexes for entry in index.entries])
+
+    def query(
+        self, axis: str, start_ms: int, end_ms: Optional[int] = None
+    ) -> List[IndexEntry]:
+        """Find the segments and breaks active at a time or during a range.
+
+        Args:
+            axis: AXIS_TIMECODE or AXIS_UTC
+            start_ms: Query time, or start of the query range, in milliseconds
+            end_ms: End of the query range, None for a point query
+
+        Returns:
+            Matching entries ordered by start time
+        """
+        if end_ms is None:
+            end_ms = start_ms
+
+        tree = self.trees[axis]
+        ids = tree.overlapping(start_ms, end_ms)
+        if axis == AXIS_TIMECODE:
+            # Intervals past midnight are stored with ends beyond one day, and
+            # a query range past midnight also covers the start of the day
+            ids += tree.overlapping(start_ms + DAY_MS, end_ms + DAY_MS)
+            if end_ms >= DAY_MS:
+                ids += tree.overlapping(start_ms - DAY_MS, end_ms - DAY_MS)
+
+        matches = [self.entries[i] for i in dict.fromkeys(ids)]
+        if axis == AXIS_UTC:
+            return sorted(matches, key=lambda entry: entry.utc_start_ms)
+        return sorted(matches, key=lambda entry: entry.timecode_start_ms)
+
+    def at(self, time: str, framerate: float = 25.0) -> List[IndexEntry]:
+        """Find the segments and breaks active at a timecode or UTC time.
+
+        Args:
+            time: Timecode ("HH:MM:SS:FF") or UTC time (ISO 8601)
+            framerate: Frame rate used to convert timecodes
+
+        Returns:
+            Matching entries ordered by start time
+        """
+        axis, time_ms = parse_query_time(time, framerate)
+        return self.query(axis, time_ms)
+
+    def between(
+        self, start: str, end: str, framerate: float = 25.0
+    ) -> List[IndexEntry]:
+        """Find the segments and breaks active at any time during a range.
+
+        Args:
+            start: Start of the range, timecode or UTC time
+            end: End of the range, on the same axis as start
+            framerate: Frame rate used to convert timecodes
+
+        Returns:
+            Matching entries ordered by start time
+
+        Raises:
+            ValueError: If start and end are on different axes
+        """
+        start_axis, start_ms = parse_query_time(start, framerate)
+        end_axis, end_ms = parse_query_time(end, framerate)
+        if start_axis != end_axis:
+            raise ValueError("Range start and end must both be timecodes or UTC times")
+        if start_axis == AXIS_TIMECODE and end_ms < start_ms:
+            end_ms += DAY_MS
+        return self.query(start_axis, start_ms, end_ms)
+
+    def save(self, path: Path) -> None:
+        """Write the index to a JSON file, replacing it atomically.
+
+        Args:
+            path: Output file
+        """
+        data = {
+            "version": INDEX_FORMAT_VERSION,
+            "fields": list(IndexEntry._fields),
+            "entries": [list(entry) for entry in self.entries],
+            "trees": {axis: tree.to_dict() for axis, tree in self.trees.items()},
+        }
+
+        path = Path(path)
+        fd, temp_name = tempfile.mkstemp(
+            prefix=f".{path.name}.", dir=path.parent or "."
+        )
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f)
+            os.replace(temp_name, path)
+        except BaseException:
+            os.unlink(temp_name)
+            raise
+
+    @classmethod
+    def load(cls, path: Path) -> "IntervalIndex":
+        """Read an index written with save().
+
+        Args:
+            path: Index file
+
+        Returns:
+            Interval index
+
+        Raises:
+            ValueError: If the file is not an index of a supported version
+        """
+        with open(path) as f:
+            data = json.load(f)
+
+        if data.get("version") != INDEX_FORMAT_VERSION:
+            raise ValueError(f"{path} is not a version {INDEX_FORMAT_VERSION} index")
+
+        fields = data["fields"]
+        entries = [
+            IndexEntry(**dict(zip(fields, values))) for values in data["entries"]
+        ]
+        trees = {
+            axis: ImplicitIntervalTree.from_dict(tree)
+            for axis, tree in data["trees"].items()
+        }
+        return cls(entries, trees)
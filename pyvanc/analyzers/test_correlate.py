@@ -0,0 +1,85 @@
+import collections
+
+from pyvanc.analyzers.correlate import (
+    JOIN_PAYLOAD,
+    CorrelationStats,
+    correlate_events,
+    join_key,
+    message_digest,
+)
+
+
+def cue(event_id, frame):
+    return {"event_id": event_id, "segmentation_type_id": 0x34, "frame": frame}
+
+
+def correlate(sent, received, key=None, max_latency_frames=5):
+    stats = CorrelationStats()
+    correlations = list(
+        correlate_events(
+            sent,
+            received,
+            key=key or join_key(),
+            position=lambda event: event["frame"],
+            max_latency_frames=max_latency_frames,
+            memory_limit=1,
+            stats=stats,
+        )
+    )
+    return correlations, stats
+
+
+def test_pairing_and_repeats():
+    sent = [cue(3, 400), cue(2, 300), cue(1, 100), cue(2, 200)]
+    received = [cue(4, 500), cue(2, 302), cue(1, 104), cue(1, 103), cue(2, 201)]
+
+    correlations, stats = correlate(sent, received)
+    pairs = sorted(
+        (c.sent_frame, c.received_frame, c.latency)
+        for c in correlations
+        if c.sent is not None and c.received is not None
+    )
+    # The copy at 104 is a repeat of the message paired at 103
+    assert pairs == [(100, 103, 3), (200, 201, 1), (300, 302, 2)]
+    assert [c.sent_frame for c in correlations if c.received is None] == [400]
+    assert [c.received_frame for c in correlations if c.sent is None] == [500]
+    assert stats.paired == 3
+    assert stats.repeats == 1
+    assert stats.not_received == 1
+    assert stats.not_sent == 1
+    assert stats.latencies == collections.Counter({1: 1, 2: 1, 3: 1})
+
+
+def test_latency_window_is_symmetric():
+    correlations, stats = correlate(
+        [cue(1, 100), cue(2, 100), cue(3, 100)],
+        [cue(1, 95), cue(2, 106), cue(3, 105)],
+    )
+    assert stats.latencies == collections.Counter({-5: 1, 5: 1})
+    assert stats.not_received == 1
+    assert stats.not_sent == 1
+
+
+def test_join_by_payload_ignores_the_vanc_header():
+    message = bytes.fromhex("ffff000b00000000000101")
+    vanc_payload = b"\x41\x07\x08\x0b" + message + b"\x00\x00"
+    assert message_digest(vanc_payload) == message_digest(message)
+
+    sent = [{"payload": message, "operation_id": "0xffff", "frame": 10}]
+    received = [{"payload": vanc_payload, "operation_id": "0xffff", "frame": 12}]
+    _, stats = correlate(sent, received, key=join_key(JOIN_PAYLOAD))
+    assert stats.paired == 1
+
+
+def test_percentiles_use_the_nearest_rank():
+    stats = CorrelationStats(latencies=collections.Counter({1: 1, 2: 1, 3: 1, 10: 1}))
+    assert stats.percentiles((0, 25, 50, 51, 75, 90, 100)) == {
+        0: 1,
+        25: 1,
+        50: 2,
+        51: 3,
+        75: 3,
+        90: 10,
+        100: 10,
+    }
+    assert CorrelationStats().percentiles() == {}
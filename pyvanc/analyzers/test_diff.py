@@ -0,0 +1,90 @@
+from pyvanc.analyzers.diff import (
+    STATUS_EXTRA,
+    STATUS_MATCHED,
+    STATUS_MISSING,
+    STATUS_SHIFTED,
+    DiffStats,
+    diff_events,
+    is_cue_event,
+)
+
+
+def cue(event_id, frame, segmentation_type_id=0x34):
+    return {
+        "event_id": event_id,
+        "segmentation_type_id": segmentation_type_id,
+        "frame": frame,
+    }
+
+
+def statuses(first, second, tolerance_frames=2):
+    stats = DiffStats()
+    diffs = diff_events(
+        first,
+        second,
+        position=lambda event: event["frame"],
+        tolerance_frames=tolerance_frames,
+        stats=stats,
+    )
+    result = sorted((diff.frame, diff.status, diff.delta) for diff in diffs)
+    return result, stats
+
+
+def test_statuses_at_the_tolerance_boundary():
+    first = [cue(1, 10), cue(2, 20), cue(3, 30), cue(5, 50)]
+    second = [cue(1, 10), cue(2, 22), cue(3, 33), cue(4, 40), cue(5, 48)]
+
+    result, stats = statuses(first, second)
+    assert result == [
+        (10, STATUS_MATCHED, 0),
+        (20, STATUS_SHIFTED, 2),
+        (30, STATUS_MISSING, None),
+        (33, STATUS_EXTRA, None),
+        (40, STATUS_EXTRA, None),
+        (50, STATUS_SHIFTED, -2),
+    ]
+    assert stats.statuses == {
+        STATUS_MATCHED: 1,
+        STATUS_SHIFTED: 2,
+        STATUS_MISSING: 1,
+        STATUS_EXTRA: 2,
+    }
+    assert stats.differences == 5
+
+
+def test_identity_includes_the_segmentation_type():
+    result, _ = statuses([cue(1, 10, 0x34)], [cue(1, 10, 0x35)])
+    assert result == [(10, STATUS_EXTRA, None), (10, STATUS_MISSING, None)]
+
+
+def test_repeated_cues_pair_in_order():
+    first = [cue(1, 10), cue(1, 100)]
+    second = [cue(1, 11), cue(1, 101), cue(1, 200)]
+
+    result, _ = statuses(first, second)
+    assert result == [
+        (10, STATUS_SHIFTED, 1),
+        (100, STATUS_SHIFTED, 1),
+        (200, STATUS_EXTRA, None),
+    ]
+
+
+def test_unplaced_events_are_counted():
+    stats = DiffStats()
+    diffs = list(
+        diff_events(
+            [cue(1, None)],
+            [cue(1, 10)],
+            position=lambda event: event["frame"],
+            stats=stats,
+        )
+    )
+    assert [diff.status for diff in diffs] == [STATUS_EXTRA]
+    assert stats.unplaced == 1
+
+
+def test_keep_alives_are_not_cues():
+    assert is_cue_event({"segmentation_type_id": 0x34})
+    assert is_cue_event({"operation_id": "0x0101"})
+    assert not is_cue_event({"operation_id": "0x0003"})
+    assert not is_cue_event({})
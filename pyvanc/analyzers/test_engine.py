@@ -0,0 +1,120 @@
+from pyvanc.analyzers.engine import (
+    CATEGORY_PROGRAM_BOUNDARY,
+    ROLE_BREAK,
+    ROLE_SEGMENT,
+    AnalysisEngine,
+    Gap,
+    Interval,
+    analyze_events,
+)
+from pyvanc.utils.scte104_utils import SEGMENTATION_TYPE_NAMES
+
+
+def event(frame, type_id, event_id=None):
+    return {
+        "frame": frame,
+        "timecode": f"frame {frame}",
+        "message_type": "splice_request",
+        "segmentation_type_id": type_id,
+        "segmentation_type_name": SEGMENTATION_TYPE_NAMES[type_id],
+        "event_id": event_id,
+    }
+
+
+def intervals(summary):
+    return [
+        (i.kind, i.role, i.event_id, i.start_frame, i.end_frame, i.closed_by_id)
+        for i in summary.intervals
+    ]
+
+
+def test_pairs_starts_and_ends_by_event_id():
+    summary = analyze_events(
+        [
+            event(0, 0x10, 1),
+            event(100, 0x30, 7),
+            event(120, 0x30, 8),
+            event(150, 0x31, 8),
+            event(200, 0x31, 7),
+            event(500, 0x11, 1),
+        ]
+    )
+
+    assert intervals(summary) == [
+        ("Provider Advertisement", ROLE_BREAK, 8, 120, 150, True),
+        ("Provider Advertisement", ROLE_BREAK, 7, 100, 200, True),
+        ("Program", ROLE_SEGMENT, 1, 0, 500, True),
+    ]
+    assert summary.breaks.count == 2
+    assert summary.breaks.total_frames == 130
+    assert summary.segments.total_frames == 500
+    assert summary.unmatched_ends == 0
+    assert summary.open_at_end == []
+
+
+def test_feed_returns_completed_intervals_and_gaps():
+    engine = AnalysisEngine()
+    assert engine.feed(event(0, 0x10, 1)) == []
+    (program,) = engine.feed(event(100, 0x11, 1))
+    assert isinstance(program, Interval) and program.frames == 100
+
+    (gap,) = engine.feed(event(130, 0x10, 2))
+    assert gap == Gap(100, 130, "frame 100", "frame 130")
+    assert engine.finish().open_at_end == [("Program", 2, 130)]
+
+
+def test_repeated_start_restarts_the_interval():
+    summary = analyze_events(
+        [event(0, 0x30, 7), event(50, 0x30, 7), event(80, 0x31, 7)]
+    )
+
+    assert intervals(summary) == [
+        ("Provider Advertisement", ROLE_BREAK, 7, 50, 80, True),
+    ]
+    assert summary.unmatched_ends == 0
+    assert summary.open_at_end == []
+
+
+def test_end_without_start_is_counted():
+    summary = analyze_events(
+        [event(0, 0x11, 1), event(10, 0x10, 2), event(20, 0x11, 3)]
+    )
+
+    assert summary.intervals == []
+    assert summary.unmatched_ends == 2
+    assert summary.open_at_end == [("Program", 2, 10)]
+
+
+def test_boundary_with_same_id_ends_the_program():
+    engine = AnalysisEngine()
+    engine.feed(event(0, 0x98, 5))
+    (program,) = engine.feed(event(300, 0x98, 5))
+    summary = engine.finish()
+
+    assert program.kind == CATEGORY_PROGRAM_BOUNDARY
+    assert (program.start_frame, program.end_frame) == (0, 300)
+    assert program.closed_by_id
+    assert summary.open_at_end == []
+
+
+def test_boundary_with_another_id_starts_the_next_program():
+    summary = analyze_events(
+        [event(0, 0x98, 5), event(300, 0x98, 6), event(700, 0x98, 6)]
+    )
+
+    assert intervals(summary) == [
+        (CATEGORY_PROGRAM_BOUNDARY, ROLE_SEGMENT, 5, 0, 300, False),
+        (CATEGORY_PROGRAM_BOUNDARY, ROLE_SEGMENT, 6, 300, 700, True),
+    ]
+    assert summary.gaps.count == 0
+    assert summary.category_counts[CATEGORY_PROGRAM_BOUNDARY] == 3
+
+
+def test_counts_events_out_of_frame_order():
+    engine = AnalysisEngine()
+    for frame in (0, 10, 5, 20):
+        engine.feed({"frame": frame, "timecode": "", "message_type": "init_request"})
+    summary = engine.finish()
+
+    assert summary.event_count == 4
+    assert summary.out_of_order == 1
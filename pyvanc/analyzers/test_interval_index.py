@@ -0,0 +1,37 @@
+import random
+
+from pyvanc.analyzers.interval_index import ImplicitIntervalTree
+
+
+def brute_force(intervals, query_start, query_end):
+    return sorted(
+        interval_id
+        for start, end, interval_id in intervals
+        if start <= query_end and query_start < end
+    )
+
+
+def test_overlapping_matches_brute_force():
+    rng = random.Random(104)
+    for size in (0, 1, 2, 3, 7, 8, 15, 16, 17, 31, 100, 257):
+        intervals = []
+        for interval_id in range(size):
+            start = rng.randrange(1000)
+            intervals.append((start, start + rng.randrange(1, 200), interval_id))
+        tree = ImplicitIntervalTree.build(intervals)
+        restored = ImplicitIntervalTree.from_dict(tree.to_dict())
+
+        for _ in range(200):
+            query_start = rng.randrange(-50, 1250)
+            query_end = query_start + rng.choice((0, 0, 1, rng.randrange(300)))
+            expected = brute_force(intervals, query_start, query_end)
+            assert sorted(tree.overlapping(query_start, query_end)) == expected
+            assert sorted(restored.overlapping(query_start, query_end)) == expected
+
+
+def test_overlapping_is_half_open():
+    tree = ImplicitIntervalTree.build([(10, 20, 1), (20, 30, 2), (5, 6, 3)])
+    assert sorted(tree.overlapping(20, 20)) == [2]
+    assert sorted(tree.overlapping(19, 20)) == [1, 2]
+    assert tree.overlapping(6, 9) == []
+    assert sorted(tree.overlapping(0, 100)) == [1, 2, 3]
@@ -0,0 +1,230 @@
+"""Merge the SCTE-104 events of consecutive recordings into one UTC timeline.
+
+A broadcast day is usually recorded as a sequence of MXF files. Analyzed one
+file at a time, a break that starts in one file and ends in the next is
+never paired. Here the event streams of all files are placed on a common
+timeline by their UTC times and merged into a single stream in timeline
+order, which can be fed to the analysis engine as if it came from one file.
+
+The merge is a heap-based k-way merge that holds one event per open file. A
+file is only opened once the merge reaches its start time, so for
+consecutive recordings only the files that overlap are read at the same
+time. Where recordings overlap, the same message is found in both files; a
+message that another file already produced within a few frames is dropped.
+"""
+
+import collections
+import datetime
+import heapq
+import logging
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    Deque,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from ..utils.vanc_utils import ClipTiming, parse_creation_time
+
+logger = logging.getLogger(__name__)
+
+# Frames between two copies of a message in overlapping recordings
+DEFAULT_DUPLICATE_FRAMES = 2
+
+SECONDS_PER_DAY = 86400
+
+# Event fields that identify a message, a copy in another file has the same values
+DUPLICATE_KEY_FIELDS = (
+    "message_type",
+    "message_num",
+    "operation_id",
+    "segmentation_type_id",
+    "event_id",
+    "upid",
+)
+
+
+class TimelineSource(NamedTuple):
+    """Event stream of one recording on the timeline."""
+
+    name: str
+    start: datetime.datetime  # UTC time of the first frame, naive
+    events: Iterable[Dict[str, Any]]  # In frame order with "utc_time", opened lazily
+
+
+@dataclass
+class TimelineStats:
+    """Counts of a timeline merge."""
+
+    events: Dict[str, int] = field(default_factory=dict)  # Merged events per source
+    duplicates: int = 0
+    without_utc: int = 0
+
+
+def resolve_clip_starts(timings: Sequence[ClipTiming]) -> List[datetime.datetime]:
+    """Get the UTC start time of consecutive clips.
+
+    Clips without a creation time are placed by their start timecode, after
+    the clip before them or, for leading clips, before the clip after them.
+
+    Args:
+        timings: Timing of every clip, in recording order
+
+    Returns:
+        UTC time of the first frame of every clip, naive
+
+    Raises:
+        ValueError: If no clip has a creation time
+    """
+    starts: List[Optional[datetime.datetime]] = [
+        timing.creation_time for timing in timings
+    ]
+    if not any(starts):
+        raise ValueError("None of the files has a creation time")
+
+    def timecode_step(earlier: ClipTiming, later: ClipTiming) -> datetime.timedelta:
+        # Times of day before the previous start timecode lie after midnight
+        seconds = (later.start_seconds - earlier.start_seconds) % SECONDS_PER_DAY
+        return datetime.timedelta(seconds=seconds)
+
+    for index in range(1, len(starts)):
+        if starts[index] is None and starts[index - 1] is not None:
+            starts[index] = starts[index - 1] + timecode_step(
+                timings[index - 1], timings[index]
+            )
+    for index in range(len(starts) - 2, -1, -1):
+        if starts[index] is None:
+            starts[index] = starts[index + 1] - timecode_step(
+                timings[index], timings[index + 1]
+            )
+
+    return starts  # type: ignore[return-value]
+
+
+def timeline_frame(
+    utc_time: datetime.datetime, origin: datetime.datetime, framerate: float
+) -> int:
+    """Convert a UTC time to a frame number on the timeline.
+
+    Args:
+        utc_time: Naive UTC time
+        origin: UTC time of timeline frame 0
+        framerate: Frame rate of the timeline
+
+    Returns:
+        Frames from the origin
+    """
+    return round((utc_time - origin).total_seconds() * framerate)
+
+
+def merge_timeline(
+    sources: Sequence[TimelineSource],
+    framerate: float = 25.0,
+    duplicate_frames: int = DEFAULT_DUPLICATE_FRAMES,
+    stats: Optional[TimelineStats] = None,
+) -> Generator[Dict[str, Any], None, None]:
+    """Merge the event streams of several recordings in timeline order.
+
+    Every event is annotated in place: "frame" becomes the frame on the
+    timeline, counted from the earliest source start, and the frame in its
+    file and the source name are kept in "file_frame" and "file". Events
+    without a UTC time cannot be placed and are skipped.
+
+    Args:
+        sources: Event streams of the recordings, in any order
+        framerate: Frame rate of the timeline
+        duplicate_frames: Maximum frames between copies of a message in two sources
+        stats: Receives the counts of the merge
+
+    Yields:
+        Events in timeline order, without duplicates
+    """
+    if not sources:
+        return
+    if stats is None:
+        stats = TimelineStats()
+
+    origin = min(source.start for source in sources)
+    pending: Deque[int] = collections.deque(
+        sorted(range(len(sources)), key=lambda index: sources[index].start)
+    )
+    start_frames = [
+        timeline_frame(source.start, origin, framerate) for source in sources
+    ]
+
+    # Entries are (frame, source index, sequence, event), open iterators by source
+    heap: List[Tuple[int, int, int, Dict[str, Any]]] = []
+    iterators: Dict[int, Iterator[Dict[str, Any]]] = {}
+    sequence = 0
+
+    def advance(index: int) -> None:
+        nonlocal sequence
+        for event in iterators[index]:
+            utc_time = parse_creation_time(event.get("utc_time") or "")
+            if utc_time is None:
+                stats.without_utc += 1
+                continue
+            frame = timeline_frame(utc_time, origin, framerate)
+            heapq.heappush(heap, (frame, index, sequence, event))
+            sequence += 1
+            return
+
+        logger.debug(f"Finished {sources[index].name}")
+        _close(iterators.pop(index))
+
+    # Recently merged messages, to drop their copies from overlapping sources
+    recent: Dict[Tuple[Any, ...], Tuple[int, int]] = {}
+    expiry: Deque[Tuple[int, Tuple[Any, ...]]] = collections.deque()
+
+    try:
+        while pending or heap:
+            # Events never lie before the start of their source
+            while pending and (not heap or start_frames[pending[0]] <= heap[0][0]):
+                index = pending.popleft()
+                logger.debug(f"Opening {sources[index].name}")
+                iterators[index] = iter(sources[index].events)
+                stats.events.setdefault(sources[index].name, 0)
+                advance(index)
+            if not heap:
+                continue
+
+            frame, index, _, event = heapq.heappop(heap)
+            advance(index)
+
+            while expiry and expiry[0][0] < frame - duplicate_frames:
+                _, old_key = expiry.popleft()
+                old = recent.get(old_key)
+                if old is not None and old[0] < frame - duplicate_frames:
+                    del recent[old_key]
+
+            key = tuple(event.get(name) for name in DUPLICATE_KEY_FIELDS)
+            seen = recent.get(key)
+            if seen is not None and seen[1] != index:
+                stats.duplicates += 1
+                continue
+            recent[key] = (frame, index)
+            expiry.append((frame, key))
+
+            event["file_frame"] = event["frame"]
+            event["frame"] = frame
+            event["file"] = sources[index].name
+            stats.events[sources[index].name] += 1
+            yield event
+    finally:
+        for iterator in iterators.values():
+            _close(iterator)
+
+
+def _close(iterator: Iterator[Any]) -> None:
+    """Close an event stream that is a generator, e.g. to stop its extraction."""
+    close = getattr(iterator, "close", None)
+    if close is not None:
+        close()
@@ -1,3 +1,10 @@
 """VANC data extractors for various file formats."""
 
-from .mxf import extract_scte104_from_mxf, extract_vanc_from_mxf
+from .mxf import (
+    extract_scte104_from_mxf,
+    extract_vanc_from_mxf,
+    follow_scte104_from_mxf,
+    sample_scte104_from_mxf,
+)
+from .mxf_klv import MXFANCReader, follow_vanc_from_mxf
+from .morpheus import KernelDiagMessage, decode_scte104, iter_kerneldiag_messages
@@ -0,0 +1,380 @@
+"""Extract the SCTE-104 messages sent by Morpheus automation from KernelDiags logs.
+
+The automation driver logs every message it sends to the injector card on
+one line, for example:
+
+    10_240_33_166|167 26-AUG-2022 12:30:40:06: SCTE104_AdsProtocol,SendData,
+    data sent: 0x0 [0] 0x3 [1] 0x0 [2] 0xd [3] ... 0x2 [12]  [166-Active]
+
+(on a single line). The timestamp ends in a frame number, and the message
+bytes are logged as hex values followed by their index.
+
+Diag logs grow to several GB a day, most of it lines of other devices. The
+log is memory-mapped and searched for the command, and only the lines that
+contain it are matched against a single precompiled regular expression
+that extracts the timestamp, device and data, so other lines never become
+Python objects. Keep-alives are recognised by their first logged bytes and
+dropped before they are parsed. Large logs are split into line-aligned
+chunks that a process pool parses, and optionally decodes, in parallel.
+Chunks are emitted in order, and only a few chunks are in flight at a time.
+"""
+
+import collections
+import datetime
+import functools
+import logging
+import mmap
+import multiprocessing
+import os
+import re
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Generator,
+    List,
+    NamedTuple,
+    Optional,
+    Pattern,
+    Tuple,
+    Union,
+)
+
+from ..models.vanc_packets import SCTE104Message
+from ..parsers.scte104 import parse_scte104
+
+logger = logging.getLogger(__name__)
+
+# A logged message byte: "0xff [0]"
+DATA_BYTE = re.compile(rb"0x([0-9a-fA-F]{1,2}) \[\d+\]")
+
+# Logged data of an alive_request_data keep-alive, opID 0x0003
+KEEP_ALIVE_DATA = re.compile(rb"0x0{1,2} \[0\] 0x0?3 \[1\]")
+
+MONTHS = {
+    name: number
+    for number, name in enumerate(
+        (
+            b"JAN",
+            b"FEB",
+            b"MAR",
+            b"APR",
+            b"MAY",
+            b"JUN",
+            b"JUL",
+            b"AUG",
+            b"SEP",
+            b"OCT",
+            b"NOV",
+            b"DEC",
+        ),
+        start=1,
+    )
+}
+
+DEFAULT_DEVICE = "SCTE104"
+DEFAULT_KEYWORD = "SendData"
+
+# Bytes of log parsed per task of the process pool
+DEFAULT_CHUNK_SIZE = 64 * 1024 * 1024
+
+# opID of alive_request_data, the keep-alives the driver sends every few seconds
+KEEP_ALIVE_OPID = 0x0003
+
+
+class KernelDiagMessage(NamedTuple):
+    """A SCTE-104 message logged by the automation driver."""
+
+    line_number: int
+    timestamp: datetime.datetime  # Log time, naive, in the time zone of the log
+    host: str
+    device: str
+    command: str
+    data: bytes  # The SCTE-104 message as sent to the injector
+    decoded: Any = None  # Result of the decode function, None without one
+
+    @property
+    def is_keep_alive(self) -> bool:
+        """Whether the message is an alive_request_data keep-alive."""
+        return int.from_bytes(self.data[:2], byteorder="big") == KEEP_ALIVE_OPID
+
+    def vanc_payload(self) -> bytes:
+        """The message as the injector writes it into a VANC packet.
+
+        Prefixed with the SCTE-104 DID and SDID, payload descriptor and
+        size, so it parses like a message found in an MXF file.
+
+        Returns:
+            VANC user data words of the message
+        """
+        return bytes([0x41, 0x07, 0x08, min(len(self.data), 0xFF)]) + self.data
+
+
+def decode_scte104(message: KernelDiagMessage) -> SCTE104Message:
+    """Decode a logged message like a message found in an MXF file.
+
+    Module level, so it can be used as decode function of a process pool.
+
+    Args:
+        message: Logged message
+
+    Returns:
+        Parsed SCTE-104 message
+    """
+    return parse_scte104(message.vanc_payload())
+
+
+@functools.lru_cache(maxsize=None)
+def line_pattern(
+    device: str = DEFAULT_DEVICE, keyword: str = DEFAULT_KEYWORD
+) -> Pattern[bytes]:
+    """Build the regular expression matching the sent-data lines of a device.
+
+    Args:
+        device: Text the device name must contain
+        keyword: Text the command must contain
+
+    Returns:
+        Compiled pattern with the groups host, day, month, year, hours,
+        minutes, seconds, frames, device, command and data
+    """
+    return re.compile(
+        rb"^(?P<host>[^ \n]+) (?P<day>\d{1,2})-(?P<month>[A-Za-z]{3})-(?P<year>\d{4}) "
+        rb"(?P<hours>\d\d):(?P<minutes>\d\d):(?P<seconds>\d\d):(?P<frames>\d\d): "
+        rb"(?P<device>[^,\n]*" + re.escape(device.encode()) + rb"[^,\n]*),"
+        rb"(?P<command>[^,\n]*" + re.escape(keyword.encode()) + rb"[^,\n]*),"
+        rb"[^:\n]*: (?P<data>[^\n]*)",
+        re.MULTILINE,
+    )
+
+
+def _message_from_match(
+    match: "re.Match[bytes]", line_number: int, framerate: float
+) -> Optional[KernelDiagMessage]:
+    """Build a message from a matched log line.
+
+    Returns:
+        The message, or None if the timestamp or data cannot be read
+    """
+    month = MONTHS.get(match["month"].upper())
+    data = bytes(int(value, 16) for value in DATA_BYTE.findall(match["data"]))
+    if month is None or not data:
+        return None
+
+    try:
+        timestamp = datetime.datetime(
+            int(match["year"]),
+            month,
+            int(match["day"]),
+            int(match["hours"]),
+            int(match["minutes"]),
+            int(match["seconds"]),
+        ) + datetime.timedelta(seconds=int(match["frames"]) / framerate)
+    except ValueError:
+        return None
+
+    return KernelDiagMessage(
+        line_number,
+        timestamp,
+        match["host"].decode(errors="replace"),
+        match["device"].strip().decode(errors="replace"),
+        match["command"].strip().decode(errors="replace"),
+        data,
+    )
+
+
+def parse_kerneldiag_line(
+    line: str,
+    line_number: int = 0,
+    framerate: float = 25.0,
+    device: str = DEFAULT_DEVICE,
+    keyword: str = DEFAULT_KEYWORD,
+) -> Optional[KernelDiagMessage]:
+    """Parse a KernelDiags line that logs sent data.
+
+    Args:
+        line: Log line
+        line_number: Number of the line in the log, for reference
+        framerate: Frame rate of the frame numbers in the timestamps
+        device: Text the device name must contain
+        keyword: Text the command must contain
+
+    Returns:
+        The logged message, or None if the line does not log sent data
+    """
+    match = line_pattern(device, keyword).match(
+        line.rstrip("\r\n").encode(errors="replace")
+    )
+    if match is None:
+        return None
+    return _message_from_match(match, line_number, framerate)
+
+
+def _parse_chunk(
+    log_file: str,
+    start: int,
+    end: int,
+    device: str,
+    keyword: str,
+    framerate: float,
+    skip_keep_alives: bool,
+    decode: Optional[Callable[[KernelDiagMessage], Any]],
+) -> Tuple[List[KernelDiagMessage], int]:
+    """Parse the messages of a line-aligned chunk of a log, in a worker process.
+
+    Line numbers are counted from the start of the chunk.
+
+    Returns:
+        The messages of the chunk, and the number of lines in it
+    """
+    pattern = line_pattern(device, keyword)
+    needle = keyword.encode()
+    messages = []
+    with (
+        open(log_file, "rb") as f,
+        mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped,
+    ):
+        line_number = 1
+        counted = start
+        position = start
+        while True:
+            # Searching for the command first is much faster than letting the
+            # regular expression try every position of the log
+            index = mapped.find(needle, position, end)
+            if index < 0:
+                break
+            newline = mapped.rfind(b"\n", start, index)
+            line_start = start if newline < 0 else newline + 1
+            line_end = mapped.find(b"\n", index, end)
+            if line_end < 0:
+                line_end = end
+            position = line_end + 1
+
+            match = pattern.match(mapped, line_start, line_end)
+            if match is None:
+                continue
+            if skip_keep_alives and KEEP_ALIVE_DATA.match(match["data"]):
+                continue
+
+            line_number += mapped[counted:line_start].count(b"\n")
+            counted = line_start
+            message = _message_from_match(match, line_number, framerate)
+            if message is None:
+                continue
+            if decode is not None:
+                try:
+                    message = message._replace(decoded=decode(message))
+                except Exception as e:
+                    logger.error(
+                        f"Failed to decode the message at line {line_number}: {e}"
+                    )
+            messages.append(message)
+        lines = line_number - 1 + mapped[counted:end].count(b"\n")
+
+    return messages, lines
+
+
+def chunk_bounds(log_file: Union[str, Path], chunk_size: int) -> List[Tuple[int, int]]:
+    """Split a log into chunks that start and end at line boundaries.
+
+    Args:
+        log_file: Path to the log
+        chunk_size: Approximate bytes per chunk
+
+    Returns:
+        (start, end) byte offsets of the chunks, in order
+    """
+    size = os.path.getsize(log_file)
+    if size == 0:
+        return []
+
+    bounds = []
+    with (
+        open(log_file, "rb") as f,
+        mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped,
+    ):
+        start = 0
+        while start < size:
+            newline = mapped.find(b"\n", min(start + max(1, chunk_size), size) - 1)
+            end = size if newline < 0 else newline + 1
+            bounds.append((start, end))
+            start = end
+    return bounds
+
+
+def iter_kerneldiag_messages(
+    log_file: Union[str, Path],
+    device: str = DEFAULT_DEVICE,
+    keyword: str = DEFAULT_KEYWORD,
+    framerate: float = 25.0,
+    skip_keep_alives: bool = True,
+    decode: Optional[Callable[[KernelDiagMessage], Any]] = None,
+    jobs: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Generator[KernelDiagMessage, None, None]:
+    """Stream the SCTE-104 messages logged in a KernelDiags log.
+
+    Logs larger than one chunk are parsed by a process pool. The decode
+    function runs in the worker processes too, so it must be picklable,
+    e.g. a function at module level such as decode_scte104. Messages it
+    cannot decode keep None as decoded value.
+
+    Args:
+        log_file: Path to the KernelDiags log
+        device: Only lines of devices whose name contains this text
+        keyword: Only lines whose command contains this text
+        framerate: Frame rate of the frame numbers in the timestamps
+        skip_keep_alives: Whether to leave out alive_request_data messages
+        decode: Called with every message, its result is stored in "decoded"
+        jobs: Number of worker processes (default: CPU count)
+        chunk_size: Approximate bytes of log per task of the process pool
+
+    Yields:
+        Logged messages, in log order
+    """
+    log_file = str(log_file)
+    bounds = chunk_bounds(log_file, chunk_size)
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(bounds)))
+    options = (device, keyword, framerate, skip_keep_alives, decode)
+
+    if jobs == 1:
+        line_offset = 0
+        for start, end in bounds:
+            messages, lines = _parse_chunk(log_file, start, end, *options)
+            for message in messages:
+                yield message._replace(line_number=message.line_number + line_offset)
+            line_offset += lines
+        return
+
+    # Spawned workers do not inherit the threads of the parent, e.g. of a pipeline
+    executor = ProcessPoolExecutor(
+        max_workers=jobs, mp_context=multiprocessing.get_context("spawn")
+    )
+    pending: Deque[Future] = collections.deque()
+    chunks = iter(bounds)
+    try:
+        # Keep every worker busy, with the next chunks already queued
+        for start, end in chunks:
+            pending.append(
+                executor.submit(_parse_chunk, log_file, start, end, *options)
+            )
+            if len(pending) >= 2 * jobs:
+                break
+
+        line_offset = 0
+        while pending:
+            messages, lines = pending.popleft().result()
+            for start, end in chunks:
+                pending.append(
+                    executor.submit(_parse_chunk, log_file, start, end, *options)
+                )
+                break
+            for message in messages:
+                yield message._replace(line_number=message.line_number + line_offset)
+            line_offset += lines
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown()
@@ -5,7 +5,17 @@ import logging
 import subprocess
 import tempfile
 from pathlib import Path
-from typing import Any, Dict, Generator, Iterator, List, Optional, Tuple
+from typing import (
+    Any,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
 
 import av
 from av.frame import Frame
@@ -13,6 +23,8 @@ from av.packet import Packet
 
 from ..models.vanc_packets import SCTE104Message, VANCPacket
 from ..parsers.scte104 import parse_scte104
+from ..pipeline import Interrupt, threaded
+from .mxf_klv import DEFAULT_POLL_INTERVAL, follow_vanc_from_mxf
 
 logger = logging.getLogger(__name__)
 
@@ -206,18 +218,47 @@ class FFprobeANCData:
         return bytes.fromhex(hex_str)
 
 
-def extract_vanc_from_mxf_ffprobe(filename: str) -> List[FFprobeANCData]:
-    """Extract VANC data from an MXF file using ffprobe.
+def _in_window(pts_time: float, start: Optional[float], end: Optional[float]) -> bool:
+    """Check whether a presentation time lies inside a time window.
 
     Args:
-        filename: Path to the MXF file
+        pts_time: Presentation time in seconds
+        start: Start of the window in seconds, None for the start of the file
+        end: End of the window in seconds (exclusive), None for the end of the file
 
     Returns:
-        List of FFprobeANCData objects containing VANC data
+        True if the time is inside the window
     """
-    logger.info(f"Running ffprobe on MXF file: {filename}")
+    return (start is None or pts_time >= start) and (end is None or pts_time < end)
+
 
-    # Run ffprobe to extract all frame data including ancillary data
+def _format_interval(start: Optional[float], end: Optional[float]) -> str:
+    """Format a time window for ffprobe's -read_intervals option.
+
+    Args:
+        start: Start of the window in seconds, None for the start of the file
+        end: End of the window in seconds, None for the end of the file
+
+    Returns:
+        Interval as "start%end", with missing bounds left empty
+    """
+    start_text = "" if start is None else f"{start:.6f}"
+    end_text = "" if end is None else f"{end:.6f}"
+    return f"{start_text}%{end_text}"
+
+
+def _ffprobe_command(
+    filename: str, intervals: Optional[Sequence[Tuple[float, float]]] = None
+) -> List[str]:
+    """Build the ffprobe command that dumps the ANC data packets of an MXF file.
+
+    Args:
+        filename: Path to the MXF file
+        intervals: (start, end) windows to read, None to read the whole file
+
+    Returns:
+        Command line arguments
+    """
     cmd = [
         "ffprobe",
         "-v",
@@ -229,98 +270,255 @@ def extract_vanc_from_mxf_ffprobe(filename: str) -> List[FFprobeANCData]:
         "2",  # Data stream (ancillary data)
         "-show_packets",
         "-show_data",
-        filename,
     ]
+    if intervals:
+        cmd += [
+            "-read_intervals",
+            ",".join(_format_interval(s, e) for s, e in intervals),
+        ]
+    cmd.append(filename)
+    return cmd
+
+
+def _iter_json_array(lines: Iterable[str], key: str) -> Iterator[Dict[str, Any]]:
+    """Parse the items of a JSON array in ffprobe output while it is being written.
+
+    Args:
+        lines: Lines of the JSON document
+        key: Name of the array, e.g. "packets"
+
+    Yields:
+        Items of the array, as soon as they are complete
+
+    Raises:
+        ValueError: If the output ends inside the array
+    """
+    decoder = json.JSONDecoder()
+    marker = f'"{key}": ['
+    buffer = ""
+    found = False
+
+    for line in lines:
+        buffer += line
+        if not found:
+            index = buffer.find(marker)
+            if index < 0:
+                buffer = buffer[-len(marker) :]
+                continue
+            found = True
+            buffer = buffer[index + len(marker) :]
+
+        # ffprobe ends every item on its own line, so only try to decode there
+        if not line.lstrip().startswith(("}", "]")):
+            continue
 
+        while True:
+            buffer = buffer.lstrip(" \t\r\n,")
+            if not buffer:
+                break
+            if buffer[0] == "]":
+                return
+            try:
+                item, consumed = decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                # The item is not complete yet
+                break
+            yield item
+            buffer = buffer[consumed:]
+
+    if found:
+        raise ValueError(f"ffprobe output ended inside the {key} array")
+
+
+def iter_vanc_from_mxf_ffprobe(
+    filename: str,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    intervals: Optional[Sequence[Tuple[float, float]]] = None,
+    interrupt: Optional[Interrupt] = None,
+) -> Generator[FFprobeANCData, None, None]:
+    """Stream the VANC data of an MXF file from ffprobe.
+
+    Packets are parsed while ffprobe writes them, so the first packets are
+    yielded before ffprobe has read the whole file. Closing the generator
+    before the end kills ffprobe, and so does the interrupt, from any thread.
+    The output then ends early without an error.
+
+    Args:
+        filename: Path to the MXF file
+        start: Start of the window in seconds, None for the start of the file
+        end: End of the window in seconds (exclusive), None for the end of the file
+        intervals: Several (start, end) windows to read in one ffprobe run,
+            used instead of start and end
+        interrupt: Interrupt of the pipeline reading the packets
+
+    Yields:
+        FFprobeANCData objects in file order
+
+    Raises:
+        OSError: If ffprobe cannot be started
+        RuntimeError: If ffprobe fails
+        ValueError: If the ffprobe output cannot be parsed
+    """
+    if intervals is None and (start is not None or end is not None):
+        intervals = [(start, end)]
+
+    logger.info(f"Running ffprobe on MXF file: {filename}")
+    process = subprocess.Popen(
+        _ffprobe_command(filename, intervals),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    if interrupt is not None:
+        interrupt.add(process.kill)
+
+    completed = False
     try:
-        result = subprocess.run(
-            cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
-        )
+        for packet in _iter_json_array(process.stdout, "packets"):
+            # Check if this is a data packet
+            if packet.get("codec_type") != "data" or "data" not in packet:
+                continue
 
-        try:
-            parsed_data = json.loads(result.stdout)
-            all_packets = []
-
-            if "packets" in parsed_data:
-                for packet in parsed_data["packets"]:
-                    # Check if this is a data packet
-                    if packet.get("codec_type") == "data" and "data" in packet:
-                        pts_frame = int(packet.get("pts", 0))
-                        pts_time = float(packet.get("pts_time", 0))
-
-                        # Create ANC data packet
-                        anc_data = FFprobeANCData(
-                            frame_number=pts_frame,
-                            pts_time=pts_time,
-                            anc_data=packet["data"],
-                        )
-                        all_packets.append(anc_data)
-
-            logger.info(f"Found {len(all_packets)} VANC data packets in the MXF file")
-            return all_packets
-
-        except json.JSONDecodeError:
-            logger.error("Failed to parse ffprobe JSON output")
-            return []
+            pts_time = float(packet.get("pts_time", 0))
+
+            # Seeking starts at the key frame before the window
+            if intervals and not any(_in_window(pts_time, s, e) for s, e in intervals):
+                continue
+
+            yield FFprobeANCData(
+                frame_number=int(packet.get("pts", 0)),
+                pts_time=pts_time,
+                anc_data=packet["data"],
+            )
+        completed = True
+    except ValueError:
+        # Killing ffprobe cuts its output off
+        if interrupt is None or not interrupt.interrupted:
+            raise
+    finally:
+        if interrupt is not None:
+            interrupt.remove(process.kill)
+        if completed:
+            # Read the rest of the output, so ffprobe can exit
+            process.stdout.read()
+            error = process.stderr.read()
+        else:
+            # Stopped early by the consumer or an error
+            process.kill()
+            error = ""
+        process.stdout.close()
+        process.stderr.close()
+        return_code = process.wait()
+
+    if return_code != 0 and not (interrupt is not None and interrupt.interrupted):
+        raise RuntimeError(f"ffprobe error: {error.strip() or return_code}")
+
+
+def extract_vanc_from_mxf_ffprobe(
+    filename: str,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    intervals: Optional[Sequence[Tuple[float, float]]] = None,
+) -> List[FFprobeANCData]:
+    """Extract VANC data from an MXF file using ffprobe.
+
+    With a start or end, ffprobe seeks to the start through the index table
+    of the file and stops reading at the end, so only the window is read.
+
+    Args:
+        filename: Path to the MXF file
+        start: Start of the window in seconds, None for the start of the file
+        end: End of the window in seconds (exclusive), None for the end of the file
+        intervals: Several (start, end) windows to read in one ffprobe run,
+            used instead of start and end
+
+    Returns:
+        List of FFprobeANCData objects containing VANC data
+    """
+    try:
+        all_packets = list(iter_vanc_from_mxf_ffprobe(filename, start, end, intervals))
+        logger.info(f"Found {len(all_packets)} VANC data packets in the MXF file")
+        return all_packets
 
-    except subprocess.CalledProcessError as e:
-        logger.error(f"ffprobe error: {e.stderr}")
-        return []
     except Exception as e:
         logger.error(f"Error extracting VANC data with ffprobe: {e}")
         return []
 
 
+def _vanc_frame(anc_data: FFprobeANCData) -> Tuple[int, float, List[VANCPacket]]:
+    """Wrap the SCTE-104 data found by ffprobe in a VANC packet.
+
+    Args:
+        anc_data: ANC data of one ffprobe packet
+
+    Returns:
+        Tuple of (frame_index, pts_time, list with the VANC packet)
+    """
+    # The data already includes DID (0x41) and SDID (0x07) at index 0 and 1
+    vanc_packet = VANCPacket(
+        did=0x41,  # SCTE-104
+        sdid=0x07,  # SCTE-104
+        payload=anc_data.anc_data,
+        line=0,
+        horizontal_offset=0,
+        checksum_valid=True,
+    )
+    return anc_data.pts_frame_number, anc_data.pts_time, [vanc_packet]
+
+
 def extract_vanc_from_mxf(
     filename: str,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    interrupt: Optional[Interrupt] = None,
 ) -> Generator[Tuple[int, float, List[VANCPacket]], None, None]:
     """Extract VANC data from an MXF file.
 
+    Frames are yielded while ffprobe or PyAV reads the file. Closing the
+    generator early, e.g. after enough events were found, stops ffprobe or
+    closes the PyAV container. The interrupt stops ffprobe from another thread.
+
     Args:
         filename: Path to the MXF file
+        start: Start of the window in seconds, None for the start of the file
+        end: End of the window in seconds (exclusive), None for the end of the file
+        interrupt: Interrupt of the pipeline reading the frames
 
     Yields:
         Tuples of (frame_index, pts_time, list of VANC packets)
+
+    Raises:
+        RuntimeError: If ffprobe fails after VANC packets were found
+        ValueError: If the ffprobe output cannot be parsed after VANC packets were found
     """
     # First try ffprobe method as it's more reliable for VANC data
+    found = 0
     try:
         logger.info(f"Extracting VANC data from {filename} using ffprobe")
-        anc_data_list = extract_vanc_from_mxf_ffprobe(filename)
-
-        if anc_data_list:
-            logger.info(f"Found {len(anc_data_list)} VANC packets using ffprobe")
-            for anc_data in anc_data_list:
-                try:
-                    # Create VANC packet from the SCTE-104 data
-                    if len(anc_data.anc_data) > 0:
-                        # The data should already include DID (0x41) and SDID (0x07)
-                        # In real data, DID is at index 0, SDID at index 1, payload starts at index 2
-                        did = 0x41  # SCTE-104
-                        sdid = 0x07  # SCTE-104
-
-                        vanc_packet = VANCPacket(
-                            did=did,
-                            sdid=sdid,
-                            # Skip first 4 bytes which should be 0x41 0x07 and some other header data
-                            payload=anc_data.anc_data,
-                            line=0,
-                            horizontal_offset=0,
-                            checksum_valid=True,
-                        )
-                        yield anc_data.pts_frame_number, anc_data.pts_time, [
-                            vanc_packet
-                        ]
-                except Exception as e:
-                    logger.error(
-                        f"Error processing VANC packet at frame {anc_data.pts_frame_number}: {e}"
-                    )
-
-            # Return after ffprobe method is successful
-            return
+        for anc_data in iter_vanc_from_mxf_ffprobe(
+            filename, start, end, interrupt=interrupt
+        ):
+            if len(anc_data.anc_data) > 0:
+                found += 1
+                yield _vanc_frame(anc_data)
 
     except Exception as e:
+        if found:
+            # The packets were already yielded, so a fallback would repeat
+            # them, and returning would make the truncated scan look complete
+            logger.error(f"ffprobe failed after {found} VANC packets: {e}")
+            raise
         logger.warning(f"ffprobe method failed: {e}, falling back to PyAV method")
 
+    if interrupt is not None and interrupt.interrupted:
+        return
+
+    # Return after ffprobe method is successful
+    if found:
+        logger.info(f"Found {found} VANC packets using ffprobe")
+        return
+
     # Fall back to PyAV method if ffprobe fails
     logger.info(f"Opening MXF file with PyAV: {filename}")
     try:
@@ -340,9 +538,15 @@ def extract_vanc_from_mxf(
 
         logger.info(f"Found video stream: {video_stream}")
 
+        # Frame numbers continue from the start of the window
+        first_frame_idx = 0
+        if start:
+            container.seek(int(start * av.time_base))
+            first_frame_idx = round(start * float(video_stream.average_rate))
+
         # Try first to extract from packets
         packet_extraction_attempted = False
-        frame_idx = 0
+        frame_idx = first_frame_idx
 
         try:
             # First try packet-based extraction
@@ -351,14 +555,18 @@ def extract_vanc_from_mxf(
                 if packet.dts is None:
                     continue
 
-                packet_extraction_attempted = True
-
                 # Get pts_time from packet
                 pts_time = (
                     float(packet.pts) / float(video_stream.time_base.denominator)
                     if packet.pts is not None
                     else float(frame_idx) / float(video_stream.rate)
                 )
+                if start is not None and pts_time < start:
+                    continue
+                if end is not None and pts_time >= end:
+                    break
+
+                packet_extraction_attempted = True
 
                 # Extract VANC packets from this video packet
                 vanc_packets = extract_vanc_from_packet(packet)
@@ -368,7 +576,7 @@ def extract_vanc_from_mxf(
                 frame_idx += 1
 
                 # If we've processed a few packets without finding VANC data, break and try frames
-                if frame_idx > 100 and not any(
+                if frame_idx - first_frame_idx > 100 and not any(
                     True
                     for _ in container.demux(video_stream)
                     for p in extract_vanc_from_packet(_)
@@ -383,11 +591,11 @@ def extract_vanc_from_mxf(
             logger.warning(f"Packet-based extraction failed: {e}")
 
         # If packet extraction didn't yield anything or wasn't attempted, try frame-based extraction
-        if not packet_extraction_attempted or frame_idx == 0:
+        if not packet_extraction_attempted or frame_idx == first_frame_idx:
             logger.info("Attempting frame-based VANC extraction")
             # Reset container and try frame-based extraction
-            container.seek(0)
-            frame_idx = 0
+            container.seek(int((start or 0) * av.time_base))
+            frame_idx = first_frame_idx
 
             for frame in container.decode(video=0):
                 # Get pts_time from frame
@@ -396,6 +604,10 @@ def extract_vanc_from_mxf(
                     if frame.pts is not None
                     else float(frame_idx) / float(video_stream.rate)
                 )
+                if start is not None and pts_time < start:
+                    continue
+                if end is not None and pts_time >= end:
+                    break
 
                 # Extract VANC packets from this frame
                 vanc_packets = extract_vanc_from_frame(frame)
@@ -412,23 +624,110 @@ def extract_vanc_from_mxf(
 
 def extract_scte104_from_mxf(
     filename: str,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    pipelined: bool = False,
+    interrupt: Optional[Interrupt] = None,
 ) -> Generator[Tuple[int, float, SCTE104Message], None, None]:
     """Extract SCTE-104 messages from an MXF file.
 
     Args:
         filename: Path to the MXF file
+        start: Start of the window in seconds, None for the start of the file
+        end: End of the window in seconds (exclusive), None for the end of the file
+        pipelined: Whether to read the file on a separate thread, so reading
+                   continues while the messages are parsed
+        interrupt: Stops reading the file from another thread, e.g. when a
+                   later stage of the pipeline is closed
+
+    Yields:
+        Tuples of (frame_index, pts_time, SCTE-104 message)
+    """
+    if interrupt is None:
+        interrupt = Interrupt()
+    frames = extract_vanc_from_mxf(filename, start, end, interrupt)
+    if pipelined:
+        frames = threaded(frames, name="pyvanc-read", interrupt=interrupt)
+    yield from _scte104_messages(frames)
+
+
+def sample_scte104_from_mxf(
+    filename: str, intervals: Sequence[Tuple[float, float]]
+) -> List[Tuple[int, float, SCTE104Message]]:
+    """Extract the SCTE-104 messages in a set of windows of an MXF file.
+
+    All windows are read by a single ffprobe run that seeks from one window
+    to the next, so sampling a long file only reads the sampled windows.
+
+    Args:
+        filename: Path to the MXF file
+        intervals: (start, end) windows in seconds, in file order
+
+    Returns:
+        Tuples of (frame_index, pts_time, SCTE-104 message) in file order
+
+    Raises:
+        OSError: If ffprobe cannot be started
+        RuntimeError: If ffprobe fails
+        ValueError: If the ffprobe output cannot be parsed
+    """
+    frames = (
+        _vanc_frame(anc_data)
+        for anc_data in iter_vanc_from_mxf_ffprobe(filename, intervals=intervals)
+        if anc_data.anc_data
+    )
+    return sorted(_scte104_messages(frames), key=lambda message: message[1])
+
+
+def follow_scte104_from_mxf(
+    filename: str,
+    framerate: float = 25.0,
+    poll_interval: float = DEFAULT_POLL_INTERVAL,
+    idle_timeout: Optional[float] = None,
+) -> Generator[Tuple[int, float, SCTE104Message], None, None]:
+    """Extract SCTE-104 messages from an MXF file while it is being recorded.
+
+    Args:
+        filename: Path to the MXF file
+        framerate: Frame rate used until the file's edit rate has been read
+        poll_interval: Seconds between reads of new data
+        idle_timeout: Seconds without new data after which to stop, None to follow forever
+
+    Yields:
+        Tuples of (frame_index, pts_time, SCTE-104 message)
+    """
+    yield from _scte104_messages(
+        follow_vanc_from_mxf(filename, framerate, poll_interval, idle_timeout)
+    )
+
+
+def _scte104_messages(
+    frames: Iterable[Tuple[int, float, List[VANCPacket]]],
+) -> Generator[Tuple[int, float, SCTE104Message], None, None]:
+    """Parse the SCTE-104 packets among the VANC packets of a stream of frames.
+
+    Args:
+        frames: Tuples of (frame_index, pts_time, list of VANC packets)
 
     Yields:
         Tuples of (frame_index, pts_time, SCTE-104 message)
     """
-    for frame_idx, pts_time, vanc_packets in extract_vanc_from_mxf(filename):
-        for packet in vanc_packets:
-            # Check if this is an SCTE-104 packet
-            if packet.did == 0x41 and packet.sdid == 0x07:
+    try:
+        for frame_idx, pts_time, vanc_packets in frames:
+            for packet in vanc_packets:
+                # Check if this is an SCTE-104 packet
+                if packet.did != 0x41 or packet.sdid != 0x07:
+                    continue
                 try:
                     scte104_msg = parse_scte104(packet.payload)
-                    yield frame_idx, pts_time, scte104_msg
+                    scte104_msg.payload = packet.payload
                 except Exception as e:
                     logger.error(
                         f"Failed to parse SCTE-104 message at frame {frame_idx}: {e}"
                     )
+                    continue
+                yield frame_idx, pts_time, scte104_msg
+    finally:
+        # Stop the extraction right away when the consumer stops early
+        if isinstance(frames, Generator):
+            frames.close()
@@ -0,0 +1,361 @@
+"""Read ANC data from MXF files by walking their KLV structure.
+
+Unlike the ffprobe and PyAV extractors, this reader parses the SMPTE 377M
+KLV (key, length, value) stream itself and only reads the values it needs:
+SMPTE 436M ANC data elements and the edit rate. Everything else is skipped
+with a seek. The reader remembers the offset of the first KLV it could not
+read completely, so it can be called again as a recording grows and only
+reads the new bytes. A missing footer partition or index table, as in
+files that are still being written, is not a problem.
+
+Only frame-wrapped essence is supported, which is what recorders write for
+the formats that carry ANC data (XDCAM HD, AVC-Intra, XAVC).
+"""
+
+import logging
+import time
+from fractions import Fraction
+from pathlib import Path
+from typing import BinaryIO, Generator, List, Optional, Tuple, Union
+
+from ..models.vanc_packets import VANCPacket
+
+logger = logging.getLogger(__name__)
+
+# Every SMPTE universal label starts with these bytes
+UL_PREFIX = b"\x06\x0e\x2b\x34"
+
+# Partition packs: 06.0E.2B.34.02.05.01.01.0D.01.02.01.01.<kind>.<status>.00
+PARTITION_PACK_PREFIX = bytes.fromhex("060e2b34020501010d01020101")
+PARTITION_FOOTER = 0x04
+
+# Timeline track local set, holds the edit rate of a track in tag 0x4B01
+TIMELINE_TRACK_KEY = bytes.fromhex("060e2b34025301010d01010101013b00")
+# Index table segment local set, holds the index edit rate in tag 0x3F0B
+INDEX_SEGMENT_KEY = bytes.fromhex("060e2b34025301010d01020101100100")
+EDIT_RATE_TAGS = (0x4B01, 0x3F0B)
+
+# Generic container essence elements: byte 12 is the item type
+ESSENCE_ELEMENT_PREFIX = bytes.fromhex("0d010301")
+PICTURE_ITEM = 0x15
+DATA_ITEM = 0x17
+ANC_DATA_ELEMENT = 0x02  # SMPTE 436M ANC frame element, 0x01 is VBI line data
+
+# SMPTE 436M payload sample codings
+SAMPLE_CODING_8_BIT = (4, 5, 6)
+SAMPLE_CODING_10_BIT = (7, 8, 9)
+
+# A KLV header is a 16 byte key and a BER length of at most 9 bytes
+MAX_HEADER_SIZE = 16 + 9
+
+# Values of header metadata sets that are read to find the edit rate
+MAX_METADATA_SET_SIZE = 64 * 1024
+
+DEFAULT_POLL_INTERVAL = 1.0
+
+
+def read_ber_length(data: bytes, offset: int) -> Optional[Tuple[int, int]]:
+    """Decode a BER encoded KLV length.
+
+    Args:
+        data: Buffer holding the length
+        offset: Offset of the length in the buffer
+
+    Returns:
+        Tuple of (length, size of the length field), or None if the buffer
+        ends inside the length field or the length is indefinite
+    """
+    if offset >= len(data):
+        return None
+
+    first = data[offset]
+    if first < 0x80:
+        return first, 1
+
+    size = first & 0x7F
+    if size == 0 or offset + 1 + size > len(data):
+        return None
+
+    return int.from_bytes(data[offset + 1 : offset + 1 + size], "big"), 1 + size
+
+
+def unpack_10_bit_samples(data: bytes, count: int) -> bytes:
+    """Unpack 10-bit ANC samples to their 8-bit values.
+
+    SMPTE 436M packs three 10-bit samples into every 32-bit big-endian word.
+
+    Args:
+        data: Packed samples
+        count: Number of samples
+
+    Returns:
+        Low 8 bits of every sample
+    """
+    samples = bytearray()
+    for offset in range(0, len(data) - 3, 4):
+        word = int.from_bytes(data[offset : offset + 4], "big")
+        samples.extend(((word >> 20) & 0xFF, (word >> 10) & 0xFF, word & 0xFF))
+    return bytes(samples[:count])
+
+
+def parse_anc_element(value: bytes) -> List[VANCPacket]:
+    """Parse the ANC packets of a SMPTE 436M ANC frame element.
+
+    Like the ffprobe extractor, packet payloads start at the DID and SDID,
+    which is what parse_scte104 expects.
+
+    Args:
+        value: Value of the ANC data element
+
+    Returns:
+        VANC packets of the frame
+    """
+    packets = []
+    if len(value) < 2:
+        return packets
+
+    packet_count = int.from_bytes(value[0:2], "big")
+    offset = 2
+
+    for _ in range(packet_count):
+        # Line number, wrapping type, sample coding, sample count, array header
+        if offset + 14 > len(value):
+            logger.debug("Truncated ANC frame element")
+            break
+
+        line = int.from_bytes(value[offset : offset + 2], "big")
+        sample_coding = value[offset + 3]
+        sample_count = int.from_bytes(value[offset + 4 : offset + 6], "big")
+        array_count = int.from_bytes(value[offset + 6 : offset + 10], "big")
+        array_element_size = int.from_bytes(value[offset + 10 : offset + 14], "big")
+        offset += 14
+
+        array_size = array_count * array_element_size
+        data = value[offset : offset + array_size]
+        offset += array_size
+
+        if sample_coding in SAMPLE_CODING_10_BIT:
+            data = unpack_10_bit_samples(data, sample_count)
+        elif sample_coding in SAMPLE_CODING_8_BIT:
+            data = data[:sample_count]
+        else:
+            logger.debug(f"Skipping ANC packet with sample coding {sample_coding}")
+            continue
+
+        if len(data) < 3:
+            continue
+
+        packets.append(
+            VANCPacket(
+                did=data[0],
+                sdid=data[1],
+                payload=data,
+                line=line,
+                horizontal_offset=0,
+                checksum_valid=True,
+            )
+        )
+
+    return packets
+
+
+def parse_edit_rate(value: bytes) -> Optional[Fraction]:
+    """Find the edit rate in a local set of header metadata or an index table.
+
+    Args:
+        value: Value of a timeline track or index table segment
+
+    Returns:
+        Edit rate, or None if the set has none
+    """
+    offset = 0
+    while offset + 4 <= len(value):
+        tag = int.from_bytes(value[offset : offset + 2], "big")
+        size = int.from_bytes(value[offset + 2 : offset + 4], "big")
+        offset += 4
+
+        if tag in EDIT_RATE_TAGS and size == 8:
+            numerator = int.from_bytes(value[offset : offset + 4], "big")
+            denominator = int.from_bytes(value[offset + 4 : offset + 8], "big")
+            if numerator > 0 and denominator > 0:
+                return Fraction(numerator, denominator)
+
+        offset += size
+
+    return None
+
+
+class MXFANCReader:
+    """Incremental reader of the ANC data in an MXF file."""
+
+    def __init__(self, filename: Union[str, Path], framerate: float = 25.0):
+        """Initialize the reader.
+
+        Args:
+            filename: Path to the MXF file
+            framerate: Frame rate used until the file's edit rate has been read
+        """
+        self.filename = Path(filename)
+        self.framerate = framerate
+        self.edit_rate: Optional[Fraction] = None
+        self.offset = 0
+        self.complete = False
+        self._started = False
+        self._picture_elements = 0
+        self._anc_elements = 0
+
+    @property
+    def frame_rate(self) -> float:
+        """Frame rate from the file's edit rate, or the configured frame rate."""
+        return float(self.edit_rate) if self.edit_rate else self.framerate
+
+    def _find_start(self, f: BinaryIO) -> bool:
+        """Skip the run-in in front of the header partition.
+
+        Args:
+            f: Open MXF file
+
+        Returns:
+            True if the header partition was found
+        """
+        # The run-in is at most 64 KiB
+        head = f.read(65536 + len(PARTITION_PACK_PREFIX))
+        start = head.find(PARTITION_PACK_PREFIX)
+        if start < 0:
+            if len(head) == 65536 + len(PARTITION_PACK_PREFIX):
+                raise ValueError(f"{self.filename} is not an MXF file")
+            return False
+
+        self.offset = start
+        self._started = True
+        return True
+
+    def read_available(self) -> List[Tuple[int, float, List[VANCPacket]]]:
+        """Read the complete KLVs that were added since the last call.
+
+        Returns:
+            List of (frame_index, pts_time, VANC packets) for the frames with ANC data
+        """
+        frames = []
+
+        with open(self.filename, "rb") as f:
+            if not self._started and not self._find_start(f):
+                return frames
+
+            f.seek(0, 2)
+            file_size = f.tell()
+
+            while self.offset + 17 <= file_size:
+                f.seek(self.offset)
+                header = f.read(MAX_HEADER_SIZE)
+                key = header[:16]
+
+                if not key.startswith(UL_PREFIX):
+                    raise ValueError(
+                        f"Lost KLV sync at offset {self.offset} in {self.filename}"
+                    )
+
+                length = read_ber_length(header, 16)
+                if length is None:
+                    # The length field is not complete yet
+                    break
+                value_size, length_size = length
+                value_offset = self.offset + 16 + length_size
+                end = value_offset + value_size
+                if end > file_size:
+                    # The value is still being written
+                    break
+
+                self._read_klv(f, key, value_offset, value_size, frames)
+                self.offset = end
+
+        return frames
+
+    def _read_klv(
+        self,
+        f: BinaryIO,
+        key: bytes,
+        value_offset: int,
+        value_size: int,
+        frames: List[Tuple[int, float, List[VANCPacket]]],
+    ) -> None:
+        """Handle one complete KLV.
+
+        Args:
+            f: Open MXF file
+            key: Key of the KLV
+            value_offset: File offset of the value
+            value_size: Size of the value
+            frames: Frames with ANC data read so far, extended in place
+        """
+        if key[4:5] == b"\x01" and key[8:12] == ESSENCE_ELEMENT_PREFIX:
+            item_type = key[12]
+            if item_type == PICTURE_ITEM:
+                self._picture_elements += 1
+            elif item_type == DATA_ITEM and key[14] == ANC_DATA_ELEMENT:
+                # Essence elements of a frame follow its picture element
+                frame_index = (
+                    self._picture_elements - 1
+                    if self._picture_elements
+                    else self._anc_elements
+                )
+                self._anc_elements += 1
+
+                f.seek(value_offset)
+                packets = parse_anc_element(f.read(value_size))
+                if packets:
+                    frames.append((frame_index, frame_index / self.frame_rate, packets))
+
+        elif key.startswith(PARTITION_PACK_PREFIX):
+            if key[13] == PARTITION_FOOTER:
+                self.complete = True
+
+        elif self.edit_rate is None and key in (TIMELINE_TRACK_KEY, INDEX_SEGMENT_KEY):
+            if value_size <= MAX_METADATA_SET_SIZE:
+                f.seek(value_offset)
+                self.edit_rate = parse_edit_rate(f.read(value_size))
+                if self.edit_rate:
+                    logger.debug(f"Edit rate of {self.filename}: {self.edit_rate}")
+
+
+def follow_vanc_from_mxf(
+    filename: Union[str, Path],
+    framerate: float = 25.0,
+    poll_interval: float = DEFAULT_POLL_INTERVAL,
+    idle_timeout: Optional[float] = None,
+) -> Generator[Tuple[int, float, List[VANCPacket]], None, None]:
+    """Follow the ANC data of an MXF file that is still being recorded.
+
+    New data is read every poll_interval seconds, so packets are yielded at
+    most that long after they were written. Following stops at the footer
+    partition, or when the file did not grow for idle_timeout seconds.
+
+    Args:
+        filename: Path to the MXF file
+        framerate: Frame rate used until the file's edit rate has been read
+        poll_interval: Seconds between reads of new data
+        idle_timeout: Seconds without new data after which to stop, None to follow forever
+
+    Yields:
+        Tuples of (frame_index, pts_time, list of VANC packets)
+    """
+    reader = MXFANCReader(filename, framerate)
+    last_growth = time.monotonic()
+
+    while True:
+        offset = reader.offset
+        yield from reader.read_available()
+
+        if reader.complete:
+            logger.info(f"Reached the footer of {filename}")
+            return
+
+        if reader.offset != offset:
+            last_growth = time.monotonic()
+        elif (
+            idle_timeout is not None and time.monotonic() - last_growth >= idle_timeout
+        ):
+            logger.info(f"{filename} did not grow for {idle_timeout:g}s, stopping")
+            return
+
+        time.sleep(poll_interval)
@@ -0,0 +1,105 @@
+from pyvanc.extractors.morpheus import (
+    chunk_bounds,
+    decode_scte104,
+    iter_kerneldiag_messages,
+    parse_kerneldiag_line,
+)
+
+KEEP_ALIVE = "0x0 [0] 0x3 [1] 0x0 [2] 0xd [3] 0xff [4] 0xff [5] 0xff [6] 0xff [7] 0x0 [8] 0x0 [9] 0x3 [10] 0x0 [11] 0x2 [12]"
+SPLICE = bytes.fromhex(
+    "ffff002c0000dd0002000209153b0402010400021f40010b0012000002290000000000310000000000000000000b0104000b0000000c00000001"
+)
+
+
+def logged(data):
+    return " ".join(f"0x{byte:x} [{index}]" for index, byte in enumerate(data))
+
+
+def write_log(path, newline):
+    lines = []
+    for i in range(600):
+        time = f"10:{i // 60 % 60:02d}:{i % 60:02d}:{i % 25:02d}"
+        lines.append(f"10_240_33_166|167 14-MAY-2024 {time}: Router,Status, ok")
+        lines.append(
+            f"10_240_33_166|167 14-MAY-2024 {time}: SCTE104_AdsProtocol,SendData, "
+            f"data sent: {KEEP_ALIVE}  [166-Active]"
+        )
+        if i % 7 == 0:
+            lines.append(
+                f"10_240_33_166|167 14-MAY-2024 {time}: SCTE104_AdsProtocol,SendData, "
+                f"data sent: {logged(SPLICE[:-1] + bytes([i % 256]))}  [166-Active]"
+            )
+    path.write_bytes(newline.join(lines).encode() + newline.encode())
+    return lines
+
+
+def test_chunks_are_line_aligned(tmp_path):
+    log = tmp_path / "KernelDiags.log"
+    write_log(log, "\r\n")
+    data = log.read_bytes()
+
+    bounds = chunk_bounds(log, 1000)
+    assert len(bounds) > 10
+    assert bounds[0][0] == 0 and bounds[-1][1] == len(data)
+    for (_, end), (start, _) in zip(bounds, bounds[1:]):
+        assert end == start
+        assert data[end - 1 : end] == b"\n"
+
+
+def test_process_pool_gives_the_same_messages_on_a_crlf_log(tmp_path):
+    log = tmp_path / "KernelDiags.log"
+    lines = write_log(log, "\r\n")
+    expected_lines = [
+        number
+        for number, line in enumerate(lines, start=1)
+        if "SendData" in line and "0x3 [1]" not in line
+    ]
+
+    in_process = list(iter_kerneldiag_messages(log, decode=decode_scte104, jobs=1))
+    pooled = list(
+        iter_kerneldiag_messages(log, decode=decode_scte104, jobs=2, chunk_size=4096)
+    )
+
+    assert [message.line_number for message in in_process] == expected_lines
+    assert [message.line_number for message in pooled] == expected_lines
+    assert [message[:6] for message in pooled] == [
+        message[:6] for message in in_process
+    ]
+    assert [repr(message.decoded) for message in pooled] == [
+        repr(message.decoded) for message in in_process
+    ]
+    assert all(message.data[:-1] == SPLICE[:-1] for message in pooled)
+    assert all(message.decoded is not None for message in pooled)
+
+
+def test_keep_alives_can_be_kept(tmp_path):
+    log = tmp_path / "KernelDiags.log"
+    lines = write_log(log, "\n")
+
+    messages = list(
+        iter_kerneldiag_messages(log, skip_keep_alives=False, jobs=2, chunk_size=4096)
+    )
+    assert len(messages) == sum("SendData" in line for line in lines)
+    assert sum(message.is_keep_alive for message in messages) == 600
+
+
+def test_parse_line():
+    message = parse_kerneldiag_line(
+        f"10_240_33_166|167 26-AUG-2022 12:30:40:06: SCTE104_AdsProtocol,SendData, "
+        f"data sent: {KEEP_ALIVE}  [166-Active]\r\n",
+        line_number=3,
+    )
+    assert message.line_number == 3
+    assert message.timestamp.isoformat() == "2022-08-26T12:30:40.240000"
+    assert message.host == "10_240_33_166|167"
+    assert message.device == "SCTE104_AdsProtocol"
+    assert message.command == "SendData"
+    assert message.data.hex() == "0003000dffffffff0000030002"
+    assert message.is_keep_alive
+
+    assert (
+        parse_kerneldiag_line(
+            "10_240_33_166|167 26-AUG-2022 12:30:40:06: Router,Status, ok"
+        )
+        is None
+    )
@@ -0,0 +1,177 @@
+from fractions import Fraction
+
+from pyvanc.extractors.mxf_klv import (
+    INDEX_SEGMENT_KEY,
+    PARTITION_PACK_PREFIX,
+    TIMELINE_TRACK_KEY,
+    MXFANCReader,
+    read_ber_length,
+    unpack_10_bit_samples,
+)
+
+HEADER_PARTITION = PARTITION_PACK_PREFIX + bytes([0x02, 0x04, 0x00])
+BODY_PARTITION = PARTITION_PACK_PREFIX + bytes([0x03, 0x04, 0x00])
+FOOTER_PARTITION = PARTITION_PACK_PREFIX + bytes([0x04, 0x04, 0x00])
+FILL = bytes.fromhex("060e2b34010101020301021001000000")
+PICTURE = bytes.fromhex("060e2b34010201010d01030115010500")
+ANC = bytes.fromhex("060e2b34010201010d01030117010201")
+VBI = bytes.fromhex("060e2b34010201010d01030117010101")
+
+SCTE104 = bytes([0x41, 0x07, 0x08, 0xFF, 0xFF, 0x00, 0x0C, 0x01, 0x02, 0x03, 0x04])
+
+
+def klv(key, value, long_length=False):
+    if long_length or len(value) >= 0x80:
+        length = bytes([0x83]) + len(value).to_bytes(3, "big")
+    else:
+        length = bytes([len(value)])
+    return key + length + value
+
+
+def anc_packet(line, samples, ten_bit=False):
+    if ten_bit:
+        # Parity bits in bits 8 and 9, three samples per 32-bit word
+        words = []
+        padded = list(samples) + [0] * (-len(samples) % 3)
+        for i in range(0, len(padded), 3):
+            s0, s1, s2 = (0x200 | sample for sample in padded[i : i + 3])
+            words.append((s0 << 20 | s1 << 10 | s2).to_bytes(4, "big"))
+        data, coding = b"".join(words), 7
+    else:
+        data, coding = samples + bytes(-len(samples) % 4), 4
+    return (
+        line.to_bytes(2, "big")
+        + bytes([1, coding])
+        + len(samples).to_bytes(2, "big")
+        + len(data).to_bytes(4, "big")
+        + (1).to_bytes(4, "big")
+        + data
+    )
+
+
+def anc_element(*packets):
+    return len(packets).to_bytes(2, "big") + b"".join(packets)
+
+
+def edit_rate_set(numerator, denominator):
+    # Another tag in front of the edit rate, as in a real track
+    return (
+        bytes.fromhex("48010004")
+        + (1).to_bytes(4, "big")
+        + bytes.fromhex("4b010008")
+        + numerator.to_bytes(4, "big")
+        + denominator.to_bytes(4, "big")
+    )
+
+
+def build_mxf():
+    """Run-in, header with edit rates, 6 frames of which 1, 2 and 5 have no ANC, footer."""
+    parts = [
+        b"\x00" * 23,
+        klv(HEADER_PARTITION, bytes(88), long_length=True),
+        klv(TIMELINE_TRACK_KEY, edit_rate_set(30000, 1001)),
+        klv(
+            INDEX_SEGMENT_KEY,
+            bytes.fromhex("3f0b0008") + bytes([0, 0, 0, 25, 0, 0, 0, 1]),
+        ),
+        klv(FILL, bytes(40)),
+        klv(BODY_PARTITION, bytes(88)),
+    ]
+    for frame in range(6):
+        parts.append(klv(PICTURE, bytes(300)))
+        if frame == 0:
+            parts.append(klv(ANC, anc_element(anc_packet(9, SCTE104))))
+        elif frame == 1:
+            parts.append(klv(VBI, bytes(20)))
+        elif frame == 2:
+            parts.append(klv(ANC, anc_element()))
+        elif frame == 3:
+            parts.append(
+                klv(
+                    ANC,
+                    anc_element(
+                        anc_packet(9, SCTE104, ten_bit=True),
+                        anc_packet(10, bytes([0x61, 0x01, 0x02, 0xAA, 0xBB])),
+                    ),
+                )
+            )
+        elif frame == 4:
+            parts.append(
+                klv(ANC, anc_element(anc_packet(9, SCTE104)), long_length=True)
+            )
+    parts.append(klv(FOOTER_PARTITION, bytes(88)))
+    return b"".join(parts)
+
+
+def summary(frames):
+    return [
+        (
+            index,
+            pts_time,
+            [
+                (packet.line, packet.did, packet.sdid, packet.payload)
+                for packet in packets
+            ],
+        )
+        for index, pts_time, packets in frames
+    ]
+
+
+EXPECTED_INDEXES = [0, 3, 4]
+
+
+def test_ber_length_and_10_bit_samples():
+    assert read_ber_length(bytes([0x10]), 0) == (16, 1)
+    assert read_ber_length(bytes([0x83, 0x00, 0x01, 0x00]), 0) == (256, 4)
+    assert read_ber_length(bytes([0x83, 0x00]), 0) is None
+    assert read_ber_length(bytes([0x80]), 0) is None
+
+    word = (0x241 << 20 | 0x107 << 10 | 0x208).to_bytes(4, "big")
+    assert unpack_10_bit_samples(word * 2, 5) == bytes([0x41, 0x07, 0x08, 0x41, 0x07])
+
+
+def test_reads_complete_file(tmp_path):
+    path = tmp_path / "complete.mxf"
+    path.write_bytes(build_mxf())
+
+    reader = MXFANCReader(path)
+    frames = reader.read_available()
+
+    assert reader.complete
+    assert reader.edit_rate == Fraction(30000, 1001)
+    assert [index for index, _, _ in frames] == EXPECTED_INDEXES
+    assert [pts_time for _, pts_time, _ in frames] == [
+        index / (30000 / 1001) for index in EXPECTED_INDEXES
+    ]
+
+    (_, _, first), (_, _, second), _ = frames
+    assert [(packet.line, packet.payload) for packet in first] == [(9, SCTE104)]
+    assert [
+        (packet.line, packet.did, packet.sdid, packet.payload) for packet in second
+    ] == [
+        (9, 0x41, 0x07, SCTE104),
+        (10, 0x61, 0x01, bytes([0x61, 0x01, 0x02, 0xAA, 0xBB])),
+    ]
+    assert reader.read_available() == []
+
+
+def test_appended_file_yields_every_frame_once(tmp_path):
+    data = build_mxf()
+    path = tmp_path / "recording.mxf"
+    whole = tmp_path / "whole.mxf"
+    whole.write_bytes(data)
+    expected = summary(MXFANCReader(whole).read_available())
+
+    # Cut the file everywhere: in the run-in, keys, BER lengths and values
+    for cut in range(len(data) + 1):
+        path.write_bytes(data[:cut])
+        reader = MXFANCReader(path)
+        frames = reader.read_available()
+        assert not reader.complete or cut == len(data)
+
+        with open(path, "ab") as f:
+            f.write(data[cut:])
+        frames += reader.read_available()
+
+        assert reader.complete, cut
+        assert summary(frames) == expected, cut
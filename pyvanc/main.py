@@ -6,13 +6,30 @@ with a focus on SCTE-104 messages in MXF files.
 """
 
 import argparse
+import dataclasses
 import datetime
 import json
 import logging
+import os
 import subprocess
 import sys
+import time
+import zoneinfo
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    TextIO,
+    Tuple,
+    Union,
+)
 
 from rich import box
 from rich.console import Console
@@ -28,14 +45,76 @@ from rich.progress import (
 from rich.syntax import Syntax
 from rich.table import Table
 
-from .extractors.mxf import extract_scte104_from_mxf, extract_vanc_from_mxf
+from .analyzers.correlate import (
+    DEFAULT_PERCENTILES,
+    JOIN_EVENT_ID,
+    JOIN_PAYLOAD,
+    CorrelationStats,
+    correlate_events,
+    join_key,
+)
+from .analyzers.diff import (
+    DEFAULT_TOLERANCE_FRAMES,
+    STATUS_EXTRA,
+    STATUS_MATCHED,
+    STATUS_MISSING,
+    STATUS_SHIFTED,
+    DiffStats,
+    diff_events,
+    is_cue_event,
+    timecode_position,
+    utc_position,
+)
+from .analyzers.engine import AnalysisEngine, AnalysisSummary, Interval
+from .analyzers.interval_index import IntervalIndex
+from .analyzers.timeline import (
+    TimelineSource,
+    TimelineStats,
+    merge_timeline,
+    resolve_clip_starts,
+)
+from .extractors.morpheus import (
+    DEFAULT_DEVICE,
+    DEFAULT_KEYWORD,
+    decode_scte104,
+    iter_kerneldiag_messages,
+)
+from .extractors.mxf import (
+    extract_scte104_from_mxf,
+    extract_vanc_from_mxf,
+    follow_scte104_from_mxf,
+    sample_scte104_from_mxf,
+)
 from .parsers.scte104 import parse_scte104
-from .utils.scte104_utils import get_segmentation_type_name
-from .utils.vanc_utils import VANCJSONEncoder, format_timecode
+from .pipeline import Interrupt, Sinks, threaded
+from .storage.catalog import EventCatalog
+from .storage.checkpoint import ExtractionCheckpoint
+from .storage.spill import DEFAULT_MEMORY_LIMIT, ExternalSorter
+from .utils.fingerprint import file_fingerprint
+from .utils.scte104_utils import (
+    get_event_color,
+    get_segmentation_type_name,
+    is_keep_alive,
+)
+from .utils.vanc_utils import (
+    ClipTiming,
+    VANCJSONEncoder,
+    format_timecode,
+    parse_creation_time,
+    pts_to_timecodes,
+    pts_to_utc_strings,
+)
 
 # Initialize Rich console
 console = Console()
 
+# Triage samples a short window every interval instead of reading whole files
+TRIAGE_WINDOW_SECONDS = 2.0
+TRIAGE_INTERVAL_SECONDS = 300.0
+
+# With --max-memory the event table is printed in pages of this many rows
+TABLE_PAGE_ROWS = 1000
+
 
 def setup_logging(verbose: bool = False, debug: bool = False) -> None:
     """Set up logging configuration with Rich formatting.
@@ -65,69 +144,304 @@ def setup_logging(verbose: bool = False, debug: bool = False) -> None:
         logging.getLogger("pyvanc.parsers.scte104").setLevel(logging.WARNING)
 
 
+def parse_segmentation_type(value: Optional[str]) -> Optional[Union[int, str]]:
+    """Parse a segmentation type given on the command line.
+
+    Args:
+        value: Segmentation type ID ("0x11", "17") or part of its name ("Program End")
+
+    Returns:
+        Segmentation type ID, the name as given, or None if no value was given
+    """
+    if value is None:
+        return None
+    try:
+        return int(value, 0)
+    except ValueError:
+        return value
+
+
+def event_has_segmentation_type(
+    event: Dict[str, Any], segmentation_type: Union[int, str]
+) -> bool:
+    """Check whether an event has a segmentation type.
+
+    Args:
+        event: Event from _process_scte104_message
+        segmentation_type: Segmentation type ID, or part of its name (case-insensitive)
+
+    Returns:
+        True if the event has the segmentation type
+    """
+    if isinstance(segmentation_type, int):
+        return event.get("segmentation_type_id") == segmentation_type
+    name = event.get("segmentation_type_name", "")
+    return segmentation_type.lower() in name.lower()
+
+
+def iter_scte104_events(
+    input_file: str,
+    framerate: float = 25.0,
+    frame_offset: int = 0,
+    use_pts_time: bool = False,
+    include_payload: bool = False,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    finish: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+    checkpoint: Optional[ExtractionCheckpoint] = None,
+) -> Generator[List[Dict[str, Any]], None, None]:
+    """Decode the SCTE-104 events of an MXF file on pipeline threads.
+
+    The file is read on one thread and its messages are parsed into events on
+    another, while the caller handles the events found so far. Closing the
+    generator stops both threads and the extraction.
+
+    With a loaded checkpoint, the recorded events are yielded first and the
+    file is only read from the recorded position on. The scan is recorded
+    in the checkpoint, which is committed when the generator stops.
+
+    Args:
+        input_file: Path to the MXF file
+        framerate: Frame rate of the video
+        frame_offset: Optional frame offset to adjust timecodes
+        use_pts_time: Whether to use PTS time from the MXF file instead of frame-based timecode
+        include_payload: Whether to add the raw message data to every event
+        start: Start of the window to read in seconds, None for the start of the file
+        end: End of the window to read in seconds (exclusive), None for the end of the file
+        finish: Called on the parsing thread with the events of every message, e.g. to add UTC times
+        checkpoint: Checkpoint to record the scan in, and to resume from if it was loaded
+
+    Yields:
+        Lists with the events of one SCTE-104 message
+    """
+
+    # Closing the generator kills ffprobe, instead of waiting for its next packet
+    interrupt = Interrupt()
+
+    def parse() -> Generator[List[Dict[str, Any]], None, None]:
+        read_start = start
+        if checkpoint is not None:
+            for events in checkpoint.recorded_batches():
+                if finish is not None:
+                    finish(events)
+                yield events
+            read_start = checkpoint.read_start(start)
+            checkpoint.start()
+
+        messages = extract_scte104_from_mxf(
+            input_file, read_start, end, pipelined=True, interrupt=interrupt
+        )
+        try:
+            for frame_idx, pts_time, scte104_msg in messages:
+                if checkpoint is not None and checkpoint.is_recorded(pts_time):
+                    continue
+
+                events = _process_scte104_message(
+                    frame_idx,
+                    pts_time,
+                    scte104_msg,
+                    framerate,
+                    frame_offset,
+                    use_pts_time,
+                    include_payload,
+                )
+                if checkpoint is not None:
+                    checkpoint.record(pts_time, events)
+                if events:
+                    if finish is not None:
+                        finish(events)
+                    yield events
+        finally:
+            messages.close()
+            if checkpoint is not None:
+                checkpoint.close()
+
+    yield from threaded(parse(), name="pyvanc-parse", interrupt=interrupt)
+
+
 def extract_scte104_events(
     input_file: str,
     framerate: float = 25.0,
     frame_offset: int = 0,
     show_progress: bool = True,
     use_pts_time: bool = False,
+    include_payload: bool = False,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    limit: Optional[int] = None,
+    until: Optional[Union[int, str]] = None,
+    finish: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+    sinks: Sequence[Callable[[Iterable[Dict[str, Any]]], Any]] = (),
+    keep_events: bool = True,
+    checkpoint: Optional[ExtractionCheckpoint] = None,
 ) -> List[Dict[str, Any]]:
     """Extract SCTE-104 events from an MXF file with progress indicator.
 
+    Reading, parsing and the sinks run concurrently, see iter_scte104_events.
+    Extraction stops as soon as the limit or the until event is reached, or
+    when it is interrupted with Ctrl+C. The extraction is then cancelled, the
+    sinks get the events found so far and those events are returned. The
+    checkpoint is kept when the extraction was interrupted or failed, and
+    removed otherwise.
+
     Args:
         input_file: Path to the MXF file
         framerate: Frame rate of the video
         frame_offset: Optional frame offset to adjust timecodes
         show_progress: Whether to show a progress spinner
         use_pts_time: Whether to use PTS time from the MXF file instead of frame-based timecode
+        include_payload: Whether to add the raw message data to every event
+        start: Start of the window to read in seconds, None for the start of the file
+        end: End of the window to read in seconds (exclusive), None for the end of the file
+        limit: Maximum number of events to extract
+        until: Stop after the first event with this segmentation type ID or name
+        finish: Called on the parsing thread with the events of every message, e.g. to add UTC times
+        sinks: Functions consuming the events on their own threads while they are extracted,
+               e.g. writers that stream them to a file
+        keep_events: Whether to return the events. Without it only the sinks get
+                     them, so memory use does not grow with the number of events.
+        checkpoint: Checkpoint to record the extraction in, see iter_scte104_events
 
     Returns:
-        List of event dictionaries with timecode and type information
+        List of event dictionaries with timecode and type information,
+        empty without keep_events
     """
     events = []
+    count = 0
+
+    batches = iter_scte104_events(
+        input_file,
+        framerate,
+        frame_offset,
+        use_pts_time,
+        include_payload,
+        start,
+        end,
+        finish,
+        checkpoint,
+    )
+    progress = Progress(
+        SpinnerColumn(),
+        TextColumn("[bold blue]Extracting SCTE-104 events..."),
+        TimeElapsedColumn(),
+        console=console,
+        disable=not show_progress,
+    )
 
-    # Use context manager for progress display
-    if show_progress:
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[bold blue]Extracting SCTE-104 events..."),
-            TimeElapsedColumn(),
-            console=console,
-        ) as progress:
+    try:
+        with progress, Sinks(sinks) as outputs:
             task = progress.add_task("Extracting", total=None)
 
-            for frame_idx, pts_time, scte104_msg in extract_scte104_from_mxf(
-                input_file
-            ):
-                # Process events (same as before)
-                events.extend(
-                    _process_scte104_message(
-                        frame_idx,
-                        pts_time,
-                        scte104_msg,
-                        framerate,
-                        frame_offset,
-                        use_pts_time,
-                    )
-                )
+            for new_events in batches:
+                # Keep the events of the message up to the until event
+                reached_until = False
+                if until is not None:
+                    for index, event in enumerate(new_events):
+                        if event_has_segmentation_type(event, until):
+                            new_events = new_events[: index + 1]
+                            reached_until = True
+                            break
+                if limit is not None:
+                    new_events = new_events[: limit - count]
+
+                for event in new_events:
+                    outputs.send(event)
+                if keep_events:
+                    events.extend(new_events)
+                count += len(new_events)
                 progress.update(task)
-    else:
-        # Extract without progress display
-        for frame_idx, pts_time, scte104_msg in extract_scte104_from_mxf(input_file):
-            events.extend(
-                _process_scte104_message(
-                    frame_idx,
-                    pts_time,
-                    scte104_msg,
-                    framerate,
-                    frame_offset,
-                    use_pts_time,
-                )
-            )
 
+                if limit is not None and count >= limit:
+                    logging.info(f"Stopped after {limit} events")
+                    break
+                if reached_until:
+                    logging.info(f"Stopped at {new_events[-1]['timecode']}")
+                    break
+
+    except KeyboardInterrupt:
+        console.print(
+            f"[yellow]Interrupted, keeping the {count} events found so far[/]"
+        )
+        if checkpoint is not None:
+            console.print("[yellow]Run again with --resume to continue[/]")
+        checkpoint = None
+    finally:
+        # Stops the pipeline threads and ffprobe when extraction stopped early
+        batches.close()
+
+    if checkpoint is not None:
+        checkpoint.remove()
     return events
 
 
+def open_checkpoint(
+    input_file: str, resume: bool, **options: Any
+) -> Optional[ExtractionCheckpoint]:
+    """Create the checkpoint of a scan, loaded from an earlier scan when resuming.
+
+    Args:
+        input_file: Path to the MXF file
+        resume: Whether to continue from the checkpoint of an interrupted scan
+        **options: Options that change the events, a checkpoint is only
+                   resumed with the same options
+
+    Returns:
+        Checkpoint to record the scan in, or None if the cache directory cannot be used
+    """
+    checkpoint = ExtractionCheckpoint(input_file, options)
+    try:
+        checkpoint.directory.mkdir(parents=True, exist_ok=True)
+    except OSError as e:
+        logging.warning(f"Scanning without checkpoints: {e}")
+        return None
+
+    if resume and not checkpoint.load():
+        logging.info(f"No checkpoint of {input_file}, starting from the beginning")
+    return checkpoint
+
+
+def write_json_events(
+    events: Iterable[Dict[str, Any]], output_file: Union[str, TextIO]
+) -> int:
+    """Write events to a JSON file as they arrive.
+
+    The file holds the same indented JSON array as json.dump(events, indent=2).
+
+    Args:
+        events: Event dictionaries
+        output_file: Path to the JSON file, or an open text file such as sys.stdout
+
+    Returns:
+        Number of events written
+    """
+    if not isinstance(output_file, str):
+        return _write_json_array(events, output_file)
+    with open(output_file, "w") as f:
+        return _write_json_array(events, f)
+
+
+def _write_json_array(events: Iterable[Dict[str, Any]], f: TextIO) -> int:
+    """Write events to an open text file as an indented JSON array.
+
+    Args:
+        events: Event dictionaries
+        f: Open text file
+
+    Returns:
+        Number of events written
+    """
+    count = 0
+    f.write("[")
+    for event in events:
+        # Strings in JSON have no raw newlines, so this only indents lines
+        text = json.dumps(event, cls=VANCJSONEncoder, indent=2)
+        f.write(",\n  " if count else "\n  ")
+        f.write(text.replace("\n", "\n  "))
+        count += 1
+    f.write("\n]" if count else "]")
+    return count
+
+
 def _process_scte104_message(
     frame_idx: int,
     pts_time: float,
@@ -135,6 +449,7 @@ def _process_scte104_message(
     framerate: float,
     frame_offset: int = 0,
     use_pts_time: bool = False,
+    include_payload: bool = False,
 ) -> List[Dict[str, Any]]:
     """Process a SCTE-104 message into events.
 
@@ -145,6 +460,7 @@ def _process_scte104_message(
         framerate: Frame rate
         frame_offset: Optional frame offset to adjust timecodes
         use_pts_time: Whether to use PTS time from the MXF file instead of frame-based timecode
+        include_payload: Whether to add the raw message data to every event
 
     Returns:
         List of event dictionaries
@@ -170,8 +486,11 @@ def _process_scte104_message(
         "pts_time": pts_time,
         "timecode": timecode,
         "message_type": scte104_msg.type,
+        "message_num": scte104_msg.message_num,
         "protocol_version": scte104_msg.protocol_version,
     }
+    if include_payload:
+        event_base["payload"] = scte104_msg.payload
 
     # Process each operation in the message
     if scte104_msg.operations:
@@ -191,34 +510,15 @@ def _process_scte104_message(
                 event["event_id"] = event_id
                 event["event_id_hex"] = f"0x{event_id:08x}"
 
+                if op.data.get("segmentation_upid"):
+                    event["upid_type"] = op.data["segmentation_upid_type"]
+                    event["upid"] = op.data["segmentation_upid"]
+
             events.append(event)
 
     return events
 
 
-def get_event_color(event_type: str) -> str:
-    """Get color for event based on type.
-
-    Args:
-        event_type: Event type name
-
-    Returns:
-        Color name for Rich formatting
-    """
-    if "Program Boundary" in event_type:
-        return "bright_green"
-    elif "Content Marker" in event_type:
-        return "bright_yellow"
-    elif "Advertisement" in event_type:
-        return "bright_cyan"
-    elif "Chapter" in event_type:
-        return "bright_magenta"
-    elif "Break" in event_type:
-        return "bright_red"
-    else:
-        return "bright_white"
-
-
 def get_mxf_timecode_info(input_file: str) -> Optional[Dict[str, Any]]:
     """Get timecode and duration information from an MXF file.
 
@@ -291,34 +591,16 @@ def convert_pts_to_utc(pts_time: float, timecode_info: Dict[str, Any]) -> Option
         UTC time string or None if conversion not possible
     """
     try:
-        if "creation_time" in timecode_info:
-            # Parse the creation time
-            creation_time_str = timecode_info["creation_time"]
+        creation_time_str = timecode_info.get(
+            "creation_time_utc_str", timecode_info.get("creation_time")
+        )
+        if creation_time_str:
+            # For many events, parse once with ClipTiming and use pts_to_utc_strings
+            creation_time = parse_creation_time(creation_time_str)
+            if creation_time is None:
+                return None  # No format matched
 
-            # Handle different datetime formats
-            try:
-                # Try ISO format first
-                creation_time = datetime.datetime.fromisoformat(
-                    creation_time_str.replace("Z", "+00:00")
-                )
-            except ValueError:
-                # Try other common formats
-                for fmt in ("%Y-%m-%dT%H:%M:%S.%fZ", "%Y-%m-%d %H:%M:%S"):
-                    try:
-                        creation_time = datetime.datetime.strptime(
-                            creation_time_str, fmt
-                        )
-                        break
-                    except ValueError:
-                        continue
-                else:
-                    return None  # No format matched
-
-            # Add the PTS time to get the actual UTC time
-            event_time = creation_time + datetime.timedelta(seconds=pts_time)
-
-            # Return formatted UTC time
-            return event_time.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3] + "Z"
+            return pts_to_utc_strings([pts_time], creation_time)[0]
 
         return None
 
@@ -327,6 +609,64 @@ def convert_pts_to_utc(pts_time: float, timecode_info: Dict[str, Any]) -> Option
         return None
 
 
+def apply_clip_timing(
+    events: List[Dict[str, Any]],
+    clip_timing: ClipTiming,
+    framerate: float,
+    add_utc: bool = False,
+) -> None:
+    """Make event timecodes relative to the clip start timecode, in place.
+
+    Args:
+        events: Events from extract_scte104_events
+        clip_timing: Start timecode and creation time of the clip
+        framerate: Frame rate of the clip
+        add_utc: Whether to add UTC times, when the creation time is known
+    """
+    original_pts_times = [event["pts_time"] for event in events]
+    adjusted_pts_times = [
+        pts_time + clip_timing.start_seconds for pts_time in original_pts_times
+    ]
+    timecodes = pts_to_timecodes(adjusted_pts_times, framerate)
+    for event, pts_time, timecode in zip(events, adjusted_pts_times, timecodes):
+        event["pts_time"] = pts_time
+        event["timecode"] = timecode
+
+    if add_utc and clip_timing.creation_time is not None:
+        # For UTC, add the event's original pts_time (relative to stream start) to file's creation_time.
+        utc_times = pts_to_utc_strings(original_pts_times, clip_timing.creation_time)
+        for event, utc_time in zip(events, utc_times):
+            event["utc_time"] = utc_time
+
+
+def resolve_window(
+    args: argparse.Namespace, clip_timing: ClipTiming
+) -> Tuple[Optional[float], Optional[float]]:
+    """Convert the --start and --end options to seconds from the clip start.
+
+    Exits with an error message if a time cannot be converted.
+
+    Args:
+        args: Command line arguments
+        clip_timing: Start timecode and creation time of the clip
+
+    Returns:
+        Start and end of the window in seconds, None where the option was not given
+    """
+    try:
+        start, end = clip_timing.window(args.start, args.end)
+    except ValueError as e:
+        console.print(f"[bold red]Error:[/] {e}")
+        sys.exit(1)
+
+    if start is not None or end is not None:
+        logging.info(
+            f"Reading {start or 0.0:.3f}s to "
+            f"{'the end' if end is None else f'{end:.3f}s'} of the clip"
+        )
+    return start, end
+
+
 def extract_command(args: argparse.Namespace) -> None:
     """Execute the extract command with Rich formatting.
 
@@ -346,110 +686,335 @@ def extract_command(args: argparse.Namespace) -> None:
         console.print(f"[bold red]Error:[/] Input file '{input_file}' does not exist")
         sys.exit(1)
 
-    # Get timecode info if showing UTC
-    timecode_info = None
-    if show_utc:
-        timecode_info = get_mxf_timecode_info(input_file)
-        if not timecode_info or "creation_time" not in timecode_info:
+    if args.follow and (args.start or args.end):
+        console.print(
+            "[bold red]Error:[/] --start and --end cannot be used with --follow"
+        )
+        sys.exit(1)
+
+    # Get timecode info if showing UTC or converting the window to clip time
+    clip_timing = None
+    if show_utc or args.start or args.end:
+        clip_timing = ClipTiming.from_timecode_info(
+            get_mxf_timecode_info(input_file), framerate
+        )
+        if show_utc and clip_timing.creation_time is None:
             console.print(
                 "[yellow]Warning:[/] Could not extract UTC time information, falling back to relative timecode"
             )
             show_utc = False
 
+    if args.follow:
+        follow_events(args, clip_timing if show_utc else None)
+        return
+
+    start, end = (
+        (None, None) if clip_timing is None else resolve_window(args, clip_timing)
+    )
+
+    # Add UTC times on the parsing thread, so that streamed output has them too
+    add_utc_times = None
+    if show_utc and clip_timing:
+
+        def add_utc_times(new_events: List[Dict[str, Any]]) -> None:
+            utc_times = pts_to_utc_strings(
+                [event["pts_time"] for event in new_events], clip_timing.creation_time
+            )
+            for event, utc_time in zip(new_events, utc_times):
+                event["utc_time"] = utc_time
+
+    # A JSON file is written while the events are extracted
+    sinks = []
+    if format_type == "json" and output_file:
+        sinks.append(lambda new_events: write_json_events(new_events, output_file))
+
+    # With a memory limit, events for the console are sorted on disk instead of in memory
+    sorter = None
+    if args.max_memory is not None and not (format_type == "json" and output_file):
+        sorter = ExternalSorter(
+            key=lambda e: e["frame"], memory_limit=int(args.max_memory * 1024 * 1024)
+        )
+        sinks.append(sorter.extend)
+
     # Extract SCTE-104 events
     try:
+        checkpoint = open_checkpoint(
+            input_file,
+            args.resume,
+            framerate=framerate,
+            frame_offset=frame_offset,
+            use_pts_time=use_pts_time,
+            start=start,
+            end=end,
+        )
         events = extract_scte104_events(
-            input_file, framerate, frame_offset, True, use_pts_time
+            input_file,
+            framerate,
+            frame_offset,
+            True,
+            use_pts_time,
+            start=start,
+            end=end,
+            limit=args.limit,
+            until=parse_segmentation_type(args.until),
+            finish=add_utc_times,
+            sinks=sinks,
+            keep_events=args.max_memory is None,
+            checkpoint=checkpoint,
         )
 
-        # Add UTC time if requested
-        if show_utc and timecode_info:
-            for event in events:
-                utc_time = convert_pts_to_utc(event["pts_time"], timecode_info)
-                if utc_time:
-                    event["utc_time"] = utc_time
-
     except Exception as e:
+        if sorter is not None:
+            sorter.close()
         console.print(f"[bold red]Error extracting SCTE-104 data:[/] {e}")
         sys.exit(1)
 
     # Output results based on format
     if format_type == "json":
-        # JSON output
-        json_output = json.dumps(events, cls=VANCJSONEncoder, indent=2)
-
         if output_file:
-            with open(output_file, "w") as f:
-                f.write(json_output)
             console.print(f"[green]SCTE-104 data written to {output_file}[/]")
+        elif sorter is not None:
+            with sorter:
+                write_json_events(sorter.sorted_items(), sys.stdout)
+                sys.stdout.write("\n")
         else:
+            json_output = json.dumps(events, cls=VANCJSONEncoder, indent=2)
             # Pretty-print JSON
             syntax = Syntax(json_output, "json", theme="monokai", line_numbers=True)
             console.print(syntax)
 
+    elif sorter is not None:
+        with sorter:
+            if sorter.spilled_runs:
+                logging.info(f"Sorted {sorter.count} events in temporary files")
+            print_events_table(
+                sorter.sorted_items(),
+                sorter.count,
+                input_file,
+                show_utc,
+                TABLE_PAGE_ROWS,
+            )
+
     else:
-        # Rich table output
-        if events:
-            # Create header
-            console.print()
-            console.print(
-                Panel(
-                    f"[bold]Found {len(events)} SCTE-104 events in [cyan]{input_file}[/]",
-                    border_style="blue",
-                )
+        show_utc = show_utc and any("utc_time" in event for event in events)
+        print_events_table(
+            sorted(events, key=lambda e: e["frame"]), len(events), input_file, show_utc
+        )
+
+
+def _events_table(show_utc: bool, title: Optional[str]) -> Table:
+    """Create an empty table of SCTE-104 events.
+
+    Args:
+        show_utc: Whether to add the UTC time column
+        title: Title of the table, None for continuation pages
+
+    Returns:
+        Table with the event columns
+    """
+    table = Table(
+        title=title,
+        box=box.ROUNDED,
+        header_style="bold white on blue",
+        border_style="blue",
+        min_width=100,
+    )
+
+    # Add columns
+    if show_utc:
+        table.add_column("UTC TIME", style="bright_magenta", no_wrap=True)
+    table.add_column("TIMECODE", style="bright_cyan", no_wrap=True)
+    table.add_column("FRAME", justify="right", style="bright_white")
+    table.add_column("EVENT TYPE", style="bright_white")
+    table.add_column("EVENT ID", no_wrap=True, style="bright_white")
+    return table
+
+
+def print_events_table(
+    events: Iterable[Dict[str, Any]],
+    count: int,
+    input_file: str,
+    show_utc: bool,
+    page_rows: Optional[int] = None,
+) -> None:
+    """Print SCTE-104 events as a Rich table.
+
+    Args:
+        events: Event dictionaries in the order to print them
+        count: Number of events, for the header
+        input_file: Path to the MXF file, for the header
+        show_utc: Whether to add the UTC time column
+        page_rows: Print the table in pages of this many rows as the events
+                   arrive, None to print all events in one table
+    """
+    if not count:
+        console.print("[yellow]No SCTE-104 events found in the MXF file[/]")
+        return
+
+    # Create header
+    console.print()
+    console.print(
+        Panel(
+            f"[bold]Found {count} SCTE-104 events in [cyan]{input_file}[/]",
+            border_style="blue",
+        )
+    )
+
+    def rows() -> Generator[List[str], None, None]:
+        for event in events:
+            # Get event description
+            if "segmentation_type_name" in event:
+                event_type = event["segmentation_type_name"]
+            else:
+                event_type = event["message_type"]
+
+            # Get event ID if available
+            event_id = event.get("event_id_hex", "N/A")
+
+            # Get color based on event type
+            color = get_event_color(event_type)
+
+            # Create row
+            row_data = []
+            if show_utc and "utc_time" in event:
+                row_data.append(event["utc_time"])
+            row_data.extend(
+                [
+                    event["timecode"],
+                    str(event["frame"]),
+                    f"[{color}]{event_type}[/]",
+                    event_id,
+                ]
             )
+            yield row_data
+
+    print_table_pages(
+        rows(),
+        lambda title: _events_table(show_utc, title),
+        "SCTE-104 EVENTS SUMMARY",
+        page_rows,
+    )
+
+
+def print_table_pages(
+    rows: Iterable[Sequence[str]],
+    new_table: Callable[[Optional[str]], Table],
+    title: str,
+    page_rows: Optional[int] = TABLE_PAGE_ROWS,
+) -> int:
+    """Print table rows, in pages as the rows arrive.
+
+    A Rich table keeps all of its rows until it is printed, so long tables are
+    printed in pages of page_rows rows to keep memory use bounded.
+
+    Args:
+        rows: Cells of every row
+        new_table: Creates an empty table with the given title, None for continuation pages
+        title: Title of the first page
+        page_rows: Number of rows per page, None to print all rows in one table
+
+    Returns:
+        Number of rows printed
+    """
+    count = 0
+    table = new_table(title)
+    for row in rows:
+        table.add_row(*row)
+        count += 1
+        if page_rows is not None and table.row_count >= page_rows:
+            console.print(table)
+            table = new_table(None)
+
+    if table.row_count:
+        console.print(table)
+    return count
+
+
+def follow_events(
+    args: argparse.Namespace, clip_timing: Optional[ClipTiming] = None
+) -> None:
+    """Print the SCTE-104 events of an MXF file as it is being recorded.
+
+    Table rows or JSON lines are written as soon as the events are read.
+
+    Args:
+        args: Command line arguments of the extract command
+        clip_timing: Clip creation time to show UTC times, None to leave them out
+    """
+    output = open(args.output, "a") if args.output else None
+    count = 0
+    until = parse_segmentation_type(args.until)
+    messages = follow_scte104_from_mxf(
+        args.input_file,
+        args.framerate,
+        args.poll_interval,
+        args.idle_timeout,
+    )
 
-            # Create table
-            table = Table(
-                title="SCTE-104 EVENTS SUMMARY",
-                box=box.ROUNDED,
-                header_style="bold white on blue",
+    if args.format != "json":
+        console.print(
+            Panel(
+                f"[bold]Following SCTE-104 events in [cyan]{args.input_file}[/], "
+                "press Ctrl+C to stop",
                 border_style="blue",
-                min_width=100,
             )
+        )
 
-            # Add columns
-            if show_utc and any("utc_time" in event for event in events):
-                table.add_column("UTC TIME", style="bright_magenta", no_wrap=True)
-            table.add_column("TIMECODE", style="bright_cyan", no_wrap=True)
-            table.add_column("FRAME", justify="right", style="bright_white")
-            table.add_column("EVENT TYPE", style="bright_white")
-            table.add_column("EVENT ID", no_wrap=True, style="bright_white")
-
-            # Add rows
-            for event in sorted(events, key=lambda e: e["frame"]):
-                # Get event description
-                if "segmentation_type_name" in event:
-                    event_type = event["segmentation_type_name"]
-                else:
-                    event_type = event["message_type"]
-
-                # Get event ID if available
-                event_id = event.get("event_id_hex", "N/A")
-
-                # Get color based on event type
-                color = get_event_color(event_type)
-
-                # Create row
-                row_data = []
-                if show_utc and "utc_time" in event:
-                    row_data.append(event["utc_time"])
-                row_data.extend(
-                    [
-                        event["timecode"],
-                        str(event["frame"]),
-                        f"[{color}]{event_type}[/]",
-                        event_id,
-                    ]
-                )
+    try:
+        for frame_idx, pts_time, scte104_msg in messages:
+            events = _process_scte104_message(
+                frame_idx,
+                pts_time,
+                scte104_msg,
+                args.framerate,
+                args.frame_offset,
+                args.use_pts_time,
+            )
+            if args.limit is not None:
+                events = events[: args.limit - count]
 
-                table.add_row(*row_data)
+            for event in events:
+                count += 1
+                if clip_timing is not None:
+                    event["utc_time"] = pts_to_utc_strings(
+                        [pts_time], clip_timing.creation_time
+                    )[0]
+
+                if args.format == "json":
+                    line = json.dumps(event, cls=VANCJSONEncoder)
+                    if output:
+                        output.write(line + "\n")
+                        output.flush()
+                    else:
+                        print(line, flush=True)
+                    continue
+
+                event_type = event.get("segmentation_type_name", event["message_type"])
+                utc = f"[bright_magenta]{event['utc_time']}[/]  " if clip_timing else ""
+                console.print(
+                    f"{utc}[bright_cyan]{event['timecode']}[/]  "
+                    f"{event['frame']:>8}  "
+                    f"[{get_event_color(event_type)}]{event_type}[/]  "
+                    f"{event.get('event_id_hex', 'N/A')}"
+                )
 
-            # Print the table
-            console.print(table)
+            if (args.limit is not None and count >= args.limit) or (
+                until is not None
+                and any(event_has_segmentation_type(event, until) for event in events)
+            ):
+                break
+    except KeyboardInterrupt:
+        pass
+    except (OSError, ValueError) as e:
+        console.print(f"[bold red]Error following {args.input_file}:[/] {e}")
+        sys.exit(1)
+    finally:
+        messages.close()
+        if output:
+            output.close()
 
-        else:
-            console.print("[yellow]No SCTE-104 events found in the MXF file[/]")
+    if args.format != "json":
+        console.print(f"[green]Stopped after {count} SCTE-104 events[/]")
 
 
 def analyze_command(args: argparse.Namespace) -> None:
@@ -464,6 +1029,7 @@ def analyze_command(args: argparse.Namespace) -> None:
     frame_offset = args.frame_offset
     use_pts_time = args.use_pts_time
     show_utc = args.show_utc
+    save_index = args.save_index
 
     # Validate input file
     if not Path(input_file).exists():
@@ -481,64 +1047,16 @@ def analyze_command(args: argparse.Namespace) -> None:
     else:
         logging.info(f"Using specified or default framerate: {framerate:.2f} fps")
 
-    start_timecode_offset_seconds = 0.0
-    start_timecode_str = "00:00:00:00"  # Default if not in MXF
+    # Parse the start timecode and creation time once for all events
+    clip_timing = ClipTiming.from_timecode_info(mxf_info, framerate)
+    start_timecode_offset_seconds = clip_timing.start_seconds
     if mxf_info and "start_timecode_str" in mxf_info:
-        start_timecode_str = mxf_info["start_timecode_str"]
-        try:
-            tc_parts = list(map(int, start_timecode_str.split(":")))
-            if len(tc_parts) == 4:
-                start_timecode_offset_seconds = (
-                    tc_parts[0] * 3600
-                    + tc_parts[1] * 60
-                    + tc_parts[2]
-                    + tc_parts[3] / framerate
-                )
-                logging.info(
-                    f"MXF start timecode {start_timecode_str} translates to {start_timecode_offset_seconds:.3f}s offset."
-                )
-        except ValueError:
-            logging.warning(f"Could not parse MXF start timecode: {start_timecode_str}")
-
-    # Extract SCTE-104 events for analysis
-    try:
-        events = extract_scte104_events(
-            input_file, framerate, frame_offset, True, use_pts_time
-        )
-
-        # Adjust pts_time and recalculate timecode if MXF start_timecode is present
-        # This ensures event timecodes are relative to the MXF's embedded start timecode
         logging.info(
-            f"Adjusting event timestamps by MXF start timecode offset: {start_timecode_offset_seconds:.3f}s"
+            f"MXF start timecode {clip_timing.start_timecode} translates to {start_timecode_offset_seconds:.3f}s offset."
         )
-        for event in events:
-            event["pts_time"] += start_timecode_offset_seconds
-            # Recalculate timecode string based on new pts_time
-            total_seconds_event = int(event["pts_time"])
-            remaining_frames_event = int(
-                (event["pts_time"] - total_seconds_event) * framerate
-            )
-            hours_event = total_seconds_event // 3600
-            minutes_event = (total_seconds_event % 3600) // 60
-            seconds_event = total_seconds_event % 60
-            event["timecode"] = (
-                f"{hours_event:02d}:{minutes_event:02d}:{seconds_event:02d}:{remaining_frames_event:02d}"
-            )
-
-        # Add UTC time if requested
-        if show_utc and mxf_info and "creation_time_utc_str" in mxf_info:
-            for event in events:
-                # For UTC, add the event's original pts_time (relative to stream start) to file's creation_time.
-                original_pts_time = (
-                    event["pts_time"] - start_timecode_offset_seconds
-                )  # Get original relative PTS
-                utc_time = convert_pts_to_utc(original_pts_time, mxf_info)
-                if utc_time:
-                    event["utc_time"] = utc_time
 
-    except Exception as e:
-        console.print(f"[bold red]Error extracting SCTE-104 data:[/] {e}")
-        sys.exit(1)
+    start, end = resolve_window(args, clip_timing)
+    show_utc_column = show_utc and clip_timing.creation_time is not None
 
     # Display Clip Info Panel
     if mxf_info:
@@ -559,14 +1077,7 @@ def analyze_command(args: argparse.Namespace) -> None:
             )
 
         clip_duration_sec = mxf_info.get("duration_seconds", 0.0)
-        total_seconds_duration = int(clip_duration_sec)
-        remaining_frames_duration = int(
-            (clip_duration_sec - total_seconds_duration) * framerate
-        )
-        hours_duration = total_seconds_duration // 3600
-        minutes_duration = (total_seconds_duration % 3600) // 60
-        seconds_duration = total_seconds_duration % 60
-        duration_timecode_str = f"{hours_duration:02d}:{minutes_duration:02d}:{seconds_duration:02d}:{remaining_frames_duration:02d}"
+        duration_timecode_str = pts_to_timecodes([clip_duration_sec], framerate)[0]
 
         clip_info_table.add_row(
             "Clip Duration (TC):", f"[bright_yellow]{duration_timecode_str}[/]"
@@ -585,17 +1096,14 @@ def analyze_command(args: argparse.Namespace) -> None:
                 "Clip Creation UTC:",
                 f"[bright_magenta]{mxf_info['creation_time_utc_str']}[/]",
             )
-            try:
-                creation_dt = datetime.datetime.fromisoformat(
-                    mxf_info["creation_time_utc_str"].replace("Z", "+00:00")
+            if clip_timing.creation_time is not None:
+                end_dt = clip_timing.creation_time + datetime.timedelta(
+                    seconds=clip_duration_sec
                 )
-                end_dt = creation_dt + datetime.timedelta(seconds=clip_duration_sec)
                 clip_info_table.add_row(
                     "Clip End UTC:",
                     f"[bright_magenta]{end_dt.strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'}[/]",
                 )
-            except ValueError:
-                pass
 
         console.print(
             Panel(
@@ -606,152 +1114,1469 @@ def analyze_command(args: argparse.Namespace) -> None:
             )
         )
 
-    # Analyze the events
-    if events:
-        # Create header
-        console.print()
-        console.print(
-            Panel(
-                f"[bold]Analyzing {len(events)} SCTE-104 events in [cyan]{input_file}[/]",
-                border_style="blue",
-            )
+    console.print()
+    console.print(
+        Panel(
+            f"[bold]Analyzing SCTE-104 events in [cyan]{input_file}[/]",
+            border_style="blue",
         )
+    )
 
-        # Categorize events
-        program_boundaries = []
-        content_markers = []
-        other_events = []
+    # Classify, pair and summarize the events in a single pass
+    engine = AnalysisEngine(framerate)
+    indexed_intervals: List[Interval] = []
 
+    def analysis_rows(
+        events: Iterable[Dict[str, Any]],
+    ) -> Generator[List[str], None, None]:
         for event in events:
-            if "segmentation_type_name" in event:
-                type_name = event["segmentation_type_name"]
-                if "Program Boundary" in type_name:
-                    program_boundaries.append(event)
-                elif "Content Marker" in type_name:
-                    content_markers.append(event)
-                else:
-                    other_events.append(event)
+            completed = engine.feed(event)
+            if save_index:
+                indexed_intervals.extend(
+                    item for item in completed if isinstance(item, Interval)
+                )
+
+            # Get event type
+            event_type = event.get("segmentation_type_name", event["message_type"])
+
+            # Create row
+            row_data = [
+                f"[{event['category_color']}]{event['category']}[/]",
+                f"[{event['event_color']}]{event_type}[/]",
+            ]
+
+            if show_utc_column:
+                row_data.append(event.get("utc_time", ""))
+
+            row_data.extend(
+                [
+                    event["timecode"],
+                    str(event["frame"]),
+                    event.get("event_id_hex", "N/A"),
+                ]
+            )
+            yield row_data
+
+    def analyze(events: Iterable[Dict[str, Any]]) -> None:
+        print_table_pages(
+            analysis_rows(events),
+            lambda title: _analysis_table(show_utc_column, title),
+            "SCTE-104 Events Analysis",
+        )
+
+    # Adjust pts_time and recalculate timecode if MXF start_timecode is present
+    # This ensures event timecodes are relative to the MXF's embedded start timecode
+    logging.info(
+        f"Adjusting event timestamps by MXF start timecode offset: {start_timecode_offset_seconds:.3f}s"
+    )
+
+    def adjust_events(new_events: List[Dict[str, Any]]) -> None:
+        # Add UTC time if requested, or to index segments by UTC time
+        apply_clip_timing(
+            new_events, clip_timing, framerate, add_utc=bool(show_utc or save_index)
+        )
+
+    # Events arrive in frame order and are analyzed while they are extracted.
+    # With a memory limit they are sorted in temporary files first instead.
+    sorter = None
+    if args.max_memory is not None:
+        sorter = ExternalSorter(
+            key=lambda e: e["frame"], memory_limit=int(args.max_memory * 1024 * 1024)
+        )
+
+    # Extract and analyze SCTE-104 events
+    try:
+        checkpoint = open_checkpoint(
+            input_file,
+            args.resume,
+            framerate=framerate,
+            frame_offset=frame_offset,
+            use_pts_time=use_pts_time,
+            start=start,
+            end=end,
+        )
+        extract_scte104_events(
+            input_file,
+            framerate,
+            frame_offset,
+            sorter is not None,
+            use_pts_time,
+            start=start,
+            end=end,
+            finish=adjust_events,
+            sinks=[sorter.extend if sorter is not None else analyze],
+            keep_events=False,
+            checkpoint=checkpoint,
+        )
+        if sorter is not None:
+            with sorter:
+                if sorter.spilled_runs:
+                    logging.info(f"Sorted {sorter.count} events in temporary files")
+                analyze(sorter.sorted_items())
+
+    except Exception as e:
+        if sorter is not None:
+            sorter.close()
+        console.print(f"[bold red]Error extracting SCTE-104 data:[/] {e}")
+        sys.exit(1)
+
+    summary = engine.finish()
+    if not summary.event_count:
+        console.print("[yellow]No SCTE-104 events found in the MXF file[/]")
+        return
+
+    # Display segment and break durations, and their totals
+    print_duration_table(summary, framerate, show_utc=show_utc_column)
+    print_analysis_summary(summary, framerate)
+
+    if save_index:
+        index = IntervalIndex.from_intervals(
+            indexed_intervals, str(input_file), framerate
+        )
+        index.save(Path(save_index))
+        console.print(
+            f"[green]Saved index of {len(index)} segments to [bold]{save_index}[/][/]"
+        )
+
+
+def _analysis_table(show_utc: bool, title: Optional[str]) -> Table:
+    """Create an empty table of classified SCTE-104 events.
+
+    Args:
+        show_utc: Whether to add the UTC time column
+        title: Title of the table, None for continuation pages
+
+    Returns:
+        Table with the analysis columns
+    """
+    table = Table(
+        title=title,
+        box=box.ROUNDED,
+        header_style="bold white on blue",
+        border_style="blue",
+        min_width=100,
+    )
+
+    # Add columns
+    table.add_column("CATEGORY", style="bright_white", no_wrap=True)
+    table.add_column("EVENT TYPE", style="bright_white")
+    if show_utc:
+        table.add_column("UTC TIME", style="bright_magenta", no_wrap=True)
+    table.add_column("TIMECODE", style="bright_cyan", no_wrap=True)
+    table.add_column("FRAME", justify="right", style="bright_white")
+    table.add_column("EVENT ID", no_wrap=True, style="bright_white")
+    return table
+
+
+def print_duration_table(
+    summary: AnalysisSummary, framerate: float, show_utc: bool = False
+) -> None:
+    """Print the segments and breaks found by the analysis engine.
+
+    Args:
+        summary: Result of the analysis
+        framerate: Frame rate used for durations in seconds
+        show_utc: Whether to add the UTC start time of every interval
+    """
+    if not summary.intervals:
+        return
+
+    duration_table = Table(
+        title="Segment Durations",
+        box=box.ROUNDED,
+        header_style="bold black on bright_cyan",
+        border_style="bright_cyan",
+    )
+
+    duration_table.add_column("SEGMENT", justify="right", style="bright_white")
+    duration_table.add_column("TYPE", style="bright_white")
+    duration_table.add_column("EVENT ID", no_wrap=True, style="bright_white")
+    if show_utc:
+        duration_table.add_column("START UTC", style="bright_magenta", no_wrap=True)
+    duration_table.add_column("START", style="bright_green")
+    duration_table.add_column("END", style="bright_red")
+    duration_table.add_column("DURATION", style="bright_cyan", justify="right")
+    duration_table.add_column("FRAMES", justify="right", style="bright_white")
+
+    intervals = sorted(summary.intervals, key=lambda i: i.start_frame)
+    for i, interval in enumerate(intervals):
+        seconds = interval.frames / framerate
+        minutes = seconds / 60
+
+        duration_str = f"{minutes:.2f} min ({seconds:.2f} sec)"
+        event_id = (
+            f"0x{interval.event_id:08x}" if interval.event_id is not None else "N/A"
+        )
+
+        row_data = [str(i + 1), f"{interval.kind} ({interval.role})", event_id]
+        if show_utc:
+            row_data.append(interval.start_utc or "")
+        row_data.extend(
+            [
+                interval.start_timecode,
+                interval.end_timecode,
+                duration_str,
+                str(interval.frames),
+            ]
+        )
+        duration_table.add_row(*row_data)
+
+    console.print()
+    console.print(duration_table)
+
+
+def print_analysis_summary(summary: AnalysisSummary, framerate: float) -> None:
+    """Print the totals of segments, breaks and gaps of an analysis.
+
+    Args:
+        summary: Result of the analysis
+        framerate: Frame rate used for durations in seconds
+    """
+    summary_table = Table(
+        box=box.MINIMAL, show_header=False, padding=(0, 1), show_edge=False
+    )
+    summary_table.add_column(style="dim italic", justify="right")
+    summary_table.add_column()
+
+    summary_table.add_row("Events:", f"[bright_white]{summary.event_count}[/]")
+    for label, durations in (
+        ("Segments:", summary.segments),
+        ("Breaks:", summary.breaks),
+        ("Gaps:", summary.gaps),
+    ):
+        total_seconds = durations.total_frames / framerate
+        summary_table.add_row(
+            label,
+            f"[bright_white]{durations.count}[/] totalling "
+            f"{total_seconds / 60:.2f} min ({durations.total_frames} frames)",
+        )
+
+    if summary.unmatched_ends:
+        summary_table.add_row("Unmatched ends:", f"[yellow]{summary.unmatched_ends}[/]")
+    if summary.out_of_order:
+        summary_table.add_row("Out of order:", f"[yellow]{summary.out_of_order}[/]")
+    if summary.open_at_end:
+        summary_table.add_row(
+            "Still open:",
+            ", ".join(
+                f"[yellow]{kind}[/] at frame {frame}"
+                for kind, _, frame in summary.open_at_end[:10]
+            ),
+        )
+
+    console.print()
+    console.print(
+        Panel(
+            summary_table,
+            title="[bold blue]Analysis Summary[/]",
+            border_style="blue",
+            expand=False,
+        )
+    )
+
+
+def ingest_file(
+    catalog: EventCatalog,
+    input_file: str,
+    framerate: float = 25.0,
+    frame_offset: int = 0,
+    force: bool = False,
+    show_progress: bool = True,
+    resume: bool = False,
+) -> Optional[int]:
+    """Decode the SCTE-104 events of an MXF file into the catalog.
+
+    The decoding is checkpointed, and the checkpoint is removed once the
+    events are in the catalog. An interrupted file is decoded again from the
+    start unless resume is set.
+
+    Args:
+        catalog: Catalog to add the events to
+        input_file: Path to the MXF file
+        framerate: Frame rate used when the MXF metadata has none
+        frame_offset: Optional frame offset to adjust timecodes
+        force: Whether to decode the file again if it was ingested before
+        show_progress: Whether to show a progress spinner
+        resume: Whether to continue from the checkpoint of an interrupted run
+
+    Returns:
+        Number of events added, or None if the file was already ingested
+    """
+    fingerprint = file_fingerprint(input_file)
+    if not force and catalog.has_fingerprint(fingerprint):
+        return None
+
+    mxf_info = get_mxf_timecode_info(input_file)
+    if mxf_info and "framerate" in mxf_info:
+        framerate = mxf_info["framerate"]
+    clip_timing = ClipTiming.from_timecode_info(mxf_info, framerate)
+    checkpoint = open_checkpoint(
+        input_file,
+        resume,
+        framerate=framerate,
+        frame_offset=frame_offset,
+        use_pts_time=True,
+        include_payload=True,
+    )
+
+    # The catalog inserts events while the file is still being read and parsed
+    batches = iter_scte104_events(
+        input_file,
+        framerate,
+        frame_offset,
+        use_pts_time=True,
+        include_payload=True,
+        finish=lambda events: apply_clip_timing(
+            events, clip_timing, framerate, add_utc=True
+        ),
+        checkpoint=checkpoint,
+    )
+    progress = Progress(
+        SpinnerColumn(),
+        TextColumn(f"[bold blue]Ingesting {Path(input_file).name}..."),
+        TimeElapsedColumn(),
+        console=console,
+        transient=True,
+        disable=not show_progress,
+    )
+
+    try:
+        with progress:
+            progress.add_task("Ingesting", total=None)
+            count = catalog.ingest(
+                input_file,
+                fingerprint,
+                (event for events in batches for event in events),
+                framerate=framerate,
+                creation_time=clip_timing.creation_time,
+                replace=force,
+            )
+    finally:
+        batches.close()
+
+    if checkpoint is not None:
+        checkpoint.remove()
+    return count
+
+
+def ingest_command(args: argparse.Namespace) -> None:
+    """Execute the ingest command, adding MXF files to the event catalog.
+
+    Args:
+        args: Command line arguments
+    """
+    missing = [f for f in args.input_files if not Path(f).exists()]
+    if missing:
+        console.print(f"[bold red]Error:[/] Input file '{missing[0]}' does not exist")
+        sys.exit(1)
+
+    table = Table(
+        title=f"Ingested into {args.catalog}",
+        box=box.ROUNDED,
+        header_style="bold white on blue",
+        border_style="blue",
+    )
+    table.add_column("FILE", style="bright_white")
+    table.add_column("STATUS")
+    table.add_column("EVENTS", justify="right", style="bright_white")
+
+    failures = 0
+    with EventCatalog(args.catalog) as catalog:
+        for input_file in args.input_files:
+            try:
+                count = ingest_file(
+                    catalog,
+                    input_file,
+                    args.framerate,
+                    args.frame_offset,
+                    force=args.force,
+                    resume=args.resume,
+                )
+            except Exception as e:
+                logging.error(f"Failed to ingest {input_file}: {e}")
+                table.add_row(Path(input_file).name, "[red]failed[/]", "")
+                failures += 1
+                continue
+
+            if count is None:
+                table.add_row(Path(input_file).name, "[dim]already ingested[/]", "")
             else:
-                other_events.append(event)
+                table.add_row(Path(input_file).name, "[green]ingested[/]", str(count))
+
+    console.print(table)
+    if failures:
+        sys.exit(1)
+
+
+def decoded_timeline_events(
+    input_file: str, clip_timing: ClipTiming, frame_offset: int = 0
+) -> Generator[Dict[str, Any], None, None]:
+    """Decode the events of a file for the timeline, with their UTC times.
+
+    Args:
+        input_file: Path to the MXF file
+        clip_timing: Timing of the clip, with the UTC time of its first frame
+        frame_offset: Optional frame offset to adjust timecodes
+
+    Yields:
+        Events in frame order
+    """
+    framerate = clip_timing.framerate
+    batches = iter_scte104_events(
+        input_file,
+        framerate,
+        frame_offset,
+        use_pts_time=True,
+        finish=lambda events: apply_clip_timing(
+            events, clip_timing, framerate, add_utc=True
+        ),
+    )
+    try:
+        for events in batches:
+            yield from events
+    finally:
+        batches.close()
+
+
+def cataloged_timeline_events(
+    catalog: EventCatalog, fingerprint: str
+) -> Generator[Dict[str, Any], None, None]:
+    """Read the events of an ingested file for the timeline.
+
+    Args:
+        catalog: Catalog holding the file
+        fingerprint: Fingerprint of the file
+
+    Yields:
+        Events in frame order
+    """
+    for event in catalog.file_events(fingerprint):
+        if event["event_id"] is not None:
+            event["event_id_hex"] = f"0x{event['event_id']:08x}"
+        yield event
+
+
+def timeline_command(args: argparse.Namespace) -> None:
+    """Execute the timeline command, analyzing consecutive files as one timeline.
+
+    Args:
+        args: Command line arguments
+    """
+    missing = [f for f in args.input_files if not Path(f).exists()]
+    if missing:
+        console.print(f"[bold red]Error:[/] Input file '{missing[0]}' does not exist")
+        sys.exit(1)
+    if args.catalog and not Path(args.catalog).exists():
+        console.print(f"[bold red]Error:[/] Catalog '{args.catalog}' does not exist")
+        sys.exit(1)
+
+    # Only the metadata of every file is read up front, the events are streamed
+    timings = []
+    for input_file in args.input_files:
+        mxf_info = get_mxf_timecode_info(input_file)
+        framerate = args.framerate
+        if mxf_info and "framerate" in mxf_info:
+            framerate = mxf_info["framerate"]
+        timings.append(ClipTiming.from_timecode_info(mxf_info, framerate))
+
+    try:
+        starts = resolve_clip_starts(timings)
+    except ValueError as e:
+        console.print(f"[bold red]Error:[/] {e}, cannot place them in UTC")
+        sys.exit(1)
+    framerate = timings[0].framerate
+
+    catalog = EventCatalog(args.catalog) if args.catalog else None
+    sources = []
+    origins = {}
+    for input_file, timing, start in zip(args.input_files, timings, starts):
+        fingerprint = file_fingerprint(input_file) if catalog else None
+        if catalog and catalog.has_fingerprint(fingerprint) and timing.creation_time:
+            events = cataloged_timeline_events(catalog, fingerprint)
+            origins[input_file] = "catalog"
+        else:
+            events = decoded_timeline_events(
+                input_file,
+                dataclasses.replace(timing, creation_time=start),
+                args.frame_offset,
+            )
+            origins[input_file] = "decoded"
+        sources.append(TimelineSource(input_file, start, events))
+
+    # Pair and summarize the merged events in a single pass, printing the
+    # events in pages as they are merged
+    engine = AnalysisEngine(framerate)
+    stats = TimelineStats()
+
+    def timeline_rows() -> Generator[List[str], None, None]:
+        for event in merge_timeline(sources, framerate, stats=stats):
+            engine.feed(event)
+            if not args.events:
+                continue
+            event_type = event.get("segmentation_type_name") or event["message_type"]
+            yield [
+                f"[{event['category_color']}]{event['category']}[/]",
+                f"[{event['event_color']}]{event_type}[/]",
+                event["utc_time"],
+                event["timecode"],
+                Path(event["file"]).name,
+                event.get("event_id_hex") or "N/A",
+            ]
+
+    try:
+        print_table_pages(timeline_rows(), _timeline_table, "SCTE-104 Timeline")
+    except Exception as e:
+        console.print(f"[bold red]Error building the timeline:[/] {e}")
+        sys.exit(1)
+    finally:
+        if catalog is not None:
+            catalog.close()
+    summary = engine.finish()
+
+    files_table = Table(
+        title=f"Timeline of {len(sources)} files",
+        box=box.ROUNDED,
+        header_style="bold white on blue",
+        border_style="blue",
+    )
+    files_table.add_column("FILE", style="bright_white")
+    files_table.add_column("START UTC", style="bright_magenta", no_wrap=True)
+    files_table.add_column("SOURCE")
+    files_table.add_column("EVENTS", justify="right", style="bright_white")
+    for source in sorted(sources, key=lambda source: source.start):
+        files_table.add_row(
+            Path(source.name).name,
+            pts_to_utc_strings([0.0], source.start)[0],
+            origins[source.name],
+            str(stats.events.get(source.name, 0)),
+        )
+    console.print(files_table)
+    if stats.duplicates:
+        console.print(
+            f"Dropped {stats.duplicates} events found in two overlapping files"
+        )
+
+    print_duration_table(summary, framerate, show_utc=True)
+    print_analysis_summary(summary, framerate)
+
+
+def _timeline_table(title: Optional[str]) -> Table:
+    """Create an empty table of timeline events.
+
+    Args:
+        title: Title of the table, None for continuation pages
+
+    Returns:
+        Table with the timeline columns
+    """
+    table = Table(
+        title=title,
+        box=box.ROUNDED,
+        header_style="bold white on blue",
+        border_style="blue",
+        min_width=100,
+    )
+    table.add_column("CATEGORY", style="bright_white", no_wrap=True)
+    table.add_column("EVENT TYPE", style="bright_white")
+    table.add_column("UTC TIME", style="bright_magenta", no_wrap=True)
+    table.add_column("TIMECODE", style="bright_cyan", no_wrap=True)
+    table.add_column("FILE", style="bright_white")
+    table.add_column("EVENT ID", no_wrap=True, style="bright_white")
+    return table
+
+
+def file_cue_events(
+    input_file: str,
+    framerate: float = 25.0,
+    frame_offset: int = 0,
+    catalog_path: Optional[str] = None,
+    include_payload: bool = False,
+) -> Tuple[List[Dict[str, Any]], str, float]:
+    """Get the cue events of a file, from the catalog if it was ingested.
+
+    Keep-alives are dropped while the file is decoded, so only the cues are
+    kept in memory.
+
+    Args:
+        input_file: Path to the MXF file
+        framerate: Frame rate used when the MXF metadata has none
+        frame_offset: Optional frame offset to adjust timecodes
+        catalog_path: Event catalog to look the file up in
+        include_payload: Whether to add the raw message data to every event
+
+    Returns:
+        Cue events in frame order, "catalog" or "decoded", and the frame rate
+    """
+    mxf_info = get_mxf_timecode_info(input_file)
+    if mxf_info and "framerate" in mxf_info:
+        framerate = mxf_info["framerate"]
+
+    if catalog_path:
+        # SQLite connections cannot be shared between threads
+        with EventCatalog(catalog_path) as catalog:
+            fingerprint = file_fingerprint(input_file)
+            if catalog.has_fingerprint(fingerprint):
+                events = [
+                    event
+                    for event in cataloged_timeline_events(catalog, fingerprint)
+                    if is_cue_event(event)
+                ]
+                return events, "catalog", framerate
+
+    clip_timing = ClipTiming.from_timecode_info(mxf_info, framerate)
+    batches = iter_scte104_events(
+        input_file,
+        framerate,
+        frame_offset,
+        use_pts_time=True,
+        include_payload=include_payload,
+        finish=lambda events: apply_clip_timing(
+            events, clip_timing, framerate, add_utc=True
+        ),
+    )
+    try:
+        events = [event for batch in batches for event in batch if is_cue_event(event)]
+    finally:
+        batches.close()
+    return events, "decoded", framerate
+
+
+def diff_command(args: argparse.Namespace) -> None:
+    """Execute the diff command, comparing the cues of two recordings.
+
+    Exits with status 1 when the recordings differ, like diff(1).
+
+    Args:
+        args: Command line arguments
+    """
+    input_files = [args.first_file, args.second_file]
+    missing = [f for f in input_files if not Path(f).exists()]
+    if missing:
+        console.print(f"[bold red]Error:[/] Input file '{missing[0]}' does not exist")
+        sys.exit(1)
+    if args.catalog and not Path(args.catalog).exists():
+        console.print(f"[bold red]Error:[/] Catalog '{args.catalog}' does not exist")
+        sys.exit(1)
+    if args.tolerance < 0:
+        console.print("[bold red]Error:[/] --tolerance must not be negative")
+        sys.exit(1)
+
+    with Progress(
+        SpinnerColumn(),
+        TextColumn("[bold blue]Extracting SCTE-104 events of both files..."),
+        TimeElapsedColumn(),
+        console=console,
+        transient=True,
+    ) as progress:
+        progress.add_task("Extracting", total=None)
+
+        # Workers mostly wait for ffprobe, so threads decode both files at once
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            futures = [
+                executor.submit(
+                    file_cue_events,
+                    input_file,
+                    args.framerate,
+                    args.frame_offset,
+                    args.catalog,
+                )
+                for input_file in input_files
+            ]
+            try:
+                sides = [future.result() for future in futures]
+            except Exception as e:
+                console.print(f"[bold red]Error extracting events:[/] {e}")
+                sys.exit(1)
+
+    (first_events, first_origin, framerate), (second_events, second_origin, _) = sides
+    position = utc_position(framerate) if args.utc else timecode_position(framerate)
+    stats = DiffStats()
+    diffs = sorted(
+        diff_events(first_events, second_events, position, args.tolerance, stats),
+        key=lambda diff: diff.frame,
+    )
+    if stats.unplaced:
+        console.print(
+            f"[yellow]Skipped {stats.unplaced} events without a "
+            f"{'UTC time' if args.utc else 'timecode'}[/]"
+        )
+
+    shown = [diff for diff in diffs if args.all or diff.status != STATUS_MATCHED]
+    if args.format == "json":
+        records = []
+        for diff in shown:
+            event = diff.first or diff.second
+            records.append(
+                {
+                    "status": diff.status,
+                    "event_id": event.get("event_id"),
+                    "segmentation_type_id": event.get("segmentation_type_id"),
+                    "event_type": event.get("segmentation_type_name")
+                    or event["message_type"],
+                    "first_timecode": diff.first and diff.first["timecode"],
+                    "second_timecode": diff.second and diff.second["timecode"],
+                    "first_utc_time": diff.first and diff.first.get("utc_time"),
+                    "second_utc_time": diff.second and diff.second.get("utc_time"),
+                    "delta_frames": diff.delta,
+                }
+            )
+        json_output = json.dumps(
+            {
+                "first_file": args.first_file,
+                "second_file": args.second_file,
+                "tolerance_frames": args.tolerance,
+                "counts": stats.statuses,
+                "events": records,
+            },
+            indent=2,
+        )
+        if args.output:
+            with open(args.output, "w") as f:
+                f.write(json_output)
+            console.print(f"[green]Diff written to {args.output}[/]")
+        else:
+            print(json_output)
+    else:
+        status_styles = {
+            STATUS_MATCHED: "green",
+            STATUS_SHIFTED: "yellow",
+            STATUS_MISSING: "red",
+            STATUS_EXTRA: "magenta",
+        }
+        table = Table(
+            title=(
+                f"SCTE-104 DIFF  A: {Path(args.first_file).name} ({first_origin})  "
+                f"B: {Path(args.second_file).name} ({second_origin})"
+            ),
+            box=box.ROUNDED,
+            header_style="bold white on blue",
+            border_style="blue",
+        )
+        table.add_column("STATUS")
+        table.add_column("EVENT TYPE", style="bright_white")
+        table.add_column("EVENT ID", no_wrap=True, style="bright_white")
+        table.add_column("TIMECODE A", style="bright_cyan", no_wrap=True)
+        table.add_column("TIMECODE B", style="bright_cyan", no_wrap=True)
+        table.add_column("DELTA", justify="right", no_wrap=True)
+
+        for diff in shown:
+            event = diff.first or diff.second
+            event_type = event.get("segmentation_type_name") or event["message_type"]
+            delta = diff.delta
+            table.add_row(
+                f"[{status_styles[diff.status]}]{diff.status}[/]",
+                f"[{get_event_color(event_type)}]{event_type}[/]",
+                event.get("event_id_hex") or "N/A",
+                diff.first["timecode"] if diff.first else "",
+                diff.second["timecode"] if diff.second else "",
+                "" if delta is None else f"{delta:+d}",
+            )
+
+        if table.row_count:
+            console.print(table)
+        counts = ", ".join(
+            f"{count} {status}" for status, count in stats.statuses.items()
+        )
+        if stats.differences:
+            console.print(f"[bold yellow]The recordings differ:[/] {counts}")
+        else:
+            console.print(
+                f"[bold green]The recordings carry the same cues:[/] {counts}"
+            )
+
+    if stats.differences:
+        sys.exit(1)
+
+
+def morpheus_log_events(
+    log_files: Sequence[str],
+    log_timezone: datetime.tzinfo,
+    device: str = DEFAULT_DEVICE,
+    keyword: str = DEFAULT_KEYWORD,
+    framerate: float = 25.0,
+) -> Generator[Dict[str, Any], None, None]:
+    """Decode the SCTE-104 messages sent by automation, with their UTC send times.
+
+    The logged messages are decoded like messages found in an MXF file, on
+    the worker processes that parse the logs, so their events have the same
+    fields and join keys.
+
+    Args:
+        log_files: Paths to Morpheus KernelDiags logs
+        log_timezone: Time zone of the log timestamps
+        device: Only lines of devices whose name contains this text
+        keyword: Only lines containing this command
+        framerate: Frame rate of the frame numbers in the log timestamps
+
+    Yields:
+        Cue events in log order, with "utc_time", "log_file" and "log_line"
+    """
+    for log_file in log_files:
+        messages = iter_kerneldiag_messages(
+            log_file, device, keyword, framerate, decode=decode_scte104
+        )
+        for message in messages:
+            scte104_msg = message.decoded
+            if scte104_msg is None:
+                continue
+
+            sent_utc = (
+                message.timestamp.replace(tzinfo=log_timezone)
+                .astimezone(datetime.timezone.utc)
+                .replace(tzinfo=None)
+            )
+            utc_time = pts_to_utc_strings([0.0], sent_utc)[0]
+            for event in _process_scte104_message(
+                0, 0.0, scte104_msg, framerate, include_payload=True
+            ):
+                if not is_cue_event(event):
+                    continue
+                event["payload"] = message.vanc_payload()
+                event["utc_time"] = utc_time
+                event["log_file"] = log_file
+                event["log_line"] = message.line_number
+                yield event
+
+
+def correlate_command(args: argparse.Namespace) -> None:
+    """Execute the correlate command, joining automation logs with MXF files.
+
+    Args:
+        args: Command line arguments
+    """
+    missing = [f for f in args.logs + args.input_files if not Path(f).exists()]
+    if missing:
+        console.print(f"[bold red]Error:[/] Input file '{missing[0]}' does not exist")
+        sys.exit(1)
+    if args.catalog and not Path(args.catalog).exists():
+        console.print(f"[bold red]Error:[/] Catalog '{args.catalog}' does not exist")
+        sys.exit(1)
+    try:
+        log_timezone = zoneinfo.ZoneInfo(args.log_timezone)
+    except (zoneinfo.ZoneInfoNotFoundError, ValueError):
+        console.print(f"[bold red]Error:[/] Unknown time zone '{args.log_timezone}'")
+        sys.exit(1)
+
+    framerate = args.framerate
+    position = utc_position(framerate)
+    stats = CorrelationStats()
+    failures = 0
+
+    # The files are decoded while the logs are read and sorted
+    executor = ThreadPoolExecutor(max_workers=max(1, args.jobs))
+    futures = {
+        executor.submit(
+            file_cue_events,
+            input_file,
+            framerate,
+            args.frame_offset,
+            args.catalog,
+            include_payload=True,
+        ): input_file
+        for input_file in args.input_files
+    }
+
+    def received_events() -> Generator[Dict[str, Any], None, None]:
+        nonlocal failures
+        for future in as_completed(futures):
+            input_file = futures[future]
+            try:
+                events, _, _ = future.result()
+            except Exception as e:
+                logging.error(f"Failed to extract {input_file}: {e}")
+                failures += 1
+                continue
+            for event in events:
+                event["file"] = input_file
+                yield event
+
+    sent = morpheus_log_events(
+        args.logs, log_timezone, args.device, args.keyword, framerate
+    )
+    memory_limit = (
+        int(args.max_memory * 1024 * 1024) if args.max_memory else DEFAULT_MEMORY_LIMIT
+    )
+
+    records = []
+    try:
+        with Progress(
+            SpinnerColumn(),
+            TextColumn("[bold blue]Correlating logs and MXF files..."),
+            TimeElapsedColumn(),
+            console=console,
+            transient=True,
+        ) as progress:
+            progress.add_task("Correlating", total=None)
+            for correlation in correlate_events(
+                sent,
+                received_events(),
+                join_key(args.join),
+                position,
+                round(args.max_latency * framerate),
+                memory_limit,
+                stats,
+            ):
+                event = correlation.sent or correlation.received
+                latency = correlation.latency
+                records.append(
+                    {
+                        "frame": (
+                            correlation.sent_frame
+                            if correlation.sent_frame is not None
+                            else correlation.received_frame
+                        ),
+                        "event_type": event.get("segmentation_type_name")
+                        or event["message_type"],
+                        "event_id": event.get("event_id"),
+                        "sent_utc_time": correlation.sent
+                        and correlation.sent["utc_time"],
+                        "file_utc_time": correlation.received
+                        and correlation.received["utc_time"],
+                        "file": correlation.received and correlation.received["file"],
+                        "file_timecode": correlation.received
+                        and correlation.received["timecode"],
+                        "log_line": correlation.sent and correlation.sent["log_line"],
+                        "latency_frames": latency,
+                        "latency_ms": (
+                            None
+                            if latency is None
+                            else round(latency * 1000 / framerate)
+                        ),
+                    }
+                )
+    finally:
+        for future in futures:
+            future.cancel()
+        executor.shutdown()
+
+    records.sort(key=lambda record: record["frame"])
+    percentiles = stats.percentiles(args.percentiles)
+    if stats.unplaced:
+        console.print(
+            f"[yellow]Skipped {stats.unplaced} events without a UTC time or join key[/]"
+        )
+
+    if args.format == "json":
+        for record in records:
+            del record["frame"]
+        json_output = json.dumps(
+            {
+                "paired": stats.paired,
+                "not_in_files": stats.not_received,
+                "not_in_logs": stats.not_sent,
+                "repeats": stats.repeats,
+                "latency_percentiles_ms": {
+                    f"p{percentile:g}": round(frames * 1000 / framerate)
+                    for percentile, frames in percentiles.items()
+                },
+                "messages": records,
+            },
+            indent=2,
+        )
+        if args.output:
+            with open(args.output, "w") as f:
+                f.write(json_output)
+            console.print(f"[green]Correlation written to {args.output}[/]")
+        else:
+            print(json_output)
+    else:
+        table = Table(
+            title="SCTE-104 AUTOMATION TO FILE LATENCY",
+            box=box.ROUNDED,
+            header_style="bold white on blue",
+            border_style="blue",
+        )
+        table.add_column("EVENT TYPE", style="bright_white")
+        table.add_column("EVENT ID", no_wrap=True, style="bright_white")
+        table.add_column("SENT UTC", style="bright_magenta", no_wrap=True)
+        table.add_column("FILE UTC", style="bright_magenta", no_wrap=True)
+        table.add_column("FILE", style="bright_white")
+        table.add_column("LATENCY", justify="right", no_wrap=True)
+
+        for record in records:
+            if record["latency_frames"] is None:
+                latency = (
+                    "[red]not in files[/]"
+                    if record["sent_utc_time"]
+                    else "[yellow]not in logs[/]"
+                )
+            else:
+                latency = f"{record['latency_frames']} fr / {record['latency_ms']} ms"
+            event_id = record["event_id"]
+            table.add_row(
+                f"[{get_event_color(record['event_type'])}]{record['event_type']}[/]",
+                "N/A" if event_id is None else f"0x{event_id:08x}",
+                record["sent_utc_time"] or "",
+                record["file_utc_time"] or "",
+                Path(record["file"]).name if record["file"] else "",
+                latency,
+            )
+        if table.row_count:
+            console.print(table)
+
+        summary_table = Table(
+            box=box.MINIMAL, show_header=False, padding=(0, 1), show_edge=False
+        )
+        summary_table.add_column(style="dim italic", justify="right")
+        summary_table.add_column()
+        summary_table.add_row("Paired:", f"[bright_white]{stats.paired}[/]")
+        summary_table.add_row("Not in files:", f"[red]{stats.not_received}[/]")
+        summary_table.add_row("Not in logs:", f"[yellow]{stats.not_sent}[/]")
+        if stats.repeats:
+            summary_table.add_row("Repeated in files:", str(stats.repeats))
+        for percentile, frames in percentiles.items():
+            summary_table.add_row(
+                f"Latency p{percentile:g}:",
+                f"[bright_white]{round(frames * 1000 / framerate)} ms[/] "
+                f"({frames} frames)",
+            )
+
+        console.print()
+        console.print(
+            Panel(
+                summary_table,
+                title="[bold blue]Correlation Summary[/]",
+                border_style="blue",
+                expand=False,
+            )
+        )
+
+    if failures:
+        sys.exit(1)
+
+
+def triage_windows(
+    duration: Optional[float], window: float, interval: float
+) -> List[Tuple[float, float]]:
+    """Spread the sample windows of a triage over a file.
+
+    Args:
+        duration: Duration of the file in seconds, None if unknown
+        window: Length of every sample window in seconds
+        interval: Seconds between the starts of consecutive windows
+
+    Returns:
+        (start, end) windows in file order
+    """
+    if not duration:
+        return [(0.0, window)]
+
+    windows = []
+    start = 0.0
+    while start < duration:
+        windows.append((start, min(start + window, duration)))
+        start += interval
+    return windows
+
+
+def triage_file(
+    input_file: str,
+    window: float = TRIAGE_WINDOW_SECONDS,
+    interval: float = TRIAGE_INTERVAL_SECONDS,
+    stop_at_any: bool = False,
+) -> Dict[str, Any]:
+    """Sample an MXF file to find out whether it carries SCTE-104 messages.
+
+    The windows are read in file order by ffprobe runs covering 1, 2, 4, ...
+    windows, so a file with messages near its start costs a single short
+    read, and a file without messages costs a few runs. Sampling stops at the
+    first message that is not a keep-alive, or with stop_at_any at the first
+    message of any kind.
 
-        # Create combined table for all events
+    Args:
+        input_file: Path to the MXF file
+        window: Length of every sample window in seconds
+        interval: Seconds between the starts of consecutive windows
+        stop_at_any: Whether a keep-alive message is enough to stop sampling
+
+    Returns:
+        Triage result with the status, the first message and the first cue
+        found, and how much of the file was sampled
+
+    Raises:
+        OSError: If ffprobe cannot be started
+        RuntimeError: If the file metadata cannot be read or ffprobe fails
+        ValueError: If the ffprobe output cannot be parsed
+    """
+    started = time.monotonic()
+
+    mxf_info = get_mxf_timecode_info(input_file)
+    if mxf_info is None:
+        raise RuntimeError(f"Cannot read the metadata of {input_file}")
+    framerate = mxf_info.get("framerate", 25.0)
+    clip_timing = ClipTiming.from_timecode_info(mxf_info, framerate)
+    windows = triage_windows(mxf_info.get("duration_seconds"), window, interval)
+
+    first_hit = None
+    first_cue = None
+    probed = 0
+    batch_size = 1
+    while probed < len(windows) and first_cue is None:
+        batch = windows[probed : probed + batch_size]
+        probed += len(batch)
+        batch_size *= 2
+
+        for _, pts_time, message in sample_scte104_from_mxf(input_file, batch):
+            if first_hit is None:
+                first_hit = pts_time
+            if not is_keep_alive(message):
+                first_cue = pts_time
+                break
+
+        if stop_at_any and first_hit is not None:
+            break
+
+    if first_cue is not None:
+        status = "cues"
+    elif first_hit is None:
+        status = "no SCTE-104"
+    elif probed == len(windows):
+        status = "keep-alive only"
+    else:
+        # Stopped at a keep-alive before all windows were sampled
+        status = "SCTE-104"
+
+    def to_timecode(pts_time: Optional[float]) -> Optional[str]:
+        if pts_time is None:
+            return None
+        return pts_to_timecodes([pts_time + clip_timing.start_seconds], framerate)[0]
+
+    return {
+        "file": input_file,
+        "status": status,
+        "has_scte104": first_hit is not None,
+        "keep_alive_only": {"cues": False, "keep-alive only": True}.get(status),
+        "first_hit_seconds": first_hit,
+        "first_hit_timecode": to_timecode(first_hit),
+        "first_cue_seconds": first_cue,
+        "first_cue_timecode": to_timecode(first_cue),
+        "windows_probed": probed,
+        "windows": len(windows),
+        "elapsed_seconds": round(time.monotonic() - started, 3),
+    }
+
+
+def triage_inputs(paths: List[str]) -> List[str]:
+    """Expand the triage inputs, replacing folders by the MXF files in them.
+
+    Args:
+        paths: MXF files and folders
+
+    Returns:
+        MXF files, folders expanded recursively in sorted order
+    """
+    files = []
+    for path in paths:
+        if Path(path).is_dir():
+            files.extend(
+                sorted(
+                    str(p)
+                    for p in Path(path).rglob("*")
+                    if p.suffix.lower() == ".mxf" and p.is_file()
+                )
+            )
+        else:
+            files.append(path)
+    return files
+
+
+def triage_command(args: argparse.Namespace) -> None:
+    """Execute the triage command, sampling MXF files in parallel.
+
+    Args:
+        args: Command line arguments
+    """
+    input_files = triage_inputs(args.input_files)
+    missing = [f for f in input_files if not Path(f).exists()]
+    if missing:
+        console.print(f"[bold red]Error:[/] Input file '{missing[0]}' does not exist")
+        sys.exit(1)
+    if args.window <= 0 or args.interval < args.window:
+        console.print(
+            "[bold red]Error:[/] --window must be positive and at most --interval"
+        )
+        sys.exit(1)
+
+    results: Dict[str, Dict[str, Any]] = {}
+    with Progress(
+        SpinnerColumn(),
+        TextColumn("[bold blue]Sampling MXF files..."),
+        BarColumn(),
+        TextColumn("{task.completed}/{task.total}"),
+        TimeElapsedColumn(),
+        console=console,
+        transient=True,
+    ) as progress:
+        task = progress.add_task("Sampling", total=len(input_files))
+
+        # Workers mostly wait for ffprobe, so threads run the files in parallel
+        with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as executor:
+            futures = {
+                executor.submit(
+                    triage_file,
+                    input_file,
+                    args.window,
+                    args.interval,
+                    args.stop_at == "any",
+                ): input_file
+                for input_file in input_files
+            }
+            for future in as_completed(futures):
+                input_file = futures[future]
+                try:
+                    results[input_file] = future.result()
+                except Exception as e:
+                    logging.error(f"Failed to triage {input_file}: {e}")
+                    results[input_file] = {
+                        "file": input_file,
+                        "status": "failed",
+                        "error": str(e),
+                    }
+                progress.advance(task)
+
+    ordered = [results[input_file] for input_file in input_files]
+    failures = sum(1 for result in ordered if result["status"] == "failed")
+
+    if args.format == "json":
+        json_output = json.dumps(ordered, indent=2)
+        if args.output:
+            with open(args.output, "w") as f:
+                f.write(json_output)
+            console.print(f"[green]Triage results written to {args.output}[/]")
+        else:
+            print(json_output)
+    else:
+        status_styles = {
+            "cues": "green",
+            "keep-alive only": "yellow",
+            "SCTE-104": "cyan",
+            "no SCTE-104": "dim",
+            "failed": "red",
+        }
         table = Table(
-            title="SCTE-104 Events Analysis",
+            title="SCTE-104 TRIAGE",
             box=box.ROUNDED,
             header_style="bold white on blue",
             border_style="blue",
-            min_width=100,
         )
+        table.add_column("FILE", style="bright_white")
+        table.add_column("STATUS")
+        table.add_column("FIRST HIT", style="bright_cyan", no_wrap=True)
+        table.add_column("FIRST CUE", style="bright_cyan", no_wrap=True)
+        table.add_column("SAMPLED", justify="right")
+        table.add_column("TIME", justify="right")
+
+        for result in ordered:
+            style = status_styles[result["status"]]
+            if result["status"] == "failed":
+                table.add_row(
+                    Path(result["file"]).name, f"[{style}]failed[/]", "", "", "", ""
+                )
+                continue
+            table.add_row(
+                Path(result["file"]).name,
+                f"[{style}]{result['status']}[/]",
+                result["first_hit_timecode"] or "",
+                result["first_cue_timecode"] or "",
+                f"{result['windows_probed']}/{result['windows']}",
+                f"{result['elapsed_seconds']:.2f}s",
+            )
 
-        # Add columns
-        table.add_column("CATEGORY", style="bright_white", no_wrap=True)
-        table.add_column("EVENT TYPE", style="bright_white")
-        if show_utc and any("utc_time" in event for event in events):
-            table.add_column("UTC TIME", style="bright_magenta", no_wrap=True)
-        table.add_column("TIMECODE", style="bright_cyan", no_wrap=True)
-        table.add_column("FRAME", justify="right", style="bright_white")
-        table.add_column("EVENT ID", no_wrap=True, style="bright_white")
+        console.print(table)
 
-        # Add all events in chronological order
-        all_events = []
-        for event in program_boundaries:
-            event_copy = event.copy()
-            event_copy["category"] = "Program Boundary"
-            event_copy["category_color"] = "bright_green"
-            all_events.append(event_copy)
-
-        for event in content_markers:
-            event_copy = event.copy()
-            event_copy["category"] = "Content Marker"
-            event_copy["category_color"] = "bright_yellow"
-            all_events.append(event_copy)
-
-        for event in other_events:
-            event_copy = event.copy()
-            event_copy["category"] = "Other"
-            event_copy["category_color"] = "bright_blue"
-            all_events.append(event_copy)
-
-        # Sort all events by frame number
-        all_events.sort(key=lambda e: e["frame"])
-
-        # Add rows to table
-        for event in all_events:
-            category = event["category"]
-            category_color = event["category_color"]
+    if failures:
+        sys.exit(1)
 
-            # Get event type
-            if "segmentation_type_name" in event:
-                event_type = event["segmentation_type_name"]
-                event_color = get_event_color(event_type)
-            else:
-                event_type = event["message_type"]
-                event_color = "bright_white"
 
-            # Get event ID
-            event_id = event.get("event_id_hex", "N/A")
+def query_catalog(args: argparse.Namespace) -> None:
+    """Execute the query command against an event catalog.
 
-            # Create row
-            row_data = [
-                f"[{category_color}]{category}[/]",
-                f"[{event_color}]{event_type}[/]",
-            ]
+    Args:
+        args: Command line arguments
+    """
+    if not Path(args.catalog).exists():
+        console.print(f"[bold red]Error:[/] Catalog '{args.catalog}' does not exist")
+        sys.exit(1)
 
-            if show_utc and "utc_time" in event:
-                row_data.append(event["utc_time"])
+    segmentation_type = parse_segmentation_type(args.type)
 
-            row_data.extend(
-                [
-                    event["timecode"],
-                    str(event["frame"]),
-                    event_id,
-                ]
+    try:
+        event_id = int(args.event_id, 0) if args.event_id is not None else None
+        with EventCatalog(args.catalog) as catalog:
+            events = catalog.query(
+                event_id=event_id,
+                upid=args.upid,
+                segmentation_type=segmentation_type,
+                file=args.file,
+                since=args.since,
+                until=args.until,
+                limit=args.limit,
             )
+    except ValueError as e:
+        console.print(f"[bold red]Error:[/] {e}")
+        sys.exit(1)
 
-            table.add_row(*row_data)
+    for event in events:
+        if event["payload"] is not None:
+            event["payload"] = event["payload"].hex()
 
-        # Print the table
-        console.print(table)
+    if args.format == "json":
+        print(json.dumps(events, indent=2))
+        return
 
-        # Calculate and display segment durations
-        if len(program_boundaries) >= 2:
-            # Create segment durations table
-            duration_table = Table(
-                title="Segment Durations",
-                box=box.ROUNDED,
-                header_style="bold black on bright_cyan",
-                border_style="bright_cyan",
+    if not events:
+        console.print("[yellow]No events match the query[/]")
+        return
+
+    table = Table(
+        title=f"{len(events)} catalog events",
+        box=box.ROUNDED,
+        header_style="bold white on blue",
+        border_style="blue",
+    )
+    table.add_column("FILE", style="bright_white")
+    table.add_column("UTC TIME", style="bright_magenta", no_wrap=True)
+    table.add_column("TIMECODE", style="bright_cyan", no_wrap=True)
+    table.add_column("FRAME", justify="right", style="bright_white")
+    table.add_column("EVENT TYPE", style="bright_white")
+    table.add_column("EVENT ID", no_wrap=True, style="bright_white")
+    table.add_column("UPID", style="bright_white")
+
+    for event in events:
+        event_type = event["segmentation_type_name"] or event["message_type"]
+        event_id = (
+            f"0x{event['event_id']:08x}" if event["event_id"] is not None else "N/A"
+        )
+        table.add_row(
+            Path(event["file"]).name,
+            event["utc_time"] or "",
+            event["timecode"] or "",
+            str(event["frame"]),
+            f"[{get_event_color(event_type)}]{event_type}[/]",
+            event_id,
+            event["upid"] or "",
+        )
+
+    console.print(table)
+
+
+def query_command(args: argparse.Namespace) -> None:
+    """Execute the query command, listing the segments active at a time.
+
+    With --catalog the events in an event catalog are searched instead.
+
+    Args:
+        args: Command line arguments
+    """
+    if args.catalog:
+        if args.index_files or args.at or args.range:
+            console.print(
+                "[bold red]Error:[/] --catalog cannot be combined with index files, --at or --range"
             )
+            sys.exit(1)
+        query_catalog(args)
+        return
 
-            duration_table.add_column("SEGMENT", justify="right", style="bright_white")
-            duration_table.add_column("START", style="bright_green")
-            duration_table.add_column("END", style="bright_red")
-            duration_table.add_column("DURATION", style="bright_cyan", justify="right")
-            duration_table.add_column("FRAMES", justify="right", style="bright_white")
-
-            boundaries = sorted(program_boundaries, key=lambda e: e["frame"])
-
-            for i in range(len(boundaries) - 1):
-                start = boundaries[i]
-                end = boundaries[i + 1]
-                frames = end["frame"] - start["frame"]
-                seconds = frames / framerate
-                minutes = seconds / 60
-
-                duration_str = f"{minutes:.2f} min ({seconds:.2f} sec)"
-
-                duration_table.add_row(
-                    str(i + 1),
-                    f"{start['timecode']}",
-                    f"{end['timecode']}",
-                    duration_str,
-                    str(frames),
-                )
+    if not args.index_files or not (args.at or args.range):
+        console.print(
+            "[bold red]Error:[/] Give index files and --at or --range, or --catalog"
+        )
+        sys.exit(1)
 
-            console.print()
-            console.print(duration_table)
-    else:
-        console.print("[yellow]No SCTE-104 events found in the MXF file[/]")
+    indexes = []
+    for index_file in args.index_files:
+        if not Path(index_file).exists():
+            console.print(
+                f"[bold red]Error:[/] Index file '{index_file}' does not exist"
+            )
+            sys.exit(1)
+        try:
+            indexes.append(IntervalIndex.load(Path(index_file)))
+        except (ValueError, KeyError, TypeError) as e:
+            console.print(f"[bold red]Error reading index '{index_file}':[/] {e}")
+            sys.exit(1)
+
+    index = IntervalIndex.merge(indexes)
+
+    try:
+        if args.at:
+            matches = index.at(args.at, args.framerate)
+            description = f"at {args.at}"
+        else:
+            start, end = args.range
+            matches = index.between(start, end, args.framerate)
+            description = f"between {start} and {end}"
+    except ValueError as e:
+        console.print(f"[bold red]Error:[/] {e}")
+        sys.exit(1)
+
+    if args.format == "json":
+        print(json.dumps([match._asdict() for match in matches], indent=2))
+        return
+
+    if not matches:
+        console.print(f"[yellow]No segments active {description}[/]")
+        return
+
+    table = Table(
+        title=f"Segments active {description}",
+        box=box.ROUNDED,
+        header_style="bold white on blue",
+        border_style="blue",
+    )
+    table.add_column("FILE", style="bright_white")
+    table.add_column("TYPE", style="bright_white")
+    table.add_column("EVENT ID", no_wrap=True, style="bright_white")
+    table.add_column("START", style="bright_green", no_wrap=True)
+    table.add_column("END", style="bright_red", no_wrap=True)
+    table.add_column("START UTC", style="bright_magenta", no_wrap=True)
+    table.add_column("END UTC", style="bright_magenta", no_wrap=True)
+
+    for match in matches:
+        event_id = f"0x{match.event_id:08x}" if match.event_id is not None else "N/A"
+        table.add_row(
+            Path(match.file).name,
+            f"{match.kind} ({match.role})",
+            event_id,
+            match.start_timecode,
+            match.end_timecode,
+            match.start_utc or "",
+            match.end_utc or "",
+        )
+
+    console.print(table)
+
+
+def add_resume_argument(parser: argparse.ArgumentParser) -> None:
+    """Add the --resume option that continues an interrupted scan.
+
+    Args:
+        parser: Subcommand parser
+    """
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue from the checkpoint of an interrupted run with the same options",
+    )
+
+
+def add_window_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the --start and --end options that limit reading to part of a file.
+
+    Args:
+        parser: Subcommand parser
+    """
+    parser.add_argument(
+        "--start",
+        metavar="TIME",
+        help="Only read from this time: seconds from the start of the file, "
+        "time of day (HH:MM:SS:FF) or UTC time (ISO 8601)",
+    )
+    parser.add_argument(
+        "--end",
+        metavar="TIME",
+        help="Only read up to this time (exclusive), in the same forms as --start",
+    )
 
 
 def main() -> None:
@@ -797,12 +2622,48 @@ def main() -> None:
         action="store_true",
         help="Show UTC timestamps based on file creation time and PTS values",
     )
+    add_window_arguments(extract_parser)
+    add_resume_argument(extract_parser)
+    extract_parser.add_argument(
+        "--limit",
+        type=int,
+        help="Stop after this many events",
+    )
+    extract_parser.add_argument(
+        "--until",
+        metavar="TYPE",
+        help="Stop after the first event of this segmentation type, "
+        "as ID (0x11) or part of its name (Program End)",
+    )
     extract_parser.add_argument(
         "--format",
         choices=["table", "json"],
         default="table",
         help="Output format (default: table)",
     )
+    extract_parser.add_argument(
+        "--max-memory",
+        type=float,
+        metavar="MIB",
+        help="Keep at most about this many MiB of events in memory, "
+        "sorting the rest in temporary files, for very long recordings",
+    )
+    extract_parser.add_argument(
+        "--follow",
+        action="store_true",
+        help="Keep reading a growing MXF file and print events as they are recorded",
+    )
+    extract_parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=1.0,
+        help="Seconds between reads of new data with --follow (default: 1.0)",
+    )
+    extract_parser.add_argument(
+        "--idle-timeout",
+        type=float,
+        help="Stop following when the file did not grow for this many seconds",
+    )
     extract_parser.set_defaults(func=extract_command)
 
     # Analyze command
@@ -836,8 +2697,334 @@ def main() -> None:
         action="store_true",
         help="Show UTC timestamps based on file creation time and PTS values",
     )
+    analyze_parser.add_argument(
+        "--save-index",
+        metavar="INDEX_FILE",
+        help="Save an index of the segments and breaks for the query command",
+    )
+    analyze_parser.add_argument(
+        "--max-memory",
+        type=float,
+        metavar="MIB",
+        help="Sort the events by frame before analyzing them, keeping at most about "
+        "this many MiB in memory and the rest in temporary files",
+    )
+    add_window_arguments(analyze_parser)
+    add_resume_argument(analyze_parser)
     analyze_parser.set_defaults(func=analyze_command)
 
+    # Query command
+    query_parser = subparsers.add_parser(
+        "query", help="Find the segments active at a time in analyzed files"
+    )
+    query_parser.add_argument(
+        "index_files", nargs="*", help="Index files written by analyze --save-index"
+    )
+    query_time = query_parser.add_mutually_exclusive_group()
+    query_time.add_argument(
+        "--at",
+        metavar="TIME",
+        help="Timecode (HH:MM:SS:FF) or UTC time (ISO 8601) to look up",
+    )
+    query_time.add_argument(
+        "--range",
+        nargs=2,
+        metavar=("START", "END"),
+        help="Find the segments active at any time between START and END",
+    )
+    query_parser.add_argument(
+        "-f",
+        "--framerate",
+        type=float,
+        default=25.0,
+        help="Frame rate used to convert timecodes (default: 25.0)",
+    )
+    query_parser.add_argument(
+        "--format",
+        choices=["table", "json"],
+        default="table",
+        help="Output format (default: table)",
+    )
+    catalog_filters = query_parser.add_argument_group(
+        "catalog filters", "Search the events in a catalog written by ingest"
+    )
+    catalog_filters.add_argument("--catalog", help="Event catalog to search")
+    catalog_filters.add_argument("--event-id", help="Segmentation event ID")
+    catalog_filters.add_argument("--upid", help="Segmentation UPID as hex digits")
+    catalog_filters.add_argument(
+        "--type", help="Segmentation type ID, or part of its name"
+    )
+    catalog_filters.add_argument("--file", help="Part of the file path")
+    catalog_filters.add_argument(
+        "--since", metavar="UTC", help="Earliest UTC time (ISO 8601)"
+    )
+    catalog_filters.add_argument(
+        "--until", metavar="UTC", help="Latest UTC time, exclusive (ISO 8601)"
+    )
+    catalog_filters.add_argument(
+        "--limit", type=int, help="Maximum number of events to show"
+    )
+    query_parser.set_defaults(func=query_command)
+
+    # Ingest command
+    ingest_parser = subparsers.add_parser(
+        "ingest", help="Add the SCTE-104 events of MXF files to an event catalog"
+    )
+    ingest_parser.add_argument("input_files", nargs="+", help="Input MXF files")
+    ingest_parser.add_argument(
+        "-c",
+        "--catalog",
+        default="pyvanc_catalog.db",
+        help="Event catalog to write (default: pyvanc_catalog.db)",
+    )
+    ingest_parser.add_argument(
+        "-f",
+        "--framerate",
+        type=float,
+        default=25.0,
+        help="Frame rate when the MXF metadata has none (default: 25.0)",
+    )
+    ingest_parser.add_argument(
+        "--frame-offset",
+        type=int,
+        default=0,
+        help="Frame offset to adjust timecodes (default: 0)",
+    )
+    ingest_parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Decode files again even if they were ingested before",
+    )
+    add_resume_argument(ingest_parser)
+    ingest_parser.set_defaults(func=ingest_command)
+
+    # Timeline command
+    timeline_parser = subparsers.add_parser(
+        "timeline",
+        help="Analyze consecutive MXF files as one UTC timeline",
+    )
+    timeline_parser.add_argument(
+        "input_files", nargs="+", help="Input MXF files, in recording order"
+    )
+    timeline_parser.add_argument(
+        "-c",
+        "--catalog",
+        help="Event catalog to read the events of ingested files from",
+    )
+    timeline_parser.add_argument(
+        "-f",
+        "--framerate",
+        type=float,
+        default=25.0,
+        help="Frame rate when the MXF metadata has none (default: 25.0)",
+    )
+    timeline_parser.add_argument(
+        "--frame-offset",
+        type=int,
+        default=0,
+        help="Frame offset to adjust timecodes (default: 0)",
+    )
+    timeline_parser.add_argument(
+        "--events",
+        action="store_true",
+        help="Also list every event of the timeline",
+    )
+    timeline_parser.set_defaults(func=timeline_command)
+
+    # Diff command
+    diff_parser = subparsers.add_parser(
+        "diff",
+        help="Compare the SCTE-104 cues of two recordings of the same content",
+    )
+    diff_parser.add_argument("first_file", help="First MXF file, e.g. the main chain")
+    diff_parser.add_argument(
+        "second_file", help="Second MXF file, e.g. the backup chain"
+    )
+    diff_parser.add_argument(
+        "-c",
+        "--catalog",
+        help="Event catalog to read the events of ingested files from",
+    )
+    diff_parser.add_argument(
+        "-f",
+        "--framerate",
+        type=float,
+        default=25.0,
+        help="Frame rate when the MXF metadata has none (default: 25.0)",
+    )
+    diff_parser.add_argument(
+        "--frame-offset",
+        type=int,
+        default=0,
+        help="Frame offset to adjust timecodes (default: 0)",
+    )
+    diff_parser.add_argument(
+        "--tolerance",
+        type=int,
+        default=DEFAULT_TOLERANCE_FRAMES,
+        metavar="FRAMES",
+        help="Maximum frames between the two copies of a cue "
+        f"(default: {DEFAULT_TOLERANCE_FRAMES})",
+    )
+    diff_parser.add_argument(
+        "--utc",
+        action="store_true",
+        help="Align the recordings by UTC time instead of timecode",
+    )
+    diff_parser.add_argument(
+        "--all",
+        action="store_true",
+        help="Also list the cues found at the same frame in both recordings",
+    )
+    diff_parser.add_argument(
+        "--format",
+        choices=["table", "json"],
+        default="table",
+        help="Output format (default: table)",
+    )
+    diff_parser.add_argument("-o", "--output", help="Write the JSON diff to a file")
+    diff_parser.set_defaults(func=diff_command)
+
+    # Correlate command
+    correlate_parser = subparsers.add_parser(
+        "correlate",
+        help="Measure the latency from Morpheus automation logs to MXF files",
+    )
+    correlate_parser.add_argument(
+        "input_files", nargs="+", help="MXF files the messages ended up in"
+    )
+    correlate_parser.add_argument(
+        "-l",
+        "--log",
+        dest="logs",
+        action="append",
+        required=True,
+        metavar="LOG",
+        help="Morpheus KernelDiags log, can be given several times",
+    )
+    correlate_parser.add_argument(
+        "--log-timezone",
+        default="UTC",
+        metavar="ZONE",
+        help="Time zone of the log timestamps, e.g. Europe/Brussels (default: UTC)",
+    )
+    correlate_parser.add_argument(
+        "--device",
+        default=DEFAULT_DEVICE,
+        help=f"Only log lines of devices containing this text (default: {DEFAULT_DEVICE})",
+    )
+    correlate_parser.add_argument(
+        "--keyword",
+        default=DEFAULT_KEYWORD,
+        help=f"Only log lines with this command (default: {DEFAULT_KEYWORD})",
+    )
+    correlate_parser.add_argument(
+        "--join",
+        choices=[JOIN_EVENT_ID, JOIN_PAYLOAD],
+        default=JOIN_EVENT_ID,
+        help="Join messages by segmentation event ID and type, or by a hash "
+        f"of their payload (default: {JOIN_EVENT_ID})",
+    )
+    correlate_parser.add_argument(
+        "--max-latency",
+        type=float,
+        default=10.0,
+        metavar="SECONDS",
+        help="Maximum seconds between sending a message and its frame in a file "
+        "(default: 10)",
+    )
+    correlate_parser.add_argument(
+        "--percentiles",
+        type=float,
+        nargs="+",
+        default=list(DEFAULT_PERCENTILES),
+        help="Latency percentiles to report (default: 50 90 95 99)",
+    )
+    correlate_parser.add_argument(
+        "-c",
+        "--catalog",
+        help="Event catalog to read the events of ingested files from",
+    )
+    correlate_parser.add_argument(
+        "-f",
+        "--framerate",
+        type=float,
+        default=25.0,
+        help="Frame rate of the log timestamps and the files (default: 25.0)",
+    )
+    correlate_parser.add_argument(
+        "--frame-offset",
+        type=int,
+        default=0,
+        help="Frame offset to adjust timecodes (default: 0)",
+    )
+    correlate_parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=min(8, os.cpu_count() or 1),
+        help="Number of MXF files extracted in parallel (default: CPU count, at most 8)",
+    )
+    correlate_parser.add_argument(
+        "--max-memory",
+        type=float,
+        metavar="MIB",
+        help="MiB of messages each side sorts in memory before using temporary files "
+        "(default: 64)",
+    )
+    correlate_parser.add_argument(
+        "--format",
+        choices=["table", "json"],
+        default="table",
+        help="Output format (default: table)",
+    )
+    correlate_parser.add_argument(
+        "-o", "--output", help="Write the JSON correlation to a file"
+    )
+    correlate_parser.set_defaults(func=correlate_command)
+
+    # Triage command
+    triage_parser = subparsers.add_parser(
+        "triage", help="Quickly find out which MXF files carry SCTE-104 messages"
+    )
+    triage_parser.add_argument(
+        "input_files", nargs="+", help="Input MXF files, or folders to search for them"
+    )
+    triage_parser.add_argument(
+        "--window",
+        type=float,
+        default=TRIAGE_WINDOW_SECONDS,
+        help=f"Seconds read per sample (default: {TRIAGE_WINDOW_SECONDS:g})",
+    )
+    triage_parser.add_argument(
+        "--interval",
+        type=float,
+        default=TRIAGE_INTERVAL_SECONDS,
+        help=f"Seconds between samples (default: {TRIAGE_INTERVAL_SECONDS:g})",
+    )
+    triage_parser.add_argument(
+        "--stop-at",
+        choices=["cue", "any"],
+        default="cue",
+        help="Stop sampling a file at the first message that is not a keep-alive "
+        "(cue), or at the first SCTE-104 message of any kind (any) (default: cue)",
+    )
+    triage_parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=min(8, os.cpu_count() or 1),
+        help="Number of files sampled in parallel (default: CPU count, at most 8)",
+    )
+    triage_parser.add_argument(
+        "--format",
+        choices=["table", "json"],
+        default="table",
+        help="Output format (default: table)",
+    )
+    triage_parser.add_argument("-o", "--output", help="Output file for JSON results")
+    triage_parser.set_defaults(func=triage_command)
+
     args = parser.parse_args()
 
     # Set up logging
@@ -866,7 +3053,12 @@ def main() -> None:
                 "[bold]Example usage:[/]\n"
                 "  [cyan]pyvanc_cli.py extract MXFInputfiles/example.mxf[/]\n"
                 "  [cyan]pyvanc_cli.py analyze MXFInputfiles/example.mxf[/]\n"
-                "  [cyan]pyvanc_cli.py extract MXFInputfiles/example.mxf --format json -o output.json[/]",
+                "  [cyan]pyvanc_cli.py extract MXFInputfiles/example.mxf --format json -o output.json[/]\n"
+                "  [cyan]pyvanc_cli.py analyze MXFInputfiles/example.mxf --save-index example.idx[/]\n"
+                "  [cyan]pyvanc_cli.py query example.idx --at 10:15:00:00[/]\n"
+                "  [cyan]pyvanc_cli.py ingest MXFInputfiles/*.mxf -c archive.db[/]\n"
+                "  [cyan]pyvanc_cli.py triage /mnt/archive --format json -o triage.json[/]\n"
+                "  [cyan]pyvanc_cli.py query --catalog archive.db --event-id 0x1234[/]",
                 border_style="dim",
             )
         )
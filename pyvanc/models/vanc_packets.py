@@ -148,6 +148,7 @@ class SCTE104Message:
         message_num: Message number
         dpi_pid_index: DPI PID index
         operations: List of operations in the message
+        payload: Raw message data as read from the VANC packet
     """
 
     opid: int
@@ -163,6 +164,7 @@ class SCTE104Message:
     result_str: str = ""
     result_str_length: int = 0
     operations: List[SCTE104Operation] = field(default_factory=list)
+    payload: bytes = field(default=b"", repr=False)
 
     def __str__(self) -> str:
         """String representation of the message."""
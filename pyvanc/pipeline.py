@@ -0,0 +1,293 @@
+"""Run the stages of an extraction concurrently on separate threads.
+
+Reading a file, parsing its SCTE-104 messages and writing the events mostly
+wait on something else: ffprobe, the disk, the catalog or the terminal. Run
+one after the other, an extraction takes the sum of their times. Here every
+stage runs on its own thread and hands its results to the next stage through
+a bounded queue, so the total time approaches that of the slowest stage. A
+full queue blocks the stage that feeds it, so a slow stage holds back the
+stages before it instead of letting results pile up in memory.
+
+Closing a stage, e.g. because enough events were found or on Ctrl+C, stops
+its thread and closes its source, which in turn stops the stages before it.
+A source that is blocked reading, e.g. from ffprobe, only notices that once
+its read returns. It can register a callback with an Interrupt, e.g. one that
+kills the process it reads from, which closing the stage calls right away.
+"""
+
+import logging
+import queue
+import threading
+from typing import (
+    Any,
+    Callable,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    TypeVar,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+DEFAULT_QUEUE_SIZE = 256
+
+# Seconds between checks whether the consumer stopped, while a queue is full
+STOP_CHECK_INTERVAL = 0.1
+
+# Seconds a closed stage waits for its thread to stop
+JOIN_TIMEOUT = 5.0
+
+# Marks the end of the items in a queue
+_END = object()
+
+
+class _Failure(NamedTuple):
+    """Exception raised by a stage, handed to its consumer."""
+
+    error: BaseException
+
+
+class Interrupt:
+    """Wakes up the sources of a pipeline that are blocked reading.
+
+    Sources add a callback that stops their read, e.g. by killing the process
+    they read from, and remove it when they are done. Calling the interrupt
+    calls the callbacks, and callbacks added after that right away.
+    """
+
+    def __init__(self) -> None:
+        self.interrupted = False
+        self._callbacks: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def add(self, callback: Callable[[], None]) -> None:
+        """Register a callback, calling it at once if the pipeline was interrupted.
+
+        Args:
+            callback: Function that stops a blocked read
+        """
+        with self._lock:
+            if not self.interrupted:
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def remove(self, callback: Callable[[], None]) -> None:
+        """Unregister a callback, once its source stopped reading.
+
+        Args:
+            callback: Function registered with add
+        """
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def __call__(self) -> None:
+        """Interrupt the pipeline."""
+        with self._lock:
+            self.interrupted = True
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
+
+
+def _put(buffer: queue.Queue, item: Any, stop: threading.Event) -> bool:
+    """Put an item in a queue, waiting while it is full.
+
+    Args:
+        buffer: Queue to the next stage
+        item: Item to put
+        stop: Set when the next stage stopped reading
+
+    Returns:
+        True if the item was queued, False if the next stage stopped
+    """
+    while not stop.is_set():
+        try:
+            buffer.put(item, timeout=STOP_CHECK_INTERVAL)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def threaded(
+    items: Iterable[T],
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+    name: str = "pyvanc-stage",
+    interrupt: Optional[Callable[[], None]] = None,
+) -> Generator[T, None, None]:
+    """Produce the items of an iterable on a separate thread.
+
+    The thread runs ahead of the consumer by at most queue_size items.
+    Exceptions of the iterable are raised in the consumer. Closing the
+    returned generator stops the thread and closes the iterable if it is a
+    generator. It waits at most JOIN_TIMEOUT seconds for the thread, which
+    is left to finish on its own if its iterable is still blocked.
+
+    Args:
+        items: Items to produce, e.g. a generator that reads a file
+        queue_size: Maximum number of items waiting for the consumer
+        name: Name of the thread, shown in debug logs and tracebacks
+        interrupt: Called when the consumer stops before the end, to wake up
+            an iterable that is blocked reading, e.g. an Interrupt
+
+    Yields:
+        The items of the iterable, in order
+    """
+    buffer: queue.Queue = queue.Queue(maxsize=max(1, queue_size))
+    stop = threading.Event()
+
+    def produce() -> None:
+        try:
+            for item in items:
+                if not _put(buffer, item, stop):
+                    logger.debug(f"{name} stopped by its consumer")
+                    return
+            _put(buffer, _END, stop)
+        except BaseException as e:
+            _put(buffer, _Failure(e), stop)
+        finally:
+            # Generators are closed on the thread that runs them
+            if isinstance(items, Generator):
+                items.close()
+
+    thread = threading.Thread(target=produce, name=name, daemon=True)
+    thread.start()
+
+    finished = False
+    try:
+        while True:
+            item = buffer.get()
+            if item is _END:
+                finished = True
+                return
+            if isinstance(item, _Failure):
+                finished = True
+                raise item.error
+            yield item
+    finally:
+        stop.set()
+        if interrupt is not None and not finished:
+            interrupt()
+        thread.join(JOIN_TIMEOUT)
+        if thread.is_alive():
+            logger.warning(f"{name} did not stop within {JOIN_TIMEOUT:g}s")
+
+
+class Sinks:
+    """Feed the same items to consumers that each run on their own thread.
+
+    A sink is a function that consumes an iterable of items, such as a
+    writer that streams them to a file, and returns a result. Sinks get
+    their items through bounded queues, so send() waits for the slowest
+    sink. Use as a context manager: leaving it ends the items, waits for the
+    sinks to finish and raises the first exception of a sink.
+    """
+
+    def __init__(
+        self,
+        sinks: Sequence[Callable[[Iterable[Any]], Any]],
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+    ):
+        """Initialize the sinks.
+
+        Args:
+            sinks: Functions consuming an iterable of items
+            queue_size: Maximum number of items waiting for each sink
+        """
+        self.sinks = list(sinks)
+        self.queue_size = max(1, queue_size)
+        self.results: List[Any] = [None] * len(self.sinks)
+        self.errors: List[BaseException] = []
+        self._buffers: List[queue.Queue] = []
+        self._threads: List[threading.Thread] = []
+
+    def __enter__(self) -> "Sinks":
+        for index, sink in enumerate(self.sinks):
+            buffer: queue.Queue = queue.Queue(maxsize=self.queue_size)
+            thread = threading.Thread(
+                target=self._run,
+                args=(index, sink, buffer),
+                name=f"pyvanc-sink-{index}",
+                daemon=True,
+            )
+            self._buffers.append(buffer)
+            self._threads.append(thread)
+            thread.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def _run(
+        self,
+        index: int,
+        sink: Callable[[Iterable[Any]], Any],
+        buffer: queue.Queue,
+    ) -> None:
+        """Run one sink on the items of its queue.
+
+        Args:
+            index: Position of the sink, for its result
+            sink: Function consuming the items
+            buffer: Queue of the items for this sink
+        """
+
+        def items() -> Iterator[Any]:
+            while True:
+                item = buffer.get()
+                if item is _END:
+                    return
+                yield item
+
+        remaining = items()
+        try:
+            self.results[index] = sink(remaining)
+        except BaseException as e:
+            logger.debug(f"Sink {index} failed: {e}")
+            self.errors.append(e)
+        finally:
+            # Keep taking items from a sink that stopped, so send() never blocks on it
+            for _ in remaining:
+                pass
+
+    def send(self, item: Any) -> None:
+        """Hand an item to every sink, waiting while a sink's queue is full.
+
+        Args:
+            item: Item to send
+
+        Raises:
+            Exception: The first exception raised by a sink
+        """
+        if self.errors:
+            raise self.errors[0]
+        for buffer in self._buffers:
+            buffer.put(item)
+
+    def close(self) -> List[Any]:
+        """End the items and wait for the sinks to finish.
+
+        Returns:
+            Results of the sinks, in the order the sinks were given
+
+        Raises:
+            Exception: The first exception raised by a sink
+        """
+        for buffer in self._buffers:
+            buffer.put(_END)
+        for thread in self._threads:
+            thread.join()
+        self._buffers = []
+        self._threads = []
+
+        if self.errors:
+            raise self.errors[0]
+        return self.results
@@ -0,0 +1,5 @@
+"""Persistent storage for decoded SCTE-104 events."""
+
+from .catalog import EventCatalog
+from .spill import ExternalSorter
+from .checkpoint import ExtractionCheckpoint
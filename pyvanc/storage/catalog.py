@@ -0,0 +1,321 @@
+"""SQLite catalog of the SCTE-104 events decoded from an archive of files.
+
+Every ingested file is recorded with its fingerprint, so ingesting the same
+file again is a no-op and a file that changed on disk replaces its old
+events. Events are inserted in batches inside a single transaction per file,
+so a file is either fully in the catalog or not at all.
+"""
+
+import datetime
+import logging
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, Generator, Iterable, List, Optional, Union
+
+from ..utils.vanc_utils import parse_creation_time, pts_to_utc_strings
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 1
+DEFAULT_BATCH_SIZE = 1000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL,
+    fingerprint TEXT NOT NULL UNIQUE,
+    size INTEGER,
+    framerate REAL,
+    creation_time TEXT,
+    event_count INTEGER NOT NULL DEFAULT 0,
+    ingested_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    file_id INTEGER NOT NULL REFERENCES files (id) ON DELETE CASCADE,
+    frame INTEGER NOT NULL,
+    pts_time REAL,
+    timecode TEXT,
+    utc_time TEXT,
+    message_type TEXT,
+    message_num INTEGER,
+    operation_id TEXT,
+    segmentation_type_id INTEGER,
+    segmentation_type_name TEXT,
+    event_id INTEGER,
+    upid_type INTEGER,
+    upid TEXT,
+    payload BLOB
+);
+
+CREATE INDEX IF NOT EXISTS files_path ON files (path);
+CREATE INDEX IF NOT EXISTS events_file_frame ON events (file_id, frame);
+CREATE INDEX IF NOT EXISTS events_utc_time ON events (utc_time);
+CREATE INDEX IF NOT EXISTS events_event_id ON events (event_id);
+CREATE INDEX IF NOT EXISTS events_upid ON events (upid);
+"""
+
+EVENT_COLUMNS = (
+    "frame",
+    "pts_time",
+    "timecode",
+    "utc_time",
+    "message_type",
+    "message_num",
+    "operation_id",
+    "segmentation_type_id",
+    "segmentation_type_name",
+    "event_id",
+    "upid_type",
+    "upid",
+    "payload",
+)
+
+INSERT_EVENT = (
+    f"INSERT INTO events (file_id, {', '.join(EVENT_COLUMNS)}) "
+    f"VALUES (?, {', '.join('?' * len(EVENT_COLUMNS))})"
+)
+
+
+def normalize_utc(value: str) -> str:
+    """Convert a UTC time to the "YYYY-MM-DD HH:MM:SS.mmmZ" form stored in the catalog.
+
+    Stored UTC times sort as text, so range filters can use the index.
+
+    Args:
+        value: UTC time in ISO 8601 or catalog form
+
+    Returns:
+        Normalized UTC time
+
+    Raises:
+        ValueError: If the time cannot be parsed
+    """
+    parsed = parse_creation_time(value)
+    if parsed is None:
+        raise ValueError(f"Cannot parse UTC time '{value}'")
+    return pts_to_utc_strings([0.0], parsed)[0]
+
+
+class EventCatalog:
+    """SQLite catalog of decoded SCTE-104 events."""
+
+    def __init__(self, path: Union[str, Path]):
+        """Open the catalog, creating it if it does not exist.
+
+        Args:
+            path: Catalog database file
+        """
+        self.path = Path(path)
+        self.connection = sqlite3.connect(self.path)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.execute("PRAGMA synchronous = NORMAL")
+        self._create_schema()
+
+    def _create_schema(self) -> None:
+        """Create the tables and indexes of a new catalog."""
+        version = self.connection.execute("PRAGMA user_version").fetchone()[0]
+        if version > SCHEMA_VERSION:
+            raise ValueError(
+                f"{self.path} has catalog version {version}, "
+                f"this pyvanc supports up to {SCHEMA_VERSION}"
+            )
+
+        with self.connection:
+            self.connection.executescript(SCHEMA)
+            self.connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def close(self) -> None:
+        """Close the catalog."""
+        self.connection.close()
+
+    def __enter__(self) -> "EventCatalog":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def has_fingerprint(self, fingerprint: str) -> bool:
+        """Check whether a file with this fingerprint was ingested.
+
+        Args:
+            fingerprint: File fingerprint
+
+        Returns:
+            True if the file is in the catalog
+        """
+        row = self.connection.execute(
+            "SELECT 1 FROM files WHERE fingerprint = ?", (fingerprint,)
+        ).fetchone()
+        return row is not None
+
+    def ingest(
+        self,
+        path: Union[str, Path],
+        fingerprint: str,
+        events: Iterable[Dict[str, Any]],
+        framerate: Optional[float] = None,
+        creation_time: Optional[datetime.datetime] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        replace: bool = False,
+    ) -> Optional[int]:
+        """Add the events of a file to the catalog.
+
+        Nothing is done if the fingerprint is already in the catalog, unless
+        replace is set. Earlier versions of the same path are replaced.
+
+        Args:
+            path: File the events were decoded from
+            fingerprint: Fingerprint of the file
+            events: Event dictionaries as produced by the extract command
+            framerate: Frame rate of the file
+            creation_time: Creation time of the file in UTC
+            batch_size: Number of events inserted per statement
+            replace: Whether to replace the events of a file ingested before
+
+        Returns:
+            Number of events added, or None if the file was already ingested
+        """
+        path = str(Path(path).resolve())
+        size = Path(path).stat().st_size if Path(path).exists() else None
+
+        with self.connection:
+            if not replace and self.has_fingerprint(fingerprint):
+                logger.debug(f"{path} is already in the catalog")
+                return None
+
+            replaced = self.connection.execute(
+                "DELETE FROM files WHERE path = ? OR fingerprint = ?",
+                (path, fingerprint),
+            ).rowcount
+            if replaced:
+                logger.info(f"Replacing {replaced} older catalog entries for {path}")
+
+            file_id = self.connection.execute(
+                "INSERT INTO files (path, fingerprint, size, framerate, creation_time, "
+                "ingested_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    path,
+                    fingerprint,
+                    size,
+                    framerate,
+                    creation_time.isoformat() if creation_time else None,
+                    datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                ),
+            ).lastrowid
+
+            count = 0
+            batch = []
+            for event in events:
+                batch.append(
+                    (file_id, *(event.get(column) for column in EVENT_COLUMNS))
+                )
+                if len(batch) >= batch_size:
+                    self.connection.executemany(INSERT_EVENT, batch)
+                    count += len(batch)
+                    batch = []
+            if batch:
+                self.connection.executemany(INSERT_EVENT, batch)
+                count += len(batch)
+
+            self.connection.execute(
+                "UPDATE files SET event_count = ? WHERE id = ?", (count, file_id)
+            )
+
+        return count
+
+    def file_events(self, fingerprint: str) -> Generator[Dict[str, Any], None, None]:
+        """Stream the events of an ingested file.
+
+        Args:
+            fingerprint: Fingerprint of the file
+
+        Yields:
+            Event records in frame order, with the columns of EVENT_COLUMNS
+        """
+        rows = self.connection.execute(
+            f"SELECT {', '.join(f'events.{column}' for column in EVENT_COLUMNS)} "
+            "FROM events JOIN files ON files.id = events.file_id "
+            "WHERE files.fingerprint = ? ORDER BY events.frame, events.id",
+            (fingerprint,),
+        )
+        for row in rows:
+            yield dict(row)
+
+    def files(self) -> List[Dict[str, Any]]:
+        """List the ingested files.
+
+        Returns:
+            File records ordered by path
+        """
+        rows = self.connection.execute("SELECT * FROM files ORDER BY path")
+        return [dict(row) for row in rows]
+
+    def query(
+        self,
+        event_id: Optional[int] = None,
+        upid: Optional[str] = None,
+        segmentation_type: Optional[Union[int, str]] = None,
+        file: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Find events matching all of the given filters.
+
+        Args:
+            event_id: Segmentation event ID
+            upid: Segmentation UPID as hex digits
+            segmentation_type: Segmentation type ID, or part of its name
+            file: Part of the file path
+            since: Earliest UTC time, inclusive
+            until: Latest UTC time, exclusive
+            limit: Maximum number of events to return
+
+        Returns:
+            Event records with their file path, ordered by UTC time and frame
+
+        Raises:
+            ValueError: If a UTC time cannot be parsed
+        """
+        conditions = []
+        parameters: List[Any] = []
+
+        if event_id is not None:
+            conditions.append("events.event_id = ?")
+            parameters.append(event_id)
+        if upid is not None:
+            conditions.append("events.upid = ?")
+            parameters.append(upid.lower().removeprefix("0x"))
+        if isinstance(segmentation_type, int):
+            conditions.append("events.segmentation_type_id = ?")
+            parameters.append(segmentation_type)
+        elif segmentation_type is not None:
+            conditions.append("events.segmentation_type_name LIKE ?")
+            parameters.append(f"%{segmentation_type}%")
+        if file is not None:
+            conditions.append("files.path LIKE ?")
+            parameters.append(f"%{file}%")
+        if since is not None:
+            conditions.append("events.utc_time >= ?")
+            parameters.append(normalize_utc(since))
+        if until is not None:
+            conditions.append("events.utc_time < ?")
+            parameters.append(normalize_utc(until))
+
+        sql = (
+            "SELECT files.path AS file, events.* FROM events "
+            "JOIN files ON files.id = events.file_id"
+        )
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY events.utc_time, files.path, events.frame"
+        if limit is not None:
+            sql += " LIMIT ?"
+            parameters.append(limit)
+
+        rows = self.connection.execute(sql, parameters)
+        return [dict(row) for row in rows]
@@ -0,0 +1,271 @@
+"""Checkpoints of long extractions, so an interrupted scan can be resumed.
+
+While a file is scanned, the events of every SCTE-104 message are appended
+to an events file in the cache directory. Every few seconds, and when the
+scan stops, the position of the last message and the size of the events
+file up to it are written to a small state file. A resumed scan first
+replays the recorded events and then reads the file from the recorded
+position on, so its output is the same as that of an uninterrupted scan.
+
+A checkpoint belongs to a file fingerprint and the options that change the
+events, so a checkpoint is never resumed for a file that changed on disk or
+with other options.
+"""
+
+import datetime
+import hashlib
+import json
+import logging
+import os
+import pickle
+import tempfile
+import time
+from pathlib import Path
+from typing import IO, Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from ..utils.fingerprint import file_fingerprint
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_VERSION = 1
+
+# Seconds between checkpoints while a file is scanned
+DEFAULT_CHECKPOINT_INTERVAL = 10.0
+
+
+def default_cache_dir() -> Path:
+    """Directory for the checkpoints of pyvanc.
+
+    Returns:
+        $XDG_CACHE_HOME/pyvanc/checkpoints, or ~/.cache/pyvanc/checkpoints
+    """
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "pyvanc" / "checkpoints"
+
+
+class ExtractionCheckpoint:
+    """Checkpoint of the scan of one file with one set of options.
+
+    The position is the PTS time of the last message scanned and the number
+    of messages at that PTS time, as a frame can hold several messages.
+    Recording and committing happen on the thread that parses the messages.
+    """
+
+    def __init__(
+        self,
+        input_file: Union[str, Path],
+        options: Dict[str, Any],
+        directory: Optional[Union[str, Path]] = None,
+        interval: float = DEFAULT_CHECKPOINT_INTERVAL,
+    ):
+        """Initialize the checkpoint.
+
+        Args:
+            input_file: Path to the MXF file
+            options: Options that change the events, as JSON serializable values
+            directory: Directory of the checkpoints (default: default_cache_dir())
+            interval: Seconds between commits while the file is scanned
+        """
+        self.input_file = str(input_file)
+        self.directory = Path(directory) if directory else default_cache_dir()
+        self.interval = interval
+
+        self.fingerprint = file_fingerprint(input_file)
+        key = hashlib.sha1(
+            json.dumps(
+                {"fingerprint": self.fingerprint, "options": options}, sort_keys=True
+            ).encode()
+        ).hexdigest()
+        self.state_path = self.directory / f"{key}.json"
+        self.events_path = self.directory / f"{key}.events"
+
+        # Position and events file size of the last commit, None without one
+        self.position: Optional[Tuple[float, int]] = None
+        self.events_size = 0
+        self.event_count = 0
+
+        self._file: Optional[IO[bytes]] = None
+        self._pts_time: Optional[float] = None
+        self._messages_at_time = 0
+        self._skip = 0
+        self._recorded_events = 0
+        self._last_commit = 0.0
+
+    def load(self) -> bool:
+        """Read the last committed state of an earlier scan.
+
+        Returns:
+            True if there is a checkpoint to resume from
+        """
+        try:
+            with open(self.state_path) as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable checkpoint {self.state_path}: {e}")
+            return False
+
+        if state.get("version") != CHECKPOINT_VERSION:
+            logger.warning(f"Ignoring checkpoint of another version: {self.state_path}")
+            return False
+
+        try:
+            if self.events_path.stat().st_size < state["events_size"]:
+                logger.warning(
+                    f"Ignoring checkpoint with missing events: {self.events_path}"
+                )
+                return False
+        except OSError:
+            return False
+
+        self.position = (state["pts_time"], state["messages_at_time"])
+        self.events_size = state["events_size"]
+        self.event_count = state["event_count"]
+        logger.info(
+            f"Resuming {self.input_file} at {self.position[0]:.3f}s "
+            f"after {self.event_count} events"
+        )
+        return True
+
+    def read_start(self, start: Optional[float]) -> Optional[float]:
+        """Start of the part of the file that still has to be read.
+
+        Args:
+            start: Start of the window in seconds, None for the start of the file
+
+        Returns:
+            Time to read from, the recorded position when resuming
+        """
+        if self.position is None:
+            return start
+        return self.position[0] if start is None else max(start, self.position[0])
+
+    def recorded_batches(self) -> Iterator[List[Dict[str, Any]]]:
+        """Read the events recorded up to the committed position.
+
+        Yields:
+            Lists with the events of one SCTE-104 message, in scan order
+        """
+        if self.position is None:
+            return
+
+        with open(self.events_path, "rb") as f:
+            while f.tell() < self.events_size:
+                yield pickle.load(f)
+
+    def start(self) -> None:
+        """Open the events file, after the committed events when resuming."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        if self.position is None:
+            self._file = open(self.events_path, "wb")
+        else:
+            # Drop events written after the last commit, they are read again
+            self._file = open(self.events_path, "r+b")
+            self._file.truncate(self.events_size)
+            self._file.seek(self.events_size)
+            self._pts_time, self._messages_at_time = self.position
+            self._skip = self._messages_at_time
+            self._recorded_events = self.event_count
+
+        self._last_commit = time.monotonic()
+
+    def is_recorded(self, pts_time: float) -> bool:
+        """Check whether a message read after resuming was recorded before.
+
+        Reading resumes at the PTS time of the last recorded message, so the
+        messages at that time that were already recorded are read again.
+
+        Args:
+            pts_time: PTS time of the message
+
+        Returns:
+            True if the message must be skipped
+        """
+        if self._skip and pts_time == self._pts_time:
+            self._skip -= 1
+            return True
+        self._skip = 0
+        return False
+
+    def record(self, pts_time: float, events: List[Dict[str, Any]]) -> None:
+        """Record a scanned message and commit when the interval passed.
+
+        Args:
+            pts_time: PTS time of the message
+            events: Events of the message, may be empty
+        """
+        if self._file is None:
+            return
+
+        if pts_time == self._pts_time:
+            self._messages_at_time += 1
+        else:
+            self._pts_time = pts_time
+            self._messages_at_time = 1
+
+        if events:
+            pickle.dump(events, self._file, protocol=pickle.HIGHEST_PROTOCOL)
+            self._recorded_events += len(events)
+
+        if time.monotonic() - self._last_commit >= self.interval:
+            self.commit()
+
+    def commit(self) -> None:
+        """Write the position of the last recorded message to the state file."""
+        if self._file is None or self._pts_time is None:
+            return
+
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.events_size = self._file.tell()
+        self.position = (self._pts_time, self._messages_at_time)
+        self.event_count = self._recorded_events
+
+        state = {
+            "version": CHECKPOINT_VERSION,
+            "file": self.input_file,
+            "fingerprint": self.fingerprint,
+            "pts_time": self._pts_time,
+            "messages_at_time": self._messages_at_time,
+            "events_size": self.events_size,
+            "event_count": self.event_count,
+            "updated_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        }
+        fd, temp_name = tempfile.mkstemp(
+            prefix=f".{self.state_path.name}.", dir=self.directory
+        )
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(state, f, indent=2)
+            os.replace(temp_name, self.state_path)
+        except BaseException:
+            os.unlink(temp_name)
+            raise
+
+        self._last_commit = time.monotonic()
+
+    def close(self) -> None:
+        """Commit the last recorded message and close the events file."""
+        if self._file is None:
+            return
+        if self._pts_time is None:
+            # Stopped before the first message, there is nothing to resume
+            self.remove()
+            return
+        self.commit()
+        self._file.close()
+        self._file = None
+
+    def remove(self) -> None:
+        """Delete the checkpoint, after the scan completed."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        for path in (self.state_path, self.events_path):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+        self.position = None
@@ -0,0 +1,210 @@
+"""Sort more items than fit in memory by spilling sorted runs to disk.
+
+Items are serialized as they are added and buffered until the buffer reaches
+the memory limit. The buffer is then sorted and written to a temporary file
+as a run. Reading the sorted items merges the runs k-way with heapq.merge,
+which holds one item per run in memory, so memory use depends on the limit
+and not on the number of items. To keep the number of runs bounded, every
+time the last runs of the same size class reach the merge width they are
+merged into one run of the next class, so each item is rewritten only a
+logarithmic number of times.
+
+Items must be picklable. Items with equal keys keep the order in which they
+were added, as with sorted().
+"""
+
+import heapq
+import logging
+import pickle
+import sys
+import tempfile
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Generator,
+    Generic,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+DEFAULT_MEMORY_LIMIT = 64 * 1024 * 1024
+
+# Read buffer of every run while the runs are merged
+RUN_BUFFER_SIZE = 64 * 1024
+
+# Runs merged at once, also bounded by the memory limit over RUN_BUFFER_SIZE
+MAX_MERGE_RUNS = 64
+
+
+class ExternalSorter(Generic[T]):
+    """Sort items within a memory limit, spilling sorted runs to temporary files.
+
+    Use as a context manager, leaving it removes the temporary files.
+    """
+
+    def __init__(
+        self,
+        key: Callable[[T], Any],
+        memory_limit: int = DEFAULT_MEMORY_LIMIT,
+        directory: Optional[str] = None,
+    ):
+        """Initialize the sorter.
+
+        Args:
+            key: Sort key of an item
+            memory_limit: Bytes of serialized items to buffer before a run is spilled
+            directory: Directory of the temporary files, None for the system default
+        """
+        self.key = key
+        self.memory_limit = max(1, memory_limit)
+        self.directory = directory
+        self.max_merge_runs = max(
+            2, min(MAX_MERGE_RUNS, self.memory_limit // RUN_BUFFER_SIZE)
+        )
+        self.count = 0
+        self._buffer: List[Tuple[Any, bytes]] = []
+        self._buffer_size = 0
+        # Runs in the order their items were added, with their size class
+        self._runs: List[Tuple[int, IO[bytes]]] = []
+
+    def __enter__(self) -> "ExternalSorter[T]":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    @property
+    def spilled_runs(self) -> int:
+        """Number of runs on disk."""
+        return len(self._runs)
+
+    def add(self, item: T) -> None:
+        """Add an item, spilling the buffer to disk when it is full.
+
+        Args:
+            item: Item to sort
+        """
+        data = pickle.dumps(item, protocol=pickle.HIGHEST_PROTOCOL)
+        self._buffer.append((self.key(item), data))
+        self._buffer_size += sys.getsizeof(data)
+        self.count += 1
+
+        if self._buffer_size >= self.memory_limit:
+            self._spill()
+
+    def extend(self, items: Iterable[T]) -> int:
+        """Add all items of an iterable, e.g. as a sink of a pipeline.
+
+        Args:
+            items: Items to sort
+
+        Returns:
+            Number of items added
+        """
+        count = 0
+        for item in items:
+            self.add(item)
+            count += 1
+        return count
+
+    def _new_run(self) -> IO[bytes]:
+        """Create an empty temporary file for a run."""
+        return tempfile.TemporaryFile(
+            prefix="pyvanc-sort-", dir=self.directory, buffering=RUN_BUFFER_SIZE
+        )
+
+    def _spill(self) -> None:
+        """Write the sorted buffer to a new run."""
+        if not self._buffer:
+            return
+
+        self._buffer.sort(key=lambda entry: entry[0])
+        run = self._new_run()
+        for _, data in self._buffer:
+            run.write(data)
+        run.flush()
+
+        logger.debug(
+            f"Spilled {len(self._buffer)} items ({self._buffer_size} bytes) "
+            f"to run {len(self._runs) + 1}"
+        )
+        self._runs.append((0, run))
+        self._buffer = []
+        self._buffer_size = 0
+
+        self._merge_runs()
+
+    def _merge_runs(self) -> None:
+        """Merge the last runs while enough of them share a size class."""
+        while len(self._runs) >= self.max_merge_runs:
+            level = self._runs[-1][0]
+            tail = self._runs[-self.max_merge_runs :]
+            if any(run_level != level for run_level, _ in tail):
+                return
+
+            # The runs are consecutive, so equal items keep their order
+            merged = self._new_run()
+            runs = [run for _, run in tail]
+            for item in heapq.merge(*map(self._read_run, runs), key=self.key):
+                pickle.dump(item, merged, protocol=pickle.HIGHEST_PROTOCOL)
+            merged.flush()
+
+            logger.debug(f"Merged {len(runs)} runs of class {level}")
+            for run in runs:
+                run.close()
+            self._runs[-self.max_merge_runs :] = [(level + 1, merged)]
+
+    @staticmethod
+    def _read_run(run: IO[bytes]) -> Generator[Any, None, None]:
+        """Read the items of a run from its start.
+
+        Args:
+            run: Temporary file of the run
+
+        Yields:
+            The items of the run, in order
+        """
+        run.seek(0)
+        while True:
+            try:
+                yield pickle.load(run)
+            except EOFError:
+                return
+
+    def sorted_items(self) -> Generator[T, None, None]:
+        """Read all items added so far in sorted order.
+
+        The items that are still buffered are merged with the runs, so
+        nothing is spilled for inputs that fit in memory. Do not add items
+        while reading.
+
+        Yields:
+            The items, sorted by key
+        """
+        self._buffer.sort(key=lambda entry: entry[0])
+        buffered = (pickle.loads(data) for _, data in self._buffer)
+
+        if not self._runs:
+            yield from buffered
+            return
+
+        # heapq.merge takes equal items from earlier iterables first, the runs
+        # hold older items than the buffer, so the sort is stable
+        runs = [self._read_run(run) for _, run in self._runs]
+        yield from heapq.merge(*runs, buffered, key=self.key)
+
+    def close(self) -> None:
+        """Remove the runs and drop the buffered items."""
+        for _, run in self._runs:
+            run.close()
+        self._runs = []
+        self._buffer = []
+        self._buffer_size = 0
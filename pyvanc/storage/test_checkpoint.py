@@ -0,0 +1,103 @@
+from pyvanc.storage.checkpoint import ExtractionCheckpoint
+
+OPTIONS = {"framerate": 25.0}
+
+
+def make_checkpoint(tmp_path, options=OPTIONS):
+    return ExtractionCheckpoint(
+        tmp_path / "recording.mxf",
+        options,
+        directory=tmp_path / "checkpoints",
+        interval=3600,
+    )
+
+
+def test_record_commit_and_resume(tmp_path):
+    (tmp_path / "recording.mxf").write_bytes(b"recording")
+
+    checkpoint = make_checkpoint(tmp_path)
+    assert not checkpoint.load()
+    checkpoint.start()
+    checkpoint.record(1.0, [{"event": 1}])
+    checkpoint.record(1.0, [{"event": 2}, {"event": 3}])
+    checkpoint.record(1.5, [])
+    checkpoint.commit()
+    # Interrupted before the next commit, this message is read again
+    checkpoint.record(2.0, [{"event": 4}])
+    checkpoint._file.close()
+
+    resumed = make_checkpoint(tmp_path)
+    assert resumed.load()
+    assert resumed.position == (1.5, 1)
+    assert resumed.event_count == 3
+    assert resumed.read_start(None) == 1.5
+    assert resumed.read_start(1.8) == 1.8
+    assert list(resumed.recorded_batches()) == [
+        [{"event": 1}],
+        [{"event": 2}, {"event": 3}],
+    ]
+
+    # Reading resumes at the last recorded message, which is skipped
+    resumed.start()
+    assert resumed.is_recorded(1.5)
+    assert not resumed.is_recorded(2.0)
+    resumed.record(2.0, [{"event": 4}])
+    resumed.close()
+
+    finished = make_checkpoint(tmp_path)
+    assert finished.load()
+    assert finished.event_count == 4
+    assert [event for batch in finished.recorded_batches() for event in batch] == [
+        {"event": 1},
+        {"event": 2},
+        {"event": 3},
+        {"event": 4},
+    ]
+
+    finished.remove()
+    assert not make_checkpoint(tmp_path).load()
+    assert list((tmp_path / "checkpoints").iterdir()) == []
+
+
+def test_messages_at_the_same_time_are_skipped_once(tmp_path):
+    (tmp_path / "recording.mxf").write_bytes(b"recording")
+
+    checkpoint = make_checkpoint(tmp_path)
+    checkpoint.start()
+    checkpoint.record(1.0, [{"event": 1}])
+    checkpoint.record(1.0, [{"event": 2}])
+    checkpoint.close()
+
+    resumed = make_checkpoint(tmp_path)
+    assert resumed.load()
+    resumed.start()
+    assert resumed.is_recorded(1.0)
+    assert resumed.is_recorded(1.0)
+    assert not resumed.is_recorded(1.0)
+    resumed.remove()
+
+
+def test_checkpoint_belongs_to_file_and_options(tmp_path):
+    recording = tmp_path / "recording.mxf"
+    recording.write_bytes(b"recording")
+
+    checkpoint = make_checkpoint(tmp_path)
+    checkpoint.start()
+    checkpoint.record(1.0, [{"event": 1}])
+    checkpoint.close()
+
+    assert not make_checkpoint(tmp_path, {"framerate": 50.0}).load()
+
+    recording.write_bytes(b"another recording")
+    assert not make_checkpoint(tmp_path).load()
+
+
+def test_stopping_before_the_first_message_leaves_nothing(tmp_path):
+    (tmp_path / "recording.mxf").write_bytes(b"recording")
+
+    checkpoint = make_checkpoint(tmp_path)
+    checkpoint.start()
+    checkpoint.close()
+
+    assert not make_checkpoint(tmp_path).load()
+    assert list((tmp_path / "checkpoints").iterdir()) == []
@@ -0,0 +1,30 @@
+import random
+
+from pyvanc.storage.spill import ExternalSorter
+
+
+def test_sort_is_stable_across_spilled_runs():
+    rng = random.Random(45)
+    items = [(rng.randrange(20), sequence) for sequence in range(3000)]
+
+    # Every item is spilled to its own run, so runs are merged in cascades
+    with ExternalSorter(key=lambda item: item[0], memory_limit=1) as sorter:
+        assert sorter.extend(items) == len(items)
+        assert sorter.spilled_runs > 0
+        assert list(sorter.sorted_items()) == sorted(items, key=lambda item: item[0])
+
+
+def test_buffered_items_merge_after_runs():
+    items = [(key % 3, sequence) for sequence, key in enumerate(range(500))]
+
+    with ExternalSorter(key=lambda item: item[0], memory_limit=2000) as sorter:
+        sorter.extend(items)
+        assert sorter.spilled_runs > 0
+        assert list(sorter.sorted_items()) == sorted(items, key=lambda item: item[0])
+
+
+def test_in_memory_sort_does_not_spill():
+    with ExternalSorter(key=lambda item: -item) as sorter:
+        sorter.extend(range(100))
+        assert sorter.spilled_runs == 0
+        assert list(sorter.sorted_items()) == list(range(99, -1, -1))
@@ -0,0 +1,48 @@
+import threading
+import time
+
+from pyvanc.pipeline import Interrupt, threaded
+
+
+def blocking_source(interrupt, released):
+    """Yield one item, then block like a read from a process until interrupted."""
+    wake = threading.Event()
+    interrupt.add(wake.set)
+    try:
+        yield 1
+        wake.wait()
+        released.set()
+    finally:
+        interrupt.remove(wake.set)
+
+
+def test_closing_interrupts_a_blocked_source():
+    interrupt = Interrupt()
+    released = threading.Event()
+    items = threaded(blocking_source(interrupt, released), interrupt=interrupt)
+
+    assert next(items) == 1
+    started = time.monotonic()
+    items.close()
+
+    assert time.monotonic() - started < 1
+    assert interrupt.interrupted
+    assert released.is_set()
+
+
+def test_finished_stage_is_not_interrupted():
+    interrupt = Interrupt()
+    items = threaded(range(5), queue_size=2, interrupt=interrupt)
+    assert list(items) == list(range(5))
+    assert not interrupt.interrupted
+
+
+def test_callbacks_added_after_the_interrupt_run_at_once():
+    interrupt = Interrupt()
+    calls = []
+    interrupt.add(lambda: calls.append("before"))
+    interrupt()
+    interrupt.add(lambda: calls.append("after"))
+    interrupt()
+
+    assert calls == ["before", "after"]
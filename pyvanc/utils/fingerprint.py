@@ -0,0 +1,40 @@
+"""File fingerprints for recognising files that were processed before.
+
+The event catalog, extraction checkpoints and the thumbnail cache all key
+their entries by this fingerprint.
+"""
+
+import hashlib
+from pathlib import Path
+from typing import Union
+
+# Hash the first and last MiB of a file
+FINGERPRINT_SAMPLE_BYTES = 1024 * 1024
+
+
+def file_fingerprint(filename: Union[str, Path]) -> str:
+    """Compute a fingerprint of a media file without reading all of it.
+
+    The fingerprint combines the file size and modification time with a hash
+    of the first and last megabyte, which is enough to tell recordings apart.
+
+    Args:
+        filename: Path to the media file
+
+    Returns:
+        Hex digest identifying the file contents
+    """
+    path = Path(filename)
+    stat = path.stat()
+
+    digest = hashlib.sha1()
+    digest.update(f"{stat.st_size}:{stat.st_mtime_ns}".encode())
+
+    with path.open("rb") as f:
+        digest.update(f.read(FINGERPRINT_SAMPLE_BYTES))
+        if stat.st_size > FINGERPRINT_SAMPLE_BYTES:
+            tail_offset = stat.st_size - FINGERPRINT_SAMPLE_BYTES
+            f.seek(max(FINGERPRINT_SAMPLE_BYTES, tail_offset))
+            digest.update(f.read(FINGERPRINT_SAMPLE_BYTES))
+
+    return digest.hexdigest()
@@ -0,0 +1,306 @@
+"""
+Frame Timecode module for SMPTE timecode arithmetic on integer frame counts.
+
+Timecodes are handled as plain ints: the zero-based number of frames since
+00:00:00:00. Conversions from and to timecode strings use integer and
+rational arithmetic only, so any frame rate (including 30000/1001) is exact
+and drop-frame timecode is supported for 29.97 and 59.94 fps. Unlike the
+timecode package, no objects are created per value and there is no
+off-by-one frame to correct for.
+"""
+
+import functools
+from fractions import Fraction
+from typing import Optional, Tuple, Union
+
+FrameRate = Union[int, float, str, Fraction]
+
+DEFAULT_FRAME_RATE = 25
+
+
+@functools.lru_cache(maxsize=None)
+def parse_frame_rate(rate: FrameRate) -> Fraction:
+    """
+    Convert a frame rate to an exact fraction.
+
+    Results are cached, so the per-call cost on hot paths is a dict lookup.
+
+    NTSC rates written as decimals ("29.97", 59.94) are mapped to their exact
+    value (30000/1001, 60000/1001).
+
+    Args:
+        rate: Frame rate as int, float, Fraction or string ("25", "29.97", "30000/1001")
+
+    Returns:
+        Fraction: Exact frame rate
+
+    Raises:
+        ValueError: If the frame rate is not positive
+    """
+    if isinstance(rate, Fraction):
+        exact_rate = rate
+    else:
+        exact_rate = Fraction(str(rate))
+
+    # Decimal spellings of the 1000/1001 rates
+    nominal = round(exact_rate)
+    if exact_rate != nominal and abs(
+        exact_rate - Fraction(nominal * 1000, 1001)
+    ) < Fraction(1, 100):
+        exact_rate = Fraction(nominal * 1000, 1001)
+
+    if exact_rate <= 0:
+        raise ValueError(f"Frame rate must be positive, not {rate}")
+
+    return exact_rate
+
+
+@functools.lru_cache(maxsize=None)
+def nominal_frame_rate(rate: FrameRate) -> int:
+    """
+    Get the number of frame labels per timecode second (e.g. 30 for 29.97 fps).
+
+    Args:
+        rate: Frame rate
+
+    Returns:
+        int: Nominal frame rate
+    """
+    return round(parse_frame_rate(rate))
+
+
+@functools.lru_cache(maxsize=None)
+def _dropped_frames_per_minute(rate: FrameRate) -> int:
+    """
+    Get the number of frame labels skipped per minute in drop-frame timecode.
+
+    Args:
+        rate: Frame rate
+
+    Returns:
+        int: 2 for 29.97 fps, 4 for 59.94 fps
+
+    Raises:
+        ValueError: If drop-frame timecode does not exist for the frame rate
+    """
+    exact_rate = parse_frame_rate(rate)
+    nominal = round(exact_rate)
+
+    if nominal % 30 != 0 or exact_rate != Fraction(nominal * 1000, 1001):
+        raise ValueError(f"Drop-frame timecode is not defined for {rate} fps")
+
+    return nominal // 15
+
+
+@functools.lru_cache(maxsize=None)
+def frames_per_day(
+    rate: FrameRate = DEFAULT_FRAME_RATE, drop_frame: bool = False
+) -> int:
+    """
+    Get the number of frames in 24 hours of timecode.
+
+    Args:
+        rate: Frame rate
+        drop_frame: Whether the timecode is drop-frame
+
+    Returns:
+        int: Frames per day
+    """
+    nominal = nominal_frame_rate(rate)
+    frames = 24 * 3600 * nominal
+
+    if drop_frame:
+        # Frame labels are dropped in 9 out of every 10 minutes
+        frames -= 24 * 54 * _dropped_frames_per_minute(rate)
+
+    return frames
+
+
+def timecode_to_frames(
+    timecode: str,
+    rate: FrameRate = DEFAULT_FRAME_RATE,
+    drop_frame: Optional[bool] = None,
+) -> int:
+    """
+    Convert a timecode string to a zero-based frame count.
+
+    Args:
+        timecode: Timecode "HH:MM:SS:FF", or "HH:MM:SS;FF" for drop-frame
+        rate: Frame rate
+        drop_frame: Whether the timecode is drop-frame. None detects it from
+                    the separator before the frames field.
+
+    Returns:
+        int: Number of frames since 00:00:00:00
+
+    Raises:
+        ValueError: If the timecode is malformed
+    """
+    if drop_frame is None:
+        drop_frame = ";" in timecode
+
+    fields = timecode.split(":")
+    if len(fields) != 4:
+        fields = timecode.replace(";", ":").replace(".", ":").split(":")
+        if len(fields) != 4:
+            raise ValueError(f"Invalid timecode: {timecode}")
+
+    hours, minutes, seconds, frames = map(int, fields)
+    nominal = nominal_frame_rate(rate)
+    total = ((hours * 60 + minutes) * 60 + seconds) * nominal + frames
+
+    if drop_frame:
+        total_minutes = hours * 60 + minutes
+        total -= _dropped_frames_per_minute(rate) * (
+            total_minutes - total_minutes // 10
+        )
+
+    return total
+
+
+def frames_to_timecode(
+    frames: int,
+    rate: FrameRate = DEFAULT_FRAME_RATE,
+    drop_frame: bool = False,
+    fractional: bool = False,
+) -> str:
+    """
+    Convert a zero-based frame count to a timecode string.
+
+    Frame counts wrap around at 24 hours, like timecode does.
+
+    Args:
+        frames: Number of frames since 00:00:00:00
+        rate: Frame rate
+        drop_frame: Whether to produce drop-frame timecode ("HH:MM:SS;FF")
+        fractional: Whether to show the frames field as milliseconds ("HH:MM:SS.mmm")
+
+    Returns:
+        str: Timecode string
+    """
+    nominal = nominal_frame_rate(rate)
+    frames %= frames_per_day(rate, drop_frame)
+
+    if drop_frame:
+        # Add back the frame labels that were skipped before this frame
+        dropped = _dropped_frames_per_minute(rate)
+        frames_per_minute = nominal * 60 - dropped
+        frames_per_10_minutes = frames_per_minute * 10 + dropped
+
+        tens_of_minutes, remainder = divmod(frames, frames_per_10_minutes)
+        frames += 9 * dropped * tens_of_minutes
+        if remainder > dropped:
+            frames += dropped * ((remainder - dropped) // frames_per_minute)
+
+    total_seconds, frame = divmod(frames, nominal)
+    total_minutes, seconds = divmod(total_seconds, 60)
+    hours, minutes = divmod(total_minutes, 60)
+
+    if fractional:
+        milliseconds = frame * 1000 // nominal
+        return f"{hours:02d}:{minutes:02d}:{seconds:02d}.{milliseconds:03d}"
+
+    separator = ";" if drop_frame else ":"
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}{separator}{frame:02d}"
+
+
+def _as_ratio(value: Union[int, float, str, Fraction]) -> Tuple[int, int]:
+    """
+    Convert a number to an exact (numerator, denominator) pair of ints.
+
+    Decimal strings are parsed digit by digit, avoiding a Fraction per call.
+
+    Args:
+        value: Number as int, float, Fraction or decimal string ("8.920000")
+
+    Returns:
+        Tuple[int, int]: Numerator and positive denominator
+    """
+    if isinstance(value, int):
+        return value, 1
+
+    if isinstance(value, str) and "e" not in value.lower():
+        whole, _, fraction = value.strip().partition(".")
+        if fraction:
+            digits = (
+                f"{whole}{fraction}"
+                if whole not in ("", "-", "+")
+                else f"{whole}0{fraction}"
+            )
+            return int(digits), 10 ** len(fraction)
+        return int(whole), 1
+
+    exact = value if isinstance(value, Fraction) else Fraction(str(value))
+    return exact.numerator, exact.denominator
+
+
+def seconds_to_frames(
+    seconds: Union[int, float, str, Fraction], rate: FrameRate = DEFAULT_FRAME_RATE
+) -> int:
+    """
+    Convert a time in seconds to the nearest frame count.
+
+    Strings such as ffprobe's pts_time ("8.920000") are converted exactly.
+
+    Args:
+        seconds: Time in seconds
+        rate: Frame rate
+
+    Returns:
+        int: Nearest frame count, halves rounded up
+    """
+    numerator, denominator = _as_ratio(seconds)
+    exact_rate = parse_frame_rate(rate)
+    numerator *= exact_rate.numerator
+    denominator *= exact_rate.denominator
+    return (numerator * 2 + denominator) // (denominator * 2)
+
+
+def milliseconds_to_frames(
+    milliseconds: Union[int, float, str, Fraction], rate: FrameRate = DEFAULT_FRAME_RATE
+) -> int:
+    """
+    Convert a duration in milliseconds to whole frames, rounding down.
+
+    Args:
+        milliseconds: Duration in milliseconds
+        rate: Frame rate
+
+    Returns:
+        int: Number of whole frames
+    """
+    numerator, denominator = _as_ratio(milliseconds)
+    exact_rate = parse_frame_rate(rate)
+    return (numerator * exact_rate.numerator) // (
+        denominator * exact_rate.denominator * 1000
+    )
+
+
+def frame_difference(
+    frames: int,
+    other_frames: int,
+    rate: FrameRate = DEFAULT_FRAME_RATE,
+    drop_frame: bool = False,
+) -> int:
+    """
+    Get the signed number of frames from one time of day to another.
+
+    Both values are taken modulo 24 hours and the shortest distance is
+    returned, so differences across midnight stay small.
+
+    Args:
+        frames: Frame count of the later time of day
+        other_frames: Frame count of the earlier time of day
+        rate: Frame rate
+        drop_frame: Whether the frame counts come from drop-frame timecode
+
+    Returns:
+        int: frames - other_frames, between minus and plus 12 hours
+    """
+    day = frames_per_day(rate, drop_frame)
+    difference = (frames - other_frames) % day
+
+    if difference >= day // 2:
+        difference -= day
+
+    return difference
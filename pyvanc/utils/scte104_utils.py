@@ -1,6 +1,10 @@
 """SCTE-104 utility functions."""
 
-from typing import Dict, Optional
+from typing import Any, Dict, Optional
+
+# Operations that carry a cue: splice_request_data, time_signal_request_data
+# and insert_segmentation_descriptor_request_data
+CUE_OPIDS = frozenset({0x0101, 0x0104, 0x010B})
 
 # Mapping of segmentation type IDs to descriptive names
 SEGMENTATION_TYPE_NAMES = {
@@ -91,6 +95,49 @@ def get_segmentation_type_name(type_id: int) -> str:
         return f"Unknown Type (0x{type_id:02x})"
 
 
+def is_keep_alive(message: Any) -> bool:
+    """Check whether a SCTE-104 message is a keep-alive without cue data.
+
+    Like the extract and analyze commands, only splices, time signals and
+    segmentation descriptors count as cues. Heartbeats such as
+    alive_request_data and splice_null_request_data do not.
+
+    Args:
+        message: Parsed SCTE104Message
+
+    Returns:
+        True if none of the operations of the message carries a cue
+    """
+    return not any(
+        operation.opid in CUE_OPIDS
+        or (operation.data and "segmentation_type_id" in operation.data)
+        for operation in message.operations
+    )
+
+
+def get_event_color(event_type: str) -> str:
+    """Get color for event based on type.
+
+    Args:
+        event_type: Event type name
+
+    Returns:
+        Color name for Rich formatting
+    """
+    if "Program Boundary" in event_type:
+        return "bright_green"
+    elif "Content Marker" in event_type:
+        return "bright_yellow"
+    elif "Advertisement" in event_type:
+        return "bright_cyan"
+    elif "Chapter" in event_type:
+        return "bright_magenta"
+    elif "Break" in event_type:
+        return "bright_red"
+    else:
+        return "bright_white"
+
+
 def get_upid_type_name(type_id: int) -> str:
     """Get descriptive name for a UPID type.
 
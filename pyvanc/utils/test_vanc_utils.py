@@ -0,0 +1,57 @@
+import datetime
+from fractions import Fraction
+
+import pytest
+
+from pyvanc.utils.vanc_utils import ClipTiming, parse_window, parse_window_time
+
+CREATION_TIME = datetime.datetime(2024, 5, 14, 6, 0, 0)
+
+
+def test_window_time_forms():
+    assert parse_window_time("90.5", "10:00:00:00") == Fraction(181, 2)
+    assert parse_window_time("10:01:00:05", "10:00:00:00") == Fraction(301, 5)
+    assert parse_window_time(
+        "2024-05-14T06:00:30+00:00", creation_time=CREATION_TIME
+    ) == Fraction(30)
+    assert parse_window_time(
+        "2024-05-14T07:59:30+02:00", creation_time=CREATION_TIME
+    ) == Fraction(-30)
+
+
+def test_timecodes_before_the_start_lie_after_midnight():
+    assert parse_window_time("00:00:10:00", "23:59:50:00") == Fraction(20)
+
+
+def test_drop_frame_timecodes_count_whole_frames():
+    # 00:01:00;02 is the first label after 00:00:59;29, frames ;00 and ;01 are dropped
+    seconds = parse_window_time("01:01:00;02", "01:00:59;29", rate="29.97")
+    assert seconds == Fraction(1001, 30000)
+
+
+@pytest.mark.parametrize(
+    "value, start_timecode, creation_time",
+    [
+        ("tomorrow", "10:00:00:00", CREATION_TIME),
+        ("10:00:00:00", None, CREATION_TIME),
+        ("2024-05-14T06:00:30Z", "10:00:00:00", None),
+    ],
+)
+def test_window_time_errors(value, start_timecode, creation_time):
+    with pytest.raises(ValueError):
+        parse_window_time(value, start_timecode, creation_time)
+
+
+def test_window_bounds():
+    assert parse_window(None, None) == (None, None)
+    assert parse_window("2024-05-14T05:00:00Z", "60", creation_time=CREATION_TIME) == (
+        Fraction(0),
+        Fraction(60),
+    )
+    with pytest.raises(ValueError):
+        parse_window("60", "30")
+
+
+def test_clip_timing_window_in_float_seconds():
+    timing = ClipTiming(25.0, "10:00:00:00", 36000.0, CREATION_TIME)
+    assert timing.window("10:00:01:12", "2024-05-14T06:01:00Z") == (1.48, 60.0)
@@ -2,9 +2,36 @@
 
 import datetime
 import json
-from typing import Any, Dict, List, Optional
+import logging
+import re
+from dataclasses import dataclass
+from fractions import Fraction
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 from ..models.vanc_packets import SCTE104Message, VANCPacket
+from .frame_timecode import (
+    FrameRate,
+    frames_per_day,
+    parse_frame_rate,
+    timecode_to_frames,
+)
+
+# NumPy is optional, the batch conversions fall back to plain Python without it
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# Formats tried after ISO 8601 when parsing a clip creation time
+CREATION_TIME_FORMATS = ("%Y-%m-%dT%H:%M:%S.%fZ", "%Y-%m-%d %H:%M:%S")
+
+# Forms of a time given on the command line, besides ISO 8601 UTC times:
+# "90", "90.5" seconds from the start of the file, and "HH:MM:SS:FF" or
+# drop-frame "HH:MM:SS;FF" times of day
+SECONDS_PATTERN = re.compile(r"^\d+(\.\d+)?$")
+TIMECODE_PATTERN = re.compile(r"^\d{1,2}:\d{2}:\d{2}[:;]\d+$")
 
 
 def calculate_parity(value: int) -> int:
@@ -84,6 +111,335 @@ def format_timecode(frames: int, framerate: float = 30, frame_offset: int = 0) -
     return f"{hours:02d}:{minutes:02d}:{seconds:02d}:{remaining_frames:02d}"
 
 
+def parse_creation_time(creation_time_str: str) -> Optional[datetime.datetime]:
+    """Parse a clip creation time as a naive UTC datetime.
+
+    Args:
+        creation_time_str: Creation time from the file metadata, e.g. "2024-05-14T13:05:00.000000Z"
+
+    Returns:
+        Creation time in UTC without tzinfo, or None if the format is not recognized
+    """
+    try:
+        creation_time = datetime.datetime.fromisoformat(
+            creation_time_str.replace("Z", "+00:00")
+        )
+    except ValueError:
+        for fmt in CREATION_TIME_FORMATS:
+            try:
+                creation_time = datetime.datetime.strptime(creation_time_str, fmt)
+                break
+            except ValueError:
+                continue
+        else:
+            return None
+
+    if creation_time.tzinfo is not None:
+        creation_time = creation_time.astimezone(datetime.timezone.utc).replace(
+            tzinfo=None
+        )
+
+    return creation_time
+
+
+def parse_timecode_seconds(timecode: str, framerate: float) -> Optional[float]:
+    """Convert a "HH:MM:SS:FF" timecode to seconds.
+
+    Args:
+        timecode: Timecode string, ";" is accepted as frame separator
+        framerate: Frames per second
+
+    Returns:
+        Seconds since 00:00:00:00, or None if the timecode cannot be parsed
+    """
+    try:
+        tc_parts = list(map(int, timecode.replace(";", ":").split(":")))
+    except ValueError:
+        return None
+
+    if len(tc_parts) != 4:
+        return None
+
+    hours, minutes, seconds, frames = tc_parts
+    return hours * 3600 + minutes * 60 + seconds + frames / framerate
+
+
+@dataclass(frozen=True)
+class ClipTiming:
+    """Timing information of a clip, parsed once and shared by the batch conversions."""
+
+    framerate: float = 25.0
+    start_timecode: str = "00:00:00:00"
+    start_seconds: float = 0.0
+    creation_time: Optional[datetime.datetime] = None  # Naive UTC
+
+    @classmethod
+    def from_timecode_info(
+        cls, timecode_info: Optional[Dict[str, Any]], framerate: float
+    ) -> "ClipTiming":
+        """Build the clip timing from the ffprobe metadata of a file.
+
+        Args:
+            timecode_info: Dictionary returned by get_mxf_timecode_info, may be None
+            framerate: Frames per second of the clip
+
+        Returns:
+            Clip timing with the parsed start timecode and creation time
+        """
+        if not timecode_info:
+            return cls(framerate=framerate)
+
+        start_timecode = timecode_info.get("start_timecode_str", "00:00:00:00")
+        start_seconds = parse_timecode_seconds(start_timecode, framerate)
+        if start_seconds is None:
+            logger.warning(f"Could not parse MXF start timecode: {start_timecode}")
+            start_seconds = 0.0
+
+        creation_time = None
+        creation_time_str = timecode_info.get(
+            "creation_time_utc_str", timecode_info.get("creation_time")
+        )
+        if creation_time_str:
+            creation_time = parse_creation_time(creation_time_str)
+            if creation_time is None:
+                logger.warning(f"Could not parse creation time: {creation_time_str}")
+
+        return cls(framerate, start_timecode, start_seconds, creation_time)
+
+    def window(
+        self, start: Optional[str], end: Optional[str]
+    ) -> Tuple[Optional[float], Optional[float]]:
+        """Convert the --start and --end bounds to seconds from the clip start.
+
+        Args:
+            start: Start of the window, None for the start of the clip
+            end: End of the window, None for the end of the clip
+
+        Returns:
+            Start and end of the window in seconds, None where no bound was given
+
+        Raises:
+            ValueError: If a bound cannot be converted or the window is empty,
+                see parse_window
+        """
+        start_seconds, end_seconds = parse_window(
+            start, end, self.start_timecode, self.creation_time, self.framerate
+        )
+        return (
+            None if start_seconds is None else float(start_seconds),
+            None if end_seconds is None else float(end_seconds),
+        )
+
+
+def parse_window_time(
+    value: str,
+    start_timecode: Optional[str] = None,
+    creation_time: Optional[datetime.datetime] = None,
+    rate: FrameRate = 25,
+) -> Fraction:
+    """Convert a time given on the command line to seconds from the start of a file.
+
+    Timecodes are converted with exact frame rates, so drop-frame timecodes
+    and NTSC rates give whole frames.
+
+    Args:
+        value: Seconds from the start of the file ("90.5"), time of day
+            timecode ("HH:MM:SS:FF" or "HH:MM:SS;FF") or UTC time (ISO 8601)
+        start_timecode: Start timecode of the file, needed for timecodes
+        creation_time: Creation time of the file as naive UTC, needed for UTC times
+        rate: Frame rate of the file
+
+    Returns:
+        Seconds from the first frame, negative for UTC times before the file
+
+    Raises:
+        ValueError: If the time cannot be parsed or the file lacks the metadata to convert it
+    """
+    value = value.strip()
+
+    if SECONDS_PATTERN.match(value):
+        return Fraction(value)
+
+    if TIMECODE_PATTERN.match(value):
+        if start_timecode is None:
+            raise ValueError(f"Cannot use timecode {value}, the file has no timecode")
+        # Times of day before the start timecode lie after midnight
+        frames = (
+            timecode_to_frames(value, rate) - timecode_to_frames(start_timecode, rate)
+        ) % frames_per_day(rate, ";" in start_timecode)
+        return Fraction(frames) / parse_frame_rate(rate)
+
+    utc_time = parse_creation_time(value)
+    if utc_time is None:
+        raise ValueError(
+            f"Cannot parse time '{value}', use seconds, HH:MM:SS:FF or ISO 8601 UTC"
+        )
+    if creation_time is None:
+        raise ValueError(f"Cannot use UTC time {value}, the file has no creation time")
+
+    return Fraction(
+        (utc_time - creation_time) // datetime.timedelta(microseconds=1), 1000000
+    )
+
+
+def parse_window(
+    start: Optional[str],
+    end: Optional[str],
+    start_timecode: Optional[str] = None,
+    creation_time: Optional[datetime.datetime] = None,
+    rate: FrameRate = 25,
+) -> Tuple[Optional[Fraction], Optional[Fraction]]:
+    """Convert the window bounds given for a file to seconds from its first frame.
+
+    Used by the pyvanc commands and by the MXF decoder, see parse_window_time.
+
+    Args:
+        start: Start of the window, None for the start of the file
+        end: End of the window (exclusive), None for the end of the file
+        start_timecode: Start timecode of the file, needed for timecodes
+        creation_time: Creation time of the file as naive UTC, needed for UTC times
+        rate: Frame rate of the file
+
+    Returns:
+        Start and end in seconds, None where no bound was given. Starts
+        before the file are moved to its first frame.
+
+    Raises:
+        ValueError: If a bound cannot be converted or the window is empty
+    """
+    start_seconds = None
+    if start is not None:
+        start_seconds = max(
+            Fraction(0), parse_window_time(start, start_timecode, creation_time, rate)
+        )
+
+    end_seconds = None
+    if end is not None:
+        end_seconds = parse_window_time(end, start_timecode, creation_time, rate)
+        if end_seconds <= (start_seconds or 0):
+            raise ValueError(f"The window ends at {end}, before it starts")
+
+    return start_seconds, end_seconds
+
+
+def pts_to_frame_counts(pts_times: Sequence[float], framerate: float) -> List[int]:
+    """Convert presentation times to timecode frame counts in bulk.
+
+    A frame count is the number of whole seconds times the nominal frame rate
+    plus the truncated frame within the second, matching the timecode strings.
+
+    Args:
+        pts_times: Presentation times in seconds
+        framerate: Frames per second
+
+    Returns:
+        Frame counts since 00:00:00:00
+    """
+    nominal = round(framerate)
+
+    if np is not None:
+        pts = np.asarray(pts_times, dtype=np.float64)
+        seconds = np.trunc(pts)
+        frames = np.trunc((pts - seconds) * framerate)
+        return (seconds.astype(np.int64) * nominal + frames.astype(np.int64)).tolist()
+
+    frame_counts = []
+    for pts_time in pts_times:
+        seconds = int(pts_time)
+        frame_counts.append(seconds * nominal + int((pts_time - seconds) * framerate))
+    return frame_counts
+
+
+def frame_counts_to_timecodes(
+    frame_counts: Sequence[int], framerate: float
+) -> List[str]:
+    """Format frame counts as "HH:MM:SS:FF" timecode strings in bulk.
+
+    Args:
+        frame_counts: Frame counts since 00:00:00:00
+        framerate: Frames per second
+
+    Returns:
+        Timecode strings
+    """
+    nominal = round(framerate)
+
+    if np is not None:
+        frame_array = np.asarray(frame_counts, dtype=np.int64)
+        total_seconds, frames = np.divmod(frame_array, nominal)
+        total_minutes, seconds = np.divmod(total_seconds, 60)
+        hours, minutes = np.divmod(total_minutes, 60)
+
+        fixed_width = frame_array.size and nominal <= 100
+        if fixed_width and 0 <= hours.min() and hours.max() < 100:
+            # Write the digits of all timecodes into one fixed-width byte array
+            characters = np.full((frame_array.size, 11), ord(":"), dtype=np.uint8)
+            for column, values in ((0, hours), (3, minutes), (6, seconds), (9, frames)):
+                characters[:, column] = values // 10 + ord("0")
+                characters[:, column + 1] = values % 10 + ord("0")
+            return characters.view("S11").ravel().astype("U11").tolist()
+
+        fields = zip(
+            hours.tolist(), minutes.tolist(), seconds.tolist(), frames.tolist()
+        )
+    else:
+        fields = []
+        for frame_count in frame_counts:
+            total_seconds, frames = divmod(frame_count, nominal)
+            total_minutes, seconds = divmod(total_seconds, 60)
+            hours, minutes = divmod(total_minutes, 60)
+            fields.append((hours, minutes, seconds, frames))
+
+    return [f"{h:02d}:{m:02d}:{s:02d}:{f:02d}" for h, m, s, f in fields]
+
+
+def pts_to_timecodes(pts_times: Sequence[float], framerate: float) -> List[str]:
+    """Convert presentation times to "HH:MM:SS:FF" timecode strings in bulk.
+
+    Args:
+        pts_times: Presentation times in seconds
+        framerate: Frames per second
+
+    Returns:
+        Timecode strings
+    """
+    frame_counts = pts_to_frame_counts(pts_times, framerate)
+    return frame_counts_to_timecodes(frame_counts, framerate)
+
+
+def pts_to_utc_strings(
+    pts_times: Sequence[float], creation_time: datetime.datetime
+) -> List[str]:
+    """Convert presentation times to UTC time strings in bulk.
+
+    Args:
+        pts_times: Presentation times in seconds relative to the clip start
+        creation_time: Clip creation time as naive UTC datetime
+
+    Returns:
+        UTC strings formatted as "YYYY-MM-DD HH:MM:SS.mmmZ"
+    """
+    if np is not None:
+        offsets = np.rint(np.asarray(pts_times, dtype=np.float64) * 1e6)
+        event_times = np.datetime64(creation_time, "us") + offsets.astype(
+            np.int64
+        ).astype("timedelta64[us]")
+        # Truncate to milliseconds like the strftime formatting below
+        event_times = event_times.astype("datetime64[ms]")
+        return [
+            f"{value.replace('T', ' ')}Z"
+            for value in np.datetime_as_string(event_times, unit="ms").tolist()
+        ]
+
+    return [
+        (creation_time + datetime.timedelta(seconds=pts_time)).strftime(
+            "%Y-%m-%d %H:%M:%S.%f"
+        )[:-3]
+        + "Z"
+        for pts_time in pts_times
+    ]
+
+
 def format_vanc_data(packet: VANCPacket) -> str:
     """Format VANC packet data as a readable string.
 
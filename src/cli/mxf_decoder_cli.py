@@ -5,7 +5,26 @@ from pathlib import Path
 from typing import List, Optional
 
 from ..decoders.mxf_decoder import MXFDecoder
-from ..utils.html_generator import generate_html_viewer
+from ..services.ffmpeg_service import (
+    DEFAULT_THUMBNAIL_WORKERS,
+    IMAGE_FORMAT_JPG,
+    IMAGE_FORMATS,
+    THUMBNAIL_MODE_FRAMES,
+    THUMBNAIL_MODES,
+    THUMBNAIL_STRATEGIES,
+    THUMBNAIL_STRATEGY_SEEK,
+    FFMPEGService,
+    ImageSettings,
+)
+from ..services.thumbnail_cache import CACHE_FOLDER_NAME
+from ..services.watch_folder import (
+    DEFAULT_POLL_INTERVAL,
+    DEFAULT_STABLE_POLLS,
+    DEFAULT_WATCH_WORKERS,
+    WatchFolder,
+    write_folder_atomically,
+)
+from ..utils.html_generator import generate_html_viewer, generate_virtual_html_viewer
 
 # Configure logging
 logging.basicConfig(
@@ -14,6 +33,91 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def add_decoder_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    Add the decoding and thumbnail options shared by all modes.
+
+    Args:
+        parser: Parser to add the options to
+    """
+    parser.add_argument(
+        "-p",
+        "--padding",
+        help="Number of frames to include before and after each identified frame",
+        type=int,
+        default=2,
+    )
+
+    parser.add_argument(
+        "--strategy",
+        help="Thumbnail extraction strategy: one seeking ffmpeg job per frame range "
+        "(seek), a single full-decode select filter (select) or in-process PyAV "
+        "decoding with a shared frame cache (frameserver)",
+        choices=THUMBNAIL_STRATEGIES,
+        default=THUMBNAIL_STRATEGY_SEEK,
+    )
+
+    parser.add_argument(
+        "-w",
+        "--workers",
+        help="Maximum number of concurrent ffmpeg jobs for the seek strategy",
+        type=int,
+        default=DEFAULT_THUMBNAIL_WORKERS,
+    )
+
+    parser.add_argument(
+        "--thumbnails",
+        help="Write one image per frame (frames) or one tiled sprite sheet per "
+        "event group (sprites)",
+        choices=THUMBNAIL_MODES,
+        default=THUMBNAIL_MODE_FRAMES,
+    )
+
+    parser.add_argument(
+        "--image-format",
+        help="Thumbnail image format, webp and avif fall back to jpg if ffmpeg "
+        "has no encoder for them",
+        choices=IMAGE_FORMATS,
+        default=IMAGE_FORMAT_JPG,
+    )
+
+    parser.add_argument(
+        "--image-width",
+        help="Downscale thumbnails to this width (default: source width)",
+        type=int,
+        default=None,
+    )
+
+    parser.add_argument(
+        "--image-quality",
+        help="Thumbnail quality from 1 to 100 (default: encoder default)",
+        type=int,
+        default=None,
+    )
+
+    parser.add_argument(
+        "--full-res-triggers",
+        help="Also write a full-resolution image of every SCTE trigger frame",
+        action="store_true",
+    )
+
+    parser.add_argument(
+        "--cache-dir",
+        help="Thumbnail cache directory (default: .thumbnail_cache in the output folder)",
+        default=None,
+    )
+
+    parser.add_argument(
+        "--no-cache",
+        help="Re-extract all thumbnails instead of reusing cached ones",
+        action="store_true",
+    )
+
+    parser.add_argument(
+        "-v", "--verbose", help="Enable verbose output", action="store_true"
+    )
+
+
 def parse_args(args: Optional[List[str]] = None) -> argparse.Namespace:
     """
     Parse command-line arguments.
@@ -25,7 +129,8 @@ def parse_args(args: Optional[List[str]] = None) -> argparse.Namespace:
         argparse.Namespace: Parsed arguments
     """
     parser = argparse.ArgumentParser(
-        description="MXF decoder for extracting SCTE-104 messages and generating frame thumbnails"
+        description="MXF decoder for extracting SCTE-104 messages and generating frame thumbnails",
+        epilog="Use 'watch <directory>' to process MXF files as they arrive in a folder",
     )
 
     parser.add_argument("filename", help="Path to the MXF file")
@@ -34,25 +139,190 @@ def parse_args(args: Optional[List[str]] = None) -> argparse.Namespace:
         "-o", "--output", help="Custom output folder path", default=None
     )
 
+    add_decoder_arguments(parser)
+
     parser.add_argument(
-        "-p",
-        "--padding",
-        help="Number of frames to include before and after each identified frame",
-        type=int,
-        default=2,
+        "--start",
+        help="Only decode from this time: seconds from the start of the file, "
+        "time of day (HH:MM:SS:FF) or UTC time (ISO 8601)",
+        default=None,
     )
 
     parser.add_argument(
-        "-v", "--verbose", help="Enable verbose output", action="store_true"
+        "--end",
+        help="Only decode up to this time (exclusive), in the same forms as --start",
+        default=None,
     )
 
     parser.add_argument(
         "--html", help="Generate HTML viewer for the results", action="store_true"
     )
 
+    parser.add_argument(
+        "--viewer",
+        help="HTML viewer to generate: every frame inlined in index.html (classic) "
+        "or a small page rendering only the events in view from events.json "
+        "(virtual, needs to be served over HTTP)",
+        choices=("classic", "virtual"),
+        default="classic",
+    )
+
     return parser.parse_args(args)
 
 
+def parse_watch_args(args: List[str]) -> argparse.Namespace:
+    """
+    Parse the command-line arguments of the watch mode.
+
+    Args:
+        args: Command-line arguments after "watch"
+
+    Returns:
+        argparse.Namespace: Parsed arguments
+    """
+    parser = argparse.ArgumentParser(
+        prog="main.py watch",
+        description="Watch a folder and decode every MXF file once it is completely written",
+    )
+
+    parser.add_argument("directory", help="Folder to watch for MXF files")
+
+    parser.add_argument(
+        "-o",
+        "--output",
+        help="Folder for the results, one subfolder per MXF file",
+        default="results",
+    )
+
+    add_decoder_arguments(parser)
+
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        help="Maximum number of MXF files decoded at the same time",
+        type=int,
+        default=DEFAULT_WATCH_WORKERS,
+    )
+
+    parser.add_argument(
+        "--poll-interval",
+        help="Seconds between scans of the watched folder",
+        type=float,
+        default=DEFAULT_POLL_INTERVAL,
+    )
+
+    parser.add_argument(
+        "--stable-polls",
+        help="Number of scans a file must keep its size before it is decoded",
+        type=int,
+        default=DEFAULT_STABLE_POLLS,
+    )
+
+    parser.add_argument(
+        "--no-thumbnails",
+        help="Only extract and analyze the SCTE-104 messages, without thumbnails",
+        action="store_true",
+    )
+
+    parser.add_argument(
+        "--recursive", help="Also watch subfolders", action="store_true"
+    )
+
+    parser.add_argument(
+        "--state-file",
+        help="File remembering the processed MXF files (default: .watch_state.json in the output folder)",
+        default=None,
+    )
+
+    parser.add_argument(
+        "--once",
+        help="Decode the files in the folder and exit instead of watching",
+        action="store_true",
+    )
+
+    return parser.parse_args(args)
+
+
+def create_decoder(parsed_args: argparse.Namespace) -> MXFDecoder:
+    """
+    Create an MXF decoder configured from the command-line options.
+
+    Args:
+        parsed_args: Parsed arguments with the decoder options
+
+    Returns:
+        MXFDecoder: Configured decoder
+    """
+    return MXFDecoder(
+        FFMPEGService(
+            thumbnail_strategy=parsed_args.strategy,
+            max_workers=parsed_args.workers,
+            use_cache=not parsed_args.no_cache,
+            cache_dir=parsed_args.cache_dir,
+            thumbnail_mode=parsed_args.thumbnails,
+            image_settings=ImageSettings(
+                parsed_args.image_format,
+                parsed_args.image_width,
+                parsed_args.image_quality,
+            ),
+            full_res_triggers=parsed_args.full_res_triggers,
+        )
+    )
+
+
+def watch(args: List[str]) -> int:
+    """
+    Run the watch mode: decode MXF files as they arrive in a folder.
+
+    Every file is decoded into a staging folder that replaces
+    <output>/<file stem> only once decoding succeeded.
+
+    Args:
+        args: Command-line arguments after "watch"
+
+    Returns:
+        int: Exit code (0 for success, non-zero for error)
+    """
+    parsed_args = parse_watch_args(args)
+    setup_logging(parsed_args.verbose)
+
+    directory = Path(parsed_args.directory)
+    if not directory.is_dir():
+        logger.error(f"Folder does not exist: {directory}")
+        return 1
+
+    output_root = Path(parsed_args.output)
+    state_file = parsed_args.state_file or output_root / ".watch_state.json"
+    if parsed_args.cache_dir is None:
+        # Staging folders are new for every file, so share one cache between them
+        parsed_args.cache_dir = str(output_root / CACHE_FOLDER_NAME)
+
+    def process(file_path: Path) -> bool:
+        # One decoder per file, the FFmpeg service keeps per-file state
+        decoder = create_decoder(parsed_args)
+        return write_folder_atomically(
+            output_root / file_path.stem,
+            lambda staging: decoder.decode(
+                str(file_path),
+                str(staging),
+                parsed_args.padding,
+                thumbnails=not parsed_args.no_thumbnails,
+            ),
+        )
+
+    WatchFolder(
+        directory,
+        process,
+        state_file=state_file,
+        poll_interval=parsed_args.poll_interval,
+        stable_polls=parsed_args.stable_polls,
+        max_workers=parsed_args.jobs,
+        recursive=parsed_args.recursive,
+    ).run(once=parsed_args.once)
+
+    return 0
+
+
 def setup_logging(verbose: bool) -> None:
     """
     Set up logging based on verbosity.
@@ -86,6 +356,11 @@ def main(args: Optional[List[str]] = None) -> int:
     Returns:
         int: Exit code (0 for success, non-zero for error)
     """
+    if args is None:
+        args = sys.argv[1:]
+    if args and args[0] == "watch":
+        return watch(args[1:])
+
     parsed_args = parse_args(args)
 
     # Set up logging
@@ -101,7 +376,7 @@ def main(args: Optional[List[str]] = None) -> int:
         output_folder = Path("results") / file_path.stem
 
     # Create MXF decoder
-    decoder = MXFDecoder()
+    decoder = create_decoder(parsed_args)
 
     # Decode MXF file
     try:
@@ -109,13 +384,23 @@ def main(args: Optional[List[str]] = None) -> int:
             parsed_args.filename,
             str(output_folder) if parsed_args.output else None,
             parsed_args.padding,
+            start=parsed_args.start,
+            end=parsed_args.end,
         )
 
         if success:
             logger.info(f"Successfully decoded MXF file: {parsed_args.filename}")
 
             # Generate HTML viewer if requested
-            if parsed_args.html:
+            if parsed_args.html and parsed_args.viewer == "virtual":
+                logger.info("Generating virtualized HTML viewer...")
+                generate_virtual_html_viewer(output_folder, parsed_args.filename)
+                logger.info(f"HTML viewer generated at {output_folder / 'index.html'}")
+                logger.info(
+                    f"Serve it with: python -m http.server -d {output_folder} "
+                    "and open http://localhost:8000/"
+                )
+            elif parsed_args.html:
                 logger.info("Generating HTML viewer...")
                 generate_html_viewer(output_folder, parsed_args.filename)
                 logger.info(f"HTML viewer generated at {output_folder / 'index.html'}")
@@ -5,14 +5,25 @@ This module provides classes and functions to decode MXF files and extract
 relevant SCTE-104 messages and frame data.
 """
 
+import contextlib
+import json
 import logging
 import sys
 from pathlib import Path
-from typing import Any, Dict, List, NamedTuple, Optional
+from typing import Any, Dict, Generator, Iterable, List, NamedTuple, Optional
+
+from pyvanc.utils.frame_timecode import frame_difference, frames_to_timecode
 
 from ..models.splice_event import SCTE104Packet
-from ..services.ffmpeg_service import FFMPEGFrameData, FFMPEGService
+from ..services.ffmpeg_service import (
+    THUMBNAIL_STRATEGY_SELECT,
+    FFMPEGFrameData,
+    FFMPEGService,
+    Packet,
+)
+from ..services.thumbnail_scheduler import ThumbnailScheduler
 from ..utils.scte104_utils import decode_SCTE104
+from ..utils.time_window import TimeWindow, resolve_window
 
 # Configure logging
 logging.basicConfig(
@@ -46,14 +57,25 @@ class MXFDecoder:
         filename: str,
         output_folder: Optional[str] = None,
         padding: int = DEFAULT_PADDING,
+        thumbnails: bool = True,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
     ) -> bool:
         """
         Decode an MXF file and extract SCTE-104 messages.
 
+        With start or end, only the packets inside that window are read from
+        the file. Both are given as seconds from the start of the file, as a
+        time of day timecode (HH:MM:SS:FF) or as a UTC time (ISO 8601).
+
         Args:
             filename: Path to the MXF file
             output_folder: Custom output folder path. If not provided, a default one will be created.
             padding: Number of frames to include before and after each identified frame
+            thumbnails: Whether to extract thumbnails. Without thumbnails, the
+                        SCTE-104 frames are written to scte104_frames.json instead.
+            start: Start of the window to decode, defaults to the start of the file
+            end: End of the window to decode (exclusive), defaults to the end of the file
 
         Returns:
             bool: True if decoding was successful, False otherwise
@@ -65,27 +87,65 @@ class MXFDecoder:
             logger.error(f"File does not exist: {filename}")
             return False
 
+        window = self._resolve_window(filename, start, end)
+        if window is None:
+            return False
+
         # Set up output folder
         results_folder = self._setup_output_folder(file_path, output_folder)
 
-        # Analyze file with ffprobe
-        output_file = results_folder / "output.json"
-        if not output_file.is_file():
+        # Analyze file with ffprobe, keeping the results of each window apart
+        output_name = "output.json"
+        if window.is_limited:
+            first_frame, end_frame = window.frame_range(self.ffmpeg_service.frame_rate)
+            last = str(end_frame) if end_frame >= 0 else "end"
+            output_name = f"output_{first_frame}-{last}.json"
+            logger.info(f"Decoding frames {first_frame} to {last} of {filename}")
+
+        output_file = results_folder / output_name
+        if output_file.is_file():
+            # Parse ffprobe output
+            logger.info("Parsing ffprobe output")
+            ffprobe_output = self.ffmpeg_service.parse_ffprobe_json_output(output_file)
+
+            if ffprobe_output is None:
+                logger.error(f"Error parsing ffprobe output for {filename}")
+                return False
+        else:
             logger.info(
                 f"No previous ffprobe result found. Analyzing MXF file: {filename}"
             )
-            self.ffmpeg_service.analyze_and_save_json(results_folder, filename)
+            # Packets are processed while ffprobe reads the file
+            ffprobe_output = self.ffmpeg_service.iter_packets(
+                filename, window, output_file
+            )
 
-        # Parse ffprobe output
-        logger.info("Parsing ffprobe output")
-        ffprobe_output = self.ffmpeg_service.parse_ffprobe_json_output(output_file)
+        # Render the thumbnails of finished event groups while the scan continues
+        scheduler = None
+        if thumbnails and self._can_schedule_thumbnails():
+            scheduler = ThumbnailScheduler(
+                self.ffmpeg_service, filename, results_folder, padding
+            )
 
-        if ffprobe_output is None:
-            logger.error(f"Error parsing ffprobe output for {filename}")
+        # Process SCTE-104 packets
+        try:
+            with scheduler or contextlib.nullcontext():
+                frame_data = self._scan_packets(ffprobe_output, window, scheduler)
+        except RuntimeError as e:
+            logger.error(f"Error analyzing {filename}: {e}")
             return False
+        finally:
+            if isinstance(ffprobe_output, Generator):
+                ffprobe_output.close()
 
-        # Process SCTE-104 packets
-        frame_data = self._process_scte104_packets(ffprobe_output)
+        if scheduler is not None:
+            logger.info(
+                f"Rendered {scheduler.scheduled_groups} event groups during the scan"
+            )
+
+        if not thumbnails:
+            self._save_frame_data(frame_data, results_folder)
+            return True
 
         # Generate thumbnails
         logger.info("Extracting frame thumbnails")
@@ -99,6 +159,91 @@ class MXFDecoder:
 
         return True
 
+    def _resolve_window(
+        self, filename: str, start: Optional[str], end: Optional[str]
+    ) -> Optional[TimeWindow]:
+        """
+        Convert the window bounds to seconds from the first frame of the file.
+
+        Args:
+            filename: Path to the MXF file
+            start: Start of the window, None for the start of the file
+            end: End of the window, None for the end of the file
+
+        Returns:
+            Optional[TimeWindow]: Window to decode, or None if it is invalid
+        """
+        if start is None and end is None:
+            return TimeWindow()
+
+        # Timecodes and UTC times need the start timecode and creation time
+        format_info = self.ffmpeg_service.probe_format(filename)
+        if format_info is None:
+            return None
+
+        try:
+            return resolve_window(
+                start,
+                end,
+                format_info.get("tags", {}),
+                self.ffmpeg_service.frame_rate,
+            )
+        except ValueError as e:
+            logger.error(f"Invalid window for {filename}: {e}")
+            return None
+
+    def _can_schedule_thumbnails(self) -> bool:
+        """
+        Check whether thumbnails can be rendered per event group during the scan.
+
+        Groups are rendered into the thumbnail cache, so the cache must be
+        enabled. The select strategy decodes the whole file in every run, so
+        it renders all groups in a single run after the scan instead.
+
+        Returns:
+            bool: True if event groups can be scheduled during the scan
+        """
+        return (
+            self.ffmpeg_service.use_cache
+            and self.ffmpeg_service.thumbnail_strategy != THUMBNAIL_STRATEGY_SELECT
+        )
+
+    def _scan_packets(
+        self,
+        packets: Iterable[Packet],
+        window: TimeWindow,
+        scheduler: Optional[ThumbnailScheduler] = None,
+    ) -> List[FFMPEGFrameData]:
+        """
+        Process SCTE-104 packets as they are read and extract frame data.
+
+        Args:
+            packets: SCTE-104 packets from ffprobe, in file order
+            window: Part of the file to decode
+            scheduler: Scheduler to hand the event frames to, if any
+
+        Returns:
+            List[FFMPEGFrameData]: List of frame data with SCTE-104 information
+        """
+        frame_data = []
+        frame_rate = self.ffmpeg_service.frame_rate
+
+        logger.info("Processing SCTE-104 packets")
+        for packet in packets:
+            # ffprobe starts reading at the key frame before the window
+            if window.is_limited and not window.contains_frame(
+                packet.pts_frames, frame_rate
+            ):
+                continue
+
+            frames = self._process_scte104_packet(packet)
+            frame_data.extend(frames)
+            if scheduler is not None:
+                scheduler.add(frames, packet.pts_frame_number)
+
+        # Sort frames by frame number
+        return sorted(frame_data, key=lambda x: x.frame_number)
+
     def _setup_output_folder(
         self, file_path: Path, custom_folder: Optional[str] = None
     ) -> Path:
@@ -120,83 +265,114 @@ class MXFDecoder:
         output_folder.mkdir(parents=True, exist_ok=True)
         return output_folder
 
-    def _process_scte104_packets(
-        self, scte104_packets: List[Any]
-    ) -> List[FFMPEGFrameData]:
+    def _save_frame_data(
+        self, frame_data: List[FFMPEGFrameData], results_folder: Path
+    ) -> None:
         """
-        Process SCTE-104 packets and extract frame data.
+        Write the SCTE-104 frames of a file to scte104_frames.json.
 
         Args:
-            scte104_packets: List of SCTE-104 packets from ffprobe
+            frame_data: Frame data from _scan_packets
+            results_folder: Output folder
+        """
+        frames = []
+        for frame in frame_data:
+            frame_dict = {
+                "frame_number": frame.frame_number,
+                "marker_type": frame.marker_type,
+            }
+            if frame.frame_text_data:
+                frame_dict["splice_event_timestamp"] = (
+                    frame.frame_text_data.splice_event_timestamp
+                )
+                frame_dict["scte104"] = frame.frame_text_data.to_dict()
+            frames.append(frame_dict)
 
-        Returns:
-            List[FFMPEGFrameData]: List of frame data with SCTE-104 information
+        with open(results_folder / "scte104_frames.json", "w") as f:
+            json.dump({"frames": frames}, f, indent=2)
+
+    def _process_scte104_packet(self, packet: Packet) -> List[FFMPEGFrameData]:
         """
-        frame_data = []
+        Extract the frame data of one SCTE-104 packet.
 
-        logger.info("Processing SCTE-104 packets")
-        for packet in scte104_packets:
-            # Strip DID, SDID, DBN, DC from the packet - next decoding step expects only UDW
-            result = decode_SCTE104(packet.anc_data[8:])
-
-            if result.as_dict["timestamp"]["time_type"] == 0:
-                # Immediate trigger with no timestamp information
-                frame_data.append(
-                    FFMPEGFrameData(packet.pts_frame_number, "Announcement Frame", None)
-                )
-                logger.info(
-                    f"Frame: {packet.pts_frame_number} - File timestamp: {packet.pts_time} - "
-                    f'UTC timestamp: {packet.utc_time} - Message type: {result.as_dict["reserved"]["type"]}'
-                )
-                logger.debug(f"Immediate trigger:\n{result}")
+        Args:
+            packet: SCTE-104 packet from ffprobe
 
-            elif result.as_dict["timestamp"]["time_type"] == 1:
-                # Keep alive message
-                logger.info(
-                    f"Frame: {packet.pts_frame_number} - File timestamp: {packet.pts_time} - "
-                    f'UTC timestamp: {packet.utc_time} - Message type: {result.as_dict["reserved"]["type"]}'
-                )
-                logger.debug(f"Keep alive message:\n{result}")
+        Returns:
+            List[FFMPEGFrameData]: Frame data of the packet, empty for keep alive messages
+        """
+        frame_data = []
+        frame_rate = self.ffmpeg_service.frame_rate
 
-            elif (
-                result.as_dict["timestamp"]["time_type"] == 2
-                and result.as_dict["reserved"]["type"] != "alive_request_data"
-            ):
-                logger.info(f"New SCTE-104 packet at frame {packet.pts_frame_number}")
-                logger.debug(f"Raw decode:\n{result}")
+        # Strip DID, SDID, DBN, DC from the packet - next decoding step expects only UDW
+        result = decode_SCTE104(packet.anc_data[8:])
 
-                # Add announcement frame - the frame where the upcoming trigger was announced
-                frame_data.append(
-                    FFMPEGFrameData(packet.pts_frame_number, "Announcement Frame", None)
-                )
+        if result.as_dict["timestamp"]["time_type"] == 0:
+            # Immediate trigger with no timestamp information
+            frame_data.append(
+                FFMPEGFrameData(packet.pts_frame_number, "Announcement Frame", None)
+            )
+            logger.info(
+                f"Frame: {packet.pts_frame_number} - "
+                f"File timestamp: {frames_to_timecode(packet.pts_frames, frame_rate)} - "
+                f"UTC timestamp: {frames_to_timecode(packet.utc_frames, frame_rate)} - "
+                f'Message type: {result.as_dict["reserved"]["type"]}'
+            )
+            logger.debug(f"Immediate trigger:\n{result}")
 
-                # Calculate driver margin (time taken to announce the SCTE packet)
-                driver_margin = result.get_splice_event_timestamp() - packet.utc_time
+        elif result.as_dict["timestamp"]["time_type"] == 1:
+            # Keep alive message
+            logger.info(
+                f"Frame: {packet.pts_frame_number} - "
+                f"File timestamp: {frames_to_timecode(packet.pts_frames, frame_rate)} - "
+                f"UTC timestamp: {frames_to_timecode(packet.utc_frames, frame_rate)} - "
+                f'Message type: {result.as_dict["reserved"]["type"]}'
+            )
+            logger.debug(f"Keep alive message:\n{result}")
+
+        elif (
+            result.as_dict["timestamp"]["time_type"] == 2
+            and result.as_dict["reserved"]["type"] != "alive_request_data"
+        ):
+            logger.info(f"New SCTE-104 packet at frame {packet.pts_frame_number}")
+            logger.debug(f"Raw decode:\n{result}")
+
+            # Add announcement frame - the frame where the upcoming trigger was announced
+            frame_data.append(
+                FFMPEGFrameData(packet.pts_frame_number, "Announcement Frame", None)
+            )
 
-                # Calculate actual transition frame number
-                transition_frame = packet.pts_frame_number + driver_margin.frames
+            # Calculate driver margin (frames between injection and transition),
+            # negative if the splice event time lies before the injection time
+            splice_event_frames = result.get_splice_event_frames()
+            driver_margin = frame_difference(
+                splice_event_frames, packet.utc_frames, frame_rate
+            )
 
-                # Create SCTE-104 packet with relevant data
-                scte104_packet = SCTE104Packet(
-                    result.get_splice_event_timestamp(),
-                    result.get_pre_roll_time(),
-                    result.get_segmentation_event_id(),
-                    result.get_duration(),
-                    result.get_segmentation_upid(),
-                    result.get_segmentation_type_id(),
-                )
+            # Calculate actual transition frame number
+            transition_frame = packet.pts_frame_number + driver_margin
+
+            # Create SCTE-104 packet with relevant data
+            scte104_packet = SCTE104Packet(
+                frames_to_timecode(splice_event_frames, frame_rate),
+                result.get_pre_roll_time(),
+                result.get_segmentation_event_id(),
+                result.get_duration(),
+                result.get_segmentation_upid(),
+                result.get_segmentation_type_id(),
+            )
 
-                # Add the actual SCTE transition frame
-                frame_data.append(
-                    FFMPEGFrameData(transition_frame, "SCTE Trigger", scte104_packet)
-                )
+            # Add the actual SCTE transition frame
+            frame_data.append(
+                FFMPEGFrameData(transition_frame, "SCTE Trigger", scte104_packet)
+            )
 
-                logger.info(
-                    f"Frame: {packet.pts_frame_number} - File timestamp: {packet.pts_time}\n"
-                    f"Injection timestamp (UTC): {packet.utc_time}\n"
-                    f"Transition frame: {transition_frame} - Splice event timestamp: {result.get_splice_event_timestamp()}"
-                )
-                logger.debug(f"SCTE-104 packet details:\n{scte104_packet}")
+            logger.info(
+                f"Frame: {packet.pts_frame_number} - "
+                f"File timestamp: {frames_to_timecode(packet.pts_frames, frame_rate)}\n"
+                f"Injection timestamp (UTC): {frames_to_timecode(packet.utc_frames, frame_rate)}\n"
+                f"Transition frame: {transition_frame} - Splice event timestamp: {scte104_packet.splice_event_timestamp}"
+            )
+            logger.debug(f"SCTE-104 packet details:\n{scte104_packet}")
 
-        # Sort frames by frame number
-        return sorted(frame_data, key=lambda x: x.frame_number)
+        return frame_data
@@ -7,13 +7,17 @@ This module provides classes to represent SCTE-104 splice events and related dat
 import copy
 import json
 import logging
-from dataclasses import dataclass
-from string import Template
-from typing import Any, Dict, Optional, Union
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
 
 import bitstring
-from dataclasses_json import LetterCase, Undefined, dataclass_json
-from timecode import Timecode
+from dataclasses_json import LetterCase, Undefined, config, dataclass_json
+
+from pyvanc.utils.frame_timecode import (
+    frames_to_timecode,
+    milliseconds_to_frames,
+    timecode_to_frames,
+)
 
 # Try importing from official scte module if available
 try:
@@ -72,12 +76,27 @@ class SCTE104Packet:
     with only the most important fields for easier handling and serialization.
     """
 
-    splice_event_timestamp: Union[str, Timecode]
+    splice_event_timestamp: Optional[str]
     pre_roll_time: int
     segmentation_event_id: int
     duration: int
     segmentation_upid: str
     segmentation_type: Dict[str, Any]
+    # Splice event time as a frame count since 00:00:00:00, None without a
+    # timestamp. Parsed once from the timestamp, which is what is serialized.
+    splice_event_frames: Optional[int] = field(
+        init=False,
+        repr=False,
+        compare=False,
+        metadata=config(exclude=lambda _: True),
+    )
+
+    def __post_init__(self) -> None:
+        frames = None
+        if self.splice_event_timestamp is not None:
+            frames = timecode_to_frames(self.splice_event_timestamp, FRAME_RATE)
+        # The dataclass is frozen
+        object.__setattr__(self, "splice_event_frames", frames)
 
 
 class SpliceEvent:
@@ -324,42 +343,54 @@ class SpliceEvent:
         """
         return self.as_dict["ops"][0]["data"]["pre_roll_time"]
 
-    def get_splice_event_timestamp(self) -> Timecode:
+    def get_splice_event_frames(self) -> Optional[int]:
         """
-        Get the splice event timestamp from the SpliceEvent.
+        Get the splice event time from the SpliceEvent as a frame count.
 
         Returns:
-            Timecode: Splice event timestamp
+            Optional[int]: Frames since 00:00:00:00 of the transition point
+                           (announced timestamp + preroll), or None if the
+                           time type is not supported
         """
         if self.as_dict["timestamp"]["time_type"] == 2:
-            splice_event_template = Template("${hours}:${minutes}:${seconds}:${frames}")
-            hours = int(self.as_dict["timestamp"]["hours"])
-            minutes = int(self.as_dict["timestamp"]["minutes"])
-            seconds = int(self.as_dict["timestamp"]["seconds"])
-            frames = int(self.as_dict["timestamp"]["frames"])
+            timestamp = self.as_dict["timestamp"]
+            hours = int(timestamp["hours"])
+            minutes = int(timestamp["minutes"])
+            seconds = int(timestamp["seconds"])
+            frames = int(timestamp["frames"])
 
-            splice_event_timestamp = Timecode(
-                FRAME_RATE,
-                splice_event_template.substitute(
-                    hours=hours, minutes=minutes, seconds=seconds, frames=frames
-                ),
-            )
+            splice_event_frames = (
+                (hours * 60 + minutes) * 60 + seconds
+            ) * FRAME_RATE + frames
 
             # Convert preroll in milliseconds to frames
-            preroll_to_frames = (
-                int(self.as_dict["ops"][0]["data"]["pre_roll_time"]) // 40
+            preroll_frames = milliseconds_to_frames(
+                int(self.as_dict["ops"][0]["data"]["pre_roll_time"]), FRAME_RATE
             )
-            preroll = Timecode(FRAME_RATE, None, None, preroll_to_frames, False)
 
-            # Add announced timestamp and preroll to return timestamp of transition point
-            return splice_event_timestamp + preroll
+            # Add announced timestamp and preroll to return the transition point
+            return splice_event_frames + preroll_frames
         else:
             # Not implemented for other time types
             logger.warning(
-                f"get_splice_event_timestamp not implemented for time_type {self.as_dict['timestamp']['time_type']}"
+                f"get_splice_event_frames not implemented for time_type {self.as_dict['timestamp']['time_type']}"
             )
             return None
 
+    def get_splice_event_timestamp(self) -> Optional[str]:
+        """
+        Get the splice event timestamp from the SpliceEvent.
+
+        Returns:
+            Optional[str]: Splice event timestamp as a timecode string, or None
+                           if the time type is not supported
+        """
+        splice_event_frames = self.get_splice_event_frames()
+        if splice_event_frames is None:
+            return None
+
+        return frames_to_timecode(splice_event_frames, FRAME_RATE)
+
     def get_segmentation_upid(self) -> str:
         """
         Get the segmentation UPID from the SpliceEvent.
@@ -9,8 +9,10 @@ from .ffmpeg_service import (
     FFMPEGResult,
     FFMPEGService,
     FFProbeResult,
+    ImageSettings,
     Packet,
 )
+from .frame_server import FrameServer
 
 __all__ = [
     "FFMPEGService",
@@ -18,4 +20,6 @@ __all__ = [
     "FFProbeResult",
     "Packet",
     "FFMPEGFrameData",
+    "FrameServer",
+    "ImageSettings",
 ]
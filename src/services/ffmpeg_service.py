@@ -5,19 +5,41 @@ This module provides classes and functions to interact with FFMPEG and FFProbe
 for analyzing media files, extracting frames, and generating thumbnails.
 """
 
-import datetime
+import functools
 import json
 import logging
+import math
 import os
+import re
 import subprocess
-from math import modf
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from string import Template
-from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Union
+from typing import (
+    Any,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
 
-from timecode import Timecode
+from pyvanc.utils.fingerprint import file_fingerprint
+from pyvanc.utils.frame_timecode import (
+    frames_per_day,
+    seconds_to_frames,
+    timecode_to_frames,
+)
 
 from ..models.splice_event import SCTE104Packet
+from ..utils.time_window import TimeWindow
+from .frame_server import FrameServer, draw_overlay_text, pillow_can_save
+from .thumbnail_cache import CACHE_FOLDER_NAME, ThumbnailCache, link_file
 
 # Configure logging
 logging.basicConfig(
@@ -31,6 +53,49 @@ DID_SDID_TO_EXTRACT = "4107"
 FRAME_RATE = 25
 FRAME_DURATION = 40  # milliseconds
 
+# Thumbnail extraction strategies
+THUMBNAIL_STRATEGY_SELECT = "select"  # One ffmpeg run decoding the whole file
+THUMBNAIL_STRATEGY_SEEK = "seek"  # One fast-seeking ffmpeg run per frame range
+THUMBNAIL_STRATEGY_FRAME_SERVER = "frameserver"  # In-process PyAV decoding
+THUMBNAIL_STRATEGIES = (
+    THUMBNAIL_STRATEGY_SELECT,
+    THUMBNAIL_STRATEGY_SEEK,
+    THUMBNAIL_STRATEGY_FRAME_SERVER,
+)
+DEFAULT_THUMBNAIL_WORKERS = 4
+
+# Event frames at most this many frames apart are shown as one event group
+EVENT_GROUP_GAP = 10
+
+# Thumbnail output modes
+THUMBNAIL_MODE_FRAMES = "frames"  # One image per frame
+THUMBNAIL_MODE_SPRITES = "sprites"  # One tiled sprite sheet per event group
+THUMBNAIL_MODES = (THUMBNAIL_MODE_FRAMES, THUMBNAIL_MODE_SPRITES)
+SPRITE_TILE_WIDTH = 320
+SPRITE_TILE_HEIGHT = 180
+SPRITE_MAX_COLUMNS = 8
+
+# Thumbnail image formats and the ffmpeg encoders that can write them
+IMAGE_FORMAT_JPG = "jpg"
+IMAGE_FORMAT_WEBP = "webp"
+IMAGE_FORMAT_AVIF = "avif"
+IMAGE_FORMATS = (IMAGE_FORMAT_JPG, IMAGE_FORMAT_WEBP, IMAGE_FORMAT_AVIF)
+IMAGE_ENCODERS = {
+    IMAGE_FORMAT_JPG: "mjpeg",
+    IMAGE_FORMAT_WEBP: "libwebp",
+    IMAGE_FORMAT_AVIF: "libaom-av1",
+}
+FRAME_FILE_PATTERN = re.compile(r"frames(\d+)(_full)?\.(jpg|webp|avif)$")
+
+# Bump when the rendering of thumbnails changes, so cached images are not reused
+THUMBNAIL_RENDER_VERSION = 1
+
+# Single drawtext filter whose text is replaced per frame through sendcmd
+DRAW_TEXT_FILTER = (
+    "drawtext=expansion=none:text=' ':x=(w-tw)/2:y=(h-th):fontsize=24"
+    ":fontcolor=yellow:boxborderw=10:borderw=1:box=1:boxcolor=black@0.5"
+)
+
 
 class FFMPEGResult(NamedTuple):
     """Result of an FFMPEG operation."""
@@ -49,11 +114,11 @@ class FFProbeResult(NamedTuple):
 
 
 class Packet(NamedTuple):
-    """Packet data extracted from FFProbe."""
+    """Packet data extracted from FFProbe, with times as frame counts."""
 
     anc_data: List[str]
-    pts_time: Timecode
-    utc_time: Timecode
+    pts_frames: int  # Position in the file, in frames
+    utc_frames: int  # Time of day (start timecode + position), in frames
     pts_frame_number: int
 
 
@@ -65,6 +130,19 @@ class FFMPEGFrameData(NamedTuple):
     frame_text_data: Optional[SCTE104Packet]
 
 
+class ImageSettings(NamedTuple):
+    """Output settings of rendered thumbnails."""
+
+    format: str = IMAGE_FORMAT_JPG
+    width: Optional[int] = None  # None keeps the source size
+    quality: Optional[int] = None  # 1-100, None uses the encoder default
+
+    @property
+    def extension(self) -> str:
+        """File extension of the images, including the dot."""
+        return f".{self.format}"
+
+
 class FFMPEGService:
     """
     Service for interacting with FFMPEG and FFProbe.
@@ -78,6 +156,14 @@ class FFMPEGService:
         did_sdid_to_extract: str = DID_SDID_TO_EXTRACT,
         frame_rate: int = FRAME_RATE,
         frame_duration: int = FRAME_DURATION,
+        thumbnail_strategy: str = THUMBNAIL_STRATEGY_SEEK,
+        max_workers: int = DEFAULT_THUMBNAIL_WORKERS,
+        frame_server: Optional[FrameServer] = None,
+        use_cache: bool = True,
+        cache_dir: Optional[Union[str, Path]] = None,
+        thumbnail_mode: str = THUMBNAIL_MODE_FRAMES,
+        image_settings: Optional[ImageSettings] = None,
+        full_res_triggers: bool = False,
     ):
         """
         Initialize the FFMPEG service.
@@ -86,21 +172,117 @@ class FFMPEGService:
             did_sdid_to_extract: DID/SDID value to extract from the media file
             frame_rate: Frame rate of the media file
             frame_duration: Duration of each frame in milliseconds
+            thumbnail_strategy: Default thumbnail extraction strategy ("seek", "select" or "frameserver")
+            max_workers: Maximum number of concurrent ffmpeg jobs for the seek strategy
+            frame_server: Optional shared FrameServer for the "frameserver" strategy.
+                          If not provided, one is created on first use.
+            use_cache: Whether to reuse thumbnails rendered by earlier runs
+            cache_dir: Thumbnail cache directory. Defaults to a ".thumbnail_cache"
+                       folder inside the output folder.
+            thumbnail_mode: Write one image per frame ("frames") or one sprite
+                            sheet per event group ("sprites")
+            image_settings: Format, width and quality of the thumbnails.
+                            Defaults to source-size JPEGs.
+            full_res_triggers: Also write a source-size frames<n>_full image
+                               for every SCTE trigger frame
         """
+        if thumbnail_strategy not in THUMBNAIL_STRATEGIES:
+            raise ValueError(f"Unknown thumbnail strategy: {thumbnail_strategy}")
+        if thumbnail_mode not in THUMBNAIL_MODES:
+            raise ValueError(f"Unknown thumbnail mode: {thumbnail_mode}")
+        image_settings = image_settings or ImageSettings()
+        if image_settings.format not in IMAGE_FORMATS:
+            raise ValueError(f"Unknown image format: {image_settings.format}")
+
         self.did_sdid_to_extract = did_sdid_to_extract
         self.frame_rate = frame_rate
         self.frame_duration = frame_duration
+        self.thumbnail_strategy = thumbnail_strategy
+        self.max_workers = max(1, max_workers)
+        self.frame_server = frame_server
+        self.use_cache = use_cache
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.thumbnail_mode = thumbnail_mode
+        self.image_settings = image_settings
+        self.full_res_triggers = full_res_triggers
+
+    def probe_format(self, filename: str) -> Optional[Dict[str, Any]]:
+        """
+        Read the format information of a media file without reading its packets.
+
+        Args:
+            filename: Path to the media file
+
+        Returns:
+            Optional[Dict[str, Any]]: ffprobe format section with the "tags", or None on error
+        """
+        commands = [
+            "ffprobe",
+            "-v",
+            "quiet",
+            "-print_format",
+            "json",
+            "-show_format",
+            filename,
+        ]
+
+        result = subprocess.run(
+            commands,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            universal_newlines=True,
+        )
+        if result.returncode != 0:
+            logger.error(f"Error reading format of {filename}: {result.stderr}")
+            return None
+
+        try:
+            return json.loads(result.stdout).get("format", {})
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed to parse JSON: {e}")
+            return None
 
-    def analyze(self, filename: str) -> FFProbeResult:
+    def analyze(
+        self, filename: str, window: Optional[TimeWindow] = None
+    ) -> FFProbeResult:
         """
         Analyze a media file using FFProbe.
 
+        With a limited window, ffprobe seeks to the start of the window and
+        stops reading at its end, so only that part of the file is read.
+
         Args:
             filename: Path to the media file
+            window: Part of the file to analyze, defaults to the whole file
 
         Returns:
             FFProbeResult: Result of the FFProbe analysis
         """
+        logger.info(f"Analyzing file: {filename}")
+        result = subprocess.run(
+            self._analyze_command(filename, window),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            universal_newlines=True,
+        )
+
+        return FFProbeResult(
+            return_code=result.returncode, json=result.stdout, error=result.stderr
+        )
+
+    def _analyze_command(
+        self, filename: str, window: Optional[TimeWindow] = None
+    ) -> List[str]:
+        """
+        Build the FFProbe command that dumps the ANC data packets of a media file.
+
+        Args:
+            filename: Path to the media file
+            window: Part of the file to analyze, defaults to the whole file
+
+        Returns:
+            List[str]: Command line arguments
+        """
         commands = [
             "ffprobe",
             "-v",
@@ -112,30 +294,122 @@ class FFMPEGService:
             "2",
             "-show_packets",
             "-show_data",
-            filename,
         ]
+        if window is not None and window.is_limited:
+            commands += ["-read_intervals", window.read_intervals()]
+        commands.append(filename)
+        return commands
+
+    def iter_packets(
+        self,
+        filename: str,
+        window: Optional[TimeWindow] = None,
+        output_file: Optional[Path] = None,
+    ) -> Generator[Packet, None, None]:
+        """
+        Analyze a media file using FFProbe and yield its packets while it is read.
+
+        Packets are parsed as ffprobe writes them, so processing can start
+        before ffprobe has read the whole file. The start timecode is probed
+        first, because ffprobe only writes the format section after the
+        packets. Closing the generator before the end kills ffprobe.
+
+        Args:
+            filename: Path to the media file
+            window: Part of the file to analyze, defaults to the whole file
+            output_file: File to save the complete ffprobe output to, written
+                         only when ffprobe succeeded
+
+        Yields:
+            Packet: Packets with ANC data of the configured DID/SDID, in file order
+
+        Raises:
+            RuntimeError: If ffprobe fails or the file has no start timecode
+        """
+        format_info = self.probe_format(filename)
+        start_timecode = (format_info or {}).get("tags", {}).get("timecode")
+        if start_timecode is None:
+            raise RuntimeError(f"No start timecode found in {filename}")
 
         logger.info(f"Analyzing file: {filename}")
-        result = subprocess.run(
-            commands,
+        process = subprocess.Popen(
+            self._analyze_command(filename, window),
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
             universal_newlines=True,
         )
 
-        return FFProbeResult(
-            return_code=result.returncode, json=result.stdout, error=result.stderr
-        )
+        # Keep a copy of the output, renamed into place once ffprobe succeeded
+        saved_output = None
+        if output_file is not None:
+            output_file.parent.mkdir(parents=True, exist_ok=True)
+            saved_output = tempfile.NamedTemporaryFile(
+                "w",
+                encoding="utf-8",
+                prefix=f".{output_file.name}.",
+                dir=output_file.parent,
+                delete=False,
+            )
+
+        def output_lines() -> Iterator[str]:
+            for line in process.stdout:
+                if saved_output is not None:
+                    saved_output.write(line)
+                yield line
+
+        completed = False
+        try:
+            for packet in _iter_json_array(output_lines(), "packets"):
+                if "data" not in packet:
+                    continue
+                anc_packet = self._extract_packet(
+                    packet["data"], packet["pts_time"], start_timecode, packet["pts"]
+                )
+                if anc_packet is not None:
+                    yield anc_packet
+            # The format section follows the packets
+            for _ in output_lines():
+                pass
+            completed = True
+        finally:
+            if completed:
+                error = process.stderr.read()
+            else:
+                # Stopped early by the consumer or an error
+                process.kill()
+                error = ""
+            process.stdout.close()
+            process.stderr.close()
+            return_code = process.wait()
+
+            if saved_output is not None:
+                saved_output.close()
+                if completed and return_code == 0:
+                    os.replace(saved_output.name, output_file)
+                    logger.info(f"JSON result written to {output_file}")
+                else:
+                    os.unlink(saved_output.name)
+
+        if return_code != 0:
+            raise RuntimeError(f"ffprobe error: {error.strip() or return_code}")
 
-    def analyze_and_save_json(self, output_dir: Path, filename: str) -> None:
+    def analyze_and_save_json(
+        self,
+        output_dir: Path,
+        filename: str,
+        window: Optional[TimeWindow] = None,
+        output_name: str = "output.json",
+    ) -> None:
         """
         Analyze a media file using FFProbe and save the results to a JSON file.
 
         Args:
             output_dir: Directory to save the output JSON file
             filename: Path to the media file
+            window: Part of the file to analyze, defaults to the whole file
+            output_name: Name of the JSON file
         """
-        result = self.analyze(filename)
+        result = self.analyze(filename, window)
 
         if result.return_code != 0:
             logger.error(f"Error analyzing file: {result.error}")
@@ -146,7 +420,7 @@ class FFMPEGService:
             output_dir.mkdir(parents=True, exist_ok=True)
 
             # Create the full file path
-            output_file = output_dir / "output.json"
+            output_file = output_dir / output_name
 
             # Parse the JSON
             parsed_json = json.loads(result.json)
@@ -227,19 +501,44 @@ class FFMPEGService:
         frames: List[FFMPEGFrameData],
         padding: int = 0,
         folder: Union[str, Path] = "",
+        strategy: Optional[str] = None,
     ) -> FFMPEGResult:
         """
         Extract thumbnails from a media file.
 
+        The "select" strategy runs a single ffmpeg process that decodes the whole
+        file and keeps the requested frames. The "seek" strategy splits the frames
+        into contiguous ranges and runs one fast-seeking ffmpeg job per range on a
+        bounded worker pool, so only the frames around each event are decoded.
+        The "frameserver" strategy decodes in-process through a shared FrameServer,
+        so frames decoded for earlier runs or nearby groups are reused.
+
+        With the thumbnail cache enabled, only frames that were not rendered
+        before with the same overlay text and render settings are extracted;
+        the others are hard-linked from the cache.
+
+        In "sprites" mode, the thumbnails of each event group are tiled into a
+        single sprite<event frame> image and metadata.json records the position of
+        every frame in its sprite sheet instead of per-frame image files.
+
+        Thumbnails are written in the configured image format and width; WebP
+        and AVIF fall back to JPEG when no encoder for them is available.
+
         Args:
             video_filename: Path to the media file
             frames: List of frame data with SCTE-104 information
             padding: Number of frames to include before and after each identified frame
             folder: Directory to save the thumbnails
+            strategy: Extraction strategy, defaults to the service's thumbnail_strategy
 
         Returns:
-            FFMPEGResult: Result of the FFMPEG operation
+            FFMPEGResult: Result of the FFMPEG operation, failed if the thumbnails
+                          or the full-resolution trigger frames failed
         """
+        strategy = strategy or self.thumbnail_strategy
+        if strategy not in THUMBNAIL_STRATEGIES:
+            raise ValueError(f"Unknown thumbnail strategy: {strategy}")
+
         # Ensure padding is at least 2 frames
         if padding < 2:
             logger.warning(
@@ -258,67 +557,20 @@ class FFMPEGService:
         all_frames_with_metadata = []
 
         # Group frames that are close to each other (likely part of the same event)
-        event_groups = []
-        sorted_frames = sorted(frames, key=lambda x: x.frame_number)
-
-        current_group = []
-        for frame in sorted_frames:
-            if (
-                not current_group
-                or frame.frame_number - current_group[-1].frame_number <= 10
-            ):
-                current_group.append(frame)
-            else:
-                event_groups.append(current_group)
-                current_group = [frame]
-
-        if current_group:
-            event_groups.append(current_group)
+        event_groups = self.group_event_frames(frames)
 
         logger.info(f"Identified {len(event_groups)} event groups")
 
         # Process each event group with proper padding
         for group_index, group in enumerate(event_groups):
-            event_frame_numbers = [frame.frame_number for frame in group]
-            min_frame = min(event_frame_numbers)
-            max_frame = max(event_frame_numbers)
-
             logger.info(
-                f"Group {group_index+1}: Event frames {event_frame_numbers}, adding {padding} frame padding"
+                f"Group {group_index+1}: Event frames {[frame.frame_number for frame in group]}, "
+                f"adding {padding} frame padding"
             )
 
-            # Calculate padding range ensuring we don't go below 0
-            start_frame = max(0, min_frame - padding)
-            end_frame = max_frame + padding
-
-            # Add frames with padding to the list
-            for frame_num in range(start_frame, end_frame + 1):
-                if frame_num in event_frame_numbers:
-                    # This is an event frame
-                    frame_obj = next(f for f in group if f.frame_number == frame_num)
-                    frame_numbers.append(frame_num)
-                    all_frames_with_metadata.append(
-                        {
-                            "frame_number": frame_num,
-                            "is_event": True,
-                            "event_info": frame_obj,
-                            "padding_for": None,
-                        }
-                    )
-                else:
-                    # This is a padding frame
-                    closest_event = min(
-                        event_frame_numbers, key=lambda x: abs(x - frame_num)
-                    )
-                    frame_numbers.append(frame_num)
-                    all_frames_with_metadata.append(
-                        {
-                            "frame_number": frame_num,
-                            "is_event": False,
-                            "event_info": None,
-                            "padding_for": closest_event,
-                        }
-                    )
+            group_metadata = self._pad_event_group(group, padding)
+            frame_numbers.extend(m["frame_number"] for m in group_metadata)
+            all_frames_with_metadata.extend(group_metadata)
 
         logger.info(f"Total frames to extract (with padding): {len(frame_numbers)}")
 
@@ -327,21 +579,17 @@ class FFMPEGService:
             logger.error("No frames to extract!")
             return FFMPEGResult(1, "", "No frames to extract")
 
-        # Build the select string - make sure frame numbers are unique and sorted
+        # Make sure frame numbers are unique and sorted
         unique_frame_numbers = sorted(list(set(frame_numbers)))
-        frame_number_selectstring = self._build_frame_select_string(
-            unique_frame_numbers
-        )
 
-        # Build the drawtext command
-        draw_text_command = self._build_improved_draw_text_command(
-            unique_frame_numbers, all_frames_with_metadata
-        )
+        # Index the metadata by frame number, the first entry of a frame wins
+        metadata_by_frame = {}
+        for frame_metadata in all_frames_with_metadata:
+            metadata_by_frame.setdefault(frame_metadata["frame_number"], frame_metadata)
 
         # Set output path
         if isinstance(folder, str):
             folder = Path(folder)
-        outputpath = str(folder / "frames%d.jpg")
 
         # Create a mapping between sequential output numbers and actual frame numbers
         frame_number_mapping = {}
@@ -357,32 +605,61 @@ class FFMPEGService:
         except Exception as e:
             logger.error(f"Error saving frame number mapping: {e}")
 
-        # Build FFMPEG command
-        commands = [
-            "ffmpeg",
-            "-i",
-            video_filename,
-            "-vf",
-            f"select={frame_number_selectstring},{draw_text_command}",
-            "-fps_mode",
-            "passthrough",
-            "-frames",
-            str(len(unique_frame_numbers)),
-            outputpath,
-        ]
+        # Remove thumbnails of a previous run, their numbering may have changed
+        for pattern in ("frames*", "sprite*"):
+            for stale_file in folder.glob(pattern):
+                if stale_file.suffix[1:] in IMAGE_FORMATS:
+                    stale_file.unlink()
 
-        logger.info(f"Running FFMPEG to extract {len(unique_frame_numbers)} frames")
-        result = subprocess.run(
-            commands,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            universal_newlines=True,
+        image_settings = self._resolve_image_settings(strategy)
+
+        result = self._extract_thumbnails_named(
+            strategy,
+            video_filename,
+            unique_frame_numbers,
+            metadata_by_frame,
+            folder,
+            image_settings,
         )
 
-        if result.returncode != 0:
-            logger.error(f"FFMPEG error: {result.stderr}")
-        else:
-            logger.info("FFMPEG completed successfully")
+        # Source-size copies of the trigger frames, for the viewer's enlarged view
+        full_res_frames = []
+        if self.full_res_triggers and result.return_code == 0:
+            full_res_frames = [
+                frame_number
+                for frame_number in unique_frame_numbers
+                if metadata_by_frame[frame_number]["is_event"]
+                and metadata_by_frame[frame_number]["event_info"].marker_type
+                == "SCTE Trigger"
+            ]
+
+        full_res_result = None
+        if full_res_frames:
+            output_numbers = {v: k for k, v in frame_number_mapping.items()}
+            full_res_result = self._extract_thumbnails_named(
+                strategy,
+                video_filename,
+                full_res_frames,
+                metadata_by_frame,
+                folder,
+                image_settings._replace(width=None),
+                [f"frames{output_numbers[n]}_full" for n in full_res_frames],
+            )
+            if full_res_result.return_code != 0:
+                logger.error(
+                    f"Error extracting full-resolution trigger frames: {full_res_result.error}"
+                )
+                # The viewer falls back to the thumbnails
+                full_res_frames = []
+
+        sprite_sheets = None
+        if self.thumbnail_mode == THUMBNAIL_MODE_SPRITES and result.return_code == 0:
+            sprite_sheets = self._generate_sprite_sheets(
+                folder,
+                self._build_frame_groups(all_frames_with_metadata),
+                unique_frame_numbers,
+                image_settings,
+            )
 
         # Generate metadata.json for visualization with frame mapping
         self._generate_improved_metadata_json(
@@ -391,111 +668,1127 @@ class FFMPEGService:
             unique_frame_numbers,
             padding,
             frame_number_mapping,
+            sprite_sheets,
+            image_settings,
+            set(full_res_frames),
         )
 
-        return FFMPEGResult(
-            return_code=result.returncode, args=str(commands), error=result.stderr
-        )
+        if full_res_result is not None and full_res_result.return_code != 0:
+            # Report the failure of either pass, with the errors of both
+            return FFMPEGResult(
+                full_res_result.return_code,
+                result.args,
+                "\n".join(
+                    error for error in (result.error, full_res_result.error) if error
+                ),
+            )
+        return result
 
-    def _build_improved_draw_text_command(
-        self,
-        frame_numbers: List[int],
-        all_frames_metadata: List[Dict[str, Any]],
-    ) -> str:
+    def group_event_frames(
+        self, frames: List[FFMPEGFrameData]
+    ) -> List[List[FFMPEGFrameData]]:
         """
-        Build an improved drawtext command for FFMPEG with better organization.
+        Group frames that are close to each other, they are likely part of the same event.
 
         Args:
-            frame_numbers: List of all frame numbers to extract
-            all_frames_metadata: List of metadata for all frames
+            frames: List of frame data with SCTE-104 information
 
         Returns:
-            str: Drawtext command string
+            List[List[FFMPEGFrameData]]: Groups sorted by frame number. A group ends
+                                         when the next frame is more than
+                                         EVENT_GROUP_GAP frames later.
         """
-        draw_text_command = ""
-        n_frames = len(frame_numbers)
+        event_groups = []
+        current_group: List[FFMPEGFrameData] = []
 
-        for idx, frame_num in enumerate(frame_numbers, start=0):
-            # Find the metadata for this frame
-            frame_metadata = next(
-                meta
-                for meta in all_frames_metadata
-                if meta["frame_number"] == frame_num
-            )
+        for frame in sorted(frames, key=lambda x: x.frame_number):
+            if (
+                not current_group
+                or frame.frame_number - current_group[-1].frame_number
+                <= EVENT_GROUP_GAP
+            ):
+                current_group.append(frame)
+            else:
+                event_groups.append(current_group)
+                current_group = [frame]
 
-            if frame_metadata["is_event"]:
-                # This is an event frame
-                frame_data = frame_metadata["event_info"]
+        if current_group:
+            event_groups.append(current_group)
 
-                if frame_data.frame_text_data is None:
-                    text = (
-                        f"Frame_number = {frame_data.frame_number} "
-                        f"Frame type = {frame_data.marker_type}"
-                    )
-                else:
-                    text = (
-                        f"Frame_number = {frame_data.frame_number} "
-                        f"Frame type = {frame_data.marker_type}\n"
-                        f"Type = {frame_data.frame_text_data.segmentation_type['name']}\n"
-                        f"Event ID = {frame_data.frame_text_data.segmentation_event_id}\n"
-                        f"Duration = {frame_data.frame_text_data.duration}"
-                    )
+        return event_groups
+
+    def _pad_event_group(
+        self, group: List[FFMPEGFrameData], padding: int
+    ) -> List[Dict[str, Any]]:
+        """
+        Build the metadata of the frames of an event group and its padding frames.
+
+        Args:
+            group: Event frames of one group, sorted by frame number
+            padding: Number of frames to include before and after the group
+
+        Returns:
+            List[Dict[str, Any]]: Metadata of every frame, sorted by frame number
+        """
+        event_frame_numbers = [frame.frame_number for frame in group]
+        event_frames_by_number = {}
+        for frame in group:
+            event_frames_by_number.setdefault(frame.frame_number, frame)
+
+        # Calculate padding range ensuring we don't go below 0
+        start_frame = max(0, min(event_frame_numbers) - padding)
+        end_frame = max(event_frame_numbers) + padding
+
+        frames_metadata = []
+        for frame_num in range(start_frame, end_frame + 1):
+            if frame_num in event_frames_by_number:
+                # This is an event frame
+                frames_metadata.append(
+                    {
+                        "frame_number": frame_num,
+                        "is_event": True,
+                        "event_info": event_frames_by_number[frame_num],
+                        "padding_for": None,
+                    }
+                )
             else:
                 # This is a padding frame
-                associated_event = frame_metadata["padding_for"]
-                text = f"PADDING FRAME {frame_num} (for Event Frame {associated_event})"
+                closest_event = min(
+                    event_frame_numbers, key=lambda x: abs(x - frame_num)
+                )
+                frames_metadata.append(
+                    {
+                        "frame_number": frame_num,
+                        "is_event": False,
+                        "event_info": None,
+                        "padding_for": closest_event,
+                    }
+                )
 
-            cmd = (
-                f"drawtext=text='{text}'"
-                f":x=(w-tw)/2:y=(h-th):fontsize=24:fontcolor=yellow:boxborderw=10:borderw=1:box=1:boxcolor=black@0.5:enable='eq(n,{idx})'"
-            )
+        return frames_metadata
 
-            draw_text_command += cmd
+    def prefetch_thumbnails(
+        self,
+        video_filename: str,
+        group: List[FFMPEGFrameData],
+        padding: int,
+        folder: Union[str, Path],
+        after_frame: int = -1,
+        strategy: Optional[str] = None,
+    ) -> FFMPEGResult:
+        """
+        Render the thumbnails of one event group into the thumbnail cache.
 
-            if idx < n_frames - 1:
-                draw_text_command += ","
+        A later extract_thumbnails call for all frames of the file finds these
+        thumbnails in the cache and only links them into place, so event groups
+        can be rendered while the rest of the file is still being scanned.
 
-        return draw_text_command
+        Args:
+            video_filename: Path to the media file
+            group: Event frames of one group, sorted by frame number
+            padding: Number of frames to include before and after the group
+            folder: Output folder of extract_thumbnails, holding the default cache
+            after_frame: Last frame claimed by the previous group, earlier frames are skipped
+            strategy: Extraction strategy, defaults to the service's thumbnail_strategy
 
-    def _generate_improved_metadata_json(
+        Returns:
+            FFMPEGResult: Result of the extraction of the missing frames
+        """
+        strategy = strategy or self.thumbnail_strategy
+        folder = Path(folder)
+        padding = max(2, padding)
+
+        # Frames up to after_frame are rendered with the previous group
+        metadata_by_frame = {
+            m["frame_number"]: m
+            for m in self._pad_event_group(group, padding)
+            if m["frame_number"] > after_frame
+        }
+        frame_numbers = sorted(metadata_by_frame)
+        if not frame_numbers:
+            return FFMPEGResult(0, "", "")
+
+        image_settings = self._resolve_image_settings(strategy)
+        result, _, _ = self._cache_thumbnails(
+            strategy,
+            video_filename,
+            frame_numbers,
+            metadata_by_frame,
+            folder,
+            image_settings,
+        )
+
+        trigger_frames = [
+            frame_number
+            for frame_number in frame_numbers
+            if metadata_by_frame[frame_number]["is_event"]
+            and metadata_by_frame[frame_number]["event_info"].marker_type
+            == "SCTE Trigger"
+        ]
+        if self.full_res_triggers and trigger_frames and result.return_code == 0:
+            result, _, _ = self._cache_thumbnails(
+                strategy,
+                video_filename,
+                trigger_frames,
+                metadata_by_frame,
+                folder,
+                image_settings._replace(width=None),
+            )
+
+        return result
+
+    def _render_thumbnails(
         self,
+        strategy: str,
+        video_filename: str,
+        frame_numbers: List[int],
+        metadata_by_frame: Dict[int, Dict[str, Any]],
         folder: Path,
-        all_frames_metadata: List[Dict[str, Any]],
+        image_settings: ImageSettings,
+    ) -> FFMPEGResult:
+        """
+        Render thumbnails as frames1, frames2, ... with the given strategy.
+
+        Args:
+            strategy: Extraction strategy
+            video_filename: Path to the media file
+            frame_numbers: Unique, sorted frame numbers to extract
+            metadata_by_frame: Metadata of every frame, indexed by frame number
+            folder: Directory to save the thumbnails
+            image_settings: Format, width and quality of the thumbnails
+
+        Returns:
+            FFMPEGResult: Result of the extraction
+        """
+        if strategy == THUMBNAIL_STRATEGY_SEEK:
+            return self._extract_thumbnails_seek(
+                video_filename, frame_numbers, metadata_by_frame, folder, image_settings
+            )
+        if strategy == THUMBNAIL_STRATEGY_FRAME_SERVER:
+            return self._extract_thumbnails_frame_server(
+                video_filename, frame_numbers, metadata_by_frame, folder, image_settings
+            )
+        return self._extract_thumbnails_select(
+            video_filename, frame_numbers, metadata_by_frame, folder, image_settings
+        )
+
+    def _extract_thumbnails_named(
+        self,
+        strategy: str,
+        video_filename: str,
         frame_numbers: List[int],
-        padding: int,
-        frame_number_mapping: Optional[Dict[int, int]] = None,
-    ) -> None:
+        metadata_by_frame: Dict[int, Dict[str, Any]],
+        folder: Path,
+        image_settings: ImageSettings,
+        output_names: Optional[List[str]] = None,
+    ) -> FFMPEGResult:
         """
-        Generate an improved metadata.json file for the extracted frames.
+        Render thumbnails under the given names, through the cache if it is enabled.
 
         Args:
-            folder: Directory to save the metadata.json file
-            all_frames_metadata: List of metadata for all frames
-            frame_numbers: List of all frame numbers (unique and sorted)
-            padding: Number of frames included before and after each identified frame
-            frame_number_mapping: Optional mapping from output number to original frame number
+            strategy: Extraction strategy
+            video_filename: Path to the media file
+            frame_numbers: Unique, sorted frame numbers to extract
+            metadata_by_frame: Metadata of every frame, indexed by frame number
+            folder: Directory to save the thumbnails
+            image_settings: Format, width and quality of the thumbnails
+            output_names: File names without extension, one per frame.
+                          Defaults to frames1, frames2, ...
+
+        Returns:
+            FFMPEGResult: Result of the extraction
         """
-        metadata = {
-            "frames": [],
-            "padding": padding,
-            "total_frames": len(frame_numbers),
-            "frame_groups": [],
-            "frame_mapping": frame_number_mapping or {},
-        }
+        if self.use_cache:
+            return self._extract_thumbnails_cached(
+                strategy,
+                video_filename,
+                frame_numbers,
+                metadata_by_frame,
+                folder,
+                image_settings,
+                output_names,
+            )
 
-        # Create frame metadata
-        for frame_meta in all_frames_metadata:
-            frame_number = frame_meta["frame_number"]
+        if output_names is None:
+            return self._render_thumbnails(
+                strategy,
+                video_filename,
+                frame_numbers,
+                metadata_by_frame,
+                folder,
+                image_settings,
+            )
 
-            if frame_meta["is_event"]:
-                # This is an event frame
-                frame_data = frame_meta["event_info"]
-                frame_info = {
-                    "frame_number": frame_number,
-                    "type": frame_data.marker_type,
-                    "is_padding": False,
-                    "event_type": frame_data.marker_type,
-                }
+        with tempfile.TemporaryDirectory(prefix="scte-dec-", dir=folder) as staging:
+            staging_folder = Path(staging)
+            result = self._render_thumbnails(
+                strategy,
+                video_filename,
+                frame_numbers,
+                metadata_by_frame,
+                staging_folder,
+                image_settings,
+            )
+
+            for output_number, name in enumerate(output_names, start=1):
+                rendered_file = (
+                    staging_folder / f"frames{output_number}{image_settings.extension}"
+                )
+                if rendered_file.is_file():
+                    os.replace(
+                        rendered_file, folder / f"{name}{image_settings.extension}"
+                    )
+
+        return result
+
+    def _extract_thumbnails_cached(
+        self,
+        strategy: str,
+        video_filename: str,
+        frame_numbers: List[int],
+        metadata_by_frame: Dict[int, Dict[str, Any]],
+        folder: Path,
+        image_settings: ImageSettings,
+        output_names: Optional[List[str]] = None,
+    ) -> FFMPEGResult:
+        """
+        Render only the thumbnails missing from the cache and link all of them into place.
+
+        Missing frames are rendered into a staging folder, moved into the cache
+        and then linked into the output folder with the same sequential numbering
+        as an uncached run.
+
+        Args:
+            strategy: Extraction strategy
+            video_filename: Path to the media file
+            frame_numbers: Unique, sorted frame numbers to extract
+            metadata_by_frame: Metadata of every frame, indexed by frame number
+            folder: Directory to save the thumbnails
+            image_settings: Format, width and quality of the thumbnails
+            output_names: File names without extension, one per frame.
+                          Defaults to frames1, frames2, ...
+
+        Returns:
+            FFMPEGResult: Result of the extraction of the missing frames
+        """
+        if output_names is None:
+            output_names = [f"frames{i}" for i in range(1, len(frame_numbers) + 1)]
+
+        result, cache, keys = self._cache_thumbnails(
+            strategy,
+            video_filename,
+            frame_numbers,
+            metadata_by_frame,
+            folder,
+            image_settings,
+        )
+
+        for frame_number, name in zip(frame_numbers, output_names):
+            if not cache.link(
+                keys[frame_number],
+                folder / f"{name}{image_settings.extension}",
+                image_settings.extension,
+            ):
+                logger.warning(f"No thumbnail available for frame {frame_number}")
+
+        return result
+
+    def _cache_thumbnails(
+        self,
+        strategy: str,
+        video_filename: str,
+        frame_numbers: List[int],
+        metadata_by_frame: Dict[int, Dict[str, Any]],
+        folder: Path,
+        image_settings: ImageSettings,
+    ) -> Tuple[FFMPEGResult, ThumbnailCache, Dict[int, str]]:
+        """
+        Render the thumbnails that are missing from the cache into the cache.
+
+        Args:
+            strategy: Extraction strategy
+            video_filename: Path to the media file
+            frame_numbers: Unique, sorted frame numbers to extract
+            metadata_by_frame: Metadata of every frame, indexed by frame number
+            folder: Directory to render in, holding the default cache
+            image_settings: Format, width and quality of the thumbnails
+
+        Returns:
+            Tuple[FFMPEGResult, ThumbnailCache, Dict[int, str]]: Result of the
+            extraction of the missing frames, the cache and the cache key of every frame
+        """
+        cache = ThumbnailCache(self.cache_dir or folder / CACHE_FOLDER_NAME)
+        fingerprint = file_fingerprint(video_filename)
+        render_signature = self._render_signature(strategy, image_settings)
+        extension = image_settings.extension
+
+        keys = {}
+        for frame_number in frame_numbers:
+            keys[frame_number] = cache.make_key(
+                fingerprint,
+                frame_number,
+                self._frame_overlay_text(metadata_by_frame[frame_number]),
+                render_signature,
+            )
+
+        missing_frames = [
+            n for n in frame_numbers if cache.get(keys[n], extension) is None
+        ]
+        logger.info(
+            f"Thumbnail cache: {len(frame_numbers) - len(missing_frames)} frames cached, "
+            f"{len(missing_frames)} frames to extract"
+        )
+
+        result = FFMPEGResult(0, "", "")
+        if missing_frames:
+            with tempfile.TemporaryDirectory(prefix="scte-dec-", dir=folder) as staging:
+                staging_folder = Path(staging)
+                result = self._render_thumbnails(
+                    strategy,
+                    video_filename,
+                    missing_frames,
+                    metadata_by_frame,
+                    staging_folder,
+                    image_settings,
+                )
+
+                for output_number, frame_number in enumerate(missing_frames, start=1):
+                    rendered_file = staging_folder / f"frames{output_number}{extension}"
+                    if rendered_file.is_file():
+                        cache.put(keys[frame_number], rendered_file, extension)
+
+        return result, cache, keys
+
+    def _render_signature(self, strategy: str, image_settings: ImageSettings) -> str:
+        """
+        Describe the render settings that affect the pixels of a thumbnail.
+
+        The select and seek strategies share the same ffmpeg filtergraph, the
+        frame server draws its overlays with Pillow.
+
+        Args:
+            strategy: Extraction strategy
+            image_settings: Format, width and quality of the thumbnails
+
+        Returns:
+            str: Render signature used in thumbnail cache keys
+        """
+        renderer = (
+            THUMBNAIL_STRATEGY_FRAME_SERVER
+            if strategy == THUMBNAIL_STRATEGY_FRAME_SERVER
+            else "ffmpeg"
+        )
+        return (
+            f"{renderer}:{image_settings.format}:{image_settings.width}:"
+            f"{image_settings.quality}:v{THUMBNAIL_RENDER_VERSION}"
+        )
+
+    def _resolve_image_settings(self, strategy: str) -> ImageSettings:
+        """
+        Get the image settings to render with, falling back to JPEG if needed.
+
+        Args:
+            strategy: Extraction strategy
+
+        Returns:
+            ImageSettings: Settings whose format the renderer can write
+        """
+        image_settings = self.image_settings
+        if image_settings.format == IMAGE_FORMAT_JPG:
+            return image_settings
+
+        if strategy == THUMBNAIL_STRATEGY_FRAME_SERVER:
+            supported = pillow_can_save(image_settings.extension)
+        else:
+            supported = IMAGE_ENCODERS[image_settings.format] in _ffmpeg_encoders()
+
+        if supported:
+            return image_settings
+
+        logger.warning(
+            f"No {image_settings.format} encoder available for the {strategy} "
+            "strategy, writing JPEG thumbnails instead"
+        )
+        return image_settings._replace(format=IMAGE_FORMAT_JPG)
+
+    def _encoder_options(self, image_settings: ImageSettings) -> List[str]:
+        """
+        Build the ffmpeg output options for the thumbnail image format.
+
+        The quality (1-100, higher is better) is mapped onto the native scale
+        of each encoder.
+
+        Args:
+            image_settings: Format, width and quality of the thumbnails
+
+        Returns:
+            List[str]: ffmpeg output options
+        """
+        quality = image_settings.quality
+
+        if image_settings.format == IMAGE_FORMAT_WEBP:
+            options = ["-c:v", IMAGE_ENCODERS[IMAGE_FORMAT_WEBP]]
+            if quality is not None:
+                options += ["-quality", str(quality)]
+            return options
+
+        if image_settings.format == IMAGE_FORMAT_AVIF:
+            # Without -f image2, ffmpeg picks the avif muxer and writes a single file
+            options = [
+                "-f",
+                "image2",
+                "-c:v",
+                IMAGE_ENCODERS[IMAGE_FORMAT_AVIF],
+                "-still-picture",
+                "1",
+            ]
+            if quality is not None:
+                options += ["-crf", str(round((100 - quality) * 63 / 100))]
+            return options
+
+        if quality is not None:
+            # mjpeg qscale runs from 2 (best) to 31 (worst)
+            return ["-q:v", str(round(2 + (100 - quality) * 29 / 100))]
+        return []
+
+    def _extract_thumbnails_select(
+        self,
+        video_filename: str,
+        frame_numbers: List[int],
+        metadata_by_frame: Dict[int, Dict[str, Any]],
+        folder: Path,
+        image_settings: ImageSettings,
+    ) -> FFMPEGResult:
+        """
+        Extract thumbnails with a single ffmpeg run using a select filter.
+
+        Args:
+            video_filename: Path to the media file
+            frame_numbers: Unique, sorted frame numbers to extract
+            metadata_by_frame: Metadata of every frame, indexed by frame number
+            folder: Directory to save the thumbnails
+            image_settings: Format, width and quality of the thumbnails
+
+        Returns:
+            FFMPEGResult: Result of the FFMPEG operation
+        """
+        frame_number_selectstring = self._build_frame_select_string(frame_numbers)
+
+        with tempfile.TemporaryDirectory(prefix="scte-dec-") as script_dir:
+            filter_script = self._write_filter_script(
+                Path(script_dir),
+                "thumbnails",
+                f"select={frame_number_selectstring}",
+                frame_numbers,
+                metadata_by_frame,
+                image_settings.width,
+            )
+
+            commands = [
+                "ffmpeg",
+                "-i",
+                video_filename,
+                "-filter_script:v",
+                str(filter_script),
+                "-fps_mode",
+                "passthrough",
+                "-frames",
+                str(len(frame_numbers)),
+                *self._encoder_options(image_settings),
+                str(folder / f"frames%d{image_settings.extension}"),
+            ]
+
+            logger.info(f"Running FFMPEG to extract {len(frame_numbers)} frames")
+            return self._run_ffmpeg(commands)
+
+    def _extract_thumbnails_seek(
+        self,
+        video_filename: str,
+        frame_numbers: List[int],
+        metadata_by_frame: Dict[int, Dict[str, Any]],
+        folder: Path,
+        image_settings: ImageSettings,
+    ) -> FFMPEGResult:
+        """
+        Extract thumbnails with one fast-seeking ffmpeg job per contiguous frame range.
+
+        Output files keep the same sequential numbering as the select strategy,
+        so frame_mapping.json and metadata.json are identical for both strategies.
+
+        Args:
+            video_filename: Path to the media file
+            frame_numbers: Unique, sorted frame numbers to extract
+            metadata_by_frame: Metadata of every frame, indexed by frame number
+            folder: Directory to save the thumbnails
+            image_settings: Format, width and quality of the thumbnails
+
+        Returns:
+            FFMPEGResult: Combined result of all FFMPEG jobs
+        """
+        jobs = []
+        output_number = 1
+        for frame_range in self._split_into_ranges(frame_numbers):
+            jobs.append((output_number, frame_range))
+            output_number += len(frame_range)
+
+        logger.info(
+            f"Running {len(jobs)} seeking FFMPEG jobs to extract {len(frame_numbers)} frames "
+            f"(max {self.max_workers} concurrent)"
+        )
+
+        with tempfile.TemporaryDirectory(prefix="scte-dec-") as script_dir:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                results = list(
+                    executor.map(
+                        lambda job: self._run_seek_job(
+                            video_filename,
+                            job[0],
+                            job[1],
+                            metadata_by_frame,
+                            folder,
+                            Path(script_dir),
+                            image_settings,
+                        ),
+                        jobs,
+                    )
+                )
+
+        return self._combine_results(results)
+
+    def _run_seek_job(
+        self,
+        video_filename: str,
+        first_output_number: int,
+        frame_range: List[int],
+        metadata_by_frame: Dict[int, Dict[str, Any]],
+        folder: Path,
+        script_dir: Path,
+        image_settings: ImageSettings,
+    ) -> FFMPEGResult:
+        """
+        Extract one contiguous range of frames using input seeking.
+
+        The seek target lies half a frame before the first requested frame, so the
+        accurate seek keeps exactly that frame, and the trim filter cuts the range
+        to the requested length.
+
+        Args:
+            video_filename: Path to the media file
+            first_output_number: Sequence number of the first output image
+            frame_range: Contiguous, sorted frame numbers to extract
+            metadata_by_frame: Metadata of every frame, indexed by frame number
+            folder: Directory to save the thumbnails
+            script_dir: Directory for the filter script and sendcmd files
+            image_settings: Format, width and quality of the thumbnails
+
+        Returns:
+            FFMPEGResult: Result of the FFMPEG operation
+        """
+        seek_time = max(0.0, (frame_range[0] - 0.5) / self.frame_rate)
+        filter_script = self._write_filter_script(
+            script_dir,
+            f"thumbnails{first_output_number}",
+            f"trim=end_frame={len(frame_range)}",
+            frame_range,
+            metadata_by_frame,
+            image_settings.width,
+        )
+
+        commands = [
+            "ffmpeg",
+            "-nostdin",
+            "-y",
+            "-ss",
+            f"{seek_time:.6f}",
+            "-i",
+            video_filename,
+            "-filter_script:v",
+            str(filter_script),
+            "-fps_mode",
+            "passthrough",
+            "-frames:v",
+            str(len(frame_range)),
+            "-start_number",
+            str(first_output_number),
+            *self._encoder_options(image_settings),
+            str(folder / f"frames%d{image_settings.extension}"),
+        ]
+
+        logger.debug(
+            f"Extracting frames {frame_range[0]}-{frame_range[-1]} "
+            f"as frames{first_output_number}{image_settings.extension} onwards"
+        )
+        return self._run_ffmpeg(commands)
+
+    def _extract_thumbnails_frame_server(
+        self,
+        video_filename: str,
+        frame_numbers: List[int],
+        metadata_by_frame: Dict[int, Dict[str, Any]],
+        folder: Path,
+        image_settings: ImageSettings,
+    ) -> FFMPEGResult:
+        """
+        Extract thumbnails in-process through the frame server.
+
+        Args:
+            video_filename: Path to the media file
+            frame_numbers: Unique, sorted frame numbers to extract
+            metadata_by_frame: Metadata of every frame, indexed by frame number
+            folder: Directory to save the thumbnails
+            image_settings: Format, width and quality of the thumbnails
+
+        Returns:
+            FFMPEGResult: Result of the extraction, with the frame server as "command"
+        """
+        try:
+            if self.frame_server is None:
+                self.frame_server = FrameServer()
+        except RuntimeError as e:
+            logger.error(f"Frame server unavailable: {e}")
+            return FFMPEGResult(1, THUMBNAIL_STRATEGY_FRAME_SERVER, str(e))
+
+        logger.info(f"Decoding {len(frame_numbers)} frames with the frame server")
+        try:
+            for output_number, frame_number in enumerate(frame_numbers, start=1):
+                image = self.frame_server.get_image(video_filename, frame_number)
+                width = image_settings.width
+                if width is not None and width < image.width:
+                    # Keep the aspect ratio with an even height, like scale=w:-2
+                    height = max(2, round(width * image.height / image.width / 2) * 2)
+                    image = image.resize((width, height))
+                image = draw_overlay_text(
+                    image, self._frame_overlay_text(metadata_by_frame[frame_number])
+                )
+                image.save(
+                    folder / f"frames{output_number}{image_settings.extension}",
+                    quality=image_settings.quality or 90,
+                )
+        except (RuntimeError, IndexError, OSError) as e:
+            logger.error(f"Frame server error: {e}")
+            return FFMPEGResult(1, THUMBNAIL_STRATEGY_FRAME_SERVER, str(e))
+
+        logger.info(f"Frame server cache: {self.frame_server.cache_info()}")
+        return FFMPEGResult(0, THUMBNAIL_STRATEGY_FRAME_SERVER, "")
+
+    def _generate_sprite_sheets(
+        self,
+        folder: Path,
+        frame_groups: List[Dict[str, Any]],
+        frame_numbers: List[int],
+        image_settings: ImageSettings,
+    ) -> Dict[int, Dict[str, Any]]:
+        """
+        Tile the thumbnails of every event group into one sprite sheet.
+
+        The per-frame images are removed from the output folder afterwards;
+        with the thumbnail cache enabled they remain available in the cache.
+
+        Args:
+            folder: Directory holding the frames<n> thumbnails
+            frame_groups: Frame groups as stored in metadata.json
+            frame_numbers: Unique, sorted frame numbers, in output order
+            image_settings: Format and quality of the thumbnails and sprite sheets
+
+        Returns:
+            Dict[int, Dict[str, Any]]: Sprite sheet layout per group event frame
+        """
+        output_numbers = {
+            frame_number: output_number
+            for output_number, frame_number in enumerate(frame_numbers, start=1)
+        }
+
+        logger.info(f"Rendering {len(frame_groups)} sprite sheets")
+        with tempfile.TemporaryDirectory(prefix="scte-dec-") as work_dir:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                sheets = list(
+                    executor.map(
+                        lambda group: self._render_sprite_sheet(
+                            folder,
+                            Path(work_dir),
+                            group,
+                            output_numbers,
+                            image_settings,
+                        ),
+                        frame_groups,
+                    )
+                )
+
+        # Keep the full-resolution trigger frames, they are not part of a sheet
+        for frame_file in folder.glob(f"frames*{image_settings.extension}"):
+            match = FRAME_FILE_PATTERN.match(frame_file.name)
+            if match and not match.group(2):
+                frame_file.unlink()
+
+        return {
+            group["event_frame"]: sheet
+            for group, sheet in zip(frame_groups, sheets)
+            if sheet is not None
+        }
+
+    def _render_sprite_sheet(
+        self,
+        folder: Path,
+        work_dir: Path,
+        group: Dict[str, Any],
+        output_numbers: Dict[int, int],
+        image_settings: ImageSettings,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Render the sprite sheet of one event group with the ffmpeg tile filter.
+
+        Every thumbnail is scaled into a fixed-size tile, letterboxed if its
+        aspect ratio differs, and the tiles are laid out row by row.
+
+        Args:
+            folder: Directory holding the frames<n> thumbnails
+            work_dir: Scratch directory for the sequentially numbered tile inputs
+            group: Frame group as stored in metadata.json
+            output_numbers: Output image number per frame number
+            image_settings: Format and quality of the thumbnails and sprite sheet
+
+        Returns:
+            Optional[Dict[str, Any]]: Sprite sheet layout, or None if it could not be rendered
+        """
+        event_frame = group["event_frame"]
+        extension = image_settings.extension
+        tile_frames = [
+            frame_number
+            for frame_number in dict.fromkeys(group["frames"])
+            if (
+                folder / f"frames{output_numbers.get(frame_number)}{extension}"
+            ).is_file()
+        ]
+        if not tile_frames:
+            logger.warning(f"No thumbnails to tile for event frame {event_frame}")
+            return None
+
+        tile_dir = work_dir / f"sprite{event_frame}"
+        tile_dir.mkdir()
+        for tile_number, frame_number in enumerate(tile_frames, start=1):
+            link_file(
+                folder / f"frames{output_numbers[frame_number]}{extension}",
+                tile_dir / f"tile{tile_number}{extension}",
+            )
+
+        columns = min(len(tile_frames), SPRITE_MAX_COLUMNS)
+        rows = math.ceil(len(tile_frames) / columns)
+        sprite_file = f"sprite{event_frame}{extension}"
+
+        commands = [
+            "ffmpeg",
+            "-nostdin",
+            "-y",
+            "-start_number",
+            "1",
+            "-i",
+            str(tile_dir / f"tile%d{extension}"),
+            "-vf",
+            f"scale={SPRITE_TILE_WIDTH}:{SPRITE_TILE_HEIGHT}"
+            ":force_original_aspect_ratio=decrease,"
+            f"pad={SPRITE_TILE_WIDTH}:{SPRITE_TILE_HEIGHT}:(ow-iw)/2:(oh-ih)/2,"
+            f"tile={columns}x{rows}",
+            "-frames:v",
+            "1",
+            *self._encoder_options(image_settings),
+            str(folder / sprite_file),
+        ]
+
+        result = self._run_ffmpeg(commands)
+        if result.return_code != 0:
+            return None
+
+        return {
+            "file": sprite_file,
+            "tile_width": SPRITE_TILE_WIDTH,
+            "tile_height": SPRITE_TILE_HEIGHT,
+            "columns": columns,
+            "rows": rows,
+            "tiles": {
+                frame_number: (
+                    (index % columns) * SPRITE_TILE_WIDTH,
+                    (index // columns) * SPRITE_TILE_HEIGHT,
+                )
+                for index, frame_number in enumerate(tile_frames)
+            },
+        }
+
+    def _run_ffmpeg(self, commands: List[str]) -> FFMPEGResult:
+        """
+        Run an FFMPEG command and log its outcome.
+
+        Args:
+            commands: FFMPEG command line
+
+        Returns:
+            FFMPEGResult: Result of the FFMPEG operation
+        """
+        result = subprocess.run(
+            commands,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            universal_newlines=True,
+        )
+
+        if result.returncode != 0:
+            logger.error(f"FFMPEG error: {result.stderr}")
+        else:
+            logger.info("FFMPEG completed successfully")
+
+        return FFMPEGResult(
+            return_code=result.returncode, args=str(commands), error=result.stderr
+        )
+
+    def _combine_results(self, results: List[FFMPEGResult]) -> FFMPEGResult:
+        """
+        Combine the results of several FFMPEG jobs into one result.
+
+        Args:
+            results: Results of the individual FFMPEG jobs
+
+        Returns:
+            FFMPEGResult: First non-zero return code, all arguments and all errors
+        """
+        failed = [result for result in results if result.return_code != 0]
+
+        return FFMPEGResult(
+            return_code=failed[0].return_code if failed else 0,
+            args=str([result.args for result in results]),
+            error="\n".join(result.error for result in failed),
+        )
+
+    def _split_into_ranges(self, frame_numbers: List[int]) -> List[List[int]]:
+        """
+        Split sorted frame numbers into ranges of consecutive frames.
+
+        Args:
+            frame_numbers: Unique, sorted frame numbers
+
+        Returns:
+            List[List[int]]: Ranges of consecutive frame numbers
+        """
+        ranges = []
+        for frame_number in frame_numbers:
+            if ranges and frame_number == ranges[-1][-1] + 1:
+                ranges[-1].append(frame_number)
+            else:
+                ranges.append([frame_number])
+
+        return ranges
+
+    def _write_filter_script(
+        self,
+        script_dir: Path,
+        name: str,
+        frame_filter: str,
+        frame_numbers: List[int],
+        metadata_by_frame: Dict[int, Dict[str, Any]],
+        width: Optional[int] = None,
+    ) -> Path:
+        """
+        Write an ffmpeg filter script that draws per-frame overlay text.
+
+        The filtergraph keeps a single drawtext filter. Its text is replaced
+        before every output frame by a sendcmd file, so ffmpeg evaluates one
+        filter per frame and the command line length no longer grows with the
+        number of frames.
+
+        Args:
+            script_dir: Directory to write the filter script and sendcmd file to
+            name: Base name of the written files
+            frame_filter: Filter that picks the frames to extract (select or trim)
+            frame_numbers: Sorted frame numbers, in output order
+            metadata_by_frame: Metadata of every frame, indexed by frame number
+            width: Width to downscale the frames to before drawing the overlay.
+                   None keeps the source size.
+
+        Returns:
+            Path: Path to the filter script, for use with -filter_script
+        """
+        commands_file = script_dir / f"{name}.cmd"
+        commands_file.write_text(
+            self._build_draw_text_commands(frame_numbers, metadata_by_frame),
+            encoding="utf-8",
+        )
+
+        # Output frames are renumbered so that frame idx is shown at idx / frame rate
+        # Only scale down, like the frame server
+        scale_filter = f"scale='min({width},iw)':-2," if width else ""
+
+        filter_script = script_dir / f"{name}.ffscript"
+        filter_script.write_text(
+            f"{frame_filter},"
+            f"{scale_filter}"
+            f"setpts=N/({self.frame_rate}*TB),"
+            f"sendcmd=f='{_escape_filter_path(commands_file)}',"
+            f"{DRAW_TEXT_FILTER}",
+            encoding="utf-8",
+        )
+
+        return filter_script
+
+    def _build_draw_text_commands(
+        self,
+        frame_numbers: List[int],
+        metadata_by_frame: Dict[int, Dict[str, Any]],
+    ) -> str:
+        """
+        Build the sendcmd commands that set the overlay text of every output frame.
+
+        Args:
+            frame_numbers: Sorted frame numbers, in output order
+            metadata_by_frame: Metadata of every frame, indexed by frame number
+
+        Returns:
+            str: Contents of a sendcmd file
+        """
+        commands = []
+
+        for idx, frame_num in enumerate(frame_numbers):
+            text = self._frame_overlay_text(metadata_by_frame[frame_num])
+
+            # Send half a frame early so rounding never skips a frame
+            command_time = max(0.0, (idx - 0.5) / self.frame_rate)
+            commands.append(
+                f"{command_time:.6f} drawtext reinit "
+                f"text={_escape_sendcmd_argument(text)};\n"
+            )
+
+        return "".join(commands)
+
+    def _frame_overlay_text(self, frame_metadata: Dict[str, Any]) -> str:
+        """
+        Build the overlay text for a frame.
+
+        Args:
+            frame_metadata: Metadata of the frame
+
+        Returns:
+            str: Text to draw on the thumbnail
+        """
+        if not frame_metadata["is_event"]:
+            # This is a padding frame
+            return (
+                f"PADDING FRAME {frame_metadata['frame_number']} "
+                f"(for Event Frame {frame_metadata['padding_for']})"
+            )
+
+        # This is an event frame
+        frame_data = frame_metadata["event_info"]
+
+        if frame_data.frame_text_data is None:
+            return (
+                f"Frame_number = {frame_data.frame_number} "
+                f"Frame type = {frame_data.marker_type}"
+            )
+
+        return (
+            f"Frame_number = {frame_data.frame_number} "
+            f"Frame type = {frame_data.marker_type}\n"
+            f"Type = {frame_data.frame_text_data.segmentation_type['name']}\n"
+            f"Event ID = {frame_data.frame_text_data.segmentation_event_id}\n"
+            f"Duration = {frame_data.frame_text_data.duration}"
+        )
+
+    def _build_frame_groups(
+        self, all_frames_metadata: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Group frames by the event frame they belong to.
+
+        Args:
+            all_frames_metadata: List of metadata for all frames
+
+        Returns:
+            List[Dict[str, Any]]: Frame groups sorted by event frame, each with the
+                                  event frame, event type and sorted frame numbers
+        """
+        frame_groups = []
+        event_frames = [f for f in all_frames_metadata if f["is_event"]]
+
+        # Index padding frames by the event frame they belong to
+        padding_by_event: Dict[int, List[Dict[str, Any]]] = {}
+        for f in all_frames_metadata:
+            if not f["is_event"]:
+                padding_by_event.setdefault(f["padding_for"], []).append(f)
+
+        for event_frame in sorted(event_frames, key=lambda x: x["frame_number"]):
+            event_frame_num = event_frame["frame_number"]
+            event_type = event_frame["event_info"].marker_type
+
+            # Get padding frames for this event
+            padding_frames = padding_by_event.get(event_frame_num, [])
+
+            # Create a group with this event frame and its padding
+            group_frames = padding_frames + [event_frame]
+            group_frames.sort(key=lambda x: x["frame_number"])
+
+            frame_groups.append(
+                {
+                    "event_frame": event_frame_num,
+                    "event_type": event_type,
+                    "frames": [f["frame_number"] for f in group_frames],
+                }
+            )
+
+        return frame_groups
+
+    def _generate_improved_metadata_json(
+        self,
+        folder: Path,
+        all_frames_metadata: List[Dict[str, Any]],
+        frame_numbers: List[int],
+        padding: int,
+        frame_number_mapping: Optional[Dict[int, int]] = None,
+        sprite_sheets: Optional[Dict[int, Dict[str, Any]]] = None,
+        image_settings: Optional[ImageSettings] = None,
+        full_res_frames: Optional[Set[int]] = None,
+    ) -> None:
+        """
+        Generate an improved metadata.json file for the extracted frames.
+
+        Args:
+            folder: Directory to save the metadata.json file
+            all_frames_metadata: List of metadata for all frames
+            frame_numbers: List of all frame numbers (unique and sorted)
+            padding: Number of frames included before and after each identified frame
+            frame_number_mapping: Optional mapping from output number to original frame number
+            sprite_sheets: Optional sprite sheet layout per group event frame
+            image_settings: Format, width and quality of the thumbnails
+            full_res_frames: Frames that also have a full-resolution frames<n>_full image
+        """
+        image_settings = image_settings or ImageSettings()
+        full_res_frames = full_res_frames or set()
+        output_numbers = {
+            frame_number: output_number
+            for output_number, frame_number in enumerate(frame_numbers, start=1)
+        }
+        metadata = {
+            "frames": [],
+            "padding": padding,
+            "total_frames": len(frame_numbers),
+            "frame_groups": [],
+            "frame_mapping": frame_number_mapping or {},
+            "image": {
+                "format": image_settings.format,
+                "width": image_settings.width,
+                "quality": image_settings.quality,
+            },
+        }
+
+        # Create frame metadata
+        for frame_meta in all_frames_metadata:
+            frame_number = frame_meta["frame_number"]
+
+            if frame_meta["is_event"]:
+                # This is an event frame
+                frame_data = frame_meta["event_info"]
+                frame_info = {
+                    "frame_number": frame_number,
+                    "type": frame_data.marker_type,
+                    "is_padding": False,
+                    "event_type": frame_data.marker_type,
+                }
 
                 # Add SCTE data if available
                 if frame_data.frame_text_data:
@@ -538,39 +1831,50 @@ class FFMPEGService:
                     "padding_for": frame_meta["padding_for"],
                 }
 
-            metadata["frames"].append(frame_info)
-
-        # Create event groups for better organization in the HTML view
-        # Group frames by the events they belong to
-        event_frames = [f for f in all_frames_metadata if f["is_event"]]
-        event_frame_numbers = [f["frame_number"] for f in event_frames]
-
-        for event_frame in sorted(event_frames, key=lambda x: x["frame_number"]):
-            event_frame_num = event_frame["frame_number"]
-            event_type = event_frame["event_info"].marker_type
-
-            # Get padding frames for this event
-            padding_frames = [
-                f
-                for f in all_frames_metadata
-                if not f["is_event"] and f["padding_for"] == event_frame_num
-            ]
+            # Add the image files of the frame
+            output_number = output_numbers[frame_number]
+            if not sprite_sheets:
+                frame_info["image"] = f"frames{output_number}{image_settings.extension}"
+            if frame_number in full_res_frames:
+                frame_info["full_image"] = (
+                    f"frames{output_number}_full{image_settings.extension}"
+                )
 
-            # Create a group with this event frame and its padding
-            group_frames = padding_frames + [event_frame]
-            group_frames.sort(key=lambda x: x["frame_number"])
+            # Add the position of the frame in the sprite sheet of its group
+            if sprite_sheets:
+                group_event_frame = (
+                    frame_number
+                    if frame_meta["is_event"]
+                    else frame_meta["padding_for"]
+                )
+                sheet = sprite_sheets.get(group_event_frame)
+                if sheet and frame_number in sheet["tiles"]:
+                    x, y = sheet["tiles"][frame_number]
+                    frame_info["sprite"] = {
+                        "file": sheet["file"],
+                        "x": x,
+                        "y": y,
+                        "width": sheet["tile_width"],
+                        "height": sheet["tile_height"],
+                        "sheet_width": sheet["tile_width"] * sheet["columns"],
+                        "sheet_height": sheet["tile_height"] * sheet["rows"],
+                    }
 
-            group_info = {
-                "event_frame": event_frame_num,
-                "event_type": event_type,
-                "frames": [f["frame_number"] for f in group_frames],
-            }
+            metadata["frames"].append(frame_info)
 
-            metadata["frame_groups"].append(group_info)
+        # Create event groups for better organization in the HTML view
+        metadata["frame_groups"] = self._build_frame_groups(all_frames_metadata)
+
+        if sprite_sheets:
+            for group_info in metadata["frame_groups"]:
+                sheet = sprite_sheets.get(group_info["event_frame"])
+                if sheet:
+                    group_info["sprite"] = {
+                        key: value for key, value in sheet.items() if key != "tiles"
+                    }
 
         # Sort all frames by frame number
         metadata["frames"].sort(key=lambda x: x["frame_number"])
-        metadata["frame_groups"].sort(key=lambda x: x["event_frame"])
 
         # Write metadata to file
         metadata_file = folder / "metadata.json"
@@ -587,6 +1891,11 @@ class FFMPEGService:
                         "frame_number": frame["frame_number"],
                         "type": frame["type"],
                         "is_padding": frame.get("is_padding", False),
+                        **{
+                            key: frame[key]
+                            for key in ("image", "full_image", "sprite")
+                            if key in frame
+                        },
                     }
                     for frame in metadata["frames"]
                 ],
@@ -616,24 +1925,23 @@ class FFMPEGService:
         """
         Build the frame select string for FFMPEG.
 
+        Consecutive frames are combined into a single between() term.
+
         Args:
             frame_numbers: List of frame numbers
 
         Returns:
             str: Frame select string
         """
-        frame_number_selectstring = "'"
-        n_frames = len(frame_numbers)
+        terms = []
 
-        for idx, frame_number in enumerate(frame_numbers, start=1):
-            frame_number_selectstring += f"eq(n,{frame_number})"
-
-            if idx < n_frames:
-                frame_number_selectstring += "+"
-
-        frame_number_selectstring += "'"
+        for frame_range in self._split_into_ranges(frame_numbers):
+            if len(frame_range) == 1:
+                terms.append(f"eq(n,{frame_range[0]})")
+            else:
+                terms.append(f"between(n,{frame_range[0]},{frame_range[-1]})")
 
-        return frame_number_selectstring
+        return "'" + "+".join(terms) + "'"
 
     def _extract_packet(
         self,
@@ -656,22 +1964,14 @@ class FFMPEGService:
         """
         anc_packet = ""
 
-        # Convert fractional time
-        ms, seconds = modf(float(pts_time))
-        seconds = datetime.timedelta(seconds=seconds)
-        ms = self._ms_to_frames(ms)
+        # Convert the presentation time and the start timecode to frame counts
+        file_timestamp = seconds_to_frames(pts_time, self.frame_rate)
+        start_frames = timecode_to_frames(start_timecode, self.frame_rate)
 
-        # Format file timestamp
-        file_timestamp = Template("0${seconds}:${ms}")
-        file_timestamp = file_timestamp.substitute(seconds=seconds, ms=ms)
-
-        # Convert to Timecode objects
-        start_timecode = Timecode(self.frame_rate, start_timecode)
-        file_timestamp = Timecode(self.frame_rate, file_timestamp)
-
-        # Calculate adjusted timestamp
-        adjusted_timestamp = start_timecode + file_timestamp
-        adjusted_timestamp.add_frames(-1)  # Timecode module calculates 1 frame off
+        # Time of day of the packet, wrapping around at midnight
+        adjusted_timestamp = (start_frames + file_timestamp) % frames_per_day(
+            self.frame_rate, ";" in start_timecode
+        )
 
         # Parse packet data
         packet_data_per_line = packet_data.split("\n")
@@ -709,14 +2009,112 @@ class FFMPEGService:
 
         return None
 
-    def _ms_to_frames(self, ms: float) -> int:
-        """
-        Convert milliseconds to frames.
 
-        Args:
-            ms: Milliseconds
+def _iter_json_array(lines: Iterable[str], key: str) -> Iterator[Dict[str, Any]]:
+    """
+    Parse the items of a JSON array in ffprobe output while it is being written.
 
-        Returns:
-            int: Equivalent number of frames
-        """
-        return round((ms / self.frame_duration) * 1000)
+    Args:
+        lines: Lines of the JSON document
+        key: Name of the array, e.g. "packets"
+
+    Yields:
+        Dict[str, Any]: Items of the array, as soon as they are complete
+
+    Raises:
+        RuntimeError: If the output ends inside the array
+    """
+    decoder = json.JSONDecoder()
+    marker = f'"{key}": ['
+    buffer = ""
+    found = False
+
+    for line in lines:
+        buffer += line
+        if not found:
+            index = buffer.find(marker)
+            if index < 0:
+                buffer = buffer[-len(marker) :]
+                continue
+            found = True
+            buffer = buffer[index + len(marker) :]
+
+        # ffprobe ends every item on its own line, so only try to decode there
+        if not line.lstrip().startswith(("}", "]")):
+            continue
+
+        while True:
+            buffer = buffer.lstrip(" \t\r\n,")
+            if not buffer:
+                break
+            if buffer[0] == "]":
+                return
+            try:
+                item, consumed = decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                # The item is not complete yet
+                break
+            yield item
+            buffer = buffer[consumed:]
+
+    if found:
+        raise RuntimeError(f"ffprobe output ended inside the {key} array")
+
+
+def _escape_sendcmd_argument(value: str) -> str:
+    """
+    Escape a drawtext option value for use in a sendcmd reinit argument.
+
+    ffmpeg unescapes the value twice: once when sendcmd reads the command
+    argument and once when drawtext parses the reinit option string.
+
+    Args:
+        value: Option value to escape
+
+    Returns:
+        str: Escaped option value
+    """
+    option_value = re.sub(r"([\\':])", r"\\\1", value)
+    return re.sub(r"([\\'\s,;])", r"\\\1", option_value)
+
+
+def _escape_filter_path(path: Path) -> str:
+    """
+    Escape a file path for use as a quoted filter option value.
+
+    Args:
+        path: File path
+
+    Returns:
+        str: Escaped path, to be wrapped in single quotes
+    """
+    return path.as_posix().replace(":", "\\:")
+
+
+@functools.lru_cache(maxsize=None)
+def _ffmpeg_encoders() -> frozenset:
+    """
+    Get the names of the encoders the installed ffmpeg supports.
+
+    Returns:
+        frozenset: Encoder names, empty if ffmpeg could not be run
+    """
+    try:
+        result = subprocess.run(
+            ["ffmpeg", "-hide_banner", "-encoders"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            universal_newlines=True,
+        )
+    except OSError as e:
+        logger.error(f"Could not list ffmpeg encoders: {e}")
+        return frozenset()
+
+    # Encoder lines look like " V....D libwebp   libwebp WebP image (codec webp)"
+    encoders = set()
+    for line in result.stdout.splitlines():
+        fields = line.split()
+        if len(fields) >= 2 and len(fields[0]) == 6 and fields[0] != "------":
+            encoders.add(fields[1])
+
+    return frozenset(encoders)
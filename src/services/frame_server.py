@@ -0,0 +1,423 @@
+"""
+Frame Server module for decoding video frames in-process with PyAV.
+
+This module provides a frame server that keeps one container open per media
+file, seeks to the nearest keyframe before a requested frame, decodes forward
+and caches the decoded (and optionally downscaled) frames in a bounded LRU
+cache. Thumbnails for padding frames, re-renders with other overlays and the
+HTML viewer can then share the same decodes instead of spawning ffmpeg.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from fractions import Fraction
+from typing import Any, Dict, Iterator, NamedTuple, Optional
+
+# PyAV and Pillow are optional, they are only needed for the frame server
+try:
+    import av
+except ImportError:
+    av = None
+
+try:
+    from PIL import Image, ImageDraw, ImageFont
+except ImportError:
+    Image = None
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+# Constants
+DEFAULT_CACHE_BYTES = 256 * 1024 * 1024  # 256 MiB of decoded RGB frames
+DEFAULT_MAX_OPEN_FILES = 4
+# Decode forward instead of seeking when the requested frame is this close
+FORWARD_DECODE_LIMIT = 50
+
+
+class FrameKey(NamedTuple):
+    """Cache key of a decoded frame."""
+
+    filename: str
+    frame_number: int
+
+
+class _OpenFile:
+    """State of an open container: stream timing and the current decode position."""
+
+    def __init__(self, filename: str):
+        self.container = av.open(filename)
+        self.stream = self.container.streams.video[0]
+        self.stream.thread_type = "AUTO"
+        self.rate = Fraction(self.stream.average_rate or self.stream.guessed_rate)
+        self.time_base = Fraction(self.stream.time_base)
+        self.start_pts = self.stream.start_time or 0
+        self.lock = threading.Lock()
+        # Guarded by the frame server's files lock: an evicted container is
+        # closed by the last thread still using it
+        self.users = 0
+        self.evicted = False
+        self.decoder: Optional[Iterator[Any]] = None
+        self.position: Optional[int] = None  # Frame number of the next decoded frame
+
+    def frame_to_pts(self, frame_number: int) -> int:
+        """Convert a frame number to a presentation timestamp in stream time base."""
+        return self.start_pts + round(frame_number / self.rate / self.time_base)
+
+    def pts_to_frame(self, pts: int) -> int:
+        """Convert a presentation timestamp in stream time base to a frame number."""
+        return round((pts - self.start_pts) * self.time_base * self.rate)
+
+    def close(self) -> None:
+        """Close the underlying container."""
+        self.decoder = None
+        self.container.close()
+
+
+class FrameServer:
+    """
+    In-process frame server backed by PyAV.
+
+    Frames are addressed by (file, frame number). Decoded frames are converted
+    to RGB, downscaled to the configured width and kept in an LRU cache that is
+    bounded by the total number of bytes of the cached frames.
+    """
+
+    def __init__(
+        self,
+        width: Optional[int] = None,
+        max_cache_bytes: int = DEFAULT_CACHE_BYTES,
+        max_open_files: int = DEFAULT_MAX_OPEN_FILES,
+    ):
+        """
+        Initialize the frame server.
+
+        Args:
+            width: Width to downscale frames to, keeping the aspect ratio. None keeps the original size.
+            max_cache_bytes: Maximum total size of the cached frames in bytes
+            max_open_files: Maximum number of containers to keep open
+
+        Raises:
+            RuntimeError: If PyAV is not installed
+        """
+        if av is None:
+            raise RuntimeError("The frame server requires PyAV (pip install av)")
+
+        self.width = width
+        self.max_cache_bytes = max_cache_bytes
+        self.max_open_files = max(1, max_open_files)
+
+        self._cache: "OrderedDict[FrameKey, Any]" = OrderedDict()
+        self._cache_bytes = 0
+        self._cache_lock = threading.Lock()
+        self._files: "OrderedDict[str, _OpenFile]" = OrderedDict()
+        self._files_lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def __enter__(self) -> "FrameServer":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def get_frame(self, filename: str, frame_number: int) -> Any:
+        """
+        Get a decoded frame, decoding it if it is not cached yet.
+
+        Args:
+            filename: Path to the media file
+            frame_number: Zero-based frame number
+
+        Returns:
+            av.VideoFrame: Decoded RGB frame
+
+        Raises:
+            IndexError: If the frame lies beyond the end of the stream
+        """
+        key = FrameKey(filename, frame_number)
+
+        frame = self._cache_get(key, count=True)
+        if frame is not None:
+            return frame
+
+        open_file = self._open(filename)
+        try:
+            with open_file.lock:
+                # Another thread may have decoded the frame while we waited
+                frame = self._cache_get(key)
+                if frame is not None:
+                    return frame
+
+                return self._decode_until(open_file, filename, frame_number)
+        finally:
+            self._release(open_file)
+
+    def get_image(self, filename: str, frame_number: int) -> Any:
+        """
+        Get a decoded frame as a Pillow image.
+
+        Args:
+            filename: Path to the media file
+            frame_number: Zero-based frame number
+
+        Returns:
+            PIL.Image.Image: Decoded frame
+
+        Raises:
+            RuntimeError: If Pillow is not installed
+        """
+        if Image is None:
+            raise RuntimeError("Converting frames to images requires Pillow")
+
+        return self.get_frame(filename, frame_number).to_image()
+
+    def cache_info(self) -> Dict[str, int]:
+        """
+        Get statistics about the frame cache.
+
+        Returns:
+            Dict[str, int]: Number of hits, misses, cached frames and cached bytes
+        """
+        with self._cache_lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "frames": len(self._cache),
+                "bytes": self._cache_bytes,
+            }
+
+    def close(self) -> None:
+        """Close all open containers and clear the cache.
+
+        Containers that other threads are decoding from are closed when they are done.
+        """
+        with self._files_lock:
+            for open_file in self._files.values():
+                self._evict(open_file)
+            self._files.clear()
+
+        with self._cache_lock:
+            self._cache.clear()
+            self._cache_bytes = 0
+
+    def _open(self, filename: str) -> _OpenFile:
+        """
+        Get the open container for a file, opening it if needed.
+
+        The container stays open until it is released with _release, even if
+        it is evicted in the meantime.
+
+        Args:
+            filename: Path to the media file
+
+        Returns:
+            _OpenFile: Open container state
+        """
+        with self._files_lock:
+            open_file = self._files.get(filename)
+            if open_file is not None:
+                self._files.move_to_end(filename)
+            else:
+                logger.info(f"Opening {filename} in frame server")
+                open_file = _OpenFile(filename)
+                self._files[filename] = open_file
+
+                while len(self._files) > self.max_open_files:
+                    _, evicted = self._files.popitem(last=False)
+                    self._evict(evicted)
+
+            open_file.users += 1
+            return open_file
+
+    def _release(self, open_file: _OpenFile) -> None:
+        """Stop using a container, closing it if it was evicted meanwhile."""
+        with self._files_lock:
+            open_file.users -= 1
+            if open_file.evicted and open_file.users == 0:
+                open_file.close()
+
+    @staticmethod
+    def _evict(open_file: _OpenFile) -> None:
+        """Close an evicted container, or leave that to its last user.
+
+        Must be called with the files lock held.
+        """
+        open_file.evicted = True
+        if open_file.users == 0:
+            open_file.close()
+
+    def _decode_until(
+        self, open_file: _OpenFile, filename: str, frame_number: int
+    ) -> Any:
+        """
+        Decode forward until the requested frame, caching every decoded frame.
+
+        Seeks to the keyframe at or before the requested frame unless the
+        decoder is already positioned shortly before it.
+
+        Args:
+            open_file: Open container state
+            filename: Path to the media file
+            frame_number: Zero-based frame number
+
+        Returns:
+            av.VideoFrame: Decoded RGB frame
+
+        Raises:
+            IndexError: If the frame lies beyond the end of the stream
+        """
+        position = open_file.position
+        if (
+            open_file.decoder is None
+            or position is None
+            or not position <= frame_number <= position + FORWARD_DECODE_LIMIT
+        ):
+            open_file.container.seek(
+                open_file.frame_to_pts(frame_number),
+                stream=open_file.stream,
+                backward=True,
+                any_frame=False,
+            )
+            open_file.decoder = open_file.container.decode(open_file.stream)
+            open_file.position = None
+
+        for frame in open_file.decoder:
+            if frame.pts is None:
+                continue
+
+            decoded_number = open_file.pts_to_frame(frame.pts)
+            open_file.position = decoded_number + 1
+
+            if decoded_number > frame_number:
+                # Requested frame does not exist (e.g. a gap in the timestamps)
+                break
+
+            scaled = self._scale(frame)
+            self._cache_put(FrameKey(filename, decoded_number), scaled)
+
+            if decoded_number == frame_number:
+                return scaled
+
+        open_file.decoder = None
+        open_file.position = None
+        raise IndexError(f"Frame {frame_number} not found in {filename}")
+
+    def _scale(self, frame: Any) -> Any:
+        """
+        Convert a frame to RGB and downscale it to the configured width.
+
+        Args:
+            frame: Decoded av.VideoFrame
+
+        Returns:
+            av.VideoFrame: RGB frame
+        """
+        if self.width is None or self.width >= frame.width:
+            return frame.reformat(format="rgb24")
+
+        # Keep the aspect ratio with an even height
+        height = max(2, round(self.width * frame.height / frame.width / 2) * 2)
+        return frame.reformat(width=self.width, height=height, format="rgb24")
+
+    def _cache_get(self, key: FrameKey, count: bool = False) -> Optional[Any]:
+        """Look up a frame in the cache and mark it as most recently used.
+
+        With count the lookup is added to the hits or misses.
+        """
+        with self._cache_lock:
+            frame = self._cache.get(key)
+            if frame is not None:
+                self._cache.move_to_end(key)
+            if count:
+                if frame is not None:
+                    self.hits += 1
+                else:
+                    self.misses += 1
+            return frame
+
+    def _cache_put(self, key: FrameKey, frame: Any) -> None:
+        """Add a frame to the cache and evict the least recently used frames."""
+        size = _frame_bytes(frame)
+
+        with self._cache_lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return
+
+            self._cache[key] = frame
+            self._cache_bytes += size
+
+            while self._cache_bytes > self.max_cache_bytes and len(self._cache) > 1:
+                _, evicted = self._cache.popitem(last=False)
+                self._cache_bytes -= _frame_bytes(evicted)
+
+
+def _frame_bytes(frame: Any) -> int:
+    """Get the size in bytes of a decoded RGB frame."""
+    return frame.width * frame.height * 3
+
+
+def pillow_can_save(extension: str) -> bool:
+    """
+    Check whether Pillow can write images with a file extension.
+
+    Args:
+        extension: File extension including the dot, e.g. ".webp"
+
+    Returns:
+        bool: True if Pillow has a writer for the extension
+    """
+    if Image is None:
+        return False
+
+    image_format = Image.registered_extensions().get(extension.lower())
+    return image_format is not None and image_format in Image.SAVE
+
+
+def draw_overlay_text(image: Any, text: str, font_size: int = 24) -> Any:
+    """
+    Draw overlay text centered at the bottom of an image.
+
+    Mirrors the ffmpeg drawtext overlay: yellow text on a half-transparent
+    black box. The font size is scaled with the image height relative to 1080p.
+
+    Args:
+        image: PIL.Image.Image to draw on
+        text: Overlay text, may contain newlines
+        font_size: Font size at 1080 lines
+
+    Returns:
+        PIL.Image.Image: Image with the overlay
+    """
+    if Image is None:
+        raise RuntimeError("Drawing overlays requires Pillow")
+
+    scaled_size = max(8, round(font_size * image.height / 1080))
+    try:
+        font = ImageFont.load_default(size=scaled_size)
+    except TypeError:
+        # Pillow < 10.1 has no scalable default font
+        font = ImageFont.load_default()
+
+    overlay = Image.new("RGBA", image.size, (0, 0, 0, 0))
+    draw = ImageDraw.Draw(overlay)
+    left, top, right, bottom = draw.multiline_textbbox((0, 0), text, font=font)
+    text_width, text_height = right - left, bottom - top
+    x = (image.width - text_width) // 2
+    y = image.height - text_height - scaled_size // 2
+    border = max(2, scaled_size // 3)
+
+    draw.rectangle(
+        (x - border, y - border, x + text_width + border, y + text_height + border),
+        fill=(0, 0, 0, 128),
+    )
+    draw.multiline_text(
+        (x - left, y - top), text, font=font, fill=(255, 255, 0, 255), align="center"
+    )
+
+    return Image.alpha_composite(image.convert("RGBA"), overlay).convert("RGB")
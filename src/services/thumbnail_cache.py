@@ -0,0 +1,144 @@
+"""
+Thumbnail Cache module for reusing rendered thumbnails between runs.
+
+This module provides a content-addressed store of rendered thumbnails. An
+image is stored under a key derived from the media file fingerprint, the
+frame number, the overlay text and the render settings, so a re-run only has
+to render the frames whose key is not in the store yet.
+"""
+
+import hashlib
+import logging
+import os
+import shutil
+from pathlib import Path
+from typing import Optional, Union
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+# Constants
+CACHE_FOLDER_NAME = ".thumbnail_cache"
+
+
+def link_file(source: Path, destination: Path) -> None:
+    """
+    Hard-link a file to a destination path, copying it if linking fails.
+
+    Args:
+        source: Existing file
+        destination: Path to place the file at, replaced if it exists
+    """
+    if destination.exists() or destination.is_symlink():
+        destination.unlink()
+
+    try:
+        os.link(source, destination)
+    except OSError:
+        # Hard links fail across file systems, fall back to a copy
+        shutil.copyfile(source, destination)
+
+
+class ThumbnailCache:
+    """
+    Content-addressed store of rendered thumbnails.
+
+    Images are stored as <cache_dir>/<key[:2]>/<key><suffix>. Output folders
+    receive hard links to the stored images, or copies when the output folder
+    is on another file system.
+    """
+
+    def __init__(self, cache_dir: Union[str, Path]):
+        """
+        Initialize the thumbnail cache.
+
+        Args:
+            cache_dir: Directory holding the cached images
+        """
+        self.cache_dir = Path(cache_dir)
+
+    @staticmethod
+    def make_key(
+        fingerprint: str, frame_number: int, overlay_text: str, render_signature: str
+    ) -> str:
+        """
+        Build the cache key of a rendered thumbnail.
+
+        Args:
+            fingerprint: Fingerprint of the media file
+            frame_number: Zero-based frame number
+            overlay_text: Text drawn on the thumbnail
+            render_signature: Description of the render settings (renderer, size, quality)
+
+        Returns:
+            str: Hex digest used as cache key
+        """
+        text_hash = hashlib.sha1(overlay_text.encode("utf-8")).hexdigest()
+        key = f"{fingerprint}:{frame_number}:{text_hash}:{render_signature}"
+        return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+    def path(self, key: str, suffix: str = ".jpg") -> Path:
+        """
+        Get the path of a cached image.
+
+        Args:
+            key: Cache key
+            suffix: File extension of the image
+
+        Returns:
+            Path: Location of the image in the cache
+        """
+        return self.cache_dir / key[:2] / f"{key}{suffix}"
+
+    def get(self, key: str, suffix: str = ".jpg") -> Optional[Path]:
+        """
+        Look up a cached image.
+
+        Args:
+            key: Cache key
+            suffix: File extension of the image
+
+        Returns:
+            Optional[Path]: Location of the image, or None if it is not cached
+        """
+        path = self.path(key, suffix)
+        return path if path.is_file() else None
+
+    def put(self, key: str, source: Path, suffix: str = ".jpg") -> Path:
+        """
+        Move a rendered image into the cache.
+
+        Args:
+            key: Cache key
+            source: Rendered image, moved into the cache
+            suffix: File extension of the image
+
+        Returns:
+            Path: Location of the image in the cache
+        """
+        path = self.path(key, suffix)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        shutil.move(str(source), str(path))
+        return path
+
+    def link(self, key: str, destination: Path, suffix: str = ".jpg") -> bool:
+        """
+        Place a cached image at a destination path.
+
+        Args:
+            key: Cache key
+            destination: Path to place the image at, replaced if it exists
+            suffix: File extension of the image
+
+        Returns:
+            bool: True if the image was placed, False if it is not cached
+        """
+        path = self.get(key, suffix)
+        if path is None:
+            return False
+
+        link_file(path, destination)
+        return True
@@ -0,0 +1,149 @@
+"""
+Thumbnail Scheduler module for rendering thumbnails while a file is scanned.
+
+Event frames are added while the SCTE-104 packets of a file are scanned.
+Once the scan has moved more than EVENT_GROUP_GAP frames past the last frame
+of an event group, later frames can no longer join that group, so its
+thumbnails are rendered into the thumbnail cache on a worker pool while the
+scan continues. The final extract_thumbnails run then finds them in the
+cache and only renders the groups that were still open when the scan ended.
+"""
+
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, List, Optional, Union
+
+from .ffmpeg_service import EVENT_GROUP_GAP, FFMPEGFrameData, FFMPEGService
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+
+class ThumbnailScheduler:
+    """
+    Renders the thumbnails of closed event groups while a scan continues.
+    """
+
+    def __init__(
+        self,
+        ffmpeg_service: FFMPEGService,
+        video_filename: str,
+        folder: Union[str, Path],
+        padding: int,
+        max_workers: Optional[int] = None,
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            ffmpeg_service: Service rendering the thumbnails, with the thumbnail cache enabled
+            video_filename: Path to the media file
+            folder: Output folder the thumbnails will be extracted to
+            padding: Number of frames to include before and after each event group
+            max_workers: Maximum number of groups rendered at the same time
+                         (default: the service's max_workers)
+        """
+        self.ffmpeg_service = ffmpeg_service
+        self.video_filename = video_filename
+        self.folder = Path(folder)
+        self.padding = padding
+        self.max_workers = max(1, max_workers or ffmpeg_service.max_workers)
+
+        # Event frames of groups that may still grow
+        self._pending: List[FFMPEGFrameData] = []
+        # Last frame, padding included, of the groups scheduled so far
+        self._last_scheduled_frame = -1
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        self._jobs: List[Future] = []
+
+    def __enter__(self) -> "ThumbnailScheduler":
+        return self
+
+    def __exit__(self, exc_type: Any, *exc_info: Any) -> None:
+        self.close(cancel=exc_type is not None)
+
+    @property
+    def scheduled_groups(self) -> int:
+        """Number of event groups handed to the worker pool."""
+        return len(self._jobs)
+
+    def add(self, frames: List[FFMPEGFrameData], scan_frame: int) -> None:
+        """
+        Add the event frames of a packet and schedule the groups that closed.
+
+        Args:
+            frames: Event frames found in the packet, may be empty
+            scan_frame: Frame number of the packet, frames found later lie at or after it
+        """
+        self._pending.extend(frames)
+        if not self._pending:
+            return
+
+        groups = self.ffmpeg_service.group_event_frames(self._pending)
+        open_groups = []
+        for group in groups:
+            if group[-1].frame_number + EVENT_GROUP_GAP < scan_frame:
+                self._schedule(group)
+            else:
+                open_groups.append(group)
+
+        self._pending = [frame for group in open_groups for frame in group]
+
+    def _schedule(self, group: List[FFMPEGFrameData]) -> None:
+        """
+        Hand the rendering of a closed event group to the worker pool.
+
+        Args:
+            group: Event frames of the group, sorted by frame number
+        """
+        logger.info(
+            f"Scheduling thumbnails of event frames "
+            f"{[frame.frame_number for frame in group]}"
+        )
+        self._jobs.append(
+            self._executor.submit(
+                self.ffmpeg_service.prefetch_thumbnails,
+                self.video_filename,
+                group,
+                self.padding,
+                self.folder,
+                self._last_scheduled_frame,
+            )
+        )
+        self._last_scheduled_frame = max(
+            self._last_scheduled_frame, group[-1].frame_number + max(2, self.padding)
+        )
+
+    def close(self, cancel: bool = False) -> None:
+        """
+        Wait for the scheduled groups to be rendered.
+
+        Groups that are still open are left to extract_thumbnails. Failed
+        groups are logged, extract_thumbnails renders their frames again.
+
+        Args:
+            cancel: Drop the groups that did not start yet, e.g. after an error
+        """
+        if cancel:
+            for job in self._jobs:
+                job.cancel()
+
+        done, _ = wait(self._jobs)
+        self._executor.shutdown()
+
+        for job in done:
+            if job.cancelled():
+                continue
+            try:
+                result = job.result()
+            except Exception as e:
+                logger.warning(f"Error rendering thumbnails ahead of time: {e}")
+                continue
+            if result.return_code != 0:
+                logger.warning(
+                    f"Error rendering thumbnails ahead of time: {result.error}"
+                )
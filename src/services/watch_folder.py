@@ -0,0 +1,336 @@
+"""
+Watch Folder module for processing media files as they arrive in a directory.
+
+The directory is polled for new files. A file is handed to the worker pool
+once its size and modification time have stopped changing, so files that are
+still being written by a recorder are left alone. Finished files are
+remembered by fingerprint in a state file, so restarts and files that are
+moved or copied again are not processed twice. When more files are waiting
+than there are workers, the newest file is processed first.
+"""
+
+import datetime
+import heapq
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, Set, Tuple, Union
+
+from pyvanc.utils.fingerprint import file_fingerprint
+
+logger = logging.getLogger(__name__)
+
+# Constants
+DEFAULT_POLL_INTERVAL = 5.0  # Seconds between directory scans
+DEFAULT_STABLE_POLLS = 2  # Scans a file must stay unchanged before processing
+DEFAULT_WATCH_WORKERS = 2
+DEFAULT_WATCH_EXTENSIONS = (".mxf",)
+STATE_FILE_NAME = ".watch_state.json"
+STATE_VERSION = 1
+
+
+class FileSignature(NamedTuple):
+    """Size and modification time of a file, to detect that it changed."""
+
+    size: int
+    mtime_ns: int
+
+
+def write_json_atomically(data: Dict, path: Path) -> None:
+    """
+    Write a JSON file so that readers never see a partially written file.
+
+    Args:
+        data: Data to write
+        path: Output file
+    """
+    fd, temp_name = tempfile.mkstemp(prefix=f".{path.name}.", dir=path.parent)
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=2)
+        os.replace(temp_name, path)
+    except BaseException:
+        os.unlink(temp_name)
+        raise
+
+
+def write_folder_atomically(folder: Path, produce: Callable[[Path], bool]) -> bool:
+    """
+    Produce the contents of a folder in a staging folder and swap it into place.
+
+    The staging folder is created next to the destination and renamed to it
+    once produce() succeeds, so the destination always holds either the
+    previous or the complete new results.
+
+    Args:
+        folder: Destination folder
+        produce: Writes the results into the given folder, returns True on success
+
+    Returns:
+        bool: True if the results were produced and moved into place
+    """
+    folder.parent.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(prefix=f".{folder.name}.", dir=folder.parent))
+
+    try:
+        if not produce(staging):
+            return False
+
+        if folder.exists():
+            # Move the old results aside first, a folder cannot be replaced in one rename
+            previous = Path(
+                tempfile.mkdtemp(prefix=f".{folder.name}.old.", dir=folder.parent)
+            )
+            os.replace(folder, previous / folder.name)
+            os.replace(staging, folder)
+            shutil.rmtree(previous, ignore_errors=True)
+        else:
+            os.replace(staging, folder)
+
+        return True
+    finally:
+        if staging.exists():
+            shutil.rmtree(staging, ignore_errors=True)
+
+
+class WatchFolder:
+    """
+    Polls a directory and processes completed files on a bounded worker pool.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        handler: Callable[[Path], bool],
+        state_file: Optional[Union[str, Path]] = None,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        stable_polls: int = DEFAULT_STABLE_POLLS,
+        max_workers: int = DEFAULT_WATCH_WORKERS,
+        extensions: Tuple[str, ...] = DEFAULT_WATCH_EXTENSIONS,
+        recursive: bool = False,
+    ):
+        """
+        Initialize the watch folder.
+
+        Args:
+            directory: Directory to watch
+            handler: Processes one file, returns True on success. Called from
+                     worker threads, so it must not share unsynchronized state.
+            state_file: File remembering processed fingerprints (default: .watch_state.json in the directory)
+            poll_interval: Seconds between directory scans
+            stable_polls: Number of scans a file must stay unchanged before it is processed
+            max_workers: Maximum number of files processed at the same time
+            extensions: File extensions to process (case-insensitive)
+            recursive: Whether to watch subdirectories as well
+        """
+        self.directory = Path(directory)
+        self.handler = handler
+        self.state_file = (
+            Path(state_file) if state_file else self.directory / STATE_FILE_NAME
+        )
+        self.poll_interval = poll_interval
+        self.stable_polls = max(1, stable_polls)
+        self.max_workers = max(1, max_workers)
+        self.extensions = tuple(extension.lower() for extension in extensions)
+        self.recursive = recursive
+
+        # Files seen while they may still be written: signature and unchanged scan count
+        self._pending: Dict[Path, Tuple[FileSignature, int]] = {}
+        # Signatures of files that were queued or handled, to skip them cheaply
+        self._handled: Dict[Path, FileSignature] = {}
+        # Stable files waiting for a worker, newest first
+        self._queue: List[Tuple[int, str]] = []
+        self._queued: Set[Path] = set()
+        self._running: Dict[Future, Tuple[Path, str]] = {}
+
+        self.processed = self._load_state()
+
+    def _load_state(self) -> Dict[str, Dict]:
+        """
+        Load the fingerprints of files processed by earlier runs.
+
+        Returns:
+            Dict[str, Dict]: Processing record per fingerprint
+        """
+        if not self.state_file.is_file():
+            return {}
+
+        try:
+            with open(self.state_file) as f:
+                state = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable watch state {self.state_file}: {e}")
+            return {}
+
+        if state.get("version") != STATE_VERSION:
+            logger.warning(
+                f"Ignoring watch state of another version: {self.state_file}"
+            )
+            return {}
+
+        return state.get("processed", {})
+
+    def _save_state(self) -> None:
+        """Write the processed fingerprints to the state file."""
+        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        write_json_atomically(
+            {"version": STATE_VERSION, "processed": self.processed}, self.state_file
+        )
+
+    def _candidates(self) -> List[Path]:
+        """
+        List the files in the watched directory with a watched extension.
+
+        Returns:
+            List[Path]: Candidate files
+        """
+        pattern = "**/*" if self.recursive else "*"
+        return [
+            path
+            for path in self.directory.glob(pattern)
+            if path.suffix.lower() in self.extensions
+            and not path.name.startswith(".")
+            and path.is_file()
+        ]
+
+    def poll(self) -> int:
+        """
+        Scan the directory and queue the files that stopped changing.
+
+        Returns:
+            int: Number of files queued by this scan
+        """
+        queued = 0
+        seen = set()
+
+        for path in self._candidates():
+            try:
+                stat = path.stat()
+            except OSError:
+                # Removed or renamed since the directory listing
+                continue
+
+            seen.add(path)
+            signature = FileSignature(stat.st_size, stat.st_mtime_ns)
+            if self._handled.get(path) == signature or path in self._queued:
+                continue
+
+            previous, unchanged = self._pending.get(path, (None, 0))
+            unchanged = unchanged + 1 if previous == signature else 0
+            if unchanged < self.stable_polls or signature.size == 0:
+                self._pending[path] = (signature, unchanged)
+                continue
+
+            del self._pending[path]
+            self._handled[path] = signature
+            heapq.heappush(self._queue, (-signature.mtime_ns, str(path)))
+            self._queued.add(path)
+            queued += 1
+
+        # Forget files that disappeared before they were complete
+        for path in list(self._pending):
+            if path not in seen:
+                del self._pending[path]
+
+        return queued
+
+    def _dispatch(self, executor: ThreadPoolExecutor) -> None:
+        """
+        Start the newest queued files while workers are free.
+
+        Files are only submitted when a worker is free, so a newer file that
+        arrives later still overtakes older files that are waiting.
+
+        Args:
+            executor: Worker pool
+        """
+        while self._queue and len(self._running) < self.max_workers:
+            _, name = heapq.heappop(self._queue)
+            path = Path(name)
+            self._queued.discard(path)
+
+            try:
+                fingerprint = file_fingerprint(path)
+            except OSError as e:
+                logger.warning(f"Skipping {path}: {e}")
+                continue
+
+            running = {fingerprint for _, fingerprint in self._running.values()}
+            if fingerprint in self.processed or fingerprint in running:
+                logger.debug(f"Already processed, skipping: {path}")
+                continue
+
+            logger.info(f"Processing {path}")
+            future = executor.submit(self.handler, path)
+            self._running[future] = (path, fingerprint)
+
+    def _collect(self, done: Set[Future]) -> None:
+        """
+        Record the results of finished jobs.
+
+        Args:
+            done: Finished jobs
+        """
+        for future in done:
+            path, fingerprint = self._running.pop(future)
+            try:
+                success = bool(future.result())
+            except Exception as e:
+                logger.exception(f"Error processing {path}: {e}")
+                success = False
+
+            if success:
+                logger.info(f"Finished {path}")
+                self.processed[fingerprint] = {
+                    "path": str(path),
+                    "processed_at": datetime.datetime.now(
+                        datetime.timezone.utc
+                    ).isoformat(),
+                }
+                self._save_state()
+            else:
+                # Retried only when the file changes, not on every scan
+                logger.error(f"Failed to process {path}")
+
+    def run(self, once: bool = False) -> None:
+        """
+        Watch the directory until interrupted.
+
+        Args:
+            once: Process the files in the directory and return, instead of
+                  watching. Files that are still being written are waited for.
+        """
+        logger.info(
+            f"Watching {self.directory} every {self.poll_interval:g}s "
+            f"with {self.max_workers} workers"
+        )
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            try:
+                while True:
+                    self.poll()
+                    self._dispatch(executor)
+
+                    if once and not self._pending and not self._queue:
+                        done, _ = wait(self._running)
+                        self._collect(done)
+                        break
+
+                    if self._running:
+                        done, _ = wait(
+                            self._running,
+                            timeout=self.poll_interval,
+                            return_when=FIRST_COMPLETED,
+                        )
+                        self._collect(done)
+                    else:
+                        time.sleep(self.poll_interval)
+            except KeyboardInterrupt:
+                logger.info("Stopping, waiting for running jobs to finish")
+                done, _ = wait(self._running)
+                self._collect(done)
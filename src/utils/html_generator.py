@@ -19,6 +19,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Per-frame thumbnails, excluding the full-resolution frames<n>_full copies
+FRAME_FILE_PATTERN = re.compile(r"frames(\d+)\.(?:jpg|webp|avif)$")
+
 HTML_TEMPLATE = """<!DOCTYPE html>
 <html lang="en">
 <head>
@@ -229,6 +232,11 @@ select {
     transition: all 0.3s;
 }
 
+.frame-sprite {
+    height: auto;
+    background-repeat: no-repeat;
+}
+
 .frame-image:hover {
     filter: brightness(1.1);
 }
@@ -440,7 +448,9 @@ JS_TEMPLATE = """document.addEventListener('DOMContentLoaded', function() {
     document.querySelectorAll('.frame-image').forEach(img => {
         img.addEventListener('click', function() {
             modal.style.display = 'flex';
-            modalImg.src = this.src;
+            // Open the full-resolution copy if there is one, sprite tiles
+            // without one open the whole sprite sheet of their group
+            modalImg.src = this.dataset.fullSrc || this.src;
             
             // Add animation class after a small delay to trigger transition
             setTimeout(() => {
@@ -673,12 +683,65 @@ JS_TEMPLATE = """document.addEventListener('DOMContentLoaded', function() {
 """
 
 
-def generate_frame_html_item(frame_path: Path, frame_data: Dict[str, Any]) -> str:
+def generate_frame_image_html(
+    frame_path: Optional[Path], frame_data: Dict[str, Any]
+) -> str:
+    """
+    Generate the image element of a frame item.
+
+    Frames rendered into a sprite sheet are shown as a CSS sprite: the sheet is
+    scaled so one tile fills the element and offset to the tile of the frame.
+    Frames with a full-resolution copy offer it through srcset and open it in
+    the enlarged view. Images are loaded lazily as they scroll into view.
+
+    Args:
+        frame_path: Path to the frame image, unused for sprite frames
+        frame_data: Frame metadata
+
+    Returns:
+        str: HTML for the frame image
+    """
+    frame_number = frame_data["frame_number"]
+    sprite = frame_data.get("sprite")
+    full_image = frame_data.get("full_image")
+
+    if not sprite:
+        srcset = f' srcset="{frame_path.name} 1x, {full_image} 2x"' if full_image else ""
+        return (
+            f'<img src="{frame_path.name}"{srcset} alt="Frame {frame_number}" '
+            f'class="frame-image" loading="lazy" decoding="async" '
+            f'data-full-src="{full_image or frame_path.name}">'
+        )
+
+    columns = sprite["sheet_width"] / sprite["width"]
+    rows = sprite["sheet_height"] / sprite["height"]
+    x_percent = (
+        sprite["x"] / (sprite["sheet_width"] - sprite["width"]) * 100 if columns > 1 else 0
+    )
+    y_percent = (
+        sprite["y"] / (sprite["sheet_height"] - sprite["height"]) * 100 if rows > 1 else 0
+    )
+    style = (
+        f"background-image: url('{sprite['file']}'); "
+        f"background-size: {columns * 100:g}% {rows * 100:g}%; "
+        f"background-position: {x_percent:g}% {y_percent:g}%; "
+        f"aspect-ratio: {sprite['width']} / {sprite['height']};"
+    )
+
+    return (
+        f'<div class="frame-image frame-sprite" role="img" aria-label="Frame {frame_number}" '
+        f'data-full-src="{full_image or sprite["file"]}" style="{style}"></div>'
+    )
+
+
+def generate_frame_html_item(
+    frame_path: Optional[Path], frame_data: Dict[str, Any]
+) -> str:
     """
     Generate HTML for a single frame item.
 
     Args:
-        frame_path: Path to the frame image
+        frame_path: Path to the frame image, or None if the frame is in a sprite sheet
         frame_data: Frame metadata
 
     Returns:
@@ -758,7 +821,7 @@ def generate_frame_html_item(frame_path: Path, frame_data: Dict[str, Any]) -> st
     html = f"""
     <div class="frame-item {frame_class}" data-frame-number="{frame_number}">
         <div class="frame-badge">{display_type}</div>
-        <img src="{frame_path.name}" alt="Frame {frame_number}" class="frame-image">
+        {generate_frame_image_html(frame_path, frame_data)}
         <div class="frame-info">
             <div class="frame-number">Frame {frame_number}</div>
             <span class="frame-type {type_class}">{frame_type}</span>
@@ -806,13 +869,16 @@ def generate_html_viewer(results_dir: Path, input_file: str) -> None:
 
     # Get all frame images by mapping frame number to file
     frame_files = {}
-    for file_path in results_dir.glob("frames*.jpg"):
-        match = re.match(r"frames(\d+)\.jpg", file_path.name)
+    for file_path in results_dir.glob("frames*"):
+        match = FRAME_FILE_PATTERN.match(file_path.name)
         if match:
             frame_number = int(match.group(1))
             frame_files[frame_number] = file_path
 
-    if not frame_files:
+    # In sprite mode the frames are tiles of per-group sprite sheets
+    has_sprites = any("sprite" in frame for frame in metadata["frames"])
+
+    if not frame_files and not has_sprites:
         logger.warning(f"No frame files found in {results_dir}")
         return
 
@@ -866,7 +932,7 @@ def generate_html_viewer(results_dir: Path, input_file: str) -> None:
     # Generate the HTML content
     html_content = HTML_TEMPLATE.format(
         filename=Path(input_file).name,
-        total_frames=len(frame_files),
+        total_frames=len(frame_files) or metadata.get("total_frames", 0),
         frame_items=frame_items_html,
     )
 
@@ -1066,11 +1132,11 @@ def generate_grouped_frame_html(
                         "padding_for": event_frame if not is_event else None,
                     }
 
-                # Check if the mapped frame number is in our frame files
-                if mapped_frame_num in frame_files:
+                # Check if the mapped frame number is in our frame files or a sprite sheet
+                if mapped_frame_num in frame_files or "sprite" in frame_data:
                     try:
                         row_html += generate_frame_html_item(
-                            frame_files[mapped_frame_num], frame_data
+                            frame_files.get(mapped_frame_num), frame_data
                         )
                         frames_added += 1
                     except Exception as e:
@@ -1259,8 +1325,8 @@ def generate_basic_html_viewer(results_dir: Path, input_file: str) -> None:
     frame_files = []
     try:
         frame_files = sorted(
-            [f for f in results_dir.glob("frames*.jpg")],
-            key=lambda x: int(re.match(r"frames(\d+)\.jpg", x.name).group(1)),
+            [f for f in results_dir.glob("frames*") if FRAME_FILE_PATTERN.match(f.name)],
+            key=lambda x: int(FRAME_FILE_PATTERN.match(x.name).group(1)),
         )
     except Exception as e:
         logger.error(f"Error sorting frame files: {e}")
@@ -1299,7 +1365,7 @@ def generate_basic_html_viewer(results_dir: Path, input_file: str) -> None:
             frame_data = []
             for j in range(5):
                 frame_number = int(
-                    re.match(r"frames(\d+)\.jpg", frame_files[i + j].name).group(1)
+                    FRAME_FILE_PATTERN.match(frame_files[i + j].name).group(1)
                 )
                 frame_data.append(
                     {
@@ -1321,7 +1387,7 @@ def generate_basic_html_viewer(results_dir: Path, input_file: str) -> None:
             remaining = []
             while i < len(frame_files):
                 frame_number = int(
-                    re.match(r"frames(\d+)\.jpg", frame_files[i].name).group(1)
+                    FRAME_FILE_PATTERN.match(frame_files[i].name).group(1)
                 )
                 remaining.append(
                     {
@@ -1394,3 +1460,545 @@ def generate_basic_html_viewer(results_dir: Path, input_file: str) -> None:
         logger.info(f"Basic HTML viewer generated in {results_dir}")
     except Exception as e:
         logger.error(f"Error writing HTML files: {e}")
+
+
+VIRTUAL_HTML_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>SCTE-104 Frame Viewer</title>
+    <link rel="stylesheet" href="styles.css">
+</head>
+<body>
+    <header>
+        <h1>SCTE-104 Frame Viewer</h1>
+        <div class="file-info">
+            <span>File: {filename}</span>
+            <span id="event-count">Loading events...</span>
+        </div>
+        <div class="controls">
+            <input type="search" id="search" placeholder="Search event ID, type, frame...">
+            <input type="number" id="jump-frame" min="0" placeholder="Jump to frame">
+            <button id="jump">Jump</button>
+            <button id="toggle-announcement">Toggle Announcement Frames</button>
+            <button id="toggle-scte">Toggle SCTE Trigger Frames</button>
+            <select id="sort-order">
+                <option value="asc">Sort Ascending</option>
+                <option value="desc">Sort Descending</option>
+            </select>
+        </div>
+    </header>
+
+    <main>
+        <div class="virtual-timeline" id="timeline"></div>
+    </main>
+
+    <footer>
+        <p>Generated by SCTE Decoder</p>
+    </footer>
+
+    <script src="viewer.js"></script>
+</body>
+</html>
+"""
+
+VIRTUAL_CSS_TEMPLATE = """
+/* Virtualized timeline: fixed-height rows, only rows in view are in the DOM */
+input[type="search"], input[type="number"] {
+    padding: 12px 18px;
+    border: none;
+    border-radius: 6px;
+    font-size: 1rem;
+    min-width: 220px;
+}
+
+button.active {
+    opacity: 0.6;
+}
+
+.virtual-timeline {
+    position: relative;
+}
+
+.virtual-row {
+    position: absolute;
+    left: 0;
+    right: 0;
+    height: 290px;
+    padding: 10px 0;
+}
+
+.virtual-row.highlight .virtual-label {
+    background-color: #fff3cd;
+}
+
+.virtual-label {
+    font-weight: 600;
+    padding: 6px 12px;
+    border-left: 5px solid #6c757d;
+    background-color: #e9ecef;
+    border-radius: 4px;
+    white-space: nowrap;
+    overflow: hidden;
+    text-overflow: ellipsis;
+}
+
+.virtual-row.announcement-row .virtual-label {
+    border-left-color: #ffc107;
+}
+
+.virtual-row.scte-row .virtual-label {
+    border-left-color: #dc3545;
+}
+
+.virtual-strip {
+    display: flex;
+    gap: 10px;
+    overflow-x: auto;
+    padding: 10px 2px;
+}
+
+.virtual-frame {
+    flex: 0 0 220px;
+    background: white;
+    border-radius: 6px;
+    border-top: 4px solid #6c757d;
+    box-shadow: 0 2px 6px rgba(0, 0, 0, 0.1);
+    overflow: hidden;
+}
+
+.virtual-frame.announcement-frame {
+    border-top-color: #ffc107;
+}
+
+.virtual-frame.scte-trigger {
+    border-top-color: #dc3545;
+}
+
+.virtual-frame .frame-image {
+    display: block;
+    width: 100%;
+    height: auto;
+    aspect-ratio: 16 / 9;
+    object-fit: contain;
+    background-color: #000;
+}
+
+.virtual-caption {
+    padding: 6px 10px;
+    font-size: 0.85rem;
+}
+
+.virtual-message {
+    padding: 30px;
+    text-align: center;
+}
+"""
+
+VIRTUAL_JS_TEMPLATE = """(function() {
+    'use strict';
+
+    // Must match the height of .virtual-row in styles.css
+    const ROW_HEIGHT = 290;
+    const OVERSCAN = 4;
+
+    const timeline = document.getElementById('timeline');
+    const eventCount = document.getElementById('event-count');
+    const searchInput = document.getElementById('search');
+    const jumpInput = document.getElementById('jump-frame');
+    const jumpBtn = document.getElementById('jump');
+    const toggleAnnouncementBtn = document.getElementById('toggle-announcement');
+    const toggleScteBtn = document.getElementById('toggle-scte');
+    const sortOrderSelect = document.getElementById('sort-order');
+
+    let groups = [];
+    let visible = [];
+    const rendered = new Map();
+    const state = {query: '', showAnnouncement: true, showScte: true, descending: false};
+    let highlighted = null;
+
+    // Modal for enlarged images
+    const modal = document.createElement('div');
+    modal.className = 'modal';
+    const modalImg = document.createElement('img');
+    modalImg.className = 'modal-content';
+    const closeBtn = document.createElement('span');
+    closeBtn.className = 'close';
+    closeBtn.innerHTML = '&times;';
+    modal.appendChild(closeBtn);
+    modal.appendChild(modalImg);
+    document.body.appendChild(modal);
+
+    function openModal(src) {
+        modal.style.display = 'flex';
+        modalImg.src = src;
+        setTimeout(() => modal.classList.add('show'), 10);
+    }
+
+    function closeModal() {
+        modal.classList.remove('show');
+        setTimeout(() => { modal.style.display = 'none'; }, 300);
+    }
+
+    closeBtn.addEventListener('click', closeModal);
+    modal.addEventListener('click', event => {
+        if (event.target === modal) {
+            closeModal();
+        }
+    });
+
+    function frameClass(type) {
+        if (type.indexOf('Announcement') !== -1) {
+            return 'announcement-frame';
+        }
+        if (type.indexOf('SCTE Trigger') !== -1) {
+            return 'scte-trigger';
+        }
+        return 'padding-frame';
+    }
+
+    function createImage(frame) {
+        let element;
+        if (frame.sprite) {
+            // [file, x, y, tile width, tile height, sheet width, sheet height]
+            const [file, x, y, w, h, sheetW, sheetH] = frame.sprite;
+            element = document.createElement('div');
+            element.className = 'frame-image frame-sprite';
+            element.setAttribute('role', 'img');
+            element.style.backgroundImage = "url('" + file + "')";
+            element.style.backgroundSize = (sheetW / w * 100) + '% ' + (sheetH / h * 100) + '%';
+            element.style.backgroundPosition =
+                (sheetW > w ? x / (sheetW - w) * 100 : 0) + '% ' +
+                (sheetH > h ? y / (sheetH - h) * 100 : 0) + '%';
+            element.dataset.fullSrc = frame.full_image || file;
+        } else {
+            element = document.createElement('img');
+            element.className = 'frame-image';
+            element.loading = 'lazy';
+            element.decoding = 'async';
+            element.src = frame.image;
+            if (frame.full_image) {
+                element.srcset = frame.image + ' 1x, ' + frame.full_image + ' 2x';
+            }
+            element.dataset.fullSrc = frame.full_image || frame.image;
+        }
+        element.setAttribute('aria-label', 'Frame ' + frame.frame);
+        element.addEventListener('click', () => openModal(element.dataset.fullSrc));
+        return element;
+    }
+
+    function createRow(group, index) {
+        const row = document.createElement('div');
+        const isAnnouncement = group.event_type.indexOf('Announcement') !== -1;
+        row.className = 'virtual-row ' + (isAnnouncement ? 'announcement-row' : 'scte-row');
+        row.style.top = (index * ROW_HEIGHT) + 'px';
+        if (group === highlighted) {
+            row.classList.add('highlight');
+        }
+
+        const label = document.createElement('div');
+        label.className = 'virtual-label';
+        label.textContent = group.label;
+        row.appendChild(label);
+
+        const strip = document.createElement('div');
+        strip.className = 'virtual-strip';
+        group.frames.forEach(frame => {
+            const card = document.createElement('div');
+            card.className = 'virtual-frame ' + frameClass(frame.type);
+            card.appendChild(createImage(frame));
+
+            const caption = document.createElement('div');
+            caption.className = 'virtual-caption';
+            caption.textContent = 'Frame ' + frame.frame + ' - ' + frame.type;
+            card.appendChild(caption);
+
+            strip.appendChild(card);
+        });
+        row.appendChild(strip);
+
+        return row;
+    }
+
+    function renderWindow() {
+        const top = -timeline.getBoundingClientRect().top;
+        const first = Math.max(0, Math.floor(top / ROW_HEIGHT) - OVERSCAN);
+        const last = Math.min(
+            visible.length - 1,
+            Math.ceil((top + window.innerHeight) / ROW_HEIGHT) + OVERSCAN
+        );
+
+        rendered.forEach((row, index) => {
+            if (index < first || index > last) {
+                row.remove();
+                rendered.delete(index);
+            }
+        });
+
+        for (let index = first; index <= last; index++) {
+            if (!rendered.has(index)) {
+                const row = createRow(visible[index], index);
+                rendered.set(index, row);
+                timeline.appendChild(row);
+            }
+        }
+    }
+
+    function applyFilters() {
+        const query = state.query.trim().toLowerCase();
+        visible = groups.filter(group => {
+            const isAnnouncement = group.event_type.indexOf('Announcement') !== -1;
+            if (isAnnouncement ? !state.showAnnouncement : !state.showScte) {
+                return false;
+            }
+            return !query || group.search.indexOf(query) !== -1;
+        });
+        if (state.descending) {
+            visible.reverse();
+        }
+
+        rendered.forEach(row => row.remove());
+        rendered.clear();
+        timeline.style.height = (visible.length * ROW_HEIGHT) + 'px';
+        eventCount.textContent = visible.length + ' of ' + groups.length + ' events';
+        renderWindow();
+    }
+
+    function jumpToFrame(frameNumber) {
+        if (!visible.length) {
+            return;
+        }
+
+        // Find the group whose event frame is closest to the requested frame
+        let best = 0;
+        visible.forEach((group, index) => {
+            const distance = Math.abs(group.event_frame - frameNumber);
+            if (distance < Math.abs(visible[best].event_frame - frameNumber)) {
+                best = index;
+            }
+        });
+
+        highlighted = visible[best];
+        rendered.forEach(row => row.remove());
+        rendered.clear();
+        const offset = timeline.getBoundingClientRect().top + window.scrollY;
+        window.scrollTo({top: offset + best * ROW_HEIGHT - 20});
+        renderWindow();
+    }
+
+    let scheduled = false;
+    function onScroll() {
+        if (!scheduled) {
+            scheduled = true;
+            window.requestAnimationFrame(() => {
+                scheduled = false;
+                renderWindow();
+            });
+        }
+    }
+
+    window.addEventListener('scroll', onScroll, {passive: true});
+    window.addEventListener('resize', onScroll);
+
+    let searchTimer = null;
+    searchInput.addEventListener('input', () => {
+        clearTimeout(searchTimer);
+        searchTimer = setTimeout(() => {
+            state.query = searchInput.value;
+            applyFilters();
+        }, 150);
+    });
+
+    jumpBtn.addEventListener('click', () => {
+        if (jumpInput.value !== '') {
+            jumpToFrame(parseInt(jumpInput.value, 10));
+        }
+    });
+    jumpInput.addEventListener('keydown', event => {
+        if (event.key === 'Enter') {
+            jumpBtn.click();
+        }
+    });
+
+    toggleAnnouncementBtn.addEventListener('click', () => {
+        state.showAnnouncement = !state.showAnnouncement;
+        toggleAnnouncementBtn.classList.toggle('active', !state.showAnnouncement);
+        applyFilters();
+    });
+    toggleScteBtn.addEventListener('click', () => {
+        state.showScte = !state.showScte;
+        toggleScteBtn.classList.toggle('active', !state.showScte);
+        applyFilters();
+    });
+    sortOrderSelect.addEventListener('change', () => {
+        state.descending = sortOrderSelect.value === 'desc';
+        applyFilters();
+    });
+
+    fetch('events.json')
+        .then(response => response.json())
+        .then(data => {
+            groups = data.groups;
+            groups.forEach(group => {
+                group.search = group.search_text.toLowerCase();
+            });
+            applyFilters();
+        })
+        .catch(error => {
+            console.error('Could not load events.json:', error);
+            eventCount.textContent = 'Could not load events';
+            timeline.innerHTML =
+                '<div class="error-message virtual-message">' +
+                '<h2>Could not load events.json</h2>' +
+                '<p>Browsers block loading data files from file:// pages. Serve the ' +
+                'results folder instead, e.g. <code>python -m http.server</code>, ' +
+                'and open http://localhost:8000/</p></div>';
+        });
+})();
+"""
+
+
+def build_viewer_events(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build the compact event data for the virtualized viewer from metadata.json.
+
+    Image names come from the metadata, so the output folder is never globbed.
+    Frames are looked up through an index by frame number, so building the
+    data is linear in the number of frames.
+
+    Args:
+        metadata: Contents of metadata.json
+
+    Returns:
+        Dict[str, Any]: Event groups with their frames, ready to serialize as events.json
+    """
+    # Metadata written before image names were recorded only has the mapping
+    output_numbers = {
+        int(original_num): int(output_num)
+        for output_num, original_num in metadata.get("frame_mapping", {}).items()
+    }
+
+    frames_by_number: Dict[int, Dict[str, Any]] = {}
+    for frame in metadata.get("frames", []):
+        frames_by_number.setdefault(frame["frame_number"], frame)
+
+    groups = []
+    for group in metadata.get("frame_groups", []):
+        event_frame = group["event_frame"]
+        event_type = group["event_type"]
+        event_data = frames_by_number.get(event_frame, {})
+        scte_data = event_data.get("scte_data", {})
+
+        segmentation_type = scte_data.get("segmentation_type", "")
+        if isinstance(segmentation_type, dict):
+            segmentation_type = segmentation_type.get("name", "")
+
+        label = f"{event_type} (Frame {event_frame})"
+        if scte_data:
+            label += (
+                f" - {segmentation_type} - Event ID "
+                f"{scte_data.get('segmentation_event_id', 'N/A')}"
+            )
+
+        frames = []
+        for frame_number in group["frames"]:
+            frame_data = frames_by_number.get(frame_number, {})
+            frame = {
+                "frame": frame_number,
+                "type": frame_data.get("type", "Padding Frame"),
+            }
+
+            sprite = frame_data.get("sprite")
+            if sprite:
+                frame["sprite"] = [
+                    sprite["file"],
+                    sprite["x"],
+                    sprite["y"],
+                    sprite["width"],
+                    sprite["height"],
+                    sprite["sheet_width"],
+                    sprite["sheet_height"],
+                ]
+            else:
+                frame["image"] = frame_data.get(
+                    "image", f"frames{output_numbers.get(frame_number, frame_number)}.jpg"
+                )
+
+            if "full_image" in frame_data:
+                frame["full_image"] = frame_data["full_image"]
+
+            frames.append(frame)
+
+        groups.append(
+            {
+                "event_frame": event_frame,
+                "event_type": event_type,
+                "label": label,
+                "search_text": " ".join(
+                    str(value)
+                    for value in (
+                        event_frame,
+                        event_type,
+                        segmentation_type,
+                        scte_data.get("segmentation_event_id", ""),
+                        scte_data.get("segmentation_upid", ""),
+                        scte_data.get("event_timestamp", ""),
+                    )
+                    if value not in ("", None)
+                ),
+                "frames": frames,
+            }
+        )
+
+    groups.sort(key=lambda x: x["event_frame"])
+
+    return {"total_frames": metadata.get("total_frames", 0), "groups": groups}
+
+
+def generate_virtual_html_viewer(results_dir: Path, input_file: str) -> None:
+    """
+    Generate a virtualized HTML viewer backed by a single events.json file.
+
+    The page itself is static and small. Its script loads events.json and only
+    keeps the event groups in view in the DOM, so the page stays responsive for
+    files with hundreds of events. The page must be served over HTTP (e.g. with
+    python -m http.server), since browsers block loading data from file:// pages.
+
+    Args:
+        results_dir: Directory containing the results
+        input_file: Path to the input MXF file
+    """
+    logger.info(f"Generating virtualized HTML viewer in {results_dir}")
+
+    metadata_file = results_dir / "metadata.json"
+    try:
+        with open(metadata_file, "r", encoding="utf-8") as f:
+            metadata = json.load(f)
+    except (OSError, json.JSONDecodeError, UnicodeDecodeError) as e:
+        logger.error(f"Error loading metadata.json: {e}")
+        logger.info("Generating basic HTML viewer without metadata")
+        return generate_basic_html_viewer(results_dir, input_file)
+
+    events = build_viewer_events(metadata)
+    events["filename"] = Path(input_file).name
+
+    try:
+        with open(results_dir / "events.json", "w", encoding="utf-8") as f:
+            json.dump(events, f, separators=(",", ":"))
+
+        with open(results_dir / "index.html", "w", encoding="utf-8") as f:
+            f.write(VIRTUAL_HTML_TEMPLATE.format(filename=Path(input_file).name))
+
+        with open(results_dir / "styles.css", "w", encoding="utf-8") as f:
+            f.write(CSS_TEMPLATE + VIRTUAL_CSS_TEMPLATE)
+
+        with open(results_dir / "viewer.js", "w", encoding="utf-8") as f:
+            f.write(VIRTUAL_JS_TEMPLATE)
+
+        logger.info(
+            f"Virtualized HTML viewer with {len(events['groups'])} event groups "
+            f"generated in {results_dir}"
+        )
+    except OSError as e:
+        logger.error(f"Error writing HTML files: {e}")
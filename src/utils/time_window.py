@@ -0,0 +1,103 @@
+"""
+Time Window module for processing only part of a media file.
+
+Window bounds are given as seconds from the start of the file, as a time of
+day timecode or as a UTC time. They are converted to seconds from the first
+frame of the file, which is what ffprobe's -read_intervals option expects, so
+only the packets inside the window are read. The bounds are parsed by
+pyvanc's parse_window, as for the --start and --end options of pyvanc.
+"""
+
+from fractions import Fraction
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+from pyvanc.utils.frame_timecode import (
+    DEFAULT_FRAME_RATE,
+    FrameRate,
+    seconds_to_frames,
+)
+from pyvanc.utils.vanc_utils import parse_creation_time, parse_window
+
+
+class TimeWindow(NamedTuple):
+    """Part of a media file, in seconds from its first frame."""
+
+    start: Optional[Fraction] = None  # None reads from the start of the file
+    end: Optional[Fraction] = None  # None reads to the end, the end is exclusive
+
+    @property
+    def is_limited(self) -> bool:
+        """Whether the window is only part of the file."""
+        return self.start is not None or self.end is not None
+
+    def read_intervals(self) -> str:
+        """
+        Build the ffprobe -read_intervals specification of the window.
+
+        Returns:
+            str: Interval as "start%end", with empty bounds left out
+        """
+        start = "" if self.start is None else f"{float(self.start):.6f}"
+        end = "" if self.end is None else f"{float(self.end):.6f}"
+        return f"{start}%{end}"
+
+    def frame_range(self, rate: FrameRate = DEFAULT_FRAME_RATE) -> Tuple[int, int]:
+        """
+        Convert the window to frame numbers.
+
+        Args:
+            rate: Frame rate
+
+        Returns:
+            Tuple[int, int]: First frame and the frame after the window, -1 for the end of the file
+        """
+        start = 0 if self.start is None else seconds_to_frames(self.start, rate)
+        end = -1 if self.end is None else seconds_to_frames(self.end, rate)
+        return start, end
+
+    def contains_frame(self, frame: int, rate: FrameRate = DEFAULT_FRAME_RATE) -> bool:
+        """
+        Check whether a frame lies inside the window.
+
+        Args:
+            frame: Frame number from the start of the file
+            rate: Frame rate
+
+        Returns:
+            bool: True if the frame is inside the window
+        """
+        start, end = self.frame_range(rate)
+        return frame >= start and (end < 0 or frame < end)
+
+
+def resolve_window(
+    start: Optional[str],
+    end: Optional[str],
+    format_tags: Dict[str, Any],
+    rate: FrameRate = DEFAULT_FRAME_RATE,
+) -> TimeWindow:
+    """
+    Convert the window bounds given for a file to seconds from its first frame.
+
+    Args:
+        start: Start of the window, None for the start of the file
+        end: End of the window, None for the end of the file
+        format_tags: Format tags of the file from ffprobe, with "timecode" and "creation_time"
+        rate: Frame rate of the file
+
+    Returns:
+        TimeWindow: Window in seconds from the first frame
+
+    Raises:
+        ValueError: If a bound cannot be converted or the window is empty
+    """
+    creation_time = format_tags.get("creation_time")
+    return TimeWindow(
+        *parse_window(
+            start,
+            end,
+            format_tags.get("timecode"),
+            parse_creation_time(creation_time) if creation_time else None,
+            rate,
+        )
+    )